@@ -0,0 +1,71 @@
+import argparse
+import os
+import time
+
+from loguru import logger
+
+from src.config import MaintenanceConfig
+from src.db.maintenance import DBMaintenance
+
+
+def parse_retention_by_source(value: str) -> dict[str, int]:
+	"""Parse retention overrides written as `source=days,source=days`."""
+	overrides = {}
+	for item in value.split(","):
+		if "=" in item:
+			source, days = item.split("=", 1)
+			overrides[source.strip()] = int(days)
+	return overrides
+
+
+def load_config() -> MaintenanceConfig:
+	return MaintenanceConfig(
+		notification_retention_days=int(os.getenv("NOTIFICATION_RETENTION_DAYS", "30")),
+		notification_retention_by_source=parse_retention_by_source(
+			os.getenv("NOTIFICATION_RETENTION_BY_SOURCE", "")
+		),
+		chat_history_retention_days=int(os.getenv("CHAT_HISTORY_RETENTION_DAYS", "0")),
+		chat_history_compress_after_days=int(
+			os.getenv("CHAT_HISTORY_COMPRESS_AFTER_DAYS", "7")
+		),
+		snapshot_raw_days=int(os.getenv("WALLET_SNAPSHOT_RAW_DAYS", "7")),
+		snapshot_hourly_days=int(os.getenv("WALLET_SNAPSHOT_HOURLY_DAYS", "90")),
+		vacuum_pages=int(os.getenv("MAINTENANCE_VACUUM_PAGES", "2000")),
+	)
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Prune, compact and roll up the agent database"
+	)
+	parser.add_argument(
+		"--once", action="store_true", help="Run once instead of on a schedule"
+	)
+	parser.add_argument(
+		"--enable-incremental-vacuum",
+		action="store_true",
+		help=(
+			"Rebuild the database once with incremental auto vacuum, so the runs can free pages, "
+			"and exit. Needs downtime: stop the agents and the notification service first"
+		),
+	)
+	args = parser.parse_args()
+
+	maintenance = DBMaintenance(
+		db_path=os.getenv("SQLITE_PATH", "../db/superior-agents.db"),
+		config=load_config(),
+	)
+	if args.enable_incremental_vacuum:
+		pages = maintenance.enable_incremental_vacuum()
+		logger.info(f"Incremental auto vacuum enabled, {pages} pages freed")
+		raise SystemExit(0)
+	interval_s = float(os.getenv("MAINTENANCE_INTERVAL_HOURS", "6")) * 60 * 60
+
+	while True:
+		try:
+			maintenance.run()
+		except Exception as e:
+			logger.error(f"Database maintenance failed: {e}")
+		if args.once:
+			break
+		time.sleep(interval_s)
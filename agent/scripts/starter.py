@@ -25,10 +25,18 @@ from src.helper import (
 	services_to_envs,
 	services_to_prompts,
 )
-from src.genner import get_genner
+from src.genner import (
+	CompletionCacheConfig,
+	FailoverConfig,
+	get_candidate_genners,
+	get_genner,
+	metrics_recorder,
+	with_completion_cache,
+)
 from src.genner.Base import Genner
 from src.client.openrouter import OpenRouter
-from src.summarizer import get_summarizer
+from src.client.notification_events import NotificationSubscriber
+from src.summarizer import SummarizerService, get_summarizer
 from anthropic import Anthropic
 import docker
 from functools import partial
@@ -40,9 +48,12 @@ from src.constants import FE_DATA_MARKETING_DEFAULTS, FE_DATA_TRADING_DEFAULTS
 from src.manager import fetch_default_prompt
 from dotenv import load_dotenv
 from src.twitter import TweepyTwitterClient
+from src.twitter_rate_limit import RateLimitedClient
 
 load_dotenv()
 
+SUMMARY_FLUSH_TIMEOUT_S = 120
+
 
 def start_marketing_agent(
 	agent_type: str,
@@ -54,6 +65,7 @@ def start_marketing_agent(
 	sensor: MarketingSensorInterface,
 	db: DBInterface,
 	stream_fn: Callable[[str], None] = lambda x: print(x, flush=True, end=""),
+	summarizer: SummarizerService | None = None,
 ):
 	role = fe_data["role"]
 	time_ = fe_data["time"]
@@ -76,7 +88,10 @@ def start_marketing_agent(
 		in_con_env=in_con_env,
 	)
 
-	summarizer = get_summarizer(genner)
+	summarizer = summarizer or get_summarizer(genner)
+	# Let the summaries of the previous cycle reach the DB before reading it
+	if not summarizer.flush(timeout=SUMMARY_FLUSH_TIMEOUT_S):
+		logger.warning("Summaries of the previous cycle are still pending")
 	previous_strategies = db.fetch_all_strategies(agent_id)
 
 	rag.save_result_batch_v4(previous_strategies)
@@ -124,6 +139,8 @@ def start_trading_agent(
 	db: DBInterface,
 	txn_service_url: str,
 	stream_fn: Callable[[str], None] = lambda x: print(x, flush=True, end=""),
+	candidate_genners: list[Genner] | None = None,
+	summarizer: SummarizerService | None = None,
 ):
 	role = fe_data["role"]
 	network = fe_data["network"]
@@ -147,7 +164,10 @@ def start_trading_agent(
 		in_con_env=in_con_env,
 	)
 
-	summarizer = get_summarizer(genner)
+	summarizer = summarizer or get_summarizer(genner)
+	# Let the summaries of the previous cycle reach the DB before reading it
+	if not summarizer.flush(timeout=SUMMARY_FLUSH_TIMEOUT_S):
+		logger.warning("Summaries of the previous cycle are still pending")
 	previous_strategies = db.fetch_all_strategies(agent_id)
 
 	rag.save_result_batch_v4(previous_strategies)
@@ -160,6 +180,7 @@ def start_trading_agent(
 		prompt_generator=prompt_generator,
 		db=db,
 		rag=rag,
+		candidate_genners=candidate_genners,
 	)
 
 	flow_func = partial(
@@ -225,12 +246,12 @@ def setup_marketing_sensor() -> MarketingSensorInterface:
 	)
 
 	twitter_client = TweepyTwitterClient(
-		client=tweepy.Client(
+		# Waits for budget up to a bound instead of sleeping out a 429 window
+		client=RateLimitedClient(
 			consumer_key=TWITTER_API_KEY,
 			consumer_secret=TWITTER_API_KEY_SECRET,
 			access_token=TWITTER_ACCESS_TOKEN,
 			access_token_secret=TWITTER_ACCESS_TOKEN_SECRET,
-			wait_on_rate_limit=True,  # Add rate limit handling
 		),
 		api_client=tweepy.API(auth),
 	)
@@ -513,14 +534,59 @@ def starter_prompt():
 	)
 
 	genner = get_genner(
-		backend=fe_data["model"],
+		backend=",".join(
+			[fe_data["model"]]
+			+ [
+				x
+				for x in os.getenv("LLM_FALLBACK_BACKENDS", "").split(",")
+				if x.strip()
+			]
+		),
 		# deepseek_deepseek_client=deepseek_deepseek_client,
 		or_client=or_client,
 		anthropic_client=anthropic_client,
 		stream_fn=lambda token: print(token, end="", flush=True),
+		failover_config=FailoverConfig(
+			hedge_after_s=float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "20")),
+		),
+	)
+	genner = with_completion_cache(
+		genner,
+		CompletionCacheConfig(
+			db_path=os.getenv("LLM_CACHE_PATH", "../db/llm-cache.db"),
+			mode=os.getenv("LLM_CACHE_MODE", "off"),
+			ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60))),
+			run_id=os.getenv("LLM_CACHE_RUN_ID", "default"),
+		),
 	)
+	metrics_recorder.prometheus_path = os.getenv("LLM_METRICS_PROM_PATH", "")
+	summarizer_backend = os.getenv("LLM_SUMMARIZER_BACKEND", "").strip()
+	summarizer = get_summarizer(
+		get_genner(
+			backend=summarizer_backend,
+			stream_fn=None,
+			or_client=or_client,
+			anthropic_client=anthropic_client,
+		)
+		if summarizer_backend
+		else genner
+	)
+	candidate_genners = get_candidate_genners(
+		[x for x in os.getenv("SPECULATIVE_CANDIDATES", "").split(",") if x.strip()],
+		or_client=or_client,
+		anthropic_client=anthropic_client,
+	)
+	# Cycles start early on high-signal notifications when the worker publishes them
+	events_socket = os.getenv("NOTIFICATION_EVENTS_SOCKET")
+	notification_events = (
+		NotificationSubscriber(events_socket) if events_socket else None
+	)
+	session_interval = int(os.getenv("SESSION_INTERVAL_SECONDS", "15"))
 	# modify this if you want to run this forever
 	for x in range(3):
+		if notification_events is not None:
+			logger.info(f"New notifications from {notification_events.new_sources()}")
+			notification_events.clear()
 		if answers["agent_type"] == "marketing":
 			start_marketing_agent(
 				agent_type=answers["agent_type"],
@@ -537,6 +603,7 @@ def starter_prompt():
 				),
 				rag=rag_client,
 				sensor=sensor,
+				summarizer=summarizer,
 			)
 		elif answers["agent_type"] == "trading":
 			start_trading_agent(
@@ -555,12 +622,22 @@ def starter_prompt():
 				rag=rag_client,
 				sensor=sensor,
 				txn_service_url=os.getenv("TXN_SERVICE_URL"),
+				candidate_genners=candidate_genners,
+				summarizer=summarizer,
 			)
-		session_interval = 15
 		logger.info(
 			f"Waiting for {session_interval} seconds before starting a new cycle..."
 		)
-		time.sleep(session_interval)
+		if notification_events is None:
+			time.sleep(session_interval)
+		elif notification_events.wait(session_interval, fe_data["notifications"]):
+			logger.info(
+				"High-signal notification received, starting the next cycle early"
+			)
+
+	if notification_events is not None:
+		notification_events.close()
+	summarizer.flush(timeout=SUMMARY_FLUSH_TIMEOUT_S)
 
 
 if __name__ == "__main__":
@@ -128,7 +128,9 @@ class MarketingPromptGenerator:
 		if not apis_str:
 			apis_str = "No APIs available"
 
-		return self.prompts.get("research_code_prompt_first", "").format(apis_str=apis_str)
+		return self.prompts.get("research_code_prompt_first", "").format(
+			apis_str=apis_str
+		)
 
 	def generate_research_code_prompt(
 		self,
@@ -192,7 +194,7 @@ class MarketingPromptGenerator:
 			research_output_str=research_output_str,
 			metric_name=metric_name,
 			time=time,
-			latest_response=latest_response
+			latest_response=latest_response,
 		)
 
 	def generate_marketing_code_prompt(
@@ -585,7 +587,9 @@ class MarketingAgent:
 			return Err(f"MarketingAgent.gen_strategy, err: \n{err}")
 
 		response = gen_result.unwrap()
-		response_content = json.dumps(response)  # Ensure the response is a JSON serializable string
+		response_content = json.dumps(
+			response
+		)  # Ensure the response is a JSON serializable string
 		ctx_ch = ctx_ch.append(Message(role="assistant", content=response_content))
 
 		return Ok((response_content, ctx_ch))
@@ -1,89 +1,63 @@
-import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from textwrap import dedent
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Tuple
 from datetime import datetime
 from src.db import DBInterface
 
+from loguru import logger
 from result import Err, Ok, Result
 
 from src.container import ContainerManager
 from src.genner.Base import Genner
+from src.genner.CacheControl import with_cache_prefix
 from src.client.rag import RAGClient
 from src.sensor.trading import TradingSensor
 from src.custom_types import ChatHistory, Message
+from src.prompt_budget import (
+	DEFAULT_MAX_PROMPT_TOKENS,
+	PromptBudget,
+	context_budget,
+	count_tokens,
+	dedupe_tracebacks,
+)
+from src.prompt_template import PromptTemplate, compile_template, parse_metric_state
 import json
 
 
-class TradingPromptGenerator:
-	"""
-	Generator for creating prompts used in trading agent workflows.
-
-	This class is responsible for generating various prompts used by the trading agent,
-	including system prompts, research code prompts, strategy prompts, and trading code prompts.
-	It handles the substitution of placeholders in prompt templates with actual values.
-	"""
-
-	def __init__(self, prompts: Dict[str, str], genner: Genner):
-		"""
-		Initialize with custom prompts for each function.
-
-		This constructor sets up the prompt generator with either custom prompts
-		or default prompts if none are provided. It validates that all required
-		prompts are present and properly formatted.
-
-		Args:
-		    prompts (Dict[str, str]): Dictionary containing custom prompts for each function
-		"""
-		if prompts:
-			prompts = self.get_default_prompts()
-		self._validate_prompts(prompts)
-		self.prompts = self.get_default_prompts()
-		self.genner = genner
-
-	def _instruments_to_curl_prompt(
-		self,
-		instruments: List[str],
-		txn_service_url: str,
-		agent_id: str,
-		session_id: str,
-	):
-		"""
-		Convert trading instruments to curl command prompts.
-
-		This method generates curl command examples for each trading instrument,
-		which can be included in prompts to show how to interact with the transaction service.
-
-		Args:
-		        instruments (List[str]): List of trading instrument types
-		        txn_service_url (str): URL of the transaction service
-		        agent_id (str): ID of the agent
-		        session_id (str): ID of the session
-
-		Returns:
-		        str: String containing curl command examples for the specified instruments
-
-		Raises:
-		        KeyError: If an unsupported trading instrument is provided
-		"""
-		try:
-			# TODO calling spot is not correct, should call it swap
-			mapping = {
-				# 	"swap_solana": dedent(f"""
-				# 	# Swap solana
-				# 	curl -X 'POST' \
-				# 	'http://{txn_service_url}/api/v1/swap' \
-				# 	-H 'accept: application/json' \
-				# 	-H 'Content-Type: application/json' \
-				# 	-d '{
-				# 		"chainId": "<",
-				# 		"tokenIn": "string",
-				# 		"chainOut": "string",
-				# 		"tokenOut": "string",
-				# 		"amountIn": "string",
-				# 		"slippage": 0.5
-				# 	}'
-				# """),
-				"spot": dedent(f"""
+def _run_coroutine(coro):
+	"""Run a coroutine from sync code, also when the calling thread already runs a loop."""
+	try:
+		asyncio.get_running_loop()
+	except RuntimeError:
+		return asyncio.run(coro)
+
+	# `asyncio.run` refuses to nest, so give the coroutine its own loop and thread
+	with ThreadPoolExecutor(max_workers=1) as executor:
+		return executor.submit(asyncio.run, coro).result()
+
+
+# Curl examples of each trading instrument, in the `str.format` syntax
+INSTRUMENT_CURL_PROMPTS: Dict[str, PromptTemplate] = {
+	name: compile_template(prompt)
+	for name, prompt in {
+		# 	"swap_solana": dedent("""
+		# 	# Swap solana
+		# 	curl -X 'POST' \
+		# 	'http://{txn_service_url}/api/v1/swap' \
+		# 	-H 'accept: application/json' \
+		# 	-H 'Content-Type: application/json' \
+		# 	-d '{
+		# 		"chainId": "<",
+		# 		"tokenIn": "string",
+		# 		"chainOut": "string",
+		# 		"tokenOut": "string",
+		# 		"amountIn": "string",
+		# 		"slippage": 0.5
+		# 	}'
+		# """),
+		"spot": dedent("""
                 curl -X POST "http://{txn_service_url}/api/v1/swap" \\
                 -H "Content-Type: application/json" \\
                 -H "x-superior-agent-id: {agent_id}" \\
@@ -95,7 +69,7 @@ class TradingPromptGenerator:
                     "slippage": "<slippage>: float"
                 }}'
             """),
-				"futures": dedent(f"""
+		"futures": dedent("""
                 # Futures
                 curl -X POST "http://{txn_service_url}/api/v1/futures/position" \\
                 -H "Content-Type: application/json" \\
@@ -108,7 +82,7 @@ class TradingPromptGenerator:
                     "take_profit": "<optional_take_profit_price>"
                 }}'
             """),
-				"options": dedent(f"""
+		"options": dedent("""
                 # Options
                 curl -X POST "http://{txn_service_url}/api/v1/options/trade" \\
                 -H "Content-Type: application/json" \\
@@ -121,7 +95,7 @@ class TradingPromptGenerator:
                     "side": "<buy|sell>"
                 }}'
             """),
-				"defi": dedent(f"""
+		"defi": dedent("""
                 # Defi
                 curl -X POST "http://{txn_service_url}/api/v1/defi/interact" \\
                 -H "Content-Type: application/json" \\
@@ -134,7 +108,7 @@ class TradingPromptGenerator:
                     "slippage": "<slippage_tolerance>"
                 }}'
             """),
-				"sports_betting": dedent(f"""
+		"sports_betting": dedent("""
                 # Sports Betting via Overtime Protocol v2
                 curl -X POST "http://{txn_service_url}/api/v1/overtime/bet" \\
                 -H "Content-Type: application/json" \\
@@ -153,13 +127,98 @@ class TradingPromptGenerator:
                 -H "x-superior-agent-id: {agent_id}" \\
                 -H "x-superior-session-id: {session_id}"
             """),
-			}
-			instruments_str = [mapping[instrument] for instrument in instruments]
-			return "\n".join(instruments_str)
-		except KeyError as e:
-			raise KeyError(
-				f"Expected trading_instruments to be in ['spot', 'defi', 'futures', 'options', 'sports_betting'], {e}"
-			)
+	}.items()
+}
+
+
+@lru_cache(maxsize=64)
+def _instruments_to_curl(
+	instruments: Tuple[str, ...], txn_service_url: str, agent_id: str, session_id: str
+) -> str:
+	"""Render the curl examples of trading instruments, once per agent and session."""
+	try:
+		templates = [INSTRUMENT_CURL_PROMPTS[instrument] for instrument in instruments]
+	except KeyError as e:
+		raise KeyError(
+			f"Expected trading_instruments to be in {list(INSTRUMENT_CURL_PROMPTS)}, {e}"
+		)
+	return "\n".join(
+		template.render(
+			txn_service_url=txn_service_url, agent_id=agent_id, session_id=session_id
+		)
+		for template in templates
+	)
+
+
+class TradingPromptGenerator:
+	"""
+	Generator for creating prompts used in trading agent workflows.
+
+	This class is responsible for generating various prompts used by the trading agent,
+	including system prompts, research code prompts, strategy prompts, and trading code prompts.
+	It handles the substitution of placeholders in prompt templates with actual values.
+	"""
+
+	def __init__(self, prompts: Dict[str, str], genner: Genner):
+		"""
+		Initialize with custom prompts for each function.
+
+		This constructor sets up the prompt generator with the default prompts,
+		overridden by the custom prompts of the agent. A custom prompt whose
+		placeholders differ from its default's is logged and left out. Every
+		prompt is compiled once, agents sharing a prompt share its template.
+
+		Args:
+		    prompts (Dict[str, str]): Dictionary containing custom prompts for each function
+		"""
+		self.templates: Dict[str, PromptTemplate] = dict(self._default_templates())
+
+		for prompt_name, prompt_content in (prompts or {}).items():
+			default = self.templates.get(prompt_name)
+			if default is not None and default.text == prompt_content:
+				continue
+			try:
+				self.templates[prompt_name] = self._validate_prompt(
+					prompt_name, prompt_content
+				)
+			except ValueError as e:
+				logger.warning(
+					f"Using the default {prompt_name}, the custom one is invalid: {e}"
+				)
+
+		self.prompts = {
+			name: template.text for name, template in self.templates.items()
+		}
+		self.genner = genner
+
+	def _instruments_to_curl_prompt(
+		self,
+		instruments: List[str],
+		txn_service_url: str,
+		agent_id: str,
+		session_id: str,
+	):
+		"""
+		Convert trading instruments to curl command prompts.
+
+		This method generates curl command examples for each trading instrument,
+		which can be included in prompts to show how to interact with the transaction service.
+
+		Args:
+		        instruments (List[str]): List of trading instrument types
+		        txn_service_url (str): URL of the transaction service
+		        agent_id (str): ID of the agent
+		        session_id (str): ID of the session
+
+		Returns:
+		        str: String containing curl command examples for the specified instruments
+
+		Raises:
+		        KeyError: If an unsupported trading instrument is provided
+		"""
+		return _instruments_to_curl(
+			tuple(instruments), txn_service_url, agent_id, session_id
+		)
 
 	@staticmethod
 	def _metric_to_metric_prompt(metric_name="wallet"):
@@ -185,73 +244,84 @@ class TradingPromptGenerator:
 		except KeyError as e:
 			raise KeyError(f"Expected to metric_name to be in ['wallet'], {e}")
 
-	def _extract_default_placeholders(self) -> Dict[str, Set[str]]:
+	@staticmethod
+	@lru_cache(maxsize=1)
+	def _default_templates() -> Dict[str, PromptTemplate]:
 		"""
-		Extract placeholders from default prompts to use as required placeholders.
-
-		This method analyzes the default prompts to identify all placeholders
-		(text surrounded by curly braces) that need to be replaced when generating
-		actual prompts.
+		Compile the default prompts, once per process.
 
 		Returns:
-		        Dict[str, Set[str]]: Dictionary mapping prompt names to sets of placeholders
+		        Dict[str, PromptTemplate]: Dictionary mapping prompt names to their templates
 		"""
-		placeholder_pattern = re.compile(r"{([^}]+)}")
 		return {
-			prompt_name: {
-				f"{{{p}}}" for p in placeholder_pattern.findall(prompt_content)
-			}
-			for prompt_name, prompt_content in self.get_default_prompts().items()
+			prompt_name: compile_template(prompt_content)
+			for prompt_name, prompt_content in TradingPromptGenerator.get_default_prompts().items()
 		}
 
-	def _validate_prompts(self, prompts: Dict[str, str]) -> None:
+	def stable_prefix(self, prompt_name: str, **stable_fields: str) -> str:
 		"""
-		Validate prompts for required and unexpected placeholders.
+		Render the leading part of a prompt that is identical across cycles.
 
-		This method checks that all provided prompts contain the required
-		placeholders and don't contain any unexpected ones. It ensures that
-		the prompts will work correctly when placeholders are substituted.
+		The prompt is rendered up to its first placeholder that is not given in
+		`stable_fields`, so providers can cache it as a prompt prefix.
 
 		Args:
-		        prompts (Dict[str, str]): Dictionary of prompt name to prompt content
+		        prompt_name (str): Name of the prompt template
+		        **stable_fields (str): Values of the placeholders that do not change between cycles
 
-		Raises:
-		        ValueError: If prompts are missing required placeholders or contain unexpected ones
+		Returns:
+		        str: The rendered stable prefix of the prompt
 		"""
-		required_placeholders = self._extract_default_placeholders()
+		template = self.templates.get(prompt_name)
+		return template.prefix(**stable_fields) if template else ""
 
-		# Check all required prompts exist
-		missing_prompts = set(required_placeholders.keys()) - set(prompts.keys())
-		if missing_prompts:
-			raise ValueError(f"Missing required prompts: {missing_prompts}")
+	def apis_to_str(self, apis: List[str]) -> str:
+		"""
+		Render the list of APIs the way the research prompts embed it.
 
-		# Extract placeholders using regex
-		placeholder_pattern = re.compile(r"{([^}]+)}")
+		Args:
+		        apis (List[str]): List of APIs available to the agent
 
-		# Check each prompt for missing and unexpected placeholders
-		for prompt_name, prompt_content in prompts.items():
-			if prompt_name not in required_placeholders:
-				continue
+		Returns:
+		        str: The APIs joined by lines, or the default APIs if none are given
+		"""
+		return ",\n".join(apis) if apis else self._get_default_apis_str()
 
-			# Get actual placeholders in the prompt
-			actual_placeholders = {
-				f"{{{p}}}" for p in placeholder_pattern.findall(prompt_content)
-			}
-			required_set = required_placeholders[prompt_name]
-
-			# Check for missing placeholders
-			missing = required_set - actual_placeholders
-			if missing:
-				raise ValueError(
-					f"Missing required placeholders in {prompt_name}: {missing}"
-				)
+	def _validate_prompt(self, prompt_name: str, prompt_content: str) -> PromptTemplate:
+		"""
+		Compile a custom prompt, checking it has the placeholders of its default.
 
-			# Check for unexpected placeholders
-			unexpected = actual_placeholders - required_set
-			if unexpected:
-				raise ValueError(
-					f"Unexpected placeholders in {prompt_name}: {unexpected}"
-				)
+		Args:
+		        prompt_name (str): Name of the prompt
+		        prompt_content (str): The custom prompt
+
+		Returns:
+		        PromptTemplate: The compiled prompt
+
+		Raises:
+		        ValueError: If the prompt is malformed, misses required placeholders or contains unexpected ones
+		"""
+		template = compile_template(prompt_content)
+		if prompt_name not in self._default_templates():
+			# Prompts without a default, like trading_code_non_address_prompt, have nothing to check against
+			return template
+		required_set = self._default_templates()[prompt_name].fields
+
+		# Check for missing placeholders
+		missing = required_set - template.fields
+		if missing:
+			raise ValueError(
+				f"Missing required placeholders in {prompt_name}: {set(missing)}"
+			)
+
+		# Check for unexpected placeholders
+		unexpected = template.fields - required_set
+		if unexpected:
+			raise ValueError(
+				f"Unexpected placeholders in {prompt_name}: {set(unexpected)}"
+			)
+
+		return template
 
 	def generate_system_prompt(
 		self,
@@ -280,23 +350,20 @@ class TradingPromptGenerator:
 		now = datetime.now()
 		today_date = now.strftime("%Y-%m-%d")
 
-		# Parse the metric state to extract available balance
-		try:
-			metric_data = eval(metric_state)
-			if isinstance(metric_data, dict) and "eth_balance_available" in metric_data:
-				# Use available balance instead of total balance
-				metric_state = str(
-					{
-						**metric_data,
-						"eth_balance": metric_data[
-							"eth_balance_available"
-						],  # Show only available balance
-					}
-				)
-		except (ValueError, TypeError):
-			pass  # Keep original metric_state if parsing fails
+		# Parse the metric state to extract available balance, keeping it as is if parsing fails
+		metric_data = parse_metric_state(metric_state)
+		if isinstance(metric_data, dict) and "eth_balance_available" in metric_data:
+			# Use available balance instead of total balance
+			metric_state = str(
+				{
+					**metric_data,
+					"eth_balance": metric_data[
+						"eth_balance_available"
+					],  # Show only available balance
+				}
+			)
 
-		return self.prompts["system_prompt"].format(
+		return self.templates["system_prompt"].render(
 			role=role,
 			today_date=today_date,
 			metric_name=metric_name,
@@ -318,12 +385,12 @@ class TradingPromptGenerator:
 		Returns:
 		        str: Formatted prompt for first-time research code generation
 		"""
-		apis_str = ",\n".join(apis) if apis else self._get_default_apis_str()
+		apis_str = self.apis_to_str(apis)
 		# Ensure apis_str is not empty
 		if not apis_str:
 			apis_str = "No APIs available"
 
-		return self.prompts.get("research_code_prompt_first", "").format(
+		return self.templates["research_code_prompt_first"].render(
 			apis_str=apis_str, network=network
 		)
 
@@ -353,8 +420,8 @@ class TradingPromptGenerator:
 		Returns:
 		    str: Formatted prompt for research code generation
 		"""
-		apis_str = ",\n".join(apis) if apis else self._get_default_apis_str()
-		return self.prompts["research_code_prompt"].format(
+		apis_str = self.apis_to_str(apis)
+		return self.templates["research_code_prompt"].render(
 			notifications_str=notifications_str,
 			apis_str=apis_str,
 			prev_strategy=prev_strategy,
@@ -364,7 +431,12 @@ class TradingPromptGenerator:
 		)
 
 	def generate_strategy_prompt(
-		self, notifications_str: str, research_output_str: str, network: str, chat_history: ChatHistory, apis: List[str]
+		self,
+		notifications_str: str,
+		research_output_str: str,
+		network: str,
+		chat_history: ChatHistory,
+		apis: List[str],
 	) -> Tuple[Result[str, str], ChatHistory]:
 		"""
 		Generate a prompt for strategy formulation.
@@ -382,17 +454,21 @@ class TradingPromptGenerator:
 		Returns:
 		        str: Formatted prompt for strategy formulation
 		"""
-		# Use chat_history directly
-		new_ch = chat_history
+		apis_str = ", ".join(apis) if apis else "No APIs available"
 
 		ctx_ch = ChatHistory(
-			Message(
-				role="user",
-				content=self.prompts.get("strategy_prompt", "").format(
-					notifications_str=notifications_str,
-					research_output_str=research_output_str,
-					network=network,
-					apis_str=", ".join(apis) if apis else "No APIs available"
+			with_cache_prefix(
+				Message(
+					role="user",
+					content=self.templates["strategy_prompt"].render(
+						notifications_str=notifications_str,
+						research_output_str=research_output_str,
+						network=network,
+						apis_str=apis_str,
+					),
+				),
+				self.stable_prefix(
+					"strategy_prompt", apis_str=apis_str, network=network
 				),
 			)
 		)
@@ -419,7 +495,7 @@ class TradingPromptGenerator:
 		Returns:
 		        str: Formatted prompt for address research code generation
 		"""
-		return self.prompts["address_research_code_prompt"].format()
+		return self.templates["address_research_code_prompt"].render()
 
 	def generate_trading_code_prompt(
 		self,
@@ -456,7 +532,7 @@ class TradingPromptGenerator:
 			session_id=session_id,
 		)
 
-		return self.prompts["trading_code_prompt"].format(
+		return self.templates["trading_code_prompt"].render(
 			strategy_output=strategy_output,
 			address_research=address_research,
 			trading_instruments_str=trading_instruments_str,
@@ -495,11 +571,9 @@ class TradingPromptGenerator:
 			txn_service_url=txn_service_url,
 			session_id=session_id,
 		)
-		apis_str = ",\n".join(apis) if apis else self._get_default_apis_str()
-		apis_str += "\n"
-		apis_str += trading_instruments_str
+		apis_str = self.apis_to_str(apis) + "\n" + trading_instruments_str
 
-		return self.prompts["trading_code_non_address_prompt"].format(
+		return self.templates["trading_code_non_address_prompt"].render(
 			strategy_output=strategy_output,
 			apis_str=apis_str,
 			trading_instruments_str=trading_instruments_str,
@@ -519,10 +593,10 @@ class TradingPromptGenerator:
 		Returns:
 		        str: Formatted prompt for code regeneration
 		"""
-		return self.prompts["regen_code_prompt"].format(
+		return self.templates["regen_code_prompt"].render(
 			errors=errors,
 			previous_code=previous_code,
-			latest_response="No response available"
+			latest_response="No response available",
 		)
 
 	@staticmethod
@@ -549,10 +623,10 @@ class TradingPromptGenerator:
 		return {
 			"system_prompt": dedent("""
 			You are a {role} crypto trader.
-			Today's date is {today_date}.
 			Your goal is to maximize {metric_name} within {time}.
-			Your current portfolio on {network} network is: {metric_state}.
 			Note: Do not trade ETH. This is reserved to pay gas fees. Trade WETH instead.
+			Today's date is {today_date}.
+			Your current portfolio on {network} network is: {metric_state}.
 		""").strip(),
 			#
 			#
@@ -581,14 +655,14 @@ class TradingPromptGenerator:
 			#
 			#
 			"research_code_prompt": dedent("""
-			Here is what is going on in your environment right now : 
-			<LatestNotification>
-			{notifications_str}
-			</LatestNotification>
 			You have access to these APIs:
 			<APIs>
 			{apis_str}
 			</APIs>
+			Here is what is going on in your environment right now : 
+			<LatestNotification>
+			{notifications_str}
+			</LatestNotification>
 			Your current strategy is: 
 			<PrevStrategy>
 			{prev_strategy}
@@ -622,6 +696,10 @@ class TradingPromptGenerator:
 			#
 			#
 			"strategy_prompt": dedent("""
+			You have access to the following APIs:
+			<APIs>
+			{apis_str}
+			</APIs>
 			You just learnt the following information: 
 			<LatestNotification>
 			{notifications_str}
@@ -629,10 +707,6 @@ class TradingPromptGenerator:
 			<ResearchOutput>
 			{research_output_str}
 			</ResearchOutput>
-			You have access to the following APIs:
-			<APIs>
-			{apis_str}
-			</APIs>
 			Decide whether to trade any of the current coins you have on the {network} network, to hold and wait or to do something else using the tools you have. 
 			Reason through your decision process below, formulating a strategy. Sketch out the code you would use to implement your strategy.
 		""").strip(),
@@ -858,7 +932,9 @@ class TradingAgent:
 		genner: Genner,
 		container_manager: ContainerManager,
 		prompt_generator: TradingPromptGenerator,
-		apis: List[str] = None
+		apis: List[str] = None,
+		candidate_genners: List[Genner] | None = None,
+		max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS,
 	):
 		"""
 		Initialize the trading agent with all required components.
@@ -871,6 +947,14 @@ class TradingAgent:
 		    genner (Genner): Generator for creating code and strategies
 		    container_manager (ContainerManager): Manager for code execution in containers
 		    prompt_generator (TradingPromptGenerator): Generator for creating prompts
+		    apis (List[str]): List of APIs available to the agent
+		    candidate_genners (List[Genner] | None): Extra genners raced against `genner`
+		        when side-effect-free code (research, address research) is generated with
+		        a `run_postfix`, e.g. other backends or temperatures. Trading code is never
+		        raced, as every candidate would place its trades. Should be built without
+		        a stream function.
+		    max_prompt_tokens (int): Upper bound on the tokens sent per request, on top of
+		        the context window of the genner's model
 		"""
 		self.agent_id = agent_id
 		self.db = db
@@ -880,6 +964,9 @@ class TradingAgent:
 		self.container_manager = container_manager
 		self.prompt_generator = prompt_generator
 		self.apis = apis or []
+		self.candidate_genners = candidate_genners or []
+		self.max_prompt_tokens = max_prompt_tokens
+		self.prompt_budget = PromptBudget()
 
 		self.chat_history = ChatHistory()
 
@@ -891,6 +978,164 @@ class TradingAgent:
 		"""
 		self.chat_history = ChatHistory()
 
+	def _remaining_prompt_tokens(self) -> int:
+		"""Get the tokens left for a new instruction after the current chat history."""
+		history_tokens = sum(
+			count_tokens(str(message.content)) for message in self.chat_history.messages
+		)
+		return context_budget(self.genner, self.max_prompt_tokens) - history_tokens
+
+	def _code_from_gen_result(
+		self,
+		gen_result: Result[Tuple[List[str], str], str],
+		ctx_ch: ChatHistory,
+		caller: str,
+	) -> Tuple[Result[str, str], ChatHistory]:
+		"""
+		Turn the result of `generate_code` into the first code block and its chat history.
+
+		Args:
+		    gen_result (Result[Tuple[List[str], str], str]): Result of a genner's `generate_code`
+		    ctx_ch (ChatHistory): Chat history holding the instruction
+		    caller (str): Name of the calling method, used in error messages
+
+		Returns:
+		    Tuple[Result[str, str], ChatHistory]: The code or an error message, and the chat
+		        history extended with the raw response
+		"""
+		if gen_result.is_err():
+			# Return error along with chat history
+			return Err(
+				f"TradingAgent.{caller}, err: \n{gen_result.unwrap_err()}"
+			), ctx_ch
+
+		processed_codes, raw_response = gen_result.unwrap()
+		ctx_ch = ctx_ch.append(Message(role="assistant", content=raw_response))
+
+		if processed_codes is None or not processed_codes:
+			return Err(f"TradingAgent.{caller}: No code could be extracted."), ctx_ch
+
+		return Ok(processed_codes[0]), ctx_ch
+
+	def _gen_code(
+		self,
+		ctx_ch: ChatHistory,
+		caller: str,
+		run_postfix: str | None,
+		race_candidates: bool = True,
+	) -> Tuple[Result[str, str], ChatHistory]:
+		"""
+		Generate code for an instruction, and optionally run it in the container.
+
+		Without a `run_postfix` this only asks `genner` for code. With one, the code
+		is also run and the result holds `(code, output)`. If candidate genners are
+		configured and `race_candidates` is set, every genner generates and runs its
+		own candidate concurrently and the first one that runs successfully wins.
+
+		Args:
+		    ctx_ch (ChatHistory): Chat history holding the instruction
+		    caller (str): Name of the calling method, used in error messages
+		    run_postfix (str | None): Postfix for the container script, or None to skip running
+		    race_candidates (bool): Whether candidates may run concurrently. Must be False
+		        for code with side effects, such as trading code, since the losers can only
+		        be cancelled after the winner finished
+
+		Returns:
+		    Tuple[Result[str, str], ChatHistory]: The code (or `(code, output)`) or an error
+		        message, and the chat history extended with the raw response
+		"""
+		if run_postfix is None:
+			gen_result = self.genner.generate_code(self.chat_history + ctx_ch)
+			return self._code_from_gen_result(gen_result, ctx_ch, caller)
+
+		if not self.candidate_genners or not race_candidates:
+			code_result, ctx_ch = self._code_from_gen_result(
+				self.genner.generate_code(self.chat_history + ctx_ch), ctx_ch, caller
+			)
+			if err := code_result.err():
+				return Err(err), ctx_ch
+
+			code = code_result.unwrap()
+			run_result = self.container_manager.run_code_in_con(code, run_postfix)
+			if err := run_result.err():
+				return Err(err), ctx_ch
+
+			output, _ = run_result.unwrap()
+			return Ok((code, output)), ctx_ch
+
+		return _run_coroutine(self._race_candidates(ctx_ch, caller, run_postfix))
+
+	async def _race_candidates(
+		self, ctx_ch: ChatHistory, caller: str, run_postfix: str
+	) -> Tuple[Result[Tuple[str, str], str], ChatHistory]:
+		"""
+		Generate and run one candidate per genner concurrently, keeping the first success.
+
+		Losing candidates are cancelled, which also kills their scripts in the
+		container. If every candidate fails, their errors are joined and the chat
+		history of the first failure is returned so it can be used for regeneration.
+
+		Args:
+		    ctx_ch (ChatHistory): Chat history holding the instruction
+		    caller (str): Name of the calling method, used in error messages
+		    run_postfix (str): Postfix for the container scripts
+
+		Returns:
+		    Tuple[Result[Tuple[str, str], str], ChatHistory]: `(code, output)` of the winner or
+		        the joined errors, and the matching chat history
+		"""
+		genners = [self.genner, *self.candidate_genners]
+
+		async def candidate(
+			genner: Genner,
+		) -> Tuple[Result[Tuple[str, str], str], ChatHistory]:
+			gen_result = await genner.async_generate_code(self.chat_history + ctx_ch)
+			code_result, candidate_ch = self._code_from_gen_result(
+				gen_result, ctx_ch, caller
+			)
+			if err := code_result.err():
+				return Err(f"{genner.identifier}: {err}"), candidate_ch
+
+			code = code_result.unwrap()
+			run_result = await self.container_manager.async_run_code_in_con(
+				code, run_postfix
+			)
+			if err := run_result.err():
+				return Err(f"{genner.identifier}: {err}"), candidate_ch
+
+			output, _ = run_result.unwrap()
+			return Ok((code, output)), candidate_ch
+
+		tasks = [asyncio.create_task(candidate(genner)) for genner in genners]
+		errors: List[str] = []
+		failed_ch = ctx_ch
+
+		try:
+			for next_done in asyncio.as_completed(tasks):
+				try:
+					result, candidate_ch = await next_done
+				except Exception as e:
+					errors.append(
+						f"TradingAgent.{caller}: candidate crashed, err: \n{e}"
+					)
+					continue
+
+				if result.is_ok():
+					logger.info(
+						f"TradingAgent.{caller}: candidate won after {len(errors)} failed candidate(s)"
+					)
+					return result, candidate_ch
+
+				errors.append(result.unwrap_err())
+				if failed_ch is ctx_ch:
+					failed_ch = candidate_ch
+		finally:
+			for task in tasks:
+				task.cancel()
+			await asyncio.gather(*tasks, return_exceptions=True)
+
+		return Err("\n".join(errors)), failed_ch
+
 	def prepare_system(
 		self, role: str, time: str, metric_name: str, metric_state: str, network: str
 	) -> ChatHistory:
@@ -911,14 +1156,27 @@ class TradingAgent:
 		    ChatHistory: Chat history with the system prompt
 		"""
 		ctx_ch = ChatHistory(
-			Message(
-				role="system",
-				content=self.prompt_generator.generate_system_prompt(
+			with_cache_prefix(
+				Message(
+					role="system",
+					content=self.prompt_budget.fit(
+						lambda sections: self.prompt_generator.generate_system_prompt(
+							role=role,
+							time=time,
+							metric_name=metric_name,
+							network=network,
+							**sections,
+						),
+						{"metric_state": metric_state},
+						self._remaining_prompt_tokens(),
+					),
+				),
+				self.prompt_generator.stable_prefix(
+					"system_prompt",
 					role=role,
 					time=time,
 					metric_name=metric_name,
 					network=network,
-					metric_state=metric_state,
 				),
 			)
 		)
@@ -926,7 +1184,7 @@ class TradingAgent:
 		return ctx_ch
 
 	def gen_research_code_on_first(
-		self, apis: List[str], network: str
+		self, apis: List[str], network: str, run_postfix: str | None = None
 	) -> Tuple[Result[str, str], ChatHistory]:
 		"""
 		Generate research code for the first time.
@@ -936,37 +1194,31 @@ class TradingAgent:
 
 		Args:
 		    apis (List[str]): List of APIs available to the agent
+		    run_postfix (str | None): When given, also run the code in the container under
+		        this postfix and return `(code, output)` of the first candidate that succeeds
 
 		Returns:
 		    Result[Tuple[str, ChatHistory], str]: Success with code and chat history,
 		        or error message
 		"""
 		ctx_ch = ChatHistory(
-			Message(
-				role="user",
-				content=self.prompt_generator.generate_research_code_first_time_prompt(
-					apis=apis,
+			with_cache_prefix(
+				Message(
+					role="user",
+					content=self.prompt_generator.generate_research_code_first_time_prompt(
+						apis=apis,
+						network=network,
+					),
+				),
+				self.prompt_generator.stable_prefix(
+					"research_code_prompt_first",
+					apis_str=self.prompt_generator.apis_to_str(apis),
 					network=network,
 				),
 			)
 		)
 
-		gen_result = self.genner.generate_code(self.chat_history + ctx_ch)
-		if gen_result.is_err():
-			# Return error along with chat history
-			return Err(
-				f"TradingAgent.gen_research_code_on_first, err: \n{gen_result.unwrap_err()}"
-			), ctx_ch
-
-		processed_codes, raw_response = gen_result.unwrap()
-		ctx_ch = ctx_ch.append(Message(role="assistant", content=raw_response))
-
-		if processed_codes is None or not processed_codes:
-			return Err(
-				"TradingAgent.gen_research_code_on_first: No code could be extracted."
-			), ctx_ch
-
-		return Ok(processed_codes[0]), ctx_ch
+		return self._gen_code(ctx_ch, "gen_research_code_on_first", run_postfix)
 
 	def gen_research_code(
 		self,
@@ -976,6 +1228,7 @@ class TradingAgent:
 		rag_summary: str,
 		before_metric_state: str,
 		after_metric_state: str,
+		run_postfix: str | None = None,
 	) -> Tuple[Result[str, str], ChatHistory]:
 		"""
 		Generate research code with context.
@@ -990,41 +1243,41 @@ class TradingAgent:
 		    rag_summary (str): Summary from retrieval-augmented generation
 		    before_metric_state (str): State of the metric before strategy execution
 		    after_metric_state (str): State of the metric after strategy execution
+		    run_postfix (str | None): When given, also run the code in the container under
+		        this postfix and return `(code, output)` of the first candidate that succeeds
 
 		Returns:
 		    Result[Tuple[str, ChatHistory], str]: Success with code and chat history,
 		        or error message
 		"""
 		ctx_ch = ChatHistory(
-			Message(
-				role="user",
-				content=self.prompt_generator.generate_research_code_prompt(
-					notifications_str=notifications_str,
-					apis=apis,
-					prev_strategy=prev_strategy,
-					rag_summary=rag_summary,
-					before_metric_state=before_metric_state,
-					after_metric_state=after_metric_state,
+			with_cache_prefix(
+				Message(
+					role="user",
+					content=self.prompt_budget.fit(
+						lambda sections: (
+							self.prompt_generator.generate_research_code_prompt(
+								apis=apis, **sections
+							)
+						),
+						{
+							"notifications_str": notifications_str,
+							"prev_strategy": prev_strategy,
+							"rag_summary": rag_summary,
+							"before_metric_state": before_metric_state,
+							"after_metric_state": after_metric_state,
+						},
+						self._remaining_prompt_tokens(),
+					),
+				),
+				self.prompt_generator.stable_prefix(
+					"research_code_prompt",
+					apis_str=self.prompt_generator.apis_to_str(apis),
 				),
 			)
 		)
 
-		gen_result = self.genner.generate_code(self.chat_history + ctx_ch)
-		if gen_result.is_err():
-			# Return error along with chat history
-			return Err(
-				f"TradingAgent.gen_research_code, err: \n{gen_result.unwrap_err()}"
-			), ctx_ch
-
-		processed_codes, raw_response = gen_result.unwrap()
-		ctx_ch = ctx_ch.append(Message(role="assistant", content=raw_response))
-
-		if processed_codes is None or not processed_codes:
-			return Err(
-				"TradingAgent.gen_research_code: No code could be extracted."
-			), ctx_ch
-
-		return Ok(processed_codes[0]), ctx_ch
+		return self._gen_code(ctx_ch, "gen_research_code", run_postfix)
 
 	def gen_strategy(
 		self,
@@ -1047,9 +1300,17 @@ class TradingAgent:
 		    Result[Tuple[str, ChatHistory], str]: Success with strategy and chat history,
 		        or error message
 		"""
+		sections = self.prompt_budget.fit_sections(
+			{
+				"notifications_str": notifications_str,
+				"research_output_str": research_output_str,
+			},
+			self._remaining_prompt_tokens()
+			- count_tokens(self.prompt_generator.prompts.get("strategy_prompt", "")),
+		)
 		prompt_result, prompt_ctx_ch = self.prompt_generator.generate_strategy_prompt(
-			notifications_str=notifications_str,
-			research_output_str=research_output_str,
+			notifications_str=sections["notifications_str"],
+			research_output_str=sections["research_output_str"],
 			network=network,
 			chat_history=self.chat_history,
 			apis=self.apis,
@@ -1059,7 +1320,7 @@ class TradingAgent:
 			return Err(f"TradingAgent.gen_strategy, err: \n{err}"), prompt_ctx_ch
 
 		prompt = prompt_result.unwrap()
-		
+
 		ctx_ch = ChatHistory(
 			Message(
 				role="user",
@@ -1073,15 +1334,15 @@ class TradingAgent:
 			return Err(f"TradingAgent.gen_strategy, err: \n{err}"), ctx_ch
 
 		response = gen_result.unwrap()
-		
+
 		# Create a message with the response
 		ctx_ch = ctx_ch.append(Message(role="assistant", content=response))
-		
+
 		# Return the response directly since it's already a Result
 		return gen_result, ctx_ch
 
 	def gen_account_research_code(
-		self, strategy_output: str
+		self, strategy_output: str, run_postfix: str | None = None
 	) -> Tuple[Result[str, str], ChatHistory]:
 		"""
 		Generate code for researching token addresses.
@@ -1089,33 +1350,21 @@ class TradingAgent:
 		This method creates code that will look up token contract addresses
 		using the CoinGecko API.
 
+		Args:
+		    strategy_output (str): Output from the strategy formulation
+		    run_postfix (str | None): When given, also run the code in the container under
+		        this postfix and return `(code, output)` of the first candidate that succeeds
+
 		Returns:
 		    Result[Tuple[str, ChatHistory], str]: Success with code and chat history,
 		        or error message
 		"""
+		prompt = self.prompt_generator.generate_address_research_code_prompt()
 		ctx_ch = ChatHistory(
-			Message(
-				role="user",
-				content=self.prompt_generator.generate_address_research_code_prompt(),
-			)
+			with_cache_prefix(Message(role="user", content=prompt), prompt)
 		)
 
-		gen_result = self.genner.generate_code(self.chat_history + ctx_ch)
-		if gen_result.is_err():
-			# Return error along with chat history
-			return Err(
-				f"TradingAgent.gen_account_research_code, err: \n{gen_result.unwrap_err()}"
-			), ctx_ch
-
-		processed_codes, raw_response = gen_result.unwrap()
-		ctx_ch = ctx_ch.append(Message(role="assistant", content=raw_response))
-
-		if processed_codes is None or not processed_codes:
-			return Err(
-				"TradingAgent.gen_account_research_code: No code could be extracted."
-			), ctx_ch
-
-		return Ok(processed_codes[0]), ctx_ch
+		return self._gen_code(ctx_ch, "gen_account_research_code", run_postfix)
 
 	def gen_trading_code(
 		self,
@@ -1126,6 +1375,7 @@ class TradingAgent:
 		agent_id: str,
 		txn_service_url: str,
 		session_id: str,
+		run_postfix: str | None = None,
 	) -> Tuple[Result[str, str], ChatHistory]:
 		"""
 		Generate code for implementing a trading strategy.
@@ -1141,6 +1391,9 @@ class TradingAgent:
 		    agent_id (str): ID of the agent
 		    txn_service_url (str): URL of the transaction service
 		    session_id (str): ID of the current session
+		    run_postfix (str | None): When given, also run the code in the container under
+		        this postfix and return `(code, output)`. Only `genner` is used, since
+		        trading code places real orders
 
 		Returns:
 		    Result[Tuple[str, ChatHistory], str]: Success with code and chat history,
@@ -1149,37 +1402,34 @@ class TradingAgent:
 		ctx_ch = ChatHistory(
 			Message(
 				role="user",
-				content=self.prompt_generator.generate_trading_code_prompt(
-					strategy_output=strategy_output,
-					address_research=address_research,
-					trading_instruments=trading_instruments,
-					metric_state=metric_state,
-					agent_id=agent_id,
-					txn_service_url=txn_service_url,
-					session_id=session_id,
+				content=self.prompt_budget.fit(
+					lambda sections: self.prompt_generator.generate_trading_code_prompt(
+						trading_instruments=trading_instruments,
+						agent_id=agent_id,
+						txn_service_url=txn_service_url,
+						session_id=session_id,
+						**sections,
+					),
+					{
+						"strategy_output": strategy_output,
+						"address_research": address_research,
+						"metric_state": metric_state,
+					},
+					self._remaining_prompt_tokens(),
 				),
 			)
 		)
 
-		gen_result = self.genner.generate_code(self.chat_history + ctx_ch)
-		if gen_result.is_err():
-			# Return error along with chat history
-			return Err(
-				f"TradingAgent.gen_trading_code, err: \n{gen_result.unwrap_err()}"
-			), ctx_ch
-
-		processed_codes, raw_response = gen_result.unwrap()
-		ctx_ch = ctx_ch.append(Message(role="assistant", content=raw_response))
-
-		if processed_codes is None or not processed_codes:
-			return Err(
-				"TradingAgent.gen_trading_code: No code could be extracted."
-			), ctx_ch
-
-		return Ok(processed_codes[0]), ctx_ch
+		return self._gen_code(
+			ctx_ch, "gen_trading_code", run_postfix, race_candidates=False
+		)
 
 	def gen_better_code(
-		self, research_code: str, errors: str
+		self,
+		research_code: str,
+		errors: str,
+		run_postfix: str | None = None,
+		race_candidates: bool = True,
 	) -> Tuple[Result[str, str], ChatHistory]:
 		"""
 		Generate improved code after errors.
@@ -1190,6 +1440,10 @@ class TradingAgent:
 		Args:
 		    prev_code (str): The code that encountered errors
 		    errors (str): Error messages from code execution
+		    run_postfix (str | None): When given, also run the code in the container under
+		        this postfix and return `(code, output)` of the first candidate that succeeds
+		    race_candidates (bool): Whether candidate genners may be raced, False when the
+		        code has side effects such as trading code
 
 		Returns:
 		    Result[Tuple[str, ChatHistory], str]: Success with improved code and chat history,
@@ -1198,26 +1452,14 @@ class TradingAgent:
 		ctx_ch = ChatHistory(
 			Message(
 				role="user",
-				content=self.prompt_generator.regen_code(
-					research_code,
-					errors,
+				content=self.prompt_budget.fit(
+					lambda sections: self.prompt_generator.regen_code(
+						research_code, sections["errors"]
+					),
+					{"errors": dedupe_tracebacks(errors)},
+					self._remaining_prompt_tokens(),
 				),
 			)
 		)
 
-		gen_result = self.genner.generate_code(self.chat_history + ctx_ch)
-		if gen_result.is_err():
-			# Return error along with chat history
-			return Err(
-				f"TradingAgent.gen_better_code, err: \n{gen_result.unwrap_err()}"
-			), ctx_ch
-
-		processed_codes, raw_response = gen_result.unwrap()
-		ctx_ch = ctx_ch.append(Message(role="assistant", content=raw_response))
-
-		if processed_codes is None or not processed_codes:
-			return Err(
-				"TradingAgent.gen_better_code: No code could be extracted."
-			), ctx_ch
-
-		return Ok(processed_codes[0]), ctx_ch
+		return self._gen_code(ctx_ch, "gen_better_code", run_postfix, race_candidates)
@@ -0,0 +1,107 @@
+import json
+import socket
+import threading
+import time
+from typing import Iterable, List, Set
+
+from loguru import logger
+
+# Seconds between attempts to reach the notification worker
+RECONNECT_DELAY_S = 5.0
+
+
+class NotificationSubscriber:
+	"""
+	Subscription to the notifications stored by the notification worker.
+
+	A background thread reads the events the worker publishes on its Unix
+	socket and reconnects when the worker restarts. Between cycles, the
+	agent waits on the subscription instead of sleeping, so a high-signal
+	notification starts the next cycle within seconds. Without a reachable
+	worker, waiting is a plain sleep.
+	"""
+
+	def __init__(self, socket_path: str):
+		"""
+		Subscribe to the worker in the background.
+
+		Args:
+			socket_path (str): Path of the Unix socket the worker publishes on
+		"""
+		self.socket_path = socket_path
+		self._condition = threading.Condition()
+		self._new_sources: Set[str] = set()
+		self._high_signal_sources: Set[str] = set()
+		self._closed = False
+		self._sock: socket.socket | None = None
+		self._thread = threading.Thread(target=self._listen, daemon=True)
+		self._thread.start()
+
+	def _listen(self):
+		while not self._closed:
+			try:
+				with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+					sock.connect(self.socket_path)
+					self._sock = sock
+					logger.info(
+						f"Subscribed to notification events on {self.socket_path}"
+					)
+					for line in sock.makefile("r", encoding="utf-8"):
+						self._on_event(json.loads(line))
+			except (OSError, ValueError) as e:
+				if not self._closed:
+					logger.debug(f"Notification events unavailable, retrying: {e}")
+			finally:
+				self._sock = None
+			if not self._closed:
+				time.sleep(RECONNECT_DELAY_S)
+
+	def _on_event(self, event: dict):
+		with self._condition:
+			self._new_sources.add(event["source"])
+			if event.get("high_signal"):
+				self._high_signal_sources.add(event["source"])
+				self._condition.notify_all()
+
+	def clear(self):
+		"""Forget the events received so far, e.g. when a cycle reads the notifications."""
+		with self._condition:
+			self._new_sources.clear()
+			self._high_signal_sources.clear()
+
+	def new_sources(self) -> List[str]:
+		"""Get the sources with notifications stored since the last `clear`."""
+		with self._condition:
+			return sorted(self._new_sources)
+
+	def wait(self, timeout: float, sources: Iterable[str]) -> bool:
+		"""
+		Wait for a high-signal notification of one of the sources.
+
+		Args:
+			timeout (float): Longest wait in seconds, e.g. the interval between cycles
+			sources (Iterable[str]): Sources the agent reads
+
+		Returns:
+			bool: True if a high-signal notification arrived, False if the wait timed out
+		"""
+		sources = set(sources)
+		deadline = time.monotonic() + timeout
+		with self._condition:
+			while not self._high_signal_sources & sources:
+				remaining = deadline - time.monotonic()
+				if remaining <= 0 or self._closed:
+					return False
+				self._condition.wait(remaining)
+			return True
+
+	def close(self):
+		"""Stop listening, waking up any wait."""
+		with self._condition:
+			self._closed = True
+			self._condition.notify_all()
+		if self._sock is not None:
+			try:
+				self._sock.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
@@ -1,9 +1,34 @@
+import asyncio
 import httpx
 import json
-from typing import Optional, Dict, Generator, List, Any, Tuple
+import threading
+from typing import (
+	Any,
+	AsyncGenerator,
+	Dict,
+	Generator,
+	Iterable,
+	Iterator,
+	List,
+	Optional,
+	Tuple,
+)
 from dataclasses import dataclass
+from loguru import logger
 from result import Ok, Result
 
+try:
+	from orjson import loads as json_loads
+except ImportError:
+	json_loads = json.loads
+
+try:
+	import h2  # noqa: F401
+
+	HTTP2_AVAILABLE = True
+except ImportError:
+	HTTP2_AVAILABLE = False
+
 
 @dataclass
 class Message:
@@ -17,6 +42,52 @@ class OpenRouterError(Exception):
 	pass
 
 
+class SSEDecoder:
+	"""
+	Incremental decoder of a server-sent events stream.
+
+	Lines are fed one at a time, as produced by `iter_lines`. `data:` fields
+	of an event are joined with newlines and the event is returned when the
+	blank line ending it is fed. Comments (e.g. OpenRouter's keep-alive
+	`: OPENROUTER PROCESSING`) and other fields are ignored.
+	"""
+
+	def __init__(self):
+		self._data: List[str] = []
+		# Set once the `[DONE]` event was decoded by `OpenRouter._iter_tokens`
+		self.done = False
+
+	def feed(self, line: str) -> Optional[str]:
+		"""
+		Feed a line of the stream.
+
+		Args:
+			line (str): The line, without its line ending
+
+		Returns:
+			Optional[str]: The data of the event the line completes, if any
+		"""
+		if not line:
+			return self.flush()
+
+		if line[0] == ":":
+			return None
+
+		field, _, value = line.partition(":")
+		if field == "data":
+			self._data.append(value[1:] if value[:1] == " " else value)
+		return None
+
+	def flush(self) -> Optional[str]:
+		"""Return the data of the pending event, if any, e.g. when the stream ends without a blank line."""
+		if not self._data:
+			return None
+
+		data = "\n".join(self._data)
+		self._data = []
+		return data
+
+
 class OpenRouter:
 	def __init__(
 		self,
@@ -31,6 +102,11 @@ class OpenRouter:
 		timeout: int = 60,
 		model: str = "deepseek/deepseek-r1",
 		include_reasoning: bool = True,
+		connect_timeout: float = 10.0,
+		http2: bool = True,
+		max_connections: int = 20,
+		max_keepalive_connections: int = 10,
+		keepalive_expiry: float = 90.0,
 	):
 		"""
 		Initialize the OpenRouter client.
@@ -38,8 +114,13 @@ class OpenRouter:
 		Args:
 		    api_key: Your OpenRouter API key
 		    base_url: The base URL for OpenRouter API
-		    timeout: Request timeout in seconds
+		    timeout: Read timeout in seconds, i.e. the longest wait for the next bytes of a response
 		    include_reasoning: Whether to include reasoning tokens in streaming responses
+		    connect_timeout: Timeout in seconds to open a connection
+		    http2: Whether to use HTTP/2 when the `h2` package is installed
+		    max_connections: Maximum number of concurrent connections
+		    max_keepalive_connections: Maximum number of idle connections kept open
+		    keepalive_expiry: Seconds an idle connection is kept open
 		"""
 		self.api_key = api_key
 		self.base_url = base_url.rstrip("/")
@@ -53,7 +134,66 @@ class OpenRouter:
 			"Authorization": f"Bearer {api_key}",
 			"Content-Type": "application/json",
 		}
-		self.http_client = httpx.Client(timeout=timeout)
+
+		if http2 and not HTTP2_AVAILABLE:
+			logger.warning(
+				"OpenRouter: `h2` is not installed, falling back to HTTP/1.1"
+			)
+		self.http2 = http2 and HTTP2_AVAILABLE
+		self.http_timeout = httpx.Timeout(timeout, connect=connect_timeout)
+		self.http_limits = httpx.Limits(
+			max_connections=max_connections,
+			max_keepalive_connections=max_keepalive_connections,
+			keepalive_expiry=keepalive_expiry,
+		)
+		self.http_client = httpx.Client(
+			timeout=self.http_timeout, limits=self.http_limits, http2=self.http2
+		)
+		# Async clients are bound to an event loop, one per loop using the client
+		self._async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+		self._async_lock = threading.Lock()
+		# Usage of the latest completion, per thread as genners may share the client
+		self._local = threading.local()
+
+	def _get_async_client(self) -> httpx.AsyncClient:
+		"""Get the pooled async client of the running event loop, creating it on a new loop."""
+		loop = asyncio.get_running_loop()
+		with self._async_lock:
+			# Clients of finished loops, e.g. left by `asyncio.run`, cannot be closed
+			# on their loop anymore, dropping them releases their connections
+			for closed_loop in [
+				other for other in self._async_clients if other.is_closed()
+			]:
+				del self._async_clients[closed_loop]
+
+			client = self._async_clients.get(loop)
+			if client is None:
+				client = httpx.AsyncClient(
+					timeout=self.http_timeout, limits=self.http_limits, http2=self.http2
+				)
+				self._async_clients[loop] = client
+			return client
+
+	def close(self):
+		"""Close the pooled connections of the sync client."""
+		self.http_client.close()
+
+	async def aclose(self):
+		"""Close the pooled connections of the async client of the running event loop."""
+		with self._async_lock:
+			client = self._async_clients.pop(asyncio.get_running_loop(), None)
+		if client is not None:
+			await client.aclose()
+
+	def get_last_usage(self) -> Dict[str, Any]:
+		"""
+		Get the usage OpenRouter reported for the latest completion on this thread.
+
+		Returns:
+		    Dict[str, Any]: The `usage` object (prompt_tokens, completion_tokens, cost, ...),
+		        empty if none was reported
+		"""
+		return getattr(self._local, "usage", {})
 
 	def _prepare_payload(
 		self,
@@ -95,6 +235,7 @@ class OpenRouter:
 			"include_reasoning": include_reasoning,
 			"model": model,
 			"stream": stream,
+			"usage": {"include": True},
 		}
 
 		if not providers:
@@ -147,7 +288,60 @@ class OpenRouter:
 		)
 
 		endpoint = f"{self.base_url}/chat/completions"
+		self._local.usage = {}
 		response = self._send_request(endpoint, payload)
+		return self._completion_content(response)
+
+	async def async_create_chat_completion(
+		self,
+		messages: List[Dict],
+		providers: List[str] = [],
+		temperature: Optional[float] = None,
+		model: Optional[str] = None,
+		include_reasoning: Optional[bool] = None,
+		max_tokens: Optional[int] = None,
+	) -> str:
+		"""
+		Create a non-streaming chat completion without blocking the event loop.
+
+		Takes the same arguments as `create_chat_completion`.
+
+		Returns:
+		    The generated text response as a string
+		"""
+		payload = self._prepare_payload(
+			messages=messages,
+			temperature=temperature,
+			providers=providers,
+			model=model,
+			max_tokens=max_tokens,
+			include_reasoning=include_reasoning,
+			stream=False,
+		)
+
+		endpoint = f"{self.base_url}/chat/completions"
+		self._local.usage = {}
+		try:
+			response = await self._get_async_client().post(
+				endpoint, headers=self.headers, content=json.dumps(payload)
+			)
+			if response.status_code != 200:
+				raise OpenRouterError(
+					f"HTTP error {response.status_code}: {response.text}"
+				)
+			body = response.json()
+		except OpenRouterError:
+			raise
+		except httpx.HTTPError as e:
+			raise OpenRouterError(f"HTTP error occurred: {str(e)}")
+		except Exception as e:
+			raise OpenRouterError(f"Error occurred: {str(e)}")
+
+		return self._completion_content(body)
+
+	def _completion_content(self, response: Dict) -> str:
+		"""Record the usage of a non-streaming response and return its content."""
+		self._local.usage = response.get("usage") or {}
 
 		try:
 			content = response["choices"][0]["message"]["content"]
@@ -231,18 +425,162 @@ class OpenRouter:
 		)
 
 		endpoint = f"{self.base_url}/chat/completions"
+		self._local.usage = {}
 		return self._stream_response(endpoint, payload)
 
+	async def async_create_chat_completion_stream(
+		self,
+		messages: List[Dict],
+		providers: List[str] = [],
+		temperature: Optional[float] = 1.0,
+		model: Optional[str] = None,
+		include_reasoning: Optional[bool] = None,
+		max_tokens: Optional[int] = None,
+	) -> AsyncGenerator[Result[Tuple[str, str], str], None]:
+		"""
+		Create a streaming chat completion without blocking the event loop.
+
+		Takes the same arguments as `create_chat_completion_stream`.
+
+		Returns:
+		    Async generator yielding Result objects containing tuples of (content, type) where type is "reasoning" or "main"
+		"""
+		payload = self._prepare_payload(
+			messages=messages,
+			temperature=temperature,
+			providers=providers,
+			model=model,
+			include_reasoning=include_reasoning,
+			max_tokens=max_tokens,
+			stream=True,
+		)
+
+		endpoint = f"{self.base_url}/chat/completions"
+		self._local.usage = {}
+		try:
+			async with self._get_async_client().stream(
+				"POST", endpoint, headers=self.headers, content=json.dumps(payload)
+			) as response:
+				if response.status_code != 200:
+					error_text = (await response.aread()).decode("utf-8")
+					raise OpenRouterError(
+						f"HTTP error {response.status_code}: {error_text}"
+					)
+
+				decoder = SSEDecoder()
+				async for line in response.aiter_lines():
+					for token in self._iter_tokens((line,), decoder, final=False):
+						yield Ok(token)
+					if decoder.done:
+						return
+
+				for token in self._iter_tokens((), decoder):
+					yield Ok(token)
+		except OpenRouterError:
+			raise
+		except httpx.HTTPError as e:
+			raise OpenRouterError(f"HTTP error occurred during streaming: {str(e)}")
+		except Exception as e:
+			raise OpenRouterError(f"Error occurred during streaming: {str(e)}")
+
+	def _parse_event(self, data: str) -> Optional[Tuple[str, str]]:
+		"""
+		Parse the data of a stream event into a token.
+
+		Usage reported in the event is recorded for `get_last_usage`.
+
+		Args:
+		    data (str): The JSON data of the event
+
+		Returns:
+		    Optional[Tuple[str, str]]: The (content, type) token where type is
+		        "reasoning" or "main", or None if the event carries no token
+		"""
+		try:
+			data_obj = json_loads(data)
+		except ValueError:
+			return None
+
+		if not isinstance(data_obj, dict):
+			return None
+
+		if data_obj.get("usage"):
+			self._local.usage = data_obj["usage"]
+
+		choices = data_obj.get("choices")
+		if not choices:
+			return None
+
+		delta = choices[0].get("delta") or {}
+		reasoning = delta.get("reasoning")
+		if reasoning is not None and self.include_reasoning:
+			# Clean various tokens that might appear, the <think> tags are not emitted
+			reasoning = (
+				reasoning.replace("</s>", "")
+				.replace("<response>", "")
+				.replace("</thinking>", "")
+			)
+			return reasoning, "reasoning"
+
+		content = delta.get("content")
+		if content is not None:
+			return content, "main"
+
+		return None
+
+	def _iter_tokens(
+		self,
+		lines: Iterable[str],
+		decoder: Optional[SSEDecoder] = None,
+		final: bool = True,
+	) -> Iterator[Tuple[str, str]]:
+		"""
+		Decode the lines of an event stream into tokens, until `[DONE]`.
+
+		A stream read in pieces, e.g. line by line from an async response, is
+		decoded by passing the same `decoder` for every piece, with `final` set
+		only for the last one.
+
+		Args:
+		    lines (Iterable[str]): Lines of the stream, without their line endings
+		    decoder (Optional[SSEDecoder]): Decoder holding the state of the stream
+		    final (bool): Whether the stream ends after these lines
+
+		Returns:
+		    Iterator[Tuple[str, str]]: The (content, type) tokens of the lines
+		"""
+		decoder = decoder or SSEDecoder()
+		for line in lines:
+			if decoder.done:
+				return
+			data = decoder.feed(line)
+			if data is None:
+				continue
+			if data == "[DONE]":
+				decoder.done = True
+				return
+			token = self._parse_event(data)
+			if token is not None:
+				yield token
+
+		if not final or decoder.done:
+			return
+
+		data = decoder.flush()
+		if data is not None and data != "[DONE]":
+			token = self._parse_event(data)
+			if token is not None:
+				yield token
+
 	def _stream_response(
 		self, endpoint: str, payload: Dict
 	) -> Generator[Result[Tuple[str, str], str], None, None]:
 		"""
 		Stream the response from the API, handling both content and reasoning tokens.
 
-		This method handles the streaming HTTP request to the OpenRouter API and processes
-		the response chunks, separating reasoning tokens from main content tokens.
-		It cleans up special tokens and manages the transition between reasoning and
-		response phases.
+		The body is split into lines by httpx's incremental line decoder and
+		fed to an `SSEDecoder`, so every byte is handled once and multi-line
+		events are supported. Each event is JSON-decoded once.
 
 		Args:
 		    endpoint (str): API endpoint URL
@@ -261,55 +599,17 @@ class OpenRouter:
 				endpoint,
 				headers=self.headers,
 				content=json.dumps(payload),
-				timeout=self.timeout,
 			) as response:
 				if response.status_code != 200:
 					error_text = response.read().decode("utf-8")
 					raise OpenRouterError(
 						f"HTTP error {response.status_code}: {error_text}"
 					)
-				buffer = ""
-				in_reasoning_phase = False
-				for chunk in response.iter_raw():
-					buffer += chunk.decode("utf-8")
-					while "\n" in buffer:
-						line_end = buffer.find("\n")
-						line = buffer[:line_end].strip()
-						buffer = buffer[line_end + 1 :]
-						if line.startswith(": OPENROUTER PROCESSING"):
-							continue
-						if line.startswith("data: "):
-							data = line[6:]
-							if data == "[DONE]":
-								return
-							try:
-								data_obj = json.loads(data)
-								if "choices" in data_obj and data_obj["choices"]:
-									delta = data_obj["choices"][0].get("delta", {})
-									content = delta.get("content")
-									reasoning = delta.get("reasoning")
-
-									# Process tokens but DON'T emit the <think> tags
-									if reasoning is not None and self.include_reasoning:
-										# Clean various tokens that might appear
-										reasoning = (
-											reasoning.replace("</s>", "")
-											.replace("<response>", "")
-											.replace("</thinking>", "")
-										)
-										# Track phase but don't emit tag
-										in_reasoning_phase = True
-										# Just yield the reasoning content
-										yield Ok((reasoning, "reasoning"))
-									elif content is not None:
-										# Track phase change but don't emit closing tag
-										if in_reasoning_phase:
-											in_reasoning_phase = False
-
-										# Yield main content without checking for </think>
-										yield Ok((content, "main"))
-							except json.JSONDecodeError:
-								pass
+
+				for token in self._iter_tokens(response.iter_lines()):
+					yield Ok(token)
+		except OpenRouterError:
+			raise
 		except httpx.HTTPError as e:
 			raise OpenRouterError(f"HTTP error occurred during streaming: {str(e)}")
 		except Exception as e:
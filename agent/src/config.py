@@ -1,5 +1,6 @@
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict
 
 
 @dataclass
@@ -97,11 +98,13 @@ class ClaudeConfig(BaseLLMConfig):
 		name (str): The display name of the model
 		model (str): The model identifier for Claude
 		max_tokens (int): The maximum number of tokens for model output
+		prompt_cache (bool): Whether to mark the stable prompt prefixes as cacheable
 	"""
 
 	name: str = "Claude"
 	model: str = "claude-3-5-sonnet-latest"
 	max_tokens = 8192
+	prompt_cache: bool = True
 
 
 @dataclass
@@ -116,9 +119,80 @@ class OpenRouterConfig(BaseLLMConfig):
 		name (str): The display name of the model
 		model (str): The model identifier for Claude
 		max_tokens (int): The maximum number of tokens for model output
+		temperature (float | None): Sampling temperature, None for the provider default
+		prompt_cache (bool): Whether to mark the stable prompt prefixes as cacheable
+			on models that need explicit markers
 	"""
 
 	name: str = "openai/o3-mini"
 	model: str = "openai/o3-mini"
 	max_tokens = 8192
 	temperature: float | None = None
+	prompt_cache: bool = True
+
+
+@dataclass
+class FailoverConfig:
+	"""
+	Configuration of the failover genner built from several backends.
+
+	Attributes:
+		hedge_after_s (float): Seconds without a first token after which the request to a
+			streaming backend is also sent to the next backend, 0 disables hedging
+		failure_threshold (int): Consecutive failures that open a backend's circuit
+		cooldown_s (float): Seconds an open circuit stays open before a trial request
+		min_health_score (float): Backends scoring below this are tried after the healthy ones
+	"""
+
+	hedge_after_s: float = 20.0
+	failure_threshold: int = 3
+	cooldown_s: float = 60.0
+	min_health_score: float = 0.5
+
+
+@dataclass
+class CompletionCacheConfig:
+	"""
+	Configuration for the completion cache wrapped around a genner.
+
+	Attributes:
+		db_path (str): Path to the SQLite file holding cached completions
+		mode (str): One of "off", "read_write", "record" or "replay"
+		ttl_seconds (int): Seconds a cached completion stays valid, 0 disables expiry
+		max_entries (int): Maximum number of cached completions kept, 0 disables the limit
+		max_bytes (int): Maximum total size of cached responses in bytes, 0 disables the limit
+		run_id (str): Identifier of the recorded run used by "record" and "replay"
+	"""
+
+	db_path: str = "../db/llm-cache.db"
+	mode: str = "off"
+	ttl_seconds: int = 24 * 60 * 60
+	max_entries: int = 5000
+	max_bytes: int = 256 * 1024 * 1024
+	run_id: str = "default"
+
+
+@dataclass
+class MaintenanceConfig:
+	"""
+	Configuration of the maintenance of the agent database.
+
+	Attributes:
+		notification_retention_days (int): Days notifications are kept, 0 keeps them forever
+		notification_retention_by_source (Dict[str, int]): Days kept for specific sources, overriding the default
+		chat_history_retention_days (int): Days chat history is kept, 0 keeps it forever
+		chat_history_compress_after_days (int): Days after which chat history content is compressed, 0 disables it
+		snapshot_raw_days (int): Days wallet snapshots are kept as is before being rolled up hourly
+		snapshot_hourly_days (int): Days hourly rollups are kept before being rolled up daily
+		vacuum_pages (int): Free pages returned to the file system by each incremental vacuum
+		batch_size (int): Rows deleted or rewritten per transaction, so writers are not blocked for long
+	"""
+
+	notification_retention_days: int = 30
+	notification_retention_by_source: Dict[str, int] = field(default_factory=dict)
+	chat_history_retention_days: int = 0
+	chat_history_compress_after_days: int = 7
+	snapshot_raw_days: int = 7
+	snapshot_hourly_days: int = 90
+	vacuum_pages: int = 2000
+	batch_size: int = 1000
@@ -1,3 +1,4 @@
+import asyncio
 import io
 import tarfile
 from datetime import datetime
@@ -11,7 +12,7 @@ from docker.models.containers import Container
 from loguru import logger
 from result import Err, Ok, Result
 
-from src.helper import timeout
+from src.helper import nanoid, timeout
 
 
 class ContainerManager:
@@ -111,7 +112,7 @@ class ContainerManager:
 		"""
 		# Create temp file name with timestamp
 		current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-		temp_file_name = f"temp_script_{current_time}.py"
+		temp_file_name = f"temp_script_{current_time}_{nanoid(6)}.py"
 		temp_file_path = f"{in_container_path}/{temp_file_name}"
 
 		# Create host file path and ensure directory exists
@@ -221,3 +222,78 @@ class ContainerManager:
 				reflected_code,
 			)
 		)
+
+	def _kill_script_in_con(self, temp_file_path: str):
+		"""Kill only the python processes running the given script in the container."""
+		kill_command = (
+			"for pid in $(pidof python); do "
+			f"grep -q '{temp_file_path}' /proc/$pid/cmdline 2>/dev/null && kill -9 $pid; "
+			"done; true"
+		)
+		self.container.exec_run(cmd=["/bin/sh", "-c", kill_command])
+
+	async def async_run_code_in_con(
+		self, code: str, postfix: str, timeout_seconds: int = 600
+	) -> Result[Tuple[str, str], str]:
+		"""Run code in container without blocking the event loop.
+
+		Unlike `run_code_in_con`, several of these can run at the same time in the
+		same container: the timeout is enforced inside the container instead of
+		with SIGALRM, and only the process of this script is killed, either on
+		timeout or when the awaiting task is cancelled.
+
+		Args:
+		    code (str): The Python code to run in the container
+		    postfix (str): The type identifier for the agent, used in the file path
+		    timeout_seconds (int, optional): Maximum run time of the script. Defaults to 600.
+
+		Returns:
+		    Result[Tuple[str, str], str]:
+		        - Ok: A tuple containing (execution_output, reflected_code)
+		        - Err: An error message describing what went wrong
+		"""
+		temp_file_path, reflected_code = await asyncio.to_thread(
+			self.write_code_in_con, code, postfix
+		)
+
+		command_str = (
+			f"timeout -s KILL {timeout_seconds} python -u {temp_file_path} 2>&1"
+		)
+		cmd = ["/bin/sh", "-c", command_str]
+
+		try:
+			python_exit_code, python_output = cast(
+				Tuple[int, bytes],
+				await asyncio.to_thread(
+					self.container.exec_run,
+					cmd=cmd,
+					environment=self.in_con_env,
+					demux=False,
+					stream=False,
+				),
+			)
+			python_output_str = python_output.decode("utf-8", errors="replace")
+		except asyncio.CancelledError:
+			await asyncio.to_thread(self._kill_script_in_con, temp_file_path)
+			raise
+		except docker.errors.ContainerError as e:
+			return Err(
+				f"ContainerManager.async_run_code_in_con: Container error, error: \n{e}"
+			)
+
+		if python_exit_code in (124, 137):
+			return Err(
+				f"ContainerManager.async_run_code_in_con: Code ran too long, killed after {timeout_seconds} seconds, program output: \n{python_output_str}"
+			)
+
+		if python_exit_code != 0:
+			return Err(
+				f"ContainerManager.async_run_code_in_con: Code that has been run failed, program output: \n{python_output_str}"
+			)
+
+		return Ok(
+			(
+				python_output_str,
+				reflected_code,
+			)
+		)
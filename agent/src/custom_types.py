@@ -1,4 +1,5 @@
-from typing import Any, List, Dict
+import threading
+from typing import Any, Dict, Iterator, List, Sequence, overload
 
 
 class Message:
@@ -15,6 +16,8 @@ class Message:
 	    metadata (Dict[str, Any]): Additional information about the message
 	"""
 
+	__slots__ = ("role", "content", "metadata", "_native")
+
 	def __init__(self, role: str, content: str, metadata: Dict[str, Any] = {}):
 		"""
 		Initialize a Message with role, content, and optional metadata.
@@ -27,15 +30,26 @@ class Message:
 		self.role = role
 		self.content = content
 		self.metadata: Dict[str, Any] = metadata
+		self._native: Dict[str, str] | None = None
 
 	def as_native(self) -> Dict[str, str]:
 		"""
 		Convert the Message to a native dictionary format.
 
+		The dictionary is built once and reused until the role or content is
+		reassigned, callers must not modify it.
+
 		Returns:
 		    Dict[str, str]: Dictionary with 'role' and 'content' keys
 		"""
-		return {"role": self.role, "content": self.content}
+		native = self._native
+		if (
+			native is None
+			or native["role"] is not self.role
+			or native["content"] is not self.content
+		):
+			native = self._native = {"role": self.role, "content": self.content}
+		return native
 
 	@staticmethod
 	def from_native(native: Dict[str, Any]) -> "Message":
@@ -76,6 +90,82 @@ class Message:
 		)
 
 
+class _MessageLog:
+	"""
+	Append-only list of messages shared by the chat histories built from it.
+
+	Alongside the messages, it keeps for every position the index of the
+	latest assistant and user message up to it, so that any history over a
+	prefix of the log finds its latest response and instruction directly.
+	"""
+
+	__slots__ = ("messages", "last_assistant", "last_user", "lock")
+
+	def __init__(self, messages: List[Message]):
+		self.messages: List[Message] = []
+		self.last_assistant: List[int] = []
+		self.last_user: List[int] = []
+		self.lock = threading.Lock()
+		self.extend(messages)
+
+	def extend(self, messages: Sequence[Message]):
+		"""Append messages at the end of the log, callers hold the lock when it is shared."""
+		for message in messages:
+			index = len(self.messages)
+			self.last_assistant.append(
+				index
+				if message.role == "assistant"
+				else (self.last_assistant[-1] if index else -1)
+			)
+			self.last_user.append(
+				index
+				if message.role == "user"
+				else (self.last_user[-1] if index else -1)
+			)
+			self.messages.append(message)
+
+
+class MessagesView(Sequence[Message]):
+	"""
+	Read-only sequence over the messages of a ChatHistory.
+
+	It reads the shared log in place instead of copying it, slicing it
+	returns a plain list.
+	"""
+
+	__slots__ = ("_messages", "_end")
+
+	def __init__(self, messages: List[Message], end: int):
+		self._messages = messages
+		self._end = end
+
+	def __len__(self) -> int:
+		return self._end
+
+	@overload
+	def __getitem__(self, index: int) -> Message: ...
+
+	@overload
+	def __getitem__(self, index: slice) -> List[Message]: ...
+
+	def __getitem__(self, index: int | slice) -> Message | List[Message]:
+		if isinstance(index, slice):
+			return self._messages[: self._end][index]
+		if index < 0:
+			index += self._end
+		if not 0 <= index < self._end:
+			raise IndexError("ChatHistory index out of range")
+		return self._messages[index]
+
+	def __iter__(self) -> Iterator[Message]:
+		messages = self._messages
+		for index in range(self._end):
+			yield messages[index]
+
+	def __repr__(self) -> str:
+		return repr(self._messages[: self._end])
+
+
 # Example :
 # convo = [
 #   {"role": "system": "content": "..."},
@@ -93,8 +183,16 @@ class ChatHistory:
 	This class manages a list of Message objects and provides methods to manipulate
 	and access the conversation history. It supports operations like appending messages,
 	combining histories, and converting between native format and ChatHistory objects.
+
+	A ChatHistory is a view over the first messages of an append-only log.
+	Appending to a history that ends at the end of its log extends the log
+	in place and shares it with the new history, so growing a conversation
+	does not copy it. Appending to an older history, one another history
+	already appended to, copies its messages into a new log first.
 	"""
 
+	__slots__ = ("_log", "_end")
+
 	def __init__(self, messages: List[Message] | Message = []):
 		"""
 		Initialize a ChatHistory with a list of messages or a single message.
@@ -102,9 +200,26 @@ class ChatHistory:
 		Args:
 		    messages (List[Message] | Message, optional): Initial messages. Defaults to [].
 		"""
-		self.messages: List[Message] = (
-			messages if isinstance(messages, list) else [messages]
-		)
+		self._log = _MessageLog(messages if isinstance(messages, list) else [messages])
+		self._end = len(self._log.messages)
+
+	@classmethod
+	def _view(cls, log: _MessageLog, end: int) -> "ChatHistory":
+		"""Create a ChatHistory over the first `end` messages of a log."""
+		history = cls.__new__(cls)
+		history._log = log
+		history._end = end
+		return history
+
+	@property
+	def messages(self) -> MessagesView:
+		"""
+		Get the messages of the history.
+
+		Returns:
+		    MessagesView: Read-only sequence of the messages, in order
+		"""
+		return MessagesView(self._log.messages, self._end)
 
 	def __len__(self) -> int:
 		"""
@@ -113,7 +228,19 @@ class ChatHistory:
 		Returns:
 		    int: The number of messages
 		"""
-		return len(self.messages)
+		return self._end
+
+	def _extend(self, new_messages: Sequence[Message]) -> "ChatHistory":
+		"""Create a new ChatHistory with messages appended, sharing the log when possible."""
+		log = self._log
+		with log.lock:
+			if self._end == len(log.messages):
+				log.extend(new_messages)
+				return ChatHistory._view(log, len(log.messages))
+
+		branch = _MessageLog(log.messages[: self._end])
+		branch.extend(new_messages)
+		return ChatHistory._view(branch, len(branch.messages))
 
 	def __add__(self, other: "ChatHistory") -> "ChatHistory":
 		"""
@@ -125,10 +252,8 @@ class ChatHistory:
 		Returns:
 		    ChatHistory: A new ChatHistory containing messages from both histories
 		"""
-		new_history = ChatHistory()
-		new_history.messages = self.messages.copy() + other.messages.copy()
-
-		return new_history
+		# Copied first, in case other is a view of the log being extended
+		return self._extend(other._log.messages[: other._end])
 
 	def append(self, new_message: Message) -> "ChatHistory":
 		"""
@@ -140,9 +265,7 @@ class ChatHistory:
 		Returns:
 		    ChatHistory: A new ChatHistory with the appended message
 		"""
-		new_history = ChatHistory()
-		new_history.messages = self.messages.copy() + [new_message]
-		return new_history
+		return self._extend((new_message,))
 
 	def as_native(self) -> List[Dict[str, str]]:
 		"""
@@ -160,15 +283,11 @@ class ChatHistory:
 		Returns:
 		    str: The content of the latest assistant message, or empty string if none exists
 		"""
-		assistant_messages = [
-			message for message in self.messages if message.role == "assistant"
-		]
-
-		if (
-			not assistant_messages
-		):  # Only return empty string if there are no assistant messages
+		if not self._end:
 			return ""
-		return assistant_messages[-1].content
+
+		index = self._log.last_assistant[self._end - 1]
+		return self._log.messages[index].content if index >= 0 else ""
 
 	def get_latest_instruction(self) -> str:
 		"""
@@ -177,14 +296,11 @@ class ChatHistory:
 		Returns:
 		    str: The content of the latest user message, or empty string if none exists
 		"""
-		user_messages = [message for message in self.messages if message.role == "user"]
-
-		if (
-			not user_messages
-		):  # Only return empty string if there are no assistant messages
+		if not self._end:
 			return ""
 
-		return user_messages[-1].content
+		index = self._log.last_user[self._end - 1]
+		return self._log.messages[index].content if index >= 0 else ""
 
 	@staticmethod
 	def from_native(native: List[Dict[str, str]]) -> "ChatHistory":
@@ -217,6 +333,9 @@ class ChatHistory:
 		"""
 		Replace a message at a specific index in the history.
 
+		The log is shared with other histories, so this history moves to its
+		own copy of it before the replacement.
+
 		Args:
 		    index (int): The index of the message to replace
 		    new_message (Message): The new message
@@ -224,7 +343,9 @@ class ChatHistory:
 		Returns:
 		    ChatHistory: The modified ChatHistory (self)
 		"""
-		self.messages[index] = new_message
+		messages = self._log.messages[: self._end]
+		messages[index] = new_message
+		self._log = _MessageLog(messages)
 
 		return self
 
@@ -41,7 +41,8 @@ create table if not exists sup_chat_history (
     session_id char(36) not null,
     message_type varchar(50) not null,
     content text,
-    timestamp datetime default CURRENT_TIMESTAMP
+    timestamp datetime default CURRENT_TIMESTAMP,
+    content_encoding varchar(20)
 );
 
 create index if not exists idx_session_time on sup_chat_history (session_id, timestamp);
@@ -63,11 +64,37 @@ create table if not exists sup_notifications (
     long_desc TEXT,
     notification_date DATETIME,
     unique_hash TEXT UNIQUE,
+    sentiment TEXT,
+    price_signals TEXT,
+    market_events TEXT,
+    simhash TEXT,
+    cluster_id TEXT,
     created DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 create index if not exists sup_notifications_source_IDX on sup_notifications (source);
 
+-- Full-text index of the notifications, kept in sync by the triggers
+create virtual table if not exists sup_notifications_fts using fts5(
+    short_desc,
+    long_desc,
+    content='sup_notifications',
+    content_rowid='id'
+);
+
+create trigger if not exists sup_notifications_fts_ai after insert on sup_notifications begin
+    insert into sup_notifications_fts (rowid, short_desc, long_desc) values (new.id, new.short_desc, new.long_desc);
+end;
+
+create trigger if not exists sup_notifications_fts_ad after delete on sup_notifications begin
+    insert into sup_notifications_fts (sup_notifications_fts, rowid, short_desc, long_desc) values ('delete', old.id, old.short_desc, old.long_desc);
+end;
+
+create trigger if not exists sup_notifications_fts_au after update of short_desc, long_desc on sup_notifications begin
+    insert into sup_notifications_fts (sup_notifications_fts, rowid, short_desc, long_desc) values ('delete', old.id, old.short_desc, old.long_desc);
+    insert into sup_notifications_fts (rowid, short_desc, long_desc) values (new.id, new.short_desc, new.long_desc);
+end;
+
 create table if not exists sup_payments (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     agent_id varchar(100),
@@ -142,6 +169,42 @@ create table if not exists sup_wallet_snapshots (
 
 create index if not exists idx_agent_time on sup_wallet_snapshots (agent_id, snapshot_time);
 
+create table if not exists sup_wallet_snapshot_rollups (
+    agent_id char(36) not null,
+    granularity varchar(10) not null,
+    bucket_start datetime not null,
+    samples integer,
+    min_value_usd real,
+    max_value_usd real,
+    sum_value_usd real,
+    last_value_usd real,
+    last_assets json,
+    last_snapshot_time datetime,
+    primary key (agent_id, granularity, bucket_start)
+);
+
+create table if not exists sup_llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id varchar(100),
+    agent_id varchar(100),
+    backend varchar(100),
+    model varchar(255),
+    phase varchar(100),
+    attempt integer,
+    input_tokens integer,
+    cached_input_tokens integer,
+    output_tokens integer,
+    usage_reported boolean,
+    ttft_s real,
+    latency_s real,
+    tokens_per_s real,
+    cost_usd real,
+    success boolean,
+    created_at datetime default CURRENT_TIMESTAMP
+);
+
+create index if not exists idx_llm_calls_session on sup_llm_calls (session_id, created_at);
+
 create table if not exists sup_token_price (
   data_id INTEGER PRIMARY KEY AUTOINCREMENT,
   token_addr TEXT NOT NULL,
@@ -1,5 +1,6 @@
 from src.db.interface import DBInterface
+from src.db.maintenance import DBMaintenance
 from src.db.rest_api import APIDB
 from src.db.sqlite import SQLiteDB
 
-__all__ = ["DBInterface", "APIDB", "SQLiteDB"]
+__all__ = ["DBInterface", "DBMaintenance", "APIDB", "SQLiteDB"]
@@ -26,7 +26,7 @@ class DBInterface(ABC, Generic[T]):
 	@abstractmethod
 	def insert_strategy_and_result(
 		self, agent_id: str, strategy_result: StrategyInsertData
-	) -> bool:
+	) -> Optional[str]:
 		"""Insert a new strategy and its result into the database.
 
 		Args:
@@ -34,10 +34,34 @@ class DBInterface(ABC, Generic[T]):
 			strategy_result (StrategyInsertData): The strategy data to insert
 
 		Returns:
-			bool: True if the insertion was successful, False otherwise
+			Optional[str]: The ID of the new strategy, None if the insertion failed
+		"""
+		pass
+
+	@abstractmethod
+	def update_strategy_summary(
+		self, strategy_id: str, summarized_desc: str, parameters: Dict[str, Any]
+	) -> bool:
+		"""Write the summaries of a strategy that were made after it was saved.
+
+		Args:
+			strategy_id (str): The ID of the strategy
+			summarized_desc (str): Brief description of the strategy
+			parameters (Dict[str, Any]): The strategy's parameters, including their summaries
+
+		Returns:
+			bool: True if the strategy was updated, False otherwise
 		"""
 		pass
 
+	def supports_strategy_summary_updates(self) -> bool:
+		"""Whether `update_strategy_summary` can write summaries made after a strategy was saved.
+
+		Returns:
+			bool: False if summaries scheduled now could never be written back
+		"""
+		return True
+
 	@abstractmethod
 	def fetch_latest_strategy(self, agent_id: str) -> Optional[StrategyData]:
 		"""Fetch the most recent strategy for a specific agent.
@@ -99,6 +123,8 @@ class DBInterface(ABC, Generic[T]):
 	) -> str:
 		"""Fetch the latest notifications as a formatted string (version 2).
 
+		Near-duplicate notifications of the same story are returned once.
+
 		Args:
 			sources (List[str]): List of notification source identifiers
 			limit (int): Maximum number of notifications to retrieve per source
@@ -108,6 +134,30 @@ class DBInterface(ABC, Generic[T]):
 		"""
 		pass
 
+	@abstractmethod
+	def search_notifications(
+		self,
+		keywords: List[str],
+		within_hours: Optional[float] = None,
+		sources: Optional[List[str]] = None,
+		limit: int = 10,
+	) -> List[Dict[str, Any]]:
+		"""Search the notifications mentioning any of the keywords, best matches first.
+
+		Near-duplicate notifications of the same story are returned once.
+
+		Args:
+			keywords (List[str]): Words or phrases to look for, e.g. token symbols
+			within_hours (Optional[float]): Only notifications created in the last hours, all if None
+			sources (Optional[List[str]]): Only notifications of these sources, all if None
+			limit (int): Maximum number of notifications to return
+
+		Returns:
+			List[Dict[str, Any]]: Notifications with their `notification_id`, `source`,
+				`short_desc`, `snippet` of the matched text, `created` and `rank`
+		"""
+		pass
+
 	@abstractmethod
 	def get_agent_session(self, session_id: str) -> Optional[Dict[str, Any]]:
 		"""Get an agent session by session_id.
@@ -281,6 +331,22 @@ class DBInterface(ABC, Generic[T]):
 		"""
 		pass
 
+	@abstractmethod
+	def insert_llm_calls(
+		self, session_id: str, agent_id: str, calls: List[Dict[str, Any]]
+	) -> bool:
+		"""Insert token and latency metrics of LLM calls.
+
+		Args:
+			session_id (str): The ID of the session
+			agent_id (str): The ID of the agent
+			calls (List[Dict[str, Any]]): One dict per call, as produced by `LLMCallMetrics.to_dict`
+
+		Returns:
+			bool: True if all calls were inserted successfully
+		"""
+		pass
+
 	@abstractmethod
 	def get_agent_profile_image(self, agent_id: str) -> Optional[str]:
 		"""Get the profile image URL for an agent.
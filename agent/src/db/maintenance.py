@@ -0,0 +1,472 @@
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from loguru import logger
+
+from src.config import MaintenanceConfig
+
+try:
+	import zstandard
+
+	ZSTD_AVAILABLE = True
+except ImportError:
+	ZSTD_AVAILABLE = False
+
+# Value of `content_encoding` for chat history content compressed by the maintenance
+ZSTD_ENCODING = "zstd"
+ZSTD_LEVEL = 10
+
+# Value of `PRAGMA auto_vacuum` once incremental vacuum is enabled
+INCREMENTAL_AUTO_VACUUM = 2
+
+# Tables whose size is reported after each run
+REPORTED_TABLES = (
+	"sup_notifications",
+	"sup_notifications_fts",
+	"sup_chat_history",
+	"sup_wallet_snapshots",
+	"sup_wallet_snapshot_rollups",
+)
+
+ROLLUP_UPSERT = """
+	ON CONFLICT (agent_id, granularity, bucket_start) DO UPDATE SET
+		samples = samples + excluded.samples,
+		min_value_usd = MIN(min_value_usd, excluded.min_value_usd),
+		max_value_usd = MAX(max_value_usd, excluded.max_value_usd),
+		sum_value_usd = sum_value_usd + excluded.sum_value_usd,
+		last_value_usd = CASE WHEN excluded.last_snapshot_time >= last_snapshot_time
+			THEN excluded.last_value_usd ELSE last_value_usd END,
+		last_assets = CASE WHEN excluded.last_snapshot_time >= last_snapshot_time
+			THEN excluded.last_assets ELSE last_assets END,
+		last_snapshot_time = MAX(last_snapshot_time, excluded.last_snapshot_time)
+"""
+
+# Raw snapshots older than the cutoff, aggregated per agent and hour
+HOURLY_ROLLUP_QUERY = (
+	"""
+	INSERT INTO sup_wallet_snapshot_rollups (agent_id, granularity, bucket_start, samples,
+		min_value_usd, max_value_usd, sum_value_usd, last_value_usd, last_assets, last_snapshot_time)
+	SELECT agent_id, 'hour', bucket_start, COUNT(*), MIN(total_value_usd), MAX(total_value_usd),
+		SUM(total_value_usd), MAX(last_value_usd), MAX(last_assets), MAX(snapshot_time)
+	FROM (
+		SELECT agent_id, total_value_usd, snapshot_time,
+			strftime('%Y-%m-%d %H:00:00', snapshot_time) AS bucket_start,
+			FIRST_VALUE(total_value_usd) OVER latest AS last_value_usd,
+			FIRST_VALUE(assets) OVER latest AS last_assets
+		FROM sup_wallet_snapshots
+		WHERE snapshot_time < datetime('now', ?)
+		WINDOW latest AS (
+			PARTITION BY agent_id, strftime('%Y-%m-%d %H:00:00', snapshot_time)
+			ORDER BY snapshot_time DESC
+		)
+	)
+	WHERE true
+	GROUP BY agent_id, bucket_start
+	"""
+	+ ROLLUP_UPSERT
+)
+
+# Hourly rollups older than the cutoff, merged per agent and day
+DAILY_ROLLUP_QUERY = (
+	"""
+	INSERT INTO sup_wallet_snapshot_rollups (agent_id, granularity, bucket_start, samples,
+		min_value_usd, max_value_usd, sum_value_usd, last_value_usd, last_assets, last_snapshot_time)
+	SELECT agent_id, 'day', day_start, SUM(samples), MIN(min_value_usd), MAX(max_value_usd),
+		SUM(sum_value_usd), MAX(day_last_value_usd), MAX(day_last_assets), MAX(last_snapshot_time)
+	FROM (
+		SELECT agent_id, samples, min_value_usd, max_value_usd, sum_value_usd, last_snapshot_time,
+			strftime('%Y-%m-%d 00:00:00', bucket_start) AS day_start,
+			FIRST_VALUE(last_value_usd) OVER latest AS day_last_value_usd,
+			FIRST_VALUE(last_assets) OVER latest AS day_last_assets
+		FROM sup_wallet_snapshot_rollups
+		WHERE granularity = 'hour' AND bucket_start < datetime('now', ?)
+		WINDOW latest AS (
+			PARTITION BY agent_id, strftime('%Y-%m-%d 00:00:00', bucket_start)
+			ORDER BY last_snapshot_time DESC
+		)
+	)
+	WHERE true
+	GROUP BY agent_id, day_start
+	"""
+	+ ROLLUP_UPSERT
+)
+
+
+def decompress_chat_content(content: Any, encoding: Optional[str]) -> Any:
+	"""
+	Get the content of a chat history row as it was inserted.
+
+	Args:
+		content (Any): Value of the `content` column
+		encoding (Optional[str]): Value of the `content_encoding` column
+
+	Returns:
+		Any: The content, decompressed if the maintenance compressed it
+	"""
+	if encoding == ZSTD_ENCODING:
+		return zstandard.ZstdDecompressor().decompress(content).decode("utf-8")
+	return content
+
+
+@dataclass
+class TableSize:
+	"""
+	Size of a table.
+
+	Attributes:
+		name (str): Name of the table
+		rows (int): Number of rows
+		bytes (int | None): Bytes of the table and its indexes, None if SQLite lacks the dbstat table
+	"""
+
+	name: str
+	rows: int
+	bytes: Optional[int]
+
+
+@dataclass
+class MaintenanceReport:
+	"""
+	Outcome of a maintenance run.
+
+	Attributes:
+		notifications_deleted (int): Notifications past their retention
+		chat_history_deleted (int): Chat history rows past their retention
+		chat_history_compressed (int): Chat history rows compressed
+		snapshots_rolled_up (int): Raw wallet snapshots merged into hourly rollups
+		hourly_rollups_rolled_up (int): Hourly rollups merged into daily rollups
+		pages_freed (int): Pages returned to the file system
+		db_bytes (int): Size of the database after the run
+		table_sizes (List[TableSize]): Size of the largest tables after the run
+	"""
+
+	notifications_deleted: int = 0
+	chat_history_deleted: int = 0
+	chat_history_compressed: int = 0
+	snapshots_rolled_up: int = 0
+	hourly_rollups_rolled_up: int = 0
+	pages_freed: int = 0
+	db_bytes: int = 0
+	table_sizes: List[TableSize] = field(default_factory=list)
+
+
+class DBMaintenance:
+	"""
+	Keeps the agent database from growing without bound.
+
+	Each run deletes the notifications and chat history past their retention,
+	compresses cold chat history, rolls old wallet snapshots up into hourly
+	then daily aggregates, and returns free pages to the file system. Rows are
+	deleted and rewritten in small transactions, so the agents and the
+	notification service can keep writing during a run. Returning free pages
+	needs incremental auto vacuum, enabled once during downtime by
+	`enable_incremental_vacuum`.
+	"""
+
+	def __init__(self, db_path: str, config: Optional[MaintenanceConfig] = None):
+		"""
+		Initialize the maintenance.
+
+		Args:
+			db_path (str): Path to the SQLite database file
+			config (MaintenanceConfig | None): Retention and rollup settings, the defaults if None
+		"""
+		self.db_path = db_path
+		self.config = config or MaintenanceConfig()
+
+	def _connect(self) -> sqlite3.Connection:
+		# Waits for the other writers instead of failing on a locked database
+		return sqlite3.connect(self.db_path, timeout=30)
+
+	def _ensure_schema(self, conn: sqlite3.Connection):
+		with conn:
+			conn.execute(
+				"""CREATE TABLE IF NOT EXISTS sup_wallet_snapshot_rollups (
+                       agent_id char(36) not null,
+                       granularity varchar(10) not null,
+                       bucket_start datetime not null,
+                       samples integer,
+                       min_value_usd real,
+                       max_value_usd real,
+                       sum_value_usd real,
+                       last_value_usd real,
+                       last_assets json,
+                       last_snapshot_time datetime,
+                       primary key (agent_id, granularity, bucket_start)
+                   )"""
+			)
+			columns = {
+				row[1] for row in conn.execute("PRAGMA table_info(sup_chat_history)")
+			}
+			if "content_encoding" not in columns:
+				conn.execute(
+					"ALTER TABLE sup_chat_history ADD COLUMN content_encoding varchar(20)"
+				)
+
+	def _delete_in_batches(
+		self, conn: sqlite3.Connection, table: str, condition: str, params: List[Any]
+	) -> int:
+		deleted = 0
+		while True:
+			with conn:
+				cursor = conn.execute(
+					f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {condition} LIMIT ?)",
+					[*params, self.config.batch_size],
+				)
+			deleted += cursor.rowcount
+			if cursor.rowcount < self.config.batch_size:
+				return deleted
+
+	def prune_notifications(self, conn: sqlite3.Connection) -> int:
+		"""Delete the notifications past the retention of their source."""
+		deleted = 0
+		overrides = self.config.notification_retention_by_source
+		for source, days in overrides.items():
+			if days > 0:
+				deleted += self._delete_in_batches(
+					conn,
+					"sup_notifications",
+					"source = ? AND created < datetime('now', ?)",
+					[source, f"-{days} days"],
+				)
+
+		days = self.config.notification_retention_days
+		if days > 0:
+			excluded = ", ".join("?" for _ in overrides)
+			deleted += self._delete_in_batches(
+				conn,
+				"sup_notifications",
+				f"source NOT IN ({excluded}) AND created < datetime('now', ?)",
+				[*overrides, f"-{days} days"],
+			)
+		return deleted
+
+	def prune_chat_history(self, conn: sqlite3.Connection) -> int:
+		"""Delete the chat history past its retention."""
+		days = self.config.chat_history_retention_days
+		if days <= 0:
+			return 0
+		return self._delete_in_batches(
+			conn,
+			"sup_chat_history",
+			"timestamp < datetime('now', ?)",
+			[f"-{days} days"],
+		)
+
+	def compress_chat_history(self, conn: sqlite3.Connection) -> int:
+		"""Compress the content of cold chat history rows, those not shrinking are left as is."""
+		days = self.config.chat_history_compress_after_days
+		if days <= 0:
+			return 0
+		if not ZSTD_AVAILABLE:
+			logger.warning(
+				"DBMaintenance: zstandard is not installed, chat history is not compressed"
+			)
+			return 0
+
+		compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+		compressed = 0
+		last_id = 0
+		while True:
+			rows = conn.execute(
+				"""SELECT id, content FROM sup_chat_history
+                   WHERE content_encoding IS NULL AND timestamp < datetime('now', ?) AND id > ?
+                   ORDER BY id LIMIT ?""",
+				[f"-{days} days", last_id, self.config.batch_size],
+			).fetchall()
+			if not rows:
+				return compressed
+
+			updates = []
+			for row_id, content in rows:
+				if isinstance(content, str):
+					raw = content.encode("utf-8")
+					packed = compressor.compress(raw)
+					if len(packed) < len(raw):
+						updates.append((packed, ZSTD_ENCODING, row_id))
+			with conn:
+				conn.executemany(
+					"UPDATE sup_chat_history SET content = ?, content_encoding = ? WHERE id = ?",
+					updates,
+				)
+			compressed += len(updates)
+			last_id = rows[-1][0]
+
+	def rollup_wallet_snapshots(self, conn: sqlite3.Connection) -> tuple[int, int]:
+		"""
+		Roll old raw wallet snapshots up into hourly aggregates, and old hourly ones into daily aggregates.
+
+		Returns:
+			tuple[int, int]: Numbers of raw snapshots and of hourly rollups merged
+		"""
+		raw_cutoff = f"-{self.config.snapshot_raw_days} days"
+		with conn:
+			conn.execute(HOURLY_ROLLUP_QUERY, [raw_cutoff])
+			snapshots = conn.execute(
+				"DELETE FROM sup_wallet_snapshots WHERE snapshot_time < datetime('now', ?)",
+				[raw_cutoff],
+			).rowcount
+
+		hourly_cutoff = f"-{self.config.snapshot_hourly_days} days"
+		with conn:
+			conn.execute(DAILY_ROLLUP_QUERY, [hourly_cutoff])
+			hourly = conn.execute(
+				"""DELETE FROM sup_wallet_snapshot_rollups
+                   WHERE granularity = 'hour' AND bucket_start < datetime('now', ?)""",
+				[hourly_cutoff],
+			).rowcount
+		return snapshots, hourly
+
+	def vacuum(self, conn: sqlite3.Connection) -> int:
+		"""
+		Return free pages to the file system with an incremental vacuum.
+
+		A database without incremental auto vacuum keeps its free pages for
+		reuse, until it is converted by `enable_incremental_vacuum`.
+
+		Returns:
+			int: Number of pages freed
+		"""
+		if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != INCREMENTAL_AUTO_VACUUM:
+			logger.warning(
+				"DBMaintenance: incremental auto vacuum is disabled, free pages are kept. "
+				"Enable it once with `scripts/maintenance.py --enable-incremental-vacuum` "
+				"while the agents and the notification service are stopped"
+			)
+			return 0
+
+		free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+		conn.execute(
+			f"PRAGMA incremental_vacuum({int(self.config.vacuum_pages)})"
+		).fetchall()
+		conn.execute("PRAGMA optimize")
+		return free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+	def enable_incremental_vacuum(self) -> int:
+		"""
+		Convert the database to incremental auto vacuum, so later runs can free pages.
+
+		Needs downtime: the full VACUUM rewrites the whole database under an
+		exclusive lock, so the agents and the notification service must be
+		stopped first. Does nothing if the database is already converted.
+
+		Returns:
+			int: Number of pages freed by the rebuild
+		"""
+		conn = self._connect()
+		try:
+			if (
+				conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+				== INCREMENTAL_AUTO_VACUUM
+			):
+				return 0
+			logger.info(
+				"DBMaintenance: enabling incremental auto vacuum, rebuilding the database"
+			)
+			conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+			free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+			conn.execute("VACUUM")
+			return free_before
+		finally:
+			conn.close()
+
+	def table_sizes(self, conn: sqlite3.Connection) -> List[TableSize]:
+		"""Get the rows and bytes of the reported tables that exist."""
+		existing = {
+			name: sql
+			for name, sql in conn.execute(
+				"SELECT name, sql FROM sqlite_master WHERE type = 'table'"
+			)
+		}
+		sizes = []
+		for table in REPORTED_TABLES:
+			if table not in existing:
+				continue
+			rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+			# Data of virtual tables, like the FTS index, lives in their shadow tables
+			is_virtual = (existing[table] or "").upper().startswith("CREATE VIRTUAL")
+			try:
+				size = conn.execute(
+					"""SELECT SUM(pgsize) FROM dbstat
+                       WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = ?)
+                          OR (? AND name LIKE ? || '\\_%' ESCAPE '\\')""",
+					[table, is_virtual, table],
+				).fetchone()[0]
+			except sqlite3.OperationalError:
+				size = None
+			sizes.append(TableSize(name=table, rows=rows, bytes=size))
+		return sizes
+
+	def run(self) -> MaintenanceReport:
+		"""
+		Run every maintenance step, a failing step is logged and does not stop the others.
+
+		Returns:
+			MaintenanceReport: What the run deleted, compressed and rolled up, and the sizes after it
+		"""
+		report = MaintenanceReport()
+		conn = self._connect()
+		try:
+			self._ensure_schema(conn)
+
+			steps = [
+				(
+					"notification retention",
+					self.prune_notifications,
+					"notifications_deleted",
+				),
+				(
+					"chat history retention",
+					self.prune_chat_history,
+					"chat_history_deleted",
+				),
+				(
+					"chat history compression",
+					self.compress_chat_history,
+					"chat_history_compressed",
+				),
+			]
+			for name, step, attribute in steps:
+				try:
+					setattr(report, attribute, step(conn))
+				except sqlite3.Error as e:
+					logger.error(f"DBMaintenance: {name} failed: {e}")
+
+			try:
+				report.snapshots_rolled_up, report.hourly_rollups_rolled_up = (
+					self.rollup_wallet_snapshots(conn)
+				)
+			except sqlite3.Error as e:
+				logger.error(f"DBMaintenance: wallet snapshot rollup failed: {e}")
+
+			try:
+				report.pages_freed = self.vacuum(conn)
+			except sqlite3.Error as e:
+				logger.error(f"DBMaintenance: vacuum failed: {e}")
+
+			page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+			report.db_bytes = (
+				conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+			)
+			report.table_sizes = self.table_sizes(conn)
+		finally:
+			conn.close()
+
+		logger.info(
+			f"DBMaintenance: deleted {report.notifications_deleted} notifications and "
+			f"{report.chat_history_deleted} chat history rows, compressed {report.chat_history_compressed} "
+			f"chat history rows, rolled up {report.snapshots_rolled_up} snapshots and "
+			f"{report.hourly_rollups_rolled_up} hourly rollups, freed {report.pages_freed} pages"
+		)
+		for size in report.table_sizes:
+			size_str = (
+				"unknown size"
+				if size.bytes is None
+				else f"{size.bytes / 1024 / 1024:.1f} MiB"
+			)
+			logger.info(f"DBMaintenance: {size.name} has {size.rows} rows, {size_str}")
+		logger.info(
+			f"DBMaintenance: database is {report.db_bytes / 1024 / 1024:.1f} MiB"
+		)
+		return report
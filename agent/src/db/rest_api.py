@@ -37,11 +37,13 @@ class ApiResponse(Generic[T]):
 		success (bool): Whether the API request was successful
 		data (Optional[T]): The data returned by the API, if successful
 		error (Optional[str]): Error message, if the request failed
+		status_code (Optional[int]): HTTP status of a failed request, if the API answered
 	"""
 
 	success: bool
 	data: Optional[T]
 	error: Optional[str]
+	status_code: Optional[int] = None
 
 
 class APIDB(DBInterface[T]):
@@ -62,6 +64,8 @@ class APIDB(DBInterface[T]):
 		"""
 		self.base_url = base_url
 		self.headers = {"x-api-key": api_key, "Content-Type": "application/json"}
+		# Cleared once the API turns out not to provide `strategies/update`
+		self._strategy_summary_updates = True
 
 	def _make_request(
 		self, endpoint: str, data: Dict[str, Any], response_type: type[T]
@@ -87,7 +91,10 @@ class APIDB(DBInterface[T]):
 			response.raise_for_status()
 			return ApiResponse(success=True, data=cast(T, response.json()), error=None)
 		except requests.exceptions.RequestException as e:
-			return ApiResponse(success=False, data=None, error=str(e))
+			status_code = e.response.status_code if e.response is not None else None
+			return ApiResponse(
+				success=False, data=None, error=str(e), status_code=status_code
+			)
 
 	def _make_get_request(self, endpoint: str) -> ApiResponse[T]:
 		"""
@@ -159,7 +166,7 @@ class APIDB(DBInterface[T]):
 
 	def insert_strategy_and_result(
 		self, agent_id: str, strategy_result: StrategyInsertData
-	) -> bool:
+	) -> Optional[str]:
 		"""
 		Insert a new strategy and its result into the database.
 
@@ -171,10 +178,10 @@ class APIDB(DBInterface[T]):
 			strategy_result (StrategyInsertData): The strategy data to insert
 
 		Returns:
-			bool: True if the insertion was successful, False otherwise
+			Optional[str]: The ID of the new strategy, None if the API did not return it
 
 		Raises:
-			ApiError: If the agent verification fails
+			ApiError: If the agent verification or the insertion fails
 		"""
 		# Verify agent exists
 		agent_response = self._make_request(
@@ -208,7 +215,55 @@ class APIDB(DBInterface[T]):
 		if not response.success:
 			raise ApiError(f"Failed to insert strategy: {response.error}")
 
-		return True
+		strategy_id = ((response.data or {}).get("data") or {}).get("strategy_id")
+		if strategy_id is None:
+			logger.error(
+				"strategies/create returned no data.strategy_id, the summaries of the "
+				"strategy cannot be written back"
+			)
+		return strategy_id
+
+	def update_strategy_summary(
+		self, strategy_id: str, summarized_desc: str, parameters: Dict[str, Any]
+	) -> bool:
+		"""
+		Write the summaries of a strategy that were made after it was saved.
+
+		Args:
+			strategy_id (str): The ID of the strategy
+			summarized_desc (str): Brief description of the strategy
+			parameters (Dict[str, Any]): The strategy's parameters, including their summaries
+
+		Returns:
+			bool: True if the strategy was updated, False otherwise
+		"""
+		if not self._strategy_summary_updates:
+			return False
+
+		response = self._make_request(
+			"strategies/update",
+			{
+				"strategy_id": strategy_id,
+				"summarized_desc": summarized_desc,
+				"parameters": json.dumps(parameters),
+			},
+			Dict[str, Any],
+		)
+
+		if not response.success:
+			logger.error(f"Failed to update strategy summary: {response.error}")
+			if response.status_code in (404, 405):
+				logger.error(
+					"The API does not provide strategies/update, strategy summaries will "
+					"no longer be scheduled"
+				)
+				self._strategy_summary_updates = False
+
+		return response.success
+
+	def supports_strategy_summary_updates(self) -> bool:
+		"""Whether the API was not found to lack `strategies/update`."""
+		return self._strategy_summary_updates
 
 	def fetch_latest_strategy(self, agent_id: str) -> Optional[StrategyData]:
 		"""
@@ -438,14 +493,53 @@ class APIDB(DBInterface[T]):
 
 		notifications = notification_response.data["data"]
 
-		notifications_long_descs = list(
-			set([notif["long_desc"] for notif in notifications])
-		)
+		# One notification per story, near-duplicates share a cluster
+		notifications_by_story = {}
+		for notif in notifications:
+			story = notif.get("cluster_id") or notif["long_desc"]
+			notifications_by_story.setdefault(story, notif["long_desc"])
 
-		ret = "\n".join(notifications_long_descs)
+		ret = "\n".join(notifications_by_story.values())
 
 		return ret
 
+	def search_notifications(
+		self,
+		keywords: List[str],
+		within_hours: Optional[float] = None,
+		sources: Optional[List[str]] = None,
+		limit: int = 10,
+	) -> List[Dict[str, Any]]:
+		"""
+		Search the notifications mentioning any of the keywords, best matches first.
+
+		Args:
+			keywords (List[str]): Words or phrases to look for, e.g. token symbols
+			within_hours (Optional[float]): Only notifications created in the last hours, all if None
+			sources (Optional[List[str]]): Only notifications of these sources, all if None
+			limit (int): Maximum number of notifications to return
+
+		Returns:
+			List[Dict[str, Any]]: Matched notifications with a snippet of the matched text,
+				empty if the search fails
+		"""
+		response = self._make_request(
+			"notification/search",
+			{
+				"keywords": keywords,
+				"within_hours": within_hours,
+				"sources": sources,
+				"limit": limit,
+			},
+			Dict[str, List[Dict[str, Any]]],
+		)
+
+		if not response.success or not response.data:
+			logger.error(f"Failed to search notifications: {response.error}")
+			return []
+
+		return response.data["data"]
+
 	def get_agent_session(self, session_id: str) -> Optional[Dict[str, Any]]:
 		"""
 		Get an agent session by session_id and agent_id.
@@ -757,6 +851,30 @@ class APIDB(DBInterface[T]):
 		snapshot = response.data["data"][0]
 		return snapshot
 
+	def insert_llm_calls(
+		self, session_id: str, agent_id: str, calls: List[Dict[str, Any]]
+	) -> bool:
+		"""Insert token and latency metrics of LLM calls.
+
+		Args:
+			session_id (str): The ID of the session
+			agent_id (str): The ID of the agent
+			calls (List[Dict[str, Any]]): One dict per call, as produced by `LLMCallMetrics.to_dict`
+
+		Returns:
+			bool: If the calls were inserted successfully
+		"""
+		response = self._make_request(
+			"llm_calls/create",
+			{"session_id": session_id, "agent_id": agent_id, "calls": calls},
+			Dict[str, Any],
+		)
+
+		if not response.success:
+			logger.error(f"Failed to insert LLM calls: {response.error}")
+
+		return response.success
+
 	def get_agent_profile_image(self, agent_id: str) -> Optional[str]:
 		"""Fetch agent's profile image URL from the API.
 
@@ -5,6 +5,7 @@ from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from src.datatypes import StrategyData, StrategyInsertData
 from src.db.interface import DBInterface
+from src.db.maintenance import decompress_chat_content
 from src.custom_types import ChatHistory
 import uuid
 
@@ -39,8 +40,34 @@ class SQLiteDB(DBInterface):
 
 		with sqlite3.connect(self.db_path) as conn:
 			cursor = conn.cursor()
+			fts_exists = cursor.execute(
+				"SELECT 1 FROM sqlite_master WHERE name = 'sup_notifications_fts'"
+			).fetchone()
 			cursor.executescript(init_script)
 			cursor.executescript(seed_script)
+			# The triggers only index new notifications, the stored ones are indexed once
+			if not fts_exists:
+				cursor.execute(
+					"INSERT INTO sup_notifications_fts (sup_notifications_fts) VALUES ('rebuild')"
+				)
+
+			# Notification databases created before clustering lack its column
+			columns = {
+				row[1] for row in cursor.execute("PRAGMA table_info(sup_notifications)")
+			}
+			if "cluster_id" not in columns:
+				cursor.execute(
+					"ALTER TABLE sup_notifications ADD COLUMN cluster_id TEXT"
+				)
+
+			# Chat history of databases created before compression lacks its encoding
+			columns = {
+				row[1] for row in cursor.execute("PRAGMA table_info(sup_chat_history)")
+			}
+			if "content_encoding" not in columns:
+				cursor.execute(
+					"ALTER TABLE sup_chat_history ADD COLUMN content_encoding varchar(20)"
+				)
 			conn.commit()
 
 	def fetch_params_using_agent_id(self, agent_id: str) -> Dict[str, Dict[str, Any]]:
@@ -64,7 +91,8 @@ class SQLiteDB(DBInterface):
 
 	def insert_strategy_and_result(
 		self, agent_id: str, strategy_result: StrategyInsertData
-	) -> bool:
+	) -> Optional[str]:
+		strategy_id = str(uuid.uuid4())
 		try:
 			with sqlite3.connect(self.db_path) as conn:
 				cursor = conn.cursor()
@@ -72,7 +100,7 @@ class SQLiteDB(DBInterface):
 					"""INSERT INTO sup_strategies (strategy_id, agent_id, parameters, summarized_desc, full_desc)
                        VALUES (?, ?, ?, ?, ?)""",
 					(
-						str(uuid.uuid4()),
+						strategy_id,
 						agent_id,
 						json.dumps(strategy_result.parameters)
 						if strategy_result.parameters
@@ -81,7 +109,23 @@ class SQLiteDB(DBInterface):
 						strategy_result.full_desc,
 					),
 				)
-				return True
+				return strategy_id
+		except sqlite3.Error:
+			return None
+
+	def update_strategy_summary(
+		self, strategy_id: str, summarized_desc: str, parameters: Dict[str, Any]
+	) -> bool:
+		try:
+			with sqlite3.connect(self.db_path) as conn:
+				cursor = conn.cursor()
+				cursor.execute(
+					"""UPDATE sup_strategies
+                       SET summarized_desc = ?, parameters = ?, updated_at = CURRENT_TIMESTAMP
+                       WHERE strategy_id = ?""",
+					(summarized_desc, json.dumps(parameters), strategy_id),
+				)
+				return cursor.rowcount > 0
 		except sqlite3.Error:
 			return False
 
@@ -156,6 +200,32 @@ class SQLiteDB(DBInterface):
 		except sqlite3.Error:
 			return False
 
+	def fetch_chat_history(self, session_id: str) -> List[Dict[str, Any]]:
+		"""Get the chat history of a session in insertion order, with the content compressed by the maintenance restored.
+
+		Args:
+		    session_id (str): ID of the session
+
+		Returns:
+		    List[Dict[str, Any]]: Message type, content and timestamp of each message
+		"""
+		with sqlite3.connect(self.db_path) as conn:
+			rows = conn.execute(
+				"""SELECT message_type, content, content_encoding, timestamp
+                   FROM sup_chat_history
+                   WHERE session_id = ?
+                   ORDER BY id""",
+				(session_id,),
+			).fetchall()
+			return [
+				{
+					"message_type": row[0],
+					"content": decompress_chat_content(row[1], row[2]),
+					"timestamp": row[3],
+				}
+				for row in rows
+			]
+
 	def fetch_latest_notification_str(self, sources: List[str]) -> str:
 		with sqlite3.connect(self.db_path) as conn:
 			cursor = conn.cursor()
@@ -176,19 +246,86 @@ class SQLiteDB(DBInterface):
 		with sqlite3.connect(self.db_path) as conn:
 			cursor = conn.cursor()
 			results = []
+			# One notification per story, near-duplicates share a cluster
+			seen_clusters = set()
 			for source in sources:
 				cursor.execute(
-					"""SELECT long_desc 
+					"""SELECT long_desc, COALESCE(cluster_id, notification_id) AS cluster, MAX(created) AS latest 
                        FROM sup_notifications 
                        WHERE source = ? 
-                       ORDER BY created DESC 
+                       GROUP BY cluster 
+                       ORDER BY latest DESC 
                        LIMIT ?""",
 					(source, limit),
 				)
-				rows = cursor.fetchall()
-				results.extend(row[0] for row in rows)
+				for long_desc, cluster, _ in cursor.fetchall():
+					if cluster in seen_clusters:
+						continue
+					seen_clusters.add(cluster)
+					results.append(long_desc)
 			return "\n".join(results)
 
+	def search_notifications(
+		self,
+		keywords: List[str],
+		within_hours: Optional[float] = None,
+		sources: Optional[List[str]] = None,
+		limit: int = 10,
+	) -> List[Dict[str, Any]]:
+		match_query = " OR ".join(
+			'"' + keyword.replace('"', '""') + '"'
+			for keyword in keywords
+			if keyword.strip()
+		)
+		if not match_query:
+			return []
+
+		filters = ["sup_notifications_fts MATCH ?"]
+		params: List[Any] = [match_query]
+		if within_hours is not None:
+			filters.append("n.created >= datetime('now', ?)")
+			params.append(f"-{within_hours} hours")
+		if sources:
+			filters.append(f"n.source IN ({', '.join('?' for _ in sources)})")
+			params.extend(sources)
+		params.append(limit)
+
+		try:
+			with sqlite3.connect(self.db_path) as conn:
+				# Ranking functions cannot be aggregated directly, the matches are materialized
+				# first and the best match of each cluster is kept
+				rows = conn.execute(
+					f"""WITH matches AS MATERIALIZED (
+                           SELECT n.notification_id, n.source, n.short_desc, n.created,
+                                  snippet(sup_notifications_fts, 1, '[', ']', '...', 16) AS snippet,
+                                  COALESCE(n.cluster_id, n.notification_id) AS cluster,
+                                  sup_notifications_fts.rank AS rank
+                           FROM sup_notifications_fts
+                           JOIN sup_notifications n ON n.id = sup_notifications_fts.rowid
+                           WHERE {" AND ".join(filters)}
+                       )
+                       SELECT notification_id, source, short_desc, snippet, created, MIN(rank) AS rank
+                       FROM matches
+                       GROUP BY cluster
+                       ORDER BY rank
+                       LIMIT ?""",
+					params,
+				).fetchall()
+		except sqlite3.Error:
+			return []
+
+		return [
+			{
+				"notification_id": row[0],
+				"source": row[1],
+				"short_desc": row[2],
+				"snippet": row[3],
+				"created": row[4],
+				"rank": row[5],
+			}
+			for row in rows
+		]
+
 	def get_agent_session(self, session_id: str) -> Optional[Dict[str, Any]]:
 		with sqlite3.connect(self.db_path) as conn:
 			cursor = conn.cursor()
@@ -347,6 +484,42 @@ class SQLiteDB(DBInterface):
 		# TODO: Make this actually work
 		return {}
 
+	def insert_llm_calls(
+		self, session_id: str, agent_id: str, calls: List[Dict[str, Any]]
+	) -> bool:
+		try:
+			with sqlite3.connect(self.db_path) as conn:
+				conn.executemany(
+					"""INSERT INTO sup_llm_calls (session_id, agent_id, backend, model, phase, attempt,
+                       input_tokens, cached_input_tokens, output_tokens, usage_reported, ttft_s, latency_s,
+                       tokens_per_s, cost_usd, success, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime(?, 'unixepoch'))""",
+					[
+						(
+							session_id,
+							agent_id,
+							call["backend"],
+							call["model"],
+							call["phase"],
+							call["attempt"],
+							call["input_tokens"],
+							call["cached_input_tokens"],
+							call["output_tokens"],
+							call["usage_reported"],
+							call["ttft_s"],
+							call["latency_s"],
+							call["tokens_per_s"],
+							call["cost_usd"],
+							call["success"],
+							call["created_at"],
+						)
+						for call in calls
+					],
+				)
+				return True
+		except sqlite3.Error:
+			return False
+
 	def get_agent_profile_image(self, agent_id: str) -> Optional[str]:
 		with sqlite3.connect(self.db_path) as conn:
 			cursor = conn.cursor()
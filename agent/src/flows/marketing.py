@@ -1,9 +1,11 @@
-from typing import Callable, List
+from typing import List
 
 from loguru import logger
 from result import UnwrapError
 from src.agent.marketing import MarketingAgent
 from src.datatypes import StrategyData, StrategyInsertData
+from src.genner.Metrics import metrics_recorder, set_llm_phase
+from src.summarizer import SummarizerService
 
 
 def unassisted_flow(
@@ -15,7 +17,7 @@ def unassisted_flow(
 	metric_name: str,
 	prev_strat: StrategyData | None,
 	notif_str: str | None,
-	summarizer: Callable[[List[str]], str],
+	summarizer: SummarizerService,
 ):
 	"""
 	Execute an unassisted marketing workflow with the marketing agent.
@@ -33,7 +35,7 @@ def unassisted_flow(
 	    metric_name (str): Name of the metric to track
 	    prev_strat (StrategyData | None): Previous strategy, if any
 	    notif_str (str | None): Notification string to process
-	    summarizer (Callable[[List[str]], str]): Function to summarize text
+	    summarizer (SummarizerService): Summarizes the saved strategy in the background
 
 	Returns:
 	    None: This function doesn't return a value but logs its progress
@@ -82,6 +84,7 @@ def unassisted_flow(
 	err_acc = ""
 	regen = False
 	for i in range(3):
+		set_llm_phase("research_code", i)
 		try:
 			if regen:
 				research_code, new_ch = agent.gen_better_code(
@@ -137,6 +140,7 @@ def unassisted_flow(
 	err_acc = ""
 	regen = False
 	for i in range(3):
+		set_llm_phase("strategy", i)
 		try:
 			if regen:
 				logger.info("Regenning on strategy..")
@@ -180,6 +184,7 @@ def unassisted_flow(
 	err_acc = ""
 	regen = False
 	for i in range(3):
+		set_llm_phase("marketing_code", i)
 		try:
 			if regen:
 				logger.info("Regenning on marketing code...")
@@ -223,42 +228,42 @@ def unassisted_flow(
 		logger.info(f"Output: \n{marketing_code_output}")
 
 	end_metric_state = str(agent.sensor.get_metric_fn(metric_name)())
-	summarized_state_change = summarizer(
-		[
-			f"This is the start state {start_metric_state}",
-			f"This is the end state {end_metric_state}",
-			"Summarize the state changes of the above",
-		]
-	)
-	logger.info("Summarizing state change...")
-	logger.info(f"Summarized state change: \n{summarized_state_change}")
-	summarized_code = summarizer(
-		[
-			marketing_code_output,
-			"Summarize the code",
-		]
-	)
-	logger.info("Summarizing code...")
-	logger.info(f"Summarized code: \n{summarized_code}")
+	parameters = {
+		"apis": apis,
+		"trading_instruments": [],
+		"metric_name": metric_name,
+		"start_metric_state": start_metric_state,
+		"end_metric_state": end_metric_state,
+		"summarized_state_change": "",
+		"summarized_code": "",
+		"code_output": marketing_code_output,
+		"prev_strat": prev_strat.summarized_desc if prev_strat else "",
+	}
 
 	logger.info("Saving strategy and its result...")
-	agent.db.insert_strategy_and_result(
+	strategy_id = agent.db.insert_strategy_and_result(
 		agent_id=agent.agent_id,
 		strategy_result=StrategyInsertData(
-			summarized_desc=summarizer([strategy_output]),
 			full_desc=strategy_output,
-			parameters={
-				"apis": apis,
-				"trading_instruments": [],
-				"metric_name": metric_name,
-				"start_metric_state": start_metric_state,
-				"end_metric_state": end_metric_state,
-				"summarized_state_change": summarized_state_change,
-				"summarized_code": summarized_code,
-				"code_output": marketing_code_output,
-				"prev_strat": prev_strat.summarized_desc if prev_strat else "",
-			},
+			parameters=parameters,
 			strategy_result="failed" if not strategy_success else "success",
 		),
 	)
+
+	logger.info("Summarizing strategy, state change and code in the background...")
+	summarizer.backfill_strategy(
+		agent.db,
+		strategy_id,
+		strategy_output,
+		parameters,
+		{
+			"summarized_state_change": [
+				f"This is the start state {start_metric_state}",
+				f"This is the end state {end_metric_state}",
+				"Summarize the state changes of the above",
+			],
+			"summarized_code": [marketing_code_output, "Summarize the code"],
+		},
+	)
+	metrics_recorder.export(agent.db, session_id, agent.agent_id)
 	logger.info("Saved, quitting and preparing for next run...")
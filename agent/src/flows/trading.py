@@ -1,7 +1,7 @@
 import json
 from datetime import timedelta
 from textwrap import dedent
-from typing import Callable, List
+from typing import List
 
 from loguru import logger
 from result import UnwrapError
@@ -14,7 +14,9 @@ from src.datatypes import (
 	WalletStats,
 )
 from src.helper import nanoid
+from src.genner.Metrics import metrics_recorder, set_llm_phase
 from src.custom_types import ChatHistory
+from src.summarizer import SummarizerService
 
 
 def assisted_flow(
@@ -29,7 +31,7 @@ def assisted_flow(
 	prev_strat: StrategyData | None,
 	notif_str: str,
 	txn_service_url: str,
-	summarizer: Callable[[List[str]], str],
+	summarizer: SummarizerService,
 ):
 	"""
 	Execute an assisted trading workflow with the trading agent.
@@ -50,7 +52,7 @@ def assisted_flow(
 	    prev_strat (StrategyData | None): Previous strategy, if any
 	    notif_str (str | None): Notification string to process
 	    txn_service_url (str): URL of the transaction service
-	    summarizer (Callable[[List[str]], str]): Function to summarize text
+	    summarizer (SummarizerService): Summarizes the saved strategy in the background
 
 	Returns:
 	    None: This function doesn't return a value but logs its progress
@@ -214,6 +216,7 @@ def assisted_flow(
 	regen = False
 	success = False
 	for i in range(3):
+		set_llm_phase("research_code", i)
 		try:
 			if regen:
 				logger.info("Attempt to regenerate research code...")
@@ -226,14 +229,13 @@ def assisted_flow(
 				research_code_result, new_ch = agent.gen_better_code(
 					research_code=new_ch.get_latest_response(),
 					errors=err_acc,
+					run_postfix="trader_research_code",
 				)
-				research_code = research_code_result.unwrap()
 			else:
 				if not prev_strat:
 					research_code_result, new_ch = agent.gen_research_code_on_first(
-						apis=apis, network=network
+						apis=apis, network=network, run_postfix="trader_research_code"
 					)
-					research_code = research_code_result.unwrap()
 				else:
 					research_code_result, new_ch = agent.gen_research_code(
 						notifications_str=notif_str if notif_str else "Fresh",
@@ -242,19 +244,16 @@ def assisted_flow(
 						rag_summary=rag_summary,
 						before_metric_state=str(rag_start_metric_state) or "",
 						after_metric_state=str(rag_end_metric_state) or "",
+						run_postfix="trader_research_code",
 					)
-					research_code = research_code_result.unwrap()
 
 			# logger.info(f"Response: {new_ch.get_latest_response()}")
 			# Temporarily avoid new chat to reduce cost
 			# agent.chat_history += new_ch
 			for_training_chat_history += new_ch
 
-			logger.info("Running the resulting research code in conatiner...")
-			code_execution_result = agent.container_manager.run_code_in_con(
-				research_code, "trader_research_code"
-			)
-			research_code_output, _ = code_execution_result.unwrap()
+			logger.info("Generated and ran the research code in container...")
+			research_code, research_code_output = research_code_result.unwrap()
 
 			success = True
 			break
@@ -275,17 +274,40 @@ def assisted_flow(
 	logger.info("Succeeded in generating research...")
 	logger.info(f"Research :\n{research_code_output}")
 
+	# Recent notifications about the held tokens, looked up in the full-text index
+	strategy_notif_str = notif_str
+	if metric_name == "wallet":
+		held_symbols = ["ETH"] + [
+			token["symbol"]
+			for token in start_metric_state.get("tokens", {}).values()
+			if token.get("symbol") not in (None, "UNKNOWN")
+		]
+		held_notifs = agent.db.search_notifications(
+			held_symbols, within_hours=24, limit=5
+		)
+		if held_notifs:
+			logger.info(
+				f"Found {len(held_notifs)} recent notifications about {held_symbols}"
+			)
+			held_notif_lines = [
+				f"{notif['short_desc']}: {notif['snippet']}" for notif in held_notifs
+			]
+			strategy_notif_str = "\n".join(
+				([notif_str] if notif_str else []) + held_notif_lines
+			)
+
 	logger.info("Attempt to generate strategy...")
 	err_acc = ""
 	regen = False
 	success = False
 	for i in range(3):
+		set_llm_phase("strategy", i)
 		try:
 			if regen:
 				logger.info("Regenning on strategy..")
 
 			strategy_output_result, new_ch = agent.gen_strategy(
-				notifications_str=notif_str if notif_str else "Fresh",
+				notifications_str=strategy_notif_str if strategy_notif_str else "Fresh",
 				research_output_str=research_code_output,
 				network=network,
 			)
@@ -322,6 +344,7 @@ def assisted_flow(
 	regen = False
 	success = False
 	for i in range(10):
+		set_llm_phase("address_research_code", i)
 		try:
 			if regen:
 				logger.info("Regenning on address research...")
@@ -334,24 +357,23 @@ def assisted_flow(
 				address_research_code_result, new_ch = agent.gen_better_code(
 					research_code=new_ch.get_latest_response(),
 					errors=err_acc,
+					run_postfix="trader_address_research",
 				)
-				address_research_code = address_research_code_result.unwrap()
 			else:
 				address_research_code_result, new_ch = agent.gen_account_research_code(
-					strategy_output=strategy_output
+					strategy_output=strategy_output,
+					run_postfix="trader_address_research",
 				)
-				address_research_code = address_research_code_result.unwrap()
 
 			# logger.info(f"Response: {new_ch.get_latest_response()}")
 			# Temporarily avoid new chat to reduce cost
 			# agent.chat_history += new_ch
 			for_training_chat_history += new_ch
 
-			logger.info("Running the resulting address research code in conatiner...")
-			code_execution_result = agent.container_manager.run_code_in_con(
-				address_research_code, "trader_address_research"
+			logger.info("Generated and ran the address research code in container...")
+			address_research_code, address_research_output = (
+				address_research_code_result.unwrap()
 			)
-			address_research_output, _ = code_execution_result.unwrap()
 			success = True
 			break
 		except UnwrapError as e:
@@ -379,6 +401,7 @@ def assisted_flow(
 	success = False
 	regen = False
 	for i in range(3):
+		set_llm_phase("trading_code", i)
 		try:
 			if regen:
 				logger.info("Regenning on trading code...")
@@ -391,8 +414,9 @@ def assisted_flow(
 				trading_code_result, new_ch = agent.gen_better_code(
 					research_code=new_ch.get_latest_response(),
 					errors=err_acc,
+					run_postfix="trader_trading_code",
+					race_candidates=False,
 				)
-				trading_code = trading_code_result.unwrap()
 			else:
 				trading_code_result, new_ch = agent.gen_trading_code(
 					strategy_output=strategy_output,
@@ -402,19 +426,16 @@ def assisted_flow(
 					agent_id=agent.agent_id,
 					txn_service_url=txn_service_url,
 					session_id=session_id,
+					run_postfix="trader_trading_code",
 				)
-				trading_code = trading_code_result.unwrap()
 
 			# logger.info(f"Response: {new_ch.get_latest_response()}")
 			# Temporarily avoid new chat to reduce cost
 			# agent.chat_history += new_ch
 			for_training_chat_history += new_ch
 
-			logger.info("Running the resulting trading code in conatiner...")
-			code_execution_result = agent.container_manager.run_code_in_con(
-				trading_code, "trader_trading_code"
-			)
-			trading_code_output, _ = code_execution_result.unwrap()
+			logger.info("Generated and ran the trading code in container...")
+			trading_code, trading_code_output = trading_code_result.unwrap()
 			success = True
 			break
 		except UnwrapError as e:
@@ -449,35 +470,37 @@ def assisted_flow(
         USD Value After: {end_metric_state["total_value_usd"]}
     """)
 
-	summarized_code = summarizer(
-		[
-			trading_code,
-			"Summarize the code above in points",
-		]
-	)
-	logger.info("Summarizing code...")
-	logger.info(f"Summarized code: \n{summarized_code}")
+	parameters = {
+		"apis": apis,
+		"trading_instruments": trading_instruments,
+		"metric_name": metric_name,
+		"start_metric_state": json.dumps(start_metric_state),
+		"end_metric_state": json.dumps(end_metric_state),
+		"summarized_state_change": summarized_state_change,
+		"summarized_code": "",
+		"code_output": code_output,
+		"prev_strat": prev_strat.summarized_desc if prev_strat else "",
+		"wallet_address": start_metric_state["wallet_address"],
+		"notif_str": notif_str,
+	}
 
 	logger.info("Saving strategy and its result...")
-	agent.db.insert_strategy_and_result(
+	strategy_id = agent.db.insert_strategy_and_result(
 		agent_id=agent.agent_id,
 		strategy_result=StrategyInsertData(
-			summarized_desc=summarizer([strategy_output]),
 			full_desc=strategy_output,
-			parameters={
-				"apis": apis,
-				"trading_instruments": trading_instruments,
-				"metric_name": metric_name,
-				"start_metric_state": json.dumps(start_metric_state),
-				"end_metric_state": json.dumps(end_metric_state),
-				"summarized_state_change": summarized_state_change,
-				"summarized_code": summarized_code,
-				"code_output": code_output,
-				"prev_strat": prev_strat.summarized_desc if prev_strat else "",
-				"wallet_address": start_metric_state["wallet_address"],
-				"notif_str": notif_str,
-			},
+			parameters=parameters,
 			strategy_result="failed" if not success else "success",
 		),
 	)
+
+	logger.info("Summarizing strategy and code in the background...")
+	summarizer.backfill_strategy(
+		agent.db,
+		strategy_id,
+		strategy_output,
+		parameters,
+		{"summarized_code": [trading_code, "Summarize the code above in points"]},
+	)
+	metrics_recorder.export(agent.db, session_id, agent.agent_id)
 	logger.info("Saved, quitting and preparing for next run...")
@@ -1,4 +1,8 @@
+import asyncio
+import contextvars
+import functools
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, List, Tuple
 from ollama import ChatResponse, chat
 from result import Err, Ok, Result
@@ -8,6 +12,23 @@ from src.config import (
 )
 from src.custom_types import ChatHistory
 
+from .Extract import extract_code_blocks, extract_yaml_lists
+from .Metrics import instrument_completion, report_usage
+from .Stream import TokenStream
+
+# Dedicated pool for the async API so that abandoned speculative calls never
+# block `asyncio.run` from shutting down its default executor.
+_ASYNC_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="genner")
+
+
+async def _run_in_executor(fn, *args):
+	"""Run a blocking genner call on the async pool, keeping the caller's context."""
+	loop = asyncio.get_running_loop()
+	context = contextvars.copy_context()
+	return await loop.run_in_executor(
+		_ASYNC_EXECUTOR, functools.partial(context.run, fn, *args)
+	)
+
 
 class Genner(ABC):
 	def __init__(self, identifier: str, do_stream: bool):
@@ -53,6 +74,54 @@ class Genner(ABC):
 		"""
 		self.do_stream = final_state
 
+	async def async_ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		"""
+		Asynchronously generate a single completion based on the current chat history.
+
+		Backends are built on blocking SDK clients, so the default implementation
+		runs `ch_completion` on a worker thread. Subclasses with a native async
+		client can override it.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+
+		Returns:
+			Result[str, str]:
+				Ok(str): The raw response text if successful
+				Err(str): The error message if generation failed
+		"""
+		return await _run_in_executor(self.ch_completion, messages)
+
+	async def async_generate_code(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[str], str], str]:
+		"""
+		Asynchronously generate code based on the current chat history.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into code
+
+		Returns:
+			Result[Tuple[List[str], str], str]: Same as `generate_code`
+		"""
+		return await _run_in_executor(self.generate_code, messages, blocks)
+
+	async def async_generate_list(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[List[str]], str], str]:
+		"""
+		Asynchronously generate a list of items based on the current chat history.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into lists
+
+		Returns:
+			Result[Tuple[List[List[str]], str], str]: Same as `generate_list`
+		"""
+		return await _run_in_executor(self.generate_list, messages, blocks)
+
 	@abstractmethod
 	def generate_code(
 		self, messages: ChatHistory, blocks: List[str] = [""]
@@ -170,6 +239,7 @@ class OllamaGenner(Genner):
 		self.config = config
 		self.stream_fn = stream_fn
 
+	@instrument_completion
 	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
 		"""
 		Generate a completion using the Ollama API.
@@ -192,11 +262,11 @@ class OllamaGenner(Genner):
 			if self.do_stream:
 				assert self.stream_fn is not None
 
+				token_stream = TokenStream(self.stream_fn)
 				for chunk in chat(self.config.model, messages.as_native(), stream=True):
 					if chunk["message"] and chunk["message"]["content"]:
-						token = chunk["message"]["content"]
-						self.stream_fn(token)
-						final_response += token
+						token_stream.feed(chunk["message"]["content"])
+				final_response = token_stream.close()
 			else:
 				response: ChatResponse = chat(self.config.model, messages.as_native())
 				assert response.message.content is not None, (
@@ -204,6 +274,7 @@ class OllamaGenner(Genner):
 				)
 
 				final_response = response.message.content
+				report_usage(response.prompt_eval_count, response.eval_count)
 		except AssertionError as e:
 			return Err(
 				f"OllamaGenner.ch_completion: response.message.content is None: {e}"
@@ -317,20 +388,12 @@ class OllamaGenner(Genner):
 				f"An unexpected error while generating list with {self.config.name}, raw response: {raw_response} occured: \n{e}"
 			)
 
-	def extract_code(self, response: str, blocks: List[str] = []) -> Result[List[str], str]:
-		# Example implementation for extracting code
-		try:
-			# Assuming the response contains code blocks separated by some delimiter
-			code_blocks = response.split('---')  # Replace '---' with actual delimiter
-			return Ok(code_blocks)
-		except Exception as e:
-			return Err(f"Failed to extract code: {str(e)}")
+	def extract_code(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[str], str]:
+		return extract_code_blocks(response, blocks)
 
-	def extract_list(self, response: str, block_name: List[str] = []) -> Result[List[List[str]], str]:
-		# Example implementation for extracting lists
-		try:
-			# Assuming the response contains lists separated by some delimiter
-			list_blocks = [block.split(',') for block in response.split('---')]  # Replace '---' with actual delimiter
-			return Ok(list_blocks)
-		except Exception as e:
-			return Err(f"Failed to extract list: {str(e)}")
+	def extract_list(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[List[str]], str]:
+		return extract_yaml_lists(response, blocks)
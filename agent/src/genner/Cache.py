@@ -0,0 +1,474 @@
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from result import Err, Ok, Result
+
+from src.config import CompletionCacheConfig
+from src.custom_types import ChatHistory
+
+from .Base import Genner
+
+CACHE_MODES = ["off", "read_write", "record", "replay"]
+
+
+class CompletionCache:
+	"""
+	SQLite backed store for LLM completions.
+
+	Completions are keyed by a hash of the backend, model, temperature and the
+	full message list. Entries expire after a TTL and the least recently used
+	entries are evicted once the entry count or the total response size goes
+	over its limit. Alongside the cache, a "tape" keeps the ordered sequence of
+	completions of a recorded run so the run can be replayed even when prompts
+	drift slightly (e.g. the date in the system prompt).
+	"""
+
+	def __init__(
+		self,
+		db_path: str,
+		ttl_seconds: int = 24 * 60 * 60,
+		max_entries: int = 5000,
+		max_bytes: int = 256 * 1024 * 1024,
+	):
+		"""
+		Initialize the cache and create its tables if they don't exist.
+
+		Args:
+			db_path (str): Path to the SQLite database file
+			ttl_seconds (int): Seconds an entry stays valid, 0 disables expiry
+			max_entries (int): Maximum number of entries kept, 0 disables the limit
+			max_bytes (int): Maximum total size of responses in bytes, 0 disables the limit
+		"""
+		self.db_path = db_path
+		self.ttl_seconds = ttl_seconds
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self._init_db()
+
+	def _init_db(self):
+		"""Create the cache and tape tables."""
+		Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			cursor.executescript(
+				"""
+				create table if not exists llm_completion_cache (
+					key text primary key,
+					backend text,
+					model text,
+					response text not null,
+					size integer not null,
+					created_at real not null,
+					last_access real not null
+				);
+
+				create index if not exists idx_llm_cache_last_access on llm_completion_cache (last_access);
+
+				create table if not exists llm_completion_tape (
+					run_id text not null,
+					seq integer not null,
+					key text not null,
+					response text not null,
+					created_at real not null,
+					primary key (run_id, seq)
+				);
+				"""
+			)
+			conn.commit()
+
+	@staticmethod
+	def make_key(
+		backend: str,
+		model: Optional[str],
+		temperature: Optional[float],
+		messages: ChatHistory,
+	) -> str:
+		"""
+		Build the cache key of a completion request.
+
+		Args:
+			backend (str): Identifier of the genner serving the request
+			model (Optional[str]): Model name
+			temperature (Optional[float]): Sampling temperature
+			messages (ChatHistory): The messages sent to the model
+
+		Returns:
+			str: Hex encoded SHA-256 of the request
+		"""
+		payload = json.dumps(
+			{
+				"backend": backend,
+				"model": model,
+				"temperature": temperature,
+				"messages": messages.as_native(),
+			},
+			sort_keys=True,
+			ensure_ascii=False,
+		)
+		return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+	def get(self, key: str, ignore_ttl: bool = False) -> Optional[str]:
+		"""
+		Look up a cached completion.
+
+		Args:
+			key (str): Cache key built with `make_key`
+			ignore_ttl (bool): Return the entry even if it has expired
+
+		Returns:
+			Optional[str]: The cached response, or None on a miss
+		"""
+		now = time.time()
+
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			cursor.execute(
+				"SELECT response, created_at FROM llm_completion_cache WHERE key = ?",
+				(key,),
+			)
+			row = cursor.fetchone()
+
+			if not row:
+				return None
+
+			response, created_at = row
+			if (
+				not ignore_ttl
+				and self.ttl_seconds > 0
+				and created_at + self.ttl_seconds < now
+			):
+				cursor.execute("DELETE FROM llm_completion_cache WHERE key = ?", (key,))
+				return None
+
+			cursor.execute(
+				"UPDATE llm_completion_cache SET last_access = ? WHERE key = ?",
+				(now, key),
+			)
+			return response
+
+	def put(self, key: str, backend: str, model: Optional[str], response: str):
+		"""
+		Store a completion and evict entries that go over the limits.
+
+		Args:
+			key (str): Cache key built with `make_key`
+			backend (str): Identifier of the genner that produced the response
+			model (Optional[str]): Model name
+			response (str): The raw response
+		"""
+		now = time.time()
+
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			cursor.execute(
+				"""INSERT OR REPLACE INTO llm_completion_cache (key, backend, model, response, size, created_at, last_access)
+				   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+				(
+					key,
+					backend,
+					model,
+					response,
+					len(response.encode("utf-8")),
+					now,
+					now,
+				),
+			)
+			self._evict(cursor, now)
+
+	def _evict(self, cursor: sqlite3.Cursor, now: float):
+		"""
+		Drop expired entries, then the least recently used ones over the limits.
+
+		Args:
+			cursor (sqlite3.Cursor): Cursor of the open connection
+			now (float): Current unix time
+		"""
+		if self.ttl_seconds > 0:
+			cursor.execute(
+				"DELETE FROM llm_completion_cache WHERE created_at < ?",
+				(now - self.ttl_seconds,),
+			)
+
+		if self.max_entries > 0:
+			cursor.execute(
+				"""DELETE FROM llm_completion_cache WHERE key IN (
+					SELECT key FROM llm_completion_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+				)""",
+				(self.max_entries,),
+			)
+
+		if self.max_bytes > 0:
+			cursor.execute(
+				"""DELETE FROM llm_completion_cache WHERE key IN (
+					SELECT key FROM (
+						SELECT key, SUM(size) OVER (ORDER BY last_access DESC) AS running_size
+						FROM llm_completion_cache
+					) WHERE running_size > ?
+				)""",
+				(self.max_bytes,),
+			)
+
+	def clear_tape(self, run_id: str):
+		"""
+		Remove every recorded completion of a run.
+
+		Args:
+			run_id (str): Identifier of the recorded run
+		"""
+		with sqlite3.connect(self.db_path) as conn:
+			conn.execute("DELETE FROM llm_completion_tape WHERE run_id = ?", (run_id,))
+
+	def record(self, run_id: str, seq: int, key: str, response: str):
+		"""
+		Append a completion to the tape of a run.
+
+		Args:
+			run_id (str): Identifier of the recorded run
+			seq (int): Position of the completion in the run
+			key (str): Cache key of the request
+			response (str): The raw response
+		"""
+		with sqlite3.connect(self.db_path) as conn:
+			conn.execute(
+				"""INSERT OR REPLACE INTO llm_completion_tape (run_id, seq, key, response, created_at)
+				   VALUES (?, ?, ?, ?, ?)""",
+				(run_id, seq, key, response, time.time()),
+			)
+
+	def get_recorded(self, run_id: str, seq: int) -> Optional[Tuple[str, str]]:
+		"""
+		Fetch the completion recorded at a given position of a run.
+
+		Args:
+			run_id (str): Identifier of the recorded run
+			seq (int): Position of the completion in the run
+
+		Returns:
+			Optional[Tuple[str, str]]: The recorded (key, response), or None if the tape is shorter
+		"""
+		with sqlite3.connect(self.db_path) as conn:
+			cursor = conn.cursor()
+			cursor.execute(
+				"SELECT key, response FROM llm_completion_tape WHERE run_id = ? AND seq = ?",
+				(run_id, seq),
+			)
+			row = cursor.fetchone()
+			return (row[0], row[1]) if row else None
+
+
+class CachedGenner(Genner):
+	"""
+	Genner wrapper that serves completions from a `CompletionCache`.
+
+	Modes:
+		- "read_write": serve hits, call the backend on a miss and store the result
+		- "record": always call the backend, store the result and append it to the run tape
+		- "replay": never call the backend, serve from the cache or the run tape, in order
+	"""
+
+	def __init__(
+		self,
+		genner: Genner,
+		cache: CompletionCache,
+		mode: str = "read_write",
+		run_id: str = "default",
+	):
+		"""
+		Wrap a genner with a completion cache.
+
+		Args:
+			genner (Genner): The backend genner to wrap
+			cache (CompletionCache): Cache storage
+			mode (str): One of "read_write", "record" or "replay"
+			run_id (str): Identifier of the run used by "record" and "replay"
+
+		Raises:
+			ValueError: If the mode is not supported
+		"""
+		if mode not in CACHE_MODES or mode == "off":
+			raise ValueError(
+				f"Unsupported cache mode: {mode}, available modes: {', '.join(CACHE_MODES[1:])}"
+			)
+
+		super().__init__(f"cached-{genner.identifier}", genner.do_stream)
+		self.genner = genner
+		self.cache = cache
+		self.mode = mode
+		self.run_id = run_id
+		self.seq = 0
+
+		config = getattr(genner, "config", None)
+		self.model: Optional[str] = getattr(config, "model", None)
+		self.temperature: Optional[float] = getattr(config, "temperature", None)
+
+		if self.mode == "record":
+			self.cache.clear_tape(self.run_id)
+
+	def set_do_stream(self, final_state: bool):
+		self.do_stream = final_state
+		self.genner.set_do_stream(final_state)
+
+	def _replay_to_stream(self, response: str):
+		"""Forward a cached response to the wrapped genner's stream function."""
+		stream_fn = getattr(self.genner, "stream_fn", None)
+		if self.do_stream and stream_fn is not None:
+			stream_fn(response)
+			stream_fn("\n")
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		"""
+		Generate a completion, serving it from the cache when possible.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+
+		Returns:
+			Result[str, str]:
+				Ok(str): The generated or cached text
+				Err(str): Error message if generation failed or a replay had no recording
+		"""
+		key = CompletionCache.make_key(
+			self.genner.identifier, self.model, self.temperature, messages
+		)
+		seq = self.seq
+		self.seq += 1
+
+		try:
+			if self.mode == "replay":
+				response = self.cache.get(key, ignore_ttl=True)
+				if response is None:
+					recorded = self.cache.get_recorded(self.run_id, seq)
+					if recorded is None:
+						return Err(
+							f"CachedGenner.ch_completion: No recorded completion for run {self.run_id} at position {seq}"
+						)
+					recorded_key, response = recorded
+					logger.warning(
+						f"CachedGenner: prompt at position {seq} differs from the recording ({key[:12]} != {recorded_key[:12]}), replaying the recorded completion"
+					)
+				self._replay_to_stream(response)
+				return Ok(response)
+
+			if self.mode == "read_write":
+				response = self.cache.get(key)
+				if response is not None:
+					logger.info(f"CachedGenner: cache hit {key[:12]}")
+					self._replay_to_stream(response)
+					return Ok(response)
+		except sqlite3.Error as e:
+			logger.error(f"CachedGenner: cache lookup failed, calling backend: {e}")
+
+		completion_result = self.genner.ch_completion(messages)
+		if completion_result.is_err():
+			return completion_result
+
+		response = completion_result.unwrap()
+		try:
+			self.cache.put(key, self.genner.identifier, self.model, response)
+			if self.mode == "record":
+				self.cache.record(self.run_id, seq, key, response)
+		except sqlite3.Error as e:
+			logger.error(f"CachedGenner: failed to store completion: {e}")
+
+		return Ok(response)
+
+	def generate_code(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[str], str], str]:
+		"""
+		Generate code through the cache.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into code
+
+		Returns:
+			Result[Tuple[List[str], str], str]:
+				Ok(Tuple[List[str], str]): Processed code blocks (None if extraction failed) and the raw response
+				Err(str): Error message if generation failed
+		"""
+		completion_result = self.ch_completion(messages)
+
+		if err := completion_result.err():
+			return Err(
+				f"CachedGenner.{self.genner.identifier}.generate_code: completion_result.is_err(): \n{err}"
+			)
+
+		raw_response = completion_result.unwrap()
+		extract_code_result = self.extract_code(raw_response, blocks)
+
+		if extract_code_result.is_err():
+			return Ok((None, raw_response))
+
+		return Ok((extract_code_result.unwrap(), raw_response))
+
+	def generate_list(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[List[str]], str], str]:
+		"""
+		Generate lists through the cache.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into lists
+
+		Returns:
+			Result[Tuple[List[List[str]], str], str]:
+				Ok(Tuple[List[List[str]], str]): Processed lists and the raw response
+				Err(str): Error message if generation or extraction failed
+		"""
+		completion_result = self.ch_completion(messages)
+
+		if err := completion_result.err():
+			return Err(
+				f"CachedGenner.{self.genner.identifier}.generate_list: completion_result.is_err(): \n{err}"
+			)
+
+		raw_response = completion_result.unwrap()
+		extract_list_result = self.extract_list(raw_response, blocks)
+
+		if err := extract_list_result.err():
+			return Err(
+				f"CachedGenner.{self.genner.identifier}.generate_list: extract_list_result.is_err(): \n{err}"
+			)
+
+		return Ok((extract_list_result.unwrap(), raw_response))
+
+	def extract_code(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[str], str]:
+		return self.genner.extract_code(response, blocks)
+
+	def extract_list(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[List[str]], str]:
+		return self.genner.extract_list(response, blocks)
+
+
+def with_completion_cache(genner: Genner, config: CompletionCacheConfig) -> Genner:
+	"""
+	Wrap a genner with a completion cache according to the configuration.
+
+	Args:
+		genner (Genner): The backend genner
+		config (CompletionCacheConfig): Cache configuration
+
+	Returns:
+		Genner: The genner itself if caching is off, a `CachedGenner` otherwise
+	"""
+	if config.mode == "off":
+		return genner
+
+	cache = CompletionCache(
+		db_path=config.db_path,
+		ttl_seconds=config.ttl_seconds,
+		max_entries=config.max_entries,
+		max_bytes=config.max_bytes,
+	)
+	return CachedGenner(genner, cache, mode=config.mode, run_id=config.run_id)
@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Tuple
+
+from src.custom_types import Message
+
+# Metadata key holding the leading part of a message's content that is stable across cycles
+CACHE_PREFIX_KEY = "cache_prefix"
+
+# Anthropic accepts at most four cache breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+
+# OpenRouter model prefixes that need explicit `cache_control` markers, the
+# other providers cache matching prompt prefixes automatically
+EXPLICIT_CACHE_MODEL_PREFIXES = ("anthropic/", "google/")
+
+EPHEMERAL_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def split_cache_prefix(message: Message) -> Tuple[str, str]:
+	"""
+	Split the content of a message into its stable prefix and the rest.
+
+	Args:
+		message (Message): The message, its `cache_prefix` metadata marks the prefix
+
+	Returns:
+		Tuple[str, str]: The stable prefix, empty if none, and the remaining content
+	"""
+	content = str(message.content)
+	prefix = (message.metadata or {}).get(CACHE_PREFIX_KEY, "")
+
+	if prefix and content.startswith(prefix):
+		return prefix, content[len(prefix) :]
+	return "", content
+
+
+def with_cache_prefix(message: Message, prefix: str) -> Message:
+	"""
+	Mark the stable prefix of a message's content.
+
+	Args:
+		message (Message): The message whose content starts with `prefix`
+		prefix (str): The part of the content that is identical across cycles
+
+	Returns:
+		Message: The same message, for chaining
+	"""
+	message.metadata = {**(message.metadata or {}), CACHE_PREFIX_KEY: prefix}
+	return message
+
+
+def to_cached_native(
+	messages: List[Message], max_breakpoints: int = MAX_CACHE_BREAKPOINTS
+) -> List[Dict[str, Any]]:
+	"""
+	Convert messages to native dictionaries carrying prompt cache breakpoints.
+
+	Breakpoints are candidates at the end of every stable prefix and at the
+	end of the last message, so that the next call of the same cycle reuses
+	the whole history. When there are more candidates than allowed, the
+	first one (the system prompt) and the latest ones are kept. Messages
+	without a breakpoint keep their plain string content.
+
+	Args:
+		messages (List[Message]): The messages to convert
+		max_breakpoints (int): Maximum number of `cache_control` markers
+
+	Returns:
+		List[Dict[str, Any]]: Message dictionaries whose content is either a
+			string or a list of text blocks
+	"""
+	parts: List[List[str]] = []
+	candidates: List[Tuple[int, int]] = []
+
+	for i, message in enumerate(messages):
+		prefix, suffix = split_cache_prefix(message)
+		if prefix:
+			candidates.append((i, 0))
+			parts.append([prefix, suffix] if suffix else [prefix])
+		else:
+			parts.append([suffix])
+
+	if messages and parts[-1][-1]:
+		last = (len(messages) - 1, len(parts[-1]) - 1)
+		if last not in candidates:
+			candidates.append(last)
+
+	if len(candidates) > max_breakpoints:
+		candidates = (
+			candidates[:1] + candidates[len(candidates) - max_breakpoints + 1 :]
+		)
+	breakpoints = set(candidates)
+
+	natives: List[Dict[str, Any]] = []
+	for i, (message, texts) in enumerate(zip(messages, parts)):
+		if not any((i, j) in breakpoints for j in range(len(texts))):
+			natives.append({"role": message.role, "content": "".join(texts)})
+			continue
+
+		blocks = []
+		for j, text in enumerate(texts):
+			block: Dict[str, Any] = {"type": "text", "text": text}
+			if (i, j) in breakpoints:
+				block["cache_control"] = EPHEMERAL_CACHE_CONTROL
+			blocks.append(block)
+		natives.append({"role": message.role, "content": blocks})
+
+	return natives
+
+
+def supports_explicit_cache(model: str) -> bool:
+	"""Whether an OpenRouter model needs `cache_control` markers to cache prompts."""
+	return (model or "").startswith(EXPLICIT_CACHE_MODEL_PREFIXES)
+
+
+def cached_prompt_tokens(usage: Any) -> int | None:
+	"""
+	Read the cached prompt tokens out of an OpenAI compatible `usage` object.
+
+	Args:
+		usage (Any): The usage as a dictionary or an SDK object
+
+	Returns:
+		int | None: Prompt tokens served from the cache, None if not reported
+	"""
+	if usage is None:
+		return None
+
+	def get(obj: Any, key: str) -> Any:
+		return obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+
+	details = get(usage, "prompt_tokens_details")
+	if details is not None and get(details, "cached_tokens") is not None:
+		return int(get(details, "cached_tokens"))
+
+	# DeepSeek's own API reports cache hits separately
+	if get(usage, "prompt_cache_hit_tokens") is not None:
+		return int(get(usage, "prompt_cache_hit_tokens"))
+
+	return None
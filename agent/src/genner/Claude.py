@@ -1,14 +1,15 @@
-import re
 from typing import Callable, List, Tuple
 
-import yaml
 from anthropic import Anthropic, TextEvent
 from result import Err, Ok, Result
 from src.config import ClaudeConfig
-from src.helper import extract_content
 from src.custom_types import ChatHistory
 
 from .Base import Genner
+from .CacheControl import to_cached_native
+from .Extract import extract_code_blocks, extract_yaml_lists
+from .Metrics import instrument_completion, report_usage
+from .Stream import TokenStream
 
 
 class ClaudeGenner(Genner):
@@ -35,6 +36,7 @@ class ClaudeGenner(Genner):
 		self.config = config
 		self.stream_fn = stream_fn
 
+	@instrument_completion
 	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
 		"""
 		Generate a completion using the Claude API.
@@ -53,8 +55,13 @@ class ClaudeGenner(Genner):
 		"""
 		system_message = messages.messages[0]
 		assert system_message.role == "system"
-		system = system_message.content
-		ch = ChatHistory(messages.messages[1:])
+
+		if self.config.prompt_cache:
+			native_messages = to_cached_native(messages.messages)
+		else:
+			native_messages = messages.as_native()
+		system = native_messages[0]["content"]
+		native_messages = native_messages[1:]
 
 		final_response = ""
 
@@ -63,30 +70,30 @@ class ClaudeGenner(Genner):
 				assert self.stream_fn is not None
 
 				with self.client.messages.stream(
-					model="claude-3-opus-20240229",
-					max_tokens=1024,
-					messages=ch.as_native(),  # type: ignore
+					model=self.config.model,
+					max_tokens=self.config.max_tokens,
+					messages=native_messages,  # type: ignore
 					system=system,
 				) as stream:
-					token_counts = 0
+					token_stream = TokenStream(
+						self.stream_fn, max_tokens=self.config.max_tokens
+					)
 					for chunk in stream:
 						if isinstance(chunk, TextEvent):
-							token = chunk.text
-							final_response += token
-							self.stream_fn(token)
-
-							token_counts += 1
-							if token_counts >= self.config.max_tokens:
+							if not token_stream.feed(chunk.text):
 								break
+					final_response = token_stream.close()
+					self._report_usage(stream.current_message_snapshot.usage)
 			else:
 				response = self.client.messages.create(
 					model=self.config.model,  # e.g. "claude-3-opus-20240229"
-					messages=ch.as_native(),  # type: ignore
+					messages=native_messages,  # type: ignore
 					max_tokens=self.config.max_tokens,
 					system=system,
 				)
 
 				final_response = response.content[0].text  # type: ignore
+				self._report_usage(response.usage)
 
 			assert isinstance(final_response, str)
 		except AssertionError as e:
@@ -98,6 +105,17 @@ class ClaudeGenner(Genner):
 
 		return Ok(final_response)
 
+	@staticmethod
+	def _report_usage(usage):
+		"""Report Anthropic usage, whose input tokens exclude the cache reads and writes."""
+		cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+		cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+		report_usage(
+			usage.input_tokens + cache_read + cache_write,
+			usage.output_tokens,
+			cached_input_tokens=cache_read,
+		)
+
 	def generate_code(
 		self, messages: ChatHistory, blocks: List[str] = [""]
 	) -> Result[Tuple[List[str], str], str]:
@@ -204,9 +222,6 @@ class ClaudeGenner(Genner):
 		"""
 		Extract code blocks from a Claude model response.
 
-		This static method extracts Python code blocks from the raw model response
-		using regex patterns to find code within markdown code blocks.
-
 		Args:
 			response (str): The raw response from the model
 			blocks (List[str]): XML tag names to extract content from before processing into code
@@ -216,41 +231,14 @@ class ClaudeGenner(Genner):
 				Ok(List[str]): List of extracted code blocks
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[str] = []
-
-		for block in blocks:
-			try:
-				response = extract_content(response, block)
-				regex_pattern = r"```python\n([\s\S]*?)```"
-				code_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert code_match is not None, "No code match found in the response"
-				assert code_match.group(1) is not None, (
-					"No code group number 1 found in the response"
-				)
-
-				code = code_match.group(1)
-				assert isinstance(code, str), "Code is not a string"
-
-				extracts.append(code)
-			except AssertionError as e:
-				return Err(f"ClaudeGenner.extract_code: Regex failed: {e}")
-			except Exception as e:
-				return Err(
-					f"An unexpected error while extracting code occurred, raw response: {response}, error: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_code_blocks(response, blocks)
 
 	@staticmethod
 	def extract_list(
 		response: str, blocks: List[str] = [""]
 	) -> Result[List[List[str]], str]:
 		"""
-		Extract lists from a Claude model response.
-
-		This static method extracts YAML-formatted lists from the raw model response
-		using regex patterns to find YAML content within markdown code blocks.
+		Extract YAML lists from a Claude model response.
 
 		Args:
 			response (str): The raw response from the model
@@ -261,27 +249,4 @@ class ClaudeGenner(Genner):
 				Ok(List[List[str]]): List of extracted lists
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[List[str]] = []
-
-		for block in blocks:
-			try:
-				response = extract_content(response, block)
-				regex_pattern = r"```yaml\n(.*?)```"
-				yaml_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert yaml_match is not None, "No match found"
-				yaml_content = yaml.safe_load(yaml_match.group(1).strip())
-				assert isinstance(yaml_content, list), "Yaml content is not a list"
-				assert all(isinstance(item, str) for item in yaml_content), (
-					"All yaml content items must be strings"
-				)
-
-				extracts.append(yaml_content)
-			except AssertionError as e:
-				return Err(f"ClaudeGenner.extract_list: Assertion error: {e}")
-			except Exception as e:
-				return Err(
-					f"An unexpected error while extracting code occurred, raw response: {response}, error: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_yaml_lists(response, blocks)
@@ -1,18 +1,18 @@
-import re
 from typing import Callable, Generator, List, Tuple
 
-import yaml
-from loguru import logger
 from openai import OpenAI
 from openai.types.chat import ChatCompletionChunk
 from result import Err, Ok, Result
 
 from src.config import DeepseekConfig
-from src.helper import extract_content
 from src.client.openrouter import OpenRouter
 from src.custom_types import ChatHistory
 
 from .Base import Genner
+from .CacheControl import cached_prompt_tokens
+from .Extract import extract_code_blocks, extract_yaml_lists
+from .Metrics import instrument_completion, report_usage
+from .Stream import TokenStream
 
 
 class DeepseekGenner(Genner):
@@ -39,6 +39,7 @@ class DeepseekGenner(Genner):
 		self.config = config
 		self.stream_fn = stream_fn
 
+	@instrument_completion
 	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
 		"""
 		Generate a completion using the Deepseek model.
@@ -72,21 +73,17 @@ class DeepseekGenner(Genner):
 						)
 					)
 
-					token_counts = 0
+					token_stream = TokenStream(
+						self.stream_fn, max_tokens=self.config.max_tokens
+					)
 					for chunk in stream:
-						if chunk.choices[0].delta.content is not None:
-							token = chunk.choices[0].delta.content
-
-							if not isinstance(token, str):
-								continue
-
-							final_response += token
-							self.stream_fn(token)
+						token = chunk.choices[0].delta.content
+						if not isinstance(token, str):
+							continue
 
-							token_counts += 1
-							if token_counts >= self.config.max_tokens:
-								break
-					self.stream_fn("\n")
+						if not token_stream.feed(token):
+							break
+					final_response = token_stream.close()
 				else:
 					response = self.client.chat.completions.create(
 						model=self.config.model,
@@ -97,6 +94,12 @@ class DeepseekGenner(Genner):
 					)
 
 					final_response = response.choices[0].message.content
+					if response.usage is not None:
+						report_usage(
+							response.usage.prompt_tokens,
+							response.usage.completion_tokens,
+							cached_input_tokens=cached_prompt_tokens(response.usage),
+						)
 
 				assert isinstance(final_response, str)
 			else:
@@ -110,25 +113,19 @@ class DeepseekGenner(Genner):
 						temperature=self.config.temperature,
 					)
 
-					reasoning_entered = False
-					main_entered = False
-
-					for token, token_type in stream_:
-						if not reasoning_entered and token_type == "reasoning":
-							reasoning_entered = True
-							self.stream_fn("<think>\n")
-						if (
-							reasoning_entered
-							and not main_entered
-							and token_type == "main"
-						):
-							main_entered = True
-							self.stream_fn("</think>\n")
-						if token_type == "main":
-							final_response += token
-
-						self.stream_fn(token)
-					self.stream_fn("\n")
+					token_stream = TokenStream(
+						self.stream_fn, max_tokens=self.config.max_tokens
+					)
+					for result in stream_:
+						if err := result.err():
+							return Err(
+								f"DeepseekGenner.ch_completion: Stream error: {err}"
+							)
+
+						token, token_type = result.unwrap()
+						if not token_stream.feed(token, token_type):
+							break
+					final_response = token_stream.close()
 				else:
 					final_response = self.client.create_chat_completion(
 						messages=messages.as_native(),
@@ -136,6 +133,14 @@ class DeepseekGenner(Genner):
 						max_tokens=self.config.max_tokens,
 						temperature=self.config.temperature,
 					)
+
+				usage = self.client.get_last_usage()
+				report_usage(
+					usage.get("prompt_tokens"),
+					usage.get("completion_tokens"),
+					usage.get("cost"),
+					cached_prompt_tokens(usage),
+				)
 				assert isinstance(final_response, str)
 		except AssertionError as e:
 			return Err(f"DeepseekGenner.ch_completion: {e}")
@@ -252,9 +257,6 @@ class DeepseekGenner(Genner):
 		"""
 		Extract code blocks from a Deepseek model response.
 
-		This static method extracts Python code blocks from the raw model response
-		using regex patterns to find code within markdown code blocks.
-
 		Args:
 			response (str): The raw response from the model
 			blocks (List[str]): XML tag names to extract content from before processing into code
@@ -264,42 +266,14 @@ class DeepseekGenner(Genner):
 				Ok(List[str]): List of extracted code blocks
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[str] = []
-
-		for block in blocks:
-			# Extract code from the response
-			try:
-				response = extract_content(response, block)
-				regex_pattern = r"```python\n([\s\S]*?)```"
-				code_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert code_match is not None, "No code match found in the response"
-				assert code_match.group(1) is not None, (
-					"No code group number 1 found in the response"
-				)
-
-				code = code_match.group(1)
-				assert isinstance(code, str), "Code is not a string"
-
-				extracts.append(code)
-			except AssertionError as e:
-				return Err(f"DeepseekGenner.extract_code: Regex failed: {e}")
-			except Exception as e:
-				return Err(
-					f"An unexpected error while extracting code occurred, err: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_code_blocks(response, blocks)
 
 	@staticmethod
 	def extract_list(
 		response: str, blocks: List[str] = [""]
 	) -> Result[List[List[str]], str]:
 		"""
-		Extract lists from a Deepseek model response.
-
-		This static method extracts YAML-formatted lists from the raw model response
-		using regex patterns to find YAML content within markdown code blocks.
+		Extract YAML lists from a Deepseek model response.
 
 		Args:
 			response (str): The raw response from the model
@@ -310,33 +284,4 @@ class DeepseekGenner(Genner):
 				Ok(List[List[str]]): List of extracted lists
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[List[str]] = []
-
-		for block in blocks:
-			try:
-				response = extract_content(response, block)
-				# Remove markdown code block markers and find yaml content
-				# Updated regex pattern to handle triple backticks
-				regex_pattern = r"```yaml\n(.*?)```"
-				yaml_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert yaml_match is not None, "No match found"
-				yaml_content = yaml.safe_load(yaml_match.group(1).strip())
-				assert isinstance(yaml_content, list), "Yaml content is not a list"
-				assert all(isinstance(item, str) for item in yaml_content), (
-					"All yaml content items must be strings"
-				)
-
-				extracts.append(yaml_content)
-			except AssertionError as e:
-				logger.error(f"DeepseekGenner.extract_list: Assertion error: {e}")
-				return Err(f"DeepseekGenner.extract_list: Assertion error: {e}")
-			except Exception as e:
-				logger.error(
-					f"An unexpected error while extracting code occurred, err: \n{e}"
-				)
-				return Err(
-					f"An unexpected error while extracting code occurred, err: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_yaml_lists(response, blocks)
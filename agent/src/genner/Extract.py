@@ -0,0 +1,153 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+from result import Err, Ok, Result
+
+# Characters of the response quoted in extraction errors
+ERROR_PREVIEW_CHARS = 200
+
+
+@lru_cache(maxsize=64)
+def _tag_pattern(name: str) -> re.Pattern:
+	"""Compile the pattern of an XML-like tag once per tag name."""
+	return re.compile(rf"<{re.escape(name)}>\s*(.*?)\s*</{re.escape(name)}>", re.DOTALL)
+
+
+@lru_cache(maxsize=8)
+def _fence_pattern(language: str) -> re.Pattern:
+	"""Compile the pattern of a markdown code fence once per language."""
+	return re.compile(rf"```{re.escape(language)}[ \t]*\r?\n(.*?)```", re.DOTALL)
+
+
+class ParsedResponse:
+	"""
+	A model response with its tagged blocks and code fences.
+
+	Each block and each (block, language) fence is searched once and kept,
+	so extracting several blocks, or code and lists, from the same response
+	does not rescan it.
+	"""
+
+	__slots__ = ("text", "_blocks", "_fences")
+
+	def __init__(self, text: str):
+		self.text = text
+		self._blocks: Dict[str, str] = {"": text}
+		self._fences: Dict[Tuple[str, str], Optional[str]] = {}
+
+	def block(self, name: str) -> str:
+		"""
+		Get the content of the first `<name>` block, the whole response for "".
+
+		Returns:
+			str: The stripped content of the block, empty if it is missing
+		"""
+		if name not in self._blocks:
+			match = _tag_pattern(name).search(self.text)
+			self._blocks[name] = match.group(1).strip() if match else ""
+		return self._blocks[name]
+
+	def fence(self, language: str, block: str = "") -> Optional[str]:
+		"""
+		Get the body of the first code fence of a language inside a block.
+
+		Returns:
+			Optional[str]: The fence body, None if the block has no such fence
+		"""
+		key = (block, language)
+		if key not in self._fences:
+			match = _fence_pattern(language).search(self.block(block))
+			self._fences[key] = match.group(1) if match else None
+		return self._fences[key]
+
+
+@lru_cache(maxsize=32)
+def parse_response(response: str) -> ParsedResponse:
+	"""Get the parsed form of a response, shared by the extractions made on it."""
+	return ParsedResponse(response)
+
+
+def _missing_fence_error(caller: str, language: str, block: str, response: str) -> Err:
+	location = f"<{block}> block" if block else "response"
+	preview = response[:ERROR_PREVIEW_CHARS].replace("\n", " ")
+	return Err(
+		f"{caller}: No ```{language} fence found in the {location} "
+		f"({len(response)} chars, starting with: {preview!r})"
+	)
+
+
+def extract_code_blocks(
+	response: str, blocks: List[str] = [""]
+) -> Result[List[str], str]:
+	"""
+	Extract the first ```python fence of each block of a model response.
+
+	Args:
+		response (str): The raw response from the model
+		blocks (List[str]): XML tag names to look in, "" for the whole response
+
+	Returns:
+		Result[List[str], str]:
+			Ok(List[str]): One code string per block
+			Err(str): Error message naming the block without code
+	"""
+	# Fast path for the usual single, untagged block
+	if blocks == [""]:
+		match = _fence_pattern("python").search(response)
+		if match is None:
+			return _missing_fence_error("extract_code_blocks", "python", "", response)
+		return Ok([match.group(1)])
+
+	parsed = parse_response(response)
+	extracts: List[str] = []
+
+	for block in blocks:
+		code = parsed.fence("python", block)
+		if code is None:
+			return _missing_fence_error(
+				"extract_code_blocks", "python", block, response
+			)
+		extracts.append(code)
+
+	return Ok(extracts)
+
+
+def extract_yaml_lists(
+	response: str, blocks: List[str] = [""]
+) -> Result[List[List[str]], str]:
+	"""
+	Extract the first ```yaml fence of each block of a model response as a list of strings.
+
+	Args:
+		response (str): The raw response from the model
+		blocks (List[str]): XML tag names to look in, "" for the whole response
+
+	Returns:
+		Result[List[List[str]], str]:
+			Ok(List[List[str]]): One list per block
+			Err(str): Error message naming the block without a valid list
+	"""
+	parsed = parse_response(response)
+	extracts: List[List[str]] = []
+
+	for block in blocks:
+		content = parsed.fence("yaml", block)
+		if content is None:
+			return _missing_fence_error("extract_yaml_lists", "yaml", block, response)
+
+		try:
+			items = yaml.safe_load(content.strip())
+		except yaml.YAMLError as e:
+			return Err(f"extract_yaml_lists: Invalid yaml in block {block!r}: {e}")
+
+		if not isinstance(items, list) or not all(
+			isinstance(item, str) for item in items
+		):
+			return Err(
+				f"extract_yaml_lists: Yaml content of block {block!r} is not a list of strings"
+			)
+		extracts.append(items)
+
+	return Ok(extracts)
@@ -0,0 +1,334 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from result import Err, Ok, Result
+
+from src.config import FailoverConfig
+from src.custom_types import ChatHistory
+
+from .Base import Genner
+from .Metrics import set_first_token_event
+
+# Blocking calls cannot be cancelled, so a losing hedged request keeps its
+# worker until the backend answers. A dedicated pool keeps those off the
+# pool used by the async genner API.
+_FAILOVER_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="failover")
+
+# Weight of the latest call in the health score and latency averages
+HEALTH_EWMA_ALPHA = 0.3
+
+# How often a request waiting to be hedged checks for its first token
+FIRST_TOKEN_POLL_S = 0.05
+
+
+@dataclass
+class BackendHealth:
+	"""
+	Circuit breaker state and health score of a backend.
+
+	Attributes:
+		consecutive_failures (int): Failed calls since the last success
+		opened_at (float | None): Monotonic time the circuit opened, None while closed
+		score (float): Exponentially weighted success rate, from 0 to 1
+		latency_s (float): Exponentially weighted call latency
+		calls (int): Number of finished calls
+	"""
+
+	consecutive_failures: int = 0
+	opened_at: Optional[float] = None
+	score: float = 1.0
+	latency_s: float = 0.0
+	calls: int = 0
+
+	def record(self, success: bool, latency_s: float, failure_threshold: int):
+		"""Account a finished call, opening the circuit after too many failures in a row."""
+		self.calls += 1
+		self.score += HEALTH_EWMA_ALPHA * ((1.0 if success else 0.0) - self.score)
+		self.latency_s = (
+			latency_s
+			if self.calls == 1
+			else self.latency_s + HEALTH_EWMA_ALPHA * (latency_s - self.latency_s)
+		)
+
+		if success:
+			self.consecutive_failures = 0
+			self.opened_at = None
+		else:
+			self.consecutive_failures += 1
+			if self.consecutive_failures >= failure_threshold:
+				self.opened_at = time.monotonic()
+
+	def is_available(self, cooldown_s: float) -> bool:
+		"""Whether the circuit is closed, or open long enough to let a trial call through."""
+		return self.opened_at is None or time.monotonic() - self.opened_at >= cooldown_s
+
+
+class FailoverGenner(Genner):
+	"""
+	Genner that spreads a request over an ordered list of backends.
+
+	Backends are tried in order, skipping those whose circuit is open and
+	trying those with a low health score last. When a backend fails, the
+	next one is tried. When a streaming backend has not streamed its first
+	token after `hedge_after_s`, the request is also sent to the next backend
+	and the first successful response wins. A backend that does not stream
+	gives no first token to wait for, so it is never hedged, only failed
+	over. Only the first backend streams, the others should be built
+	without a stream function.
+	"""
+
+	def __init__(
+		self, genners: List[Genner], config: FailoverConfig = FailoverConfig()
+	):
+		"""
+		Initialize the failover genner.
+
+		Args:
+			genners (List[Genner]): Backends in order of preference
+			config (FailoverConfig): Hedging and circuit breaker settings
+
+		Raises:
+			ValueError: If no backend is given
+		"""
+		if not genners:
+			raise ValueError("FailoverGenner needs at least one backend")
+
+		super().__init__(
+			"failover-" + "+".join(genner.identifier for genner in genners),
+			genners[0].do_stream,
+		)
+		self.genners = genners
+		# The primary backend, used for prompt budgeting and response extraction
+		self.genner = genners[0]
+		self.failover_config = config
+		self.health = [BackendHealth() for _ in genners]
+		self._lock = threading.Lock()
+
+	def set_do_stream(self, final_state: bool):
+		self.do_stream = final_state
+		self.genner.set_do_stream(final_state)
+
+	def _ordered_backends(self) -> List[int]:
+		"""Get the indexes of the backends to try, healthy ones first, in configured order."""
+		with self._lock:
+			available = [
+				i
+				for i, health in enumerate(self.health)
+				if health.is_available(self.failover_config.cooldown_s)
+			]
+			if not available:
+				# Every circuit is open, trying them beats failing the whole flow
+				available = list(range(len(self.genners)))
+
+			return sorted(
+				available,
+				key=lambda i: (
+					self.health[i].score < self.failover_config.min_health_score
+				),
+			)
+
+	def _record(self, index: int, success: bool, started: float):
+		"""Update the health of a backend once its call finished."""
+		with self._lock:
+			health = self.health[index]
+			was_open = health.opened_at is not None
+			health.record(
+				success,
+				time.monotonic() - started,
+				self.failover_config.failure_threshold,
+			)
+			if health.opened_at is not None and not was_open:
+				logger.warning(
+					f"FailoverGenner: circuit of {self.genners[index].identifier} opened after "
+					f"{health.consecutive_failures} consecutive failures"
+				)
+
+	def _record_abandoned(self, index: int, future: Future, started: float):
+		"""Update the health of a backend whose call finished after another one won."""
+		success = not future.cancelled() and future.exception() is None
+		if success:
+			success = future.result().is_ok()
+		self._record(index, success, started)
+
+	def _submit(
+		self, index: int, messages: ChatHistory
+	) -> Tuple[Future, threading.Event, float]:
+		"""Start a completion on a backend, returning its future, first token event and start time."""
+		first_token = threading.Event()
+		genner = self.genners[index]
+
+		def call() -> Result[str, str]:
+			set_first_token_event(first_token)
+			return genner.ch_completion(messages)
+
+		started = time.monotonic()
+		future = _FAILOVER_EXECUTOR.submit(contextvars.copy_context().run, call)
+		return future, first_token, started
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		"""
+		Generate a completion with the first backend that answers successfully.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+
+		Returns:
+			Result[str, str]:
+				Ok(str): The response of the winning backend
+				Err(str): The errors of every backend if all of them failed
+		"""
+		order = self._ordered_backends()
+		hedge_after_s = self.failover_config.hedge_after_s
+
+		pending: Dict[Future, Tuple[int, threading.Event, float]] = {}
+		errors: List[str] = []
+		launched = 0
+		hedge_deadline = 0.0
+
+		while pending or launched < len(order):
+			if not pending:
+				if launched:
+					logger.warning(
+						f"FailoverGenner: failing over to {self.genners[order[launched]].identifier}"
+					)
+				future, first_token, started = self._submit(order[launched], messages)
+				pending[future] = (order[launched], first_token, started)
+				launched += 1
+				hedge_deadline = time.monotonic() + hedge_after_s
+
+			# Without streaming, a slow response is indistinguishable from a
+			# stuck one, and hedging it would double the cost of every long call
+			can_hedge = (
+				hedge_after_s > 0
+				and launched < len(order)
+				and len(pending) == 1
+				and all(
+					self.genners[index].do_stream and not first_token.is_set()
+					for index, first_token, _ in pending.values()
+				)
+			)
+
+			done, _ = wait(
+				pending,
+				timeout=FIRST_TOKEN_POLL_S if can_hedge else None,
+				return_when=FIRST_COMPLETED,
+			)
+
+			for future in done:
+				index, _, started = pending.pop(future)
+				try:
+					result = future.result()
+				except Exception as e:
+					result = Err(f"Unexpected error: {e}")
+
+				# Recorded before returning, so the next call sees the updated circuits
+				self._record(index, result.is_ok(), started)
+
+				if result.is_ok():
+					if pending:
+						logger.info(
+							f"FailoverGenner: {self.genners[index].identifier} won, "
+							f"abandoning {', '.join(self.genners[i].identifier for i, _, _ in pending.values())}"
+						)
+					for abandoned, (i, _, started) in pending.items():
+						abandoned.add_done_callback(
+							lambda f, i=i, started=started: self._record_abandoned(
+								i, f, started
+							)
+						)
+					return Ok(result.unwrap())
+
+				errors.append(
+					f"{self.genners[index].identifier}: {result.unwrap_err()}"
+				)
+
+			if can_hedge and not done and time.monotonic() >= hedge_deadline:
+				index = order[launched]
+				logger.warning(
+					f"FailoverGenner: no first token after {hedge_after_s}s, "
+					f"hedging the request to {self.genners[index].identifier}"
+				)
+				future, first_token, started = self._submit(index, messages)
+				pending[future] = (index, first_token, started)
+				launched += 1
+
+		return Err(
+			"FailoverGenner.ch_completion: All backends failed: \n" + "\n".join(errors)
+		)
+
+	def generate_code(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[str], str], str]:
+		"""
+		Generate code with the first backend that answers successfully.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into code
+
+		Returns:
+			Result[Tuple[List[str], str], str]:
+				Ok(Tuple[List[str], str]): Processed code blocks (None if extraction failed) and the raw response
+				Err(str): Error message if every backend failed
+		"""
+		completion_result = self.ch_completion(messages)
+
+		if err := completion_result.err():
+			return Err(
+				f"FailoverGenner.{self.identifier}.generate_code: completion_result.is_err(): \n{err}"
+			)
+
+		raw_response = completion_result.unwrap()
+		extract_code_result = self.extract_code(raw_response, blocks)
+
+		if extract_code_result.is_err():
+			return Ok((None, raw_response))
+
+		return Ok((extract_code_result.unwrap(), raw_response))
+
+	def generate_list(
+		self, messages: ChatHistory, blocks: List[str] = [""]
+	) -> Result[Tuple[List[List[str]], str], str]:
+		"""
+		Generate lists with the first backend that answers successfully.
+
+		Args:
+			messages (ChatHistory): Chat history containing the conversation context
+			blocks (List[str]): XML tag names to extract content from before processing into lists
+
+		Returns:
+			Result[Tuple[List[List[str]], str], str]:
+				Ok(Tuple[List[List[str]], str]): Processed lists and the raw response
+				Err(str): Error message if every backend failed or extraction failed
+		"""
+		completion_result = self.ch_completion(messages)
+
+		if err := completion_result.err():
+			return Err(
+				f"FailoverGenner.{self.identifier}.generate_list: completion_result.is_err(): \n{err}"
+			)
+
+		raw_response = completion_result.unwrap()
+		extract_list_result = self.extract_list(raw_response, blocks)
+
+		if err := extract_list_result.err():
+			return Err(
+				f"FailoverGenner.{self.identifier}.generate_list: extract_list_result.is_err(): \n{err}"
+			)
+
+		return Ok((extract_list_result.unwrap(), raw_response))
+
+	def extract_code(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[str], str]:
+		return self.genner.extract_code(response, blocks)
+
+	def extract_list(
+		self, response: str, blocks: List[str] = [""]
+	) -> Result[List[List[str]], str]:
+		return self.genner.extract_list(response, blocks)
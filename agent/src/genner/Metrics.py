@@ -0,0 +1,395 @@
+import functools
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from result import Result
+
+from src.custom_types import ChatHistory
+
+# USD per million (input, output) tokens, used when the backend reports no cost
+MODEL_PRICES_PER_MTOK: Dict[str, Tuple[float, float]] = {
+	"deepseek/deepseek-r1": (0.55, 2.19),
+	"deepseek-reasoner": (0.55, 2.19),
+	"deepseek/deepseek-chat": (0.27, 1.10),
+	"openai/o3-mini": (1.10, 4.40),
+	"o3-mini": (1.10, 4.40),
+	"google/gemini-2.0-flash-lite-001": (0.075, 0.30),
+	"qwen/qwq-32b": (0.15, 0.20),
+	"claude-3-5-sonnet-latest": (3.0, 15.0),
+	"claude-3-opus-20240229": (15.0, 75.0),
+}
+
+# Rough characters per token, used when the backend reports no usage
+CHARS_PER_TOKEN = 4
+
+# Price of prompt tokens read from the provider's prompt cache, relative to uncached input
+CACHED_INPUT_PRICE_FACTOR = 0.1
+
+
+@dataclass
+class LLMCallMetrics:
+	"""
+	Token and latency accounting of a single completion call.
+
+	Attributes:
+		backend (str): Identifier of the genner that served the call
+		model (str): Model name of the backend
+		phase (str): Flow phase the call was made in, empty outside a flow
+		attempt (int): Zero-based attempt number within the phase, i.e. the retries before it
+		input_tokens (int): Prompt tokens, reported by the backend or estimated
+		cached_input_tokens (int): Prompt tokens served from the provider's prompt cache
+		output_tokens (int): Completion tokens, reported by the backend or estimated
+		usage_reported (bool): Whether token counts came from the backend
+		ttft_s (float | None): Seconds to the first streamed token, None when not streaming
+		latency_s (float): Seconds for the whole call
+		tokens_per_s (float): Output tokens per second after the first token
+		cost_usd (float): Cost reported by the backend, or estimated from MODEL_PRICES_PER_MTOK
+		success (bool): Whether the call returned Ok
+		created_at (float): Unix time the call started
+	"""
+
+	backend: str
+	model: str
+	phase: str = ""
+	attempt: int = 0
+	input_tokens: int = 0
+	cached_input_tokens: int = 0
+	output_tokens: int = 0
+	usage_reported: bool = False
+	ttft_s: Optional[float] = None
+	latency_s: float = 0.0
+	tokens_per_s: float = 0.0
+	cost_usd: float = 0.0
+	success: bool = True
+	created_at: float = field(default_factory=time.time)
+
+	def to_dict(self) -> Dict[str, Any]:
+		return asdict(self)
+
+
+_llm_phase: ContextVar[Tuple[str, int]] = ContextVar("llm_phase", default=("", 0))
+_current_call: ContextVar[Optional[LLMCallMetrics]] = ContextVar(
+	"llm_current_call", default=None
+)
+_current_call_started: ContextVar[float] = ContextVar(
+	"llm_current_call_started", default=0.0
+)
+_first_token_event: ContextVar[Optional[threading.Event]] = ContextVar(
+	"llm_first_token_event", default=None
+)
+
+
+def set_llm_phase(phase: str, attempt: int = 0):
+	"""
+	Tag the following completion calls with a flow phase and attempt number.
+
+	Args:
+		phase (str): Name of the flow phase, e.g. "research_code"
+		attempt (int): Zero-based attempt number within the phase
+	"""
+	_llm_phase.set((phase, attempt))
+
+
+def mark_first_token():
+	"""Record the time to first token of the current call, if not recorded yet."""
+	metrics = _current_call.get()
+	if metrics is not None and metrics.ttft_s is None:
+		metrics.ttft_s = time.monotonic() - _current_call_started.get()
+
+	event = _first_token_event.get()
+	if event is not None:
+		event.set()
+
+
+def set_first_token_event(event: Optional[threading.Event]):
+	"""
+	Set the event signalled when the following completion calls stream their first token.
+
+	Args:
+		event (Optional[threading.Event]): The event, or None to stop signalling
+	"""
+	_first_token_event.set(event)
+
+
+def report_usage(
+	input_tokens: Optional[int] = None,
+	output_tokens: Optional[int] = None,
+	cost_usd: Optional[float] = None,
+	cached_input_tokens: Optional[int] = None,
+):
+	"""
+	Report the usage returned by a backend for the current call.
+
+	Args:
+		input_tokens (Optional[int]): Prompt tokens, including cached ones
+		output_tokens (Optional[int]): Completion tokens
+		cost_usd (Optional[float]): Cost of the call in USD
+		cached_input_tokens (Optional[int]): Prompt tokens read from the prompt cache
+	"""
+	metrics = _current_call.get()
+	if metrics is None:
+		return
+
+	if input_tokens is not None:
+		metrics.input_tokens = int(input_tokens)
+		metrics.usage_reported = True
+	if output_tokens is not None:
+		metrics.output_tokens = int(output_tokens)
+		metrics.usage_reported = True
+	if cost_usd is not None:
+		metrics.cost_usd = float(cost_usd)
+	if cached_input_tokens is not None:
+		metrics.cached_input_tokens = int(cached_input_tokens)
+
+
+def _estimate_tokens(text: str) -> int:
+	return len(text) // CHARS_PER_TOKEN
+
+
+def _estimate_cost(
+	model: str, input_tokens: int, output_tokens: int, cached_input_tokens: int = 0
+) -> float:
+	input_price, output_price = MODEL_PRICES_PER_MTOK.get(model, (0.0, 0.0))
+	uncached_input_tokens = max(input_tokens - cached_input_tokens, 0)
+	return (
+		uncached_input_tokens * input_price
+		+ cached_input_tokens * input_price * CACHED_INPUT_PRICE_FACTOR
+		+ output_tokens * output_price
+	) / 1_000_000
+
+
+class LLMMetricsRecorder:
+	"""
+	Collects the metrics of completion calls and exports them.
+
+	Calls are buffered until `export` moves them to the database. Per
+	backend, model and phase totals are kept for the lifetime of the
+	process and written in the Prometheus text format.
+	"""
+
+	def __init__(self, prometheus_path: str = ""):
+		"""
+		Initialize the recorder.
+
+		Args:
+			prometheus_path (str): File the Prometheus text exposition is written to, empty to disable
+		"""
+		self.prometheus_path = prometheus_path
+		self._lock = threading.Lock()
+		self._pending: List[LLMCallMetrics] = []
+		self._totals: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+
+	def record(self, metrics: LLMCallMetrics):
+		"""Buffer a finished call and add it to the running totals."""
+		with self._lock:
+			self._pending.append(metrics)
+
+			totals = self._totals.setdefault(
+				(metrics.backend, metrics.model, metrics.phase),
+				{
+					"calls": 0,
+					"failures": 0,
+					"retries": 0,
+					"input_tokens": 0,
+					"cached_input_tokens": 0,
+					"output_tokens": 0,
+					"cost_usd": 0.0,
+					"latency_s": 0.0,
+					"ttft_s": 0.0,
+					"ttft_count": 0,
+				},
+			)
+			totals["calls"] += 1
+			totals["failures"] += 0 if metrics.success else 1
+			totals["retries"] += 1 if metrics.attempt > 0 else 0
+			totals["input_tokens"] += metrics.input_tokens
+			totals["cached_input_tokens"] += metrics.cached_input_tokens
+			totals["output_tokens"] += metrics.output_tokens
+			totals["cost_usd"] += metrics.cost_usd
+			totals["latency_s"] += metrics.latency_s
+			if metrics.ttft_s is not None:
+				totals["ttft_s"] += metrics.ttft_s
+				totals["ttft_count"] += 1
+
+		logger.debug(
+			f"LLM call {metrics.backend}/{metrics.model} phase={metrics.phase or '-'} "
+			f"attempt={metrics.attempt} in={metrics.input_tokens} cached={metrics.cached_input_tokens} "
+			f"out={metrics.output_tokens} "
+			f"ttft={metrics.ttft_s if metrics.ttft_s is None else round(metrics.ttft_s, 2)}s "
+			f"latency={metrics.latency_s:.2f}s tok/s={metrics.tokens_per_s:.1f} "
+			f"cost=${metrics.cost_usd:.5f}"
+		)
+
+	def drain(self) -> List[LLMCallMetrics]:
+		"""Return and clear the buffered calls."""
+		with self._lock:
+			pending, self._pending = self._pending, []
+		return pending
+
+	def to_prometheus(self) -> str:
+		"""
+		Render the running totals in the Prometheus text exposition format.
+
+		Returns:
+			str: The exposition text
+		"""
+		series = [
+			("llm_calls_total", "counter", "Completion calls", "calls"),
+			(
+				"llm_call_failures_total",
+				"counter",
+				"Failed completion calls",
+				"failures",
+			),
+			(
+				"llm_call_retries_total",
+				"counter",
+				"Completion calls made on a retry",
+				"retries",
+			),
+			("llm_input_tokens_total", "counter", "Prompt tokens", "input_tokens"),
+			(
+				"llm_cached_input_tokens_total",
+				"counter",
+				"Prompt tokens read from the prompt cache",
+				"cached_input_tokens",
+			),
+			(
+				"llm_output_tokens_total",
+				"counter",
+				"Completion tokens",
+				"output_tokens",
+			),
+			("llm_cost_usd_total", "counter", "Cost in USD", "cost_usd"),
+			("llm_latency_seconds_sum", "counter", "Total call latency", "latency_s"),
+			("llm_ttft_seconds_sum", "counter", "Total time to first token", "ttft_s"),
+			(
+				"llm_ttft_seconds_count",
+				"counter",
+				"Streamed calls with a first token",
+				"ttft_count",
+			),
+		]
+
+		with self._lock:
+			totals = {key: dict(value) for key, value in self._totals.items()}
+
+		lines = []
+		for name, metric_type, help_text, key in series:
+			lines.append(f"# HELP {name} {help_text}")
+			lines.append(f"# TYPE {name} {metric_type}")
+			for (backend, model, phase), values in totals.items():
+				labels = f'backend="{backend}",model="{model}",phase="{phase}"'
+				lines.append(f"{name}{{{labels}}} {values[key]}")
+
+		return "\n".join(lines) + "\n"
+
+	def write_prometheus(self):
+		"""Atomically rewrite the Prometheus text file, if one is configured."""
+		if not self.prometheus_path:
+			return
+
+		tmp_path = f"{self.prometheus_path}.tmp"
+		with open(tmp_path, "w") as f:
+			f.write(self.to_prometheus())
+		os.replace(tmp_path, self.prometheus_path)
+
+	def export(self, db, session_id: str, agent_id: str) -> List[LLMCallMetrics]:
+		"""
+		Move the buffered calls to the database and refresh the Prometheus file.
+
+		Args:
+			db (DBInterface): Database to insert the calls into
+			session_id (str): Session the calls belong to
+			agent_id (str): Agent the calls belong to
+
+		Returns:
+			List[LLMCallMetrics]: The exported calls
+		"""
+		calls = self.drain()
+
+		if calls and not db.insert_llm_calls(
+			session_id, agent_id, [call.to_dict() for call in calls]
+		):
+			logger.error(f"Failed to insert {len(calls)} LLM call metrics")
+
+		try:
+			self.write_prometheus()
+		except OSError as e:
+			logger.error(f"Failed to write LLM metrics to {self.prometheus_path}: {e}")
+
+		if calls:
+			logger.info(
+				f"LLM usage: {len(calls)} calls, "
+				f"{sum(c.input_tokens for c in calls)} input tokens "
+				f"({sum(c.cached_input_tokens for c in calls)} cached), "
+				f"{sum(c.output_tokens for c in calls)} output tokens, "
+				f"${sum(c.cost_usd for c in calls):.4f}"
+			)
+
+		return calls
+
+
+metrics_recorder = LLMMetricsRecorder()
+
+
+def instrument_completion(
+	fn: Callable[[Any, ChatHistory], Result[str, str]],
+) -> Callable[[Any, ChatHistory], Result[str, str]]:
+	"""
+	Decorate a genner's `ch_completion` to record its token and latency metrics.
+
+	Backends report exact usage through `report_usage` and the streaming
+	pipeline reports the first token through `mark_first_token`. Token
+	counts the backend did not report are estimated from the text length.
+	"""
+
+	@functools.wraps(fn)
+	def wrapper(self, messages: ChatHistory) -> Result[str, str]:
+		config = getattr(self, "config", None)
+		phase, attempt = _llm_phase.get()
+		metrics = LLMCallMetrics(
+			backend=self.identifier,
+			model=str(getattr(config, "model", "") or ""),
+			phase=phase,
+			attempt=attempt,
+		)
+
+		call_token = _current_call.set(metrics)
+		started_token = _current_call_started.set(time.monotonic())
+		started = time.monotonic()
+		try:
+			result = fn(self, messages)
+		finally:
+			_current_call.reset(call_token)
+			_current_call_started.reset(started_token)
+		metrics.latency_s = time.monotonic() - started
+
+		response = result.unwrap() if result.is_ok() else ""
+		metrics.success = result.is_ok()
+		if not metrics.usage_reported:
+			metrics.input_tokens = _estimate_tokens(
+				"".join(str(message.content) for message in messages.messages)
+			)
+			metrics.output_tokens = _estimate_tokens(str(response))
+		if not metrics.cost_usd:
+			metrics.cost_usd = _estimate_cost(
+				metrics.model,
+				metrics.input_tokens,
+				metrics.output_tokens,
+				metrics.cached_input_tokens,
+			)
+
+		generation_s = metrics.latency_s - (metrics.ttft_s or 0.0)
+		if generation_s > 0:
+			metrics.tokens_per_s = metrics.output_tokens / generation_s
+
+		metrics_recorder.record(metrics)
+		return result
+
+	return wrapper
@@ -1,17 +1,17 @@
-import re
 from typing import Callable, Generator, List, Tuple
 
-import yaml
 from openai import OpenAI
 from openai.types.chat import ChatCompletionChunk
 from result import Err, Ok, Result
 
 from src.config import OAIConfig
-from src.helper import extract_content
 from src.custom_types import ChatHistory
 
 from .Base import Genner
-import json
+from .CacheControl import cached_prompt_tokens
+from .Extract import extract_code_blocks, extract_yaml_lists
+from .Metrics import instrument_completion, report_usage
+from .Stream import TokenStream
 
 
 class OAIGenner(Genner):
@@ -38,6 +38,7 @@ class OAIGenner(Genner):
 		self.config = config
 		self.stream_fn = stream_fn
 
+	@instrument_completion
 	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
 		"""
 		Generate a completion using the OAI model.
@@ -74,53 +75,19 @@ class OAIGenner(Genner):
 					self.client.chat.completions.create(**kwargs)
 				)
 
-				if self.config.thinking_delimiter != "":
-					main_entered = False
-					reasoning_entered = False
-
-					token_counts = 0
-					for chunk in stream:
-						if chunk.choices[0].delta.content is not None:
-							token = chunk.choices[0].delta.content
-
-							if not isinstance(token, str):
-								continue
-
-							if (
-								not reasoning_entered
-								and self.config.thinking_delimiter not in token
-							):
-								reasoning_entered = True
-							elif (
-								reasoning_entered
-								and not main_entered
-								and self.config.thinking_delimiter in token
-							):
-								main_entered = True
-
-							if (
-								reasoning_entered
-								and main_entered
-								and self.config.thinking_delimiter not in token
-							):
-								final_response += token
-
-							self.stream_fn(token)
-
-							token_counts += 1
-							if token_counts >= self.config.max_tokens:
-								break
-					self.stream_fn("\n")
-				else:
-					for chunk in stream:
-						if chunk.choices[0].delta.content is not None:
-							token = chunk.choices[0].delta.content
-
-							if not isinstance(token, str):
-								continue
-
-							final_response += token
-							self.stream_fn(token)
+				token_stream = TokenStream(
+					self.stream_fn,
+					max_tokens=self.config.max_tokens,
+					thinking_delimiter=self.config.thinking_delimiter,
+				)
+				for chunk in stream:
+					token = chunk.choices[0].delta.content
+					if not isinstance(token, str):
+						continue
+
+					if not token_stream.feed_delimited(token):
+						break
+				final_response = token_stream.close()
 			else:
 				kwargs = {
 					"model": self.config.model,
@@ -134,6 +101,12 @@ class OAIGenner(Genner):
 					kwargs.pop("temperature")
 
 				response = self.client.chat.completions.create(**kwargs)
+				if response.usage is not None:
+					report_usage(
+						response.usage.prompt_tokens,
+						response.usage.completion_tokens,
+						cached_input_tokens=cached_prompt_tokens(response.usage),
+					)
 
 				final_response: str = response.choices[0].message.content
 				final_response = final_response.split(self.config.thinking_delimiter)[
@@ -148,7 +121,7 @@ class OAIGenner(Genner):
 				f"OAIGenner.{self.config.model}.ch_completion: An unexpected error while generating occured: \n{e}"
 			)
 
-		return json.dumps(final_response.strip())
+		return Ok(final_response.strip())
 
 	def generate_code(
 		self, messages: ChatHistory, blocks: List[str] = [""]
@@ -256,9 +229,6 @@ class OAIGenner(Genner):
 		"""
 		Extract code blocks from a OAI model response.
 
-		This static method extracts Python code blocks from the raw model response
-		using regex patterns to find code within markdown code blocks.
-
 		Args:
 			response (str): The raw response from the model
 			blocks (List[str]): XML tag names to extract content from before processing into code
@@ -268,42 +238,14 @@ class OAIGenner(Genner):
 				Ok(List[str]): List of extracted code blocks
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[str] = []
-
-		for block in blocks:
-			# Extract code from the response
-			try:
-				response = extract_content(response, block)
-				regex_pattern = r"```python\n([\s\S]*?)```"
-				code_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert code_match is not None, "No code match found in the response"
-				assert code_match.group(1) is not None, (
-					"No code group number 1 found in the response"
-				)
-
-				code = code_match.group(1)
-				assert isinstance(code, str), "Code is not a string"
-
-				extracts.append(code)
-			except AssertionError as e:
-				return Err(f"OAIGenner.extract_code: Regex failed: \n{e}")
-			except Exception as e:
-				return Err(
-					f"OAIGenner.extract_code: An unexpected error while extracting code occurred, error: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_code_blocks(response, blocks)
 
 	@staticmethod
 	def extract_list(
 		response: str, blocks: List[str] = [""]
 	) -> Result[List[List[str]], str]:
 		"""
-		Extract lists from a OAI model response.
-
-		This static method extracts YAML-formatted lists from the raw model response
-		using regex patterns to find YAML content within markdown code blocks.
+		Extract YAML lists from a OAI model response.
 
 		Args:
 			response (str): The raw response from the model
@@ -314,29 +256,4 @@ class OAIGenner(Genner):
 				Ok(List[List[str]]): List of extracted lists
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[List[str]] = []
-
-		for block in blocks:
-			try:
-				response = extract_content(response, block)
-				# Remove markdown code block markers and find yaml content
-				# Updated regex pattern to handle triple backticks
-				regex_pattern = r"```yaml\n(.*?)```"
-				yaml_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert yaml_match is not None, "No match found"
-				yaml_content = yaml.safe_load(yaml_match.group(1).strip())
-				assert isinstance(yaml_content, list), "Yaml content is not a list"
-				assert all(isinstance(item, str) for item in yaml_content), (
-					"All yaml content items must be strings"
-				)
-
-				extracts.append(yaml_content)
-			except AssertionError as e:
-				return Err(f"OAIGenner.extract_list: Assertion error: \n{e}")
-			except Exception as e:
-				return Err(
-					f"OAIGenner.extract_list: An unexpected error while extracting list occurred, error: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_yaml_lists(response, blocks)
@@ -1,14 +1,19 @@
-import re
 from typing import Callable, List, Tuple
 
-import yaml
 from result import Err, Ok, Result
 from src.client.openrouter import OpenRouter
 from src.config import OpenRouterConfig
-from src.helper import extract_content
 from src.custom_types import ChatHistory
 
 from .Base import Genner
+from .CacheControl import (
+	cached_prompt_tokens,
+	supports_explicit_cache,
+	to_cached_native,
+)
+from .Extract import extract_code_blocks, extract_yaml_lists
+from .Metrics import instrument_completion, report_usage
+from .Stream import TokenStream
 
 
 class OpenRouterGenner(Genner):
@@ -35,6 +40,7 @@ class OpenRouterGenner(Genner):
 		self.config = config
 		self.stream_fn = stream_fn
 
+	@instrument_completion
 	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
 		"""
 		Generate a completion using the Claude API.
@@ -55,58 +61,58 @@ class OpenRouterGenner(Genner):
 
 		final_response = ""
 
+		# Anthropic and Gemini models only cache marked prefixes, the other
+		# providers cache the stable prefix of plain messages on their own
+		if self.config.prompt_cache and supports_explicit_cache(self.config.model):
+			native_messages = to_cached_native(messages.messages)
+		else:
+			native_messages = messages.as_native()
+
 		try:
 			if self.do_stream:
 				assert self.stream_fn is not None
 
 				stream_ = self.client.create_chat_completion_stream(
-					messages=messages.as_native(),
+					messages=native_messages,
 					model=self.config.model,
 					max_tokens=self.config.max_tokens,
 					temperature=self.config.temperature,
 				)
 
-				reasoning_entered = False
-				main_entered = False
-
-				token_counts = 0
+				token_stream = TokenStream(
+					self.stream_fn, max_tokens=self.config.max_tokens
+				)
 				for result in stream_:
 					if err := result.err():
-						return Err(f"OpenRouterGenner.{self.config.model}.ch_completion: Stream error: {err}")
-					
-					token_tuple = result.unwrap()
-					token, token_type = token_tuple
-					
-					if not reasoning_entered and token_type == "reasoning":
-						reasoning_entered = True
-						self.stream_fn("<think>\n")
-					if reasoning_entered and not main_entered and token_type == "main":
-						main_entered = True
-						self.stream_fn("</think>\n")
-					if token_type == "main":
-						# Ensure token is a string before concatenation
-						if not isinstance(token, str):
-							logger.warning(f"Token is not a string: {type(token)}")
-							token = str(token)
-						final_response += token
-
-					self.stream_fn(token)
-
-					token_counts += 1
-					if token_counts >= self.config.max_tokens:
+						return Err(
+							f"OpenRouterGenner.{self.config.model}.ch_completion: Stream error: {err}"
+						)
+
+					token, token_type = result.unwrap()
+					if not token_stream.feed(token, token_type):
 						break
-				self.stream_fn("\n")
+				final_response = token_stream.close()
 			else:
 				final_response = self.client.create_chat_completion(
-					messages=messages.as_native(),
+					messages=native_messages,
 					model=self.config.model,
 					max_tokens=self.config.max_tokens,
 					temperature=self.config.temperature,
 				)
 
+			usage = self.client.get_last_usage()
+			report_usage(
+				usage.get("prompt_tokens"),
+				usage.get("completion_tokens"),
+				usage.get("cost"),
+				cached_prompt_tokens(usage),
+			)
+
 			# Ensure final_response is a string and JSON serializable
 			if not isinstance(final_response, str):
-				logger.warning(f"Final response is not a string: {type(final_response)}")
+				logger.warning(
+					f"Final response is not a string: {type(final_response)}"
+				)
 				final_response = str(final_response)
 
 			# Verify JSON serializability
@@ -114,10 +120,14 @@ class OpenRouterGenner(Genner):
 				json.dumps({"response": final_response})
 			except (TypeError, ValueError) as e:
 				logger.error(f"Final response is not JSON serializable: {e}")
-				return Err(f"OpenRouterGenner.{self.config.model}.ch_completion: Response is not JSON serializable")
+				return Err(
+					f"OpenRouterGenner.{self.config.model}.ch_completion: Response is not JSON serializable"
+				)
 
 			logger.info(f"Final response type: {type(final_response)}")
-			logger.debug(f"Final response content: {final_response[:100]}...")  # Log first 100 chars
+			logger.debug(
+				f"Final response content: {final_response[:100]}..."
+			)  # Log first 100 chars
 
 		except AssertionError as e:
 			return Err(
@@ -230,10 +240,7 @@ class OpenRouterGenner(Genner):
 	@staticmethod
 	def extract_code(response: str, blocks: List[str] = [""]) -> Result[List[str], str]:
 		"""
-		Extract code blocks from a Claude model response.
-
-		This static method extracts Python code blocks from the raw model response
-		using regex patterns to find code within markdown code blocks.
+		Extract code blocks from a OpenRouter model response.
 
 		Args:
 			response (str): The raw response from the model
@@ -244,41 +251,14 @@ class OpenRouterGenner(Genner):
 				Ok(List[str]): List of extracted code blocks
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[str] = []
-
-		for block in blocks:
-			try:
-				response = extract_content(response, block)
-				regex_pattern = r"```python\n([\s\S]*?)```"
-				code_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert code_match is not None, "No code match found in the response"
-				assert code_match.group(1) is not None, (
-					"No code group number 1 found in the response"
-				)
-
-				code = code_match.group(1)
-				assert isinstance(code, str), "Code is not a string"
-
-				extracts.append(code)
-			except AssertionError as e:
-				return Err(f"OpenRouterGenner.extract_code: Regex failed: \n{e}")
-			except Exception as e:
-				return Err(
-					f"OpenRouterGenner.extract_code: An unexpected error while extracting code occurred, error: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_code_blocks(response, blocks)
 
 	@staticmethod
 	def extract_list(
 		response: str, blocks: List[str] = [""]
 	) -> Result[List[List[str]], str]:
 		"""
-		Extract lists from a Claude model response.
-
-		This static method extracts YAML-formatted lists from the raw model response
-		using regex patterns to find YAML content within markdown code blocks.
+		Extract YAML lists from a OpenRouter model response.
 
 		Args:
 			response (str): The raw response from the model
@@ -289,27 +269,4 @@ class OpenRouterGenner(Genner):
 				Ok(List[List[str]]): List of extracted lists
 				Err(str): Error message if extraction failed
 		"""
-		extracts: List[List[str]] = []
-
-		for block in blocks:
-			try:
-				response = extract_content(response, block)
-				regex_pattern = r"```yaml\n(.*?)```"
-				yaml_match = re.search(regex_pattern, response, re.DOTALL)
-
-				assert yaml_match is not None, "No match found"
-				yaml_content = yaml.safe_load(yaml_match.group(1).strip())
-				assert isinstance(yaml_content, list), "Yaml content is not a list"
-				assert all(isinstance(item, str) for item in yaml_content), (
-					"All yaml content items must be strings"
-				)
-
-				extracts.append(yaml_content)
-			except AssertionError as e:
-				return Err(f"OpenRouterGenner.extract_list: Assertion error: \n{e}")
-			except Exception as e:
-				return Err(
-					f"OpenRouterGenner.extract_list: An unexpected error while extracting list occurred, error: \n{e}"
-				)
-
-		return Ok(extracts)
+		return extract_yaml_lists(response, blocks)
@@ -0,0 +1,155 @@
+import io
+import time
+from typing import Callable, List, Optional
+
+from .Metrics import mark_first_token
+
+
+class TokenStream:
+	"""
+	Shared streaming pipeline used by every genner backend.
+
+	Tokens are fed one by one together with their phase ("reasoning" or
+	"main"). Main tokens are accumulated into a list and joined once at the
+	end, and the tokens forwarded to `stream_fn` are buffered and written in
+	batches, either when `flush_size` characters are pending or when
+	`flush_interval` seconds passed since the last write. Phase transitions
+	are rendered as `<think>` / `</think>` markers on the sink.
+	"""
+
+	def __init__(
+		self,
+		stream_fn: Optional[Callable[[str], None]],
+		max_tokens: int = 0,
+		flush_size: int = 256,
+		flush_interval: float = 0.05,
+		thinking_delimiter: str = "",
+	):
+		"""
+		Initialize the stream.
+
+		Args:
+			stream_fn (Optional[Callable[[str], None]]): Sink for streamed text, or None to only accumulate
+			max_tokens (int): Stop accepting tokens after this many, 0 disables the limit
+			flush_size (int): Number of pending characters that triggers a write to the sink
+			flush_interval (float): Seconds after which pending characters are written to the sink
+			thinking_delimiter (str): Delimiter that ends the reasoning phase in untyped streams,
+				empty if the backend does not emit one
+		"""
+		self.stream_fn = stream_fn
+		self.max_tokens = max_tokens
+		self.flush_size = flush_size
+		self.flush_interval = flush_interval
+		self.thinking_delimiter = thinking_delimiter
+
+		self.token_count = 0
+		self.phase: Optional[str] = None
+		self._main_parts: List[str] = []
+		self._pending = io.StringIO()
+		self._pending_size = 0
+		self._last_flush = time.monotonic()
+
+	def _emit(self, text: str):
+		"""Queue text for the sink and flush if the batch is full or stale."""
+		if self.stream_fn is None or not text:
+			return
+
+		self._pending.write(text)
+		self._pending_size += len(text)
+
+		if (
+			self._pending_size >= self.flush_size
+			or time.monotonic() - self._last_flush >= self.flush_interval
+		):
+			self.flush()
+
+	def flush(self):
+		"""Write every pending character to the sink."""
+		if self.stream_fn is not None and self._pending_size:
+			self.stream_fn(self._pending.getvalue())
+			self._pending = io.StringIO()
+			self._pending_size = 0
+		self._last_flush = time.monotonic()
+
+	def _enter_phase(self, phase: str):
+		"""Switch phase and emit the matching marker."""
+		if phase == self.phase:
+			return
+
+		if phase == "reasoning":
+			self._emit("<think>\n")
+		elif self.phase == "reasoning":
+			self._emit("</think>\n")
+		self.phase = phase
+
+	def _count(self) -> bool:
+		"""Count a fed token and report whether more tokens are accepted."""
+		if self.token_count == 0:
+			mark_first_token()
+		self.token_count += 1
+		return not (self.max_tokens and self.token_count >= self.max_tokens)
+
+	def feed(self, token: str, token_type: str = "main") -> bool:
+		"""
+		Feed a token of a known phase.
+
+		Args:
+			token (str): The token text
+			token_type (str): "reasoning" or "main"
+
+		Returns:
+			bool: False once `max_tokens` tokens were fed and the caller should stop reading
+		"""
+		if not isinstance(token, str):
+			token = str(token)
+
+		self._enter_phase(token_type)
+		if token_type == "main":
+			self._main_parts.append(token)
+		self._emit(token)
+
+		return self._count()
+
+	def feed_delimited(self, token: str) -> bool:
+		"""
+		Feed a token of a stream whose reasoning ends at `thinking_delimiter`.
+
+		Everything up to the delimiter is reasoning, everything after it is
+		main content. The model already renders its own reasoning markup, so
+		tokens reach the sink unchanged. Without a delimiter every token is
+		main content.
+
+		Args:
+			token (str): The token text
+
+		Returns:
+			bool: False once `max_tokens` tokens were fed and the caller should stop reading
+		"""
+		if not isinstance(token, str):
+			token = str(token)
+
+		if self.thinking_delimiter and self.phase != "main":
+			if self.thinking_delimiter not in token:
+				self.phase = "reasoning"
+				self._emit(token)
+				return self._count()
+
+			reasoning, token = token.split(self.thinking_delimiter, 1)
+			self._emit(reasoning + self.thinking_delimiter)
+
+		self.phase = "main"
+		self._main_parts.append(token)
+		self._emit(token)
+
+		return self._count()
+
+	def close(self) -> str:
+		"""
+		Flush the sink and return the accumulated main content.
+
+		Returns:
+			str: The concatenated main-phase tokens
+		"""
+		self._emit("\n")
+		self.flush()
+		return "".join(self._main_parts)
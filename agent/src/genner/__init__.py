@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, List
 
 from anthropic import Anthropic
 from openai import OpenAI
@@ -6,7 +6,9 @@ from openai import OpenAI
 from src.client.openrouter import OpenRouter
 from src.config import (
 	ClaudeConfig,
+	CompletionCacheConfig,
 	DeepseekConfig,
+	FailoverConfig,
 	OAIConfig,
 	OllamaConfig,
 	OpenRouterConfig,
@@ -16,11 +18,28 @@ from src.genner.OAI import OAIGenner
 from src.genner.OR import OpenRouterGenner
 
 from .Base import Genner
+from .Cache import CachedGenner, CompletionCache, with_completion_cache
 from .Deepseek import DeepseekGenner
+from .Failover import FailoverGenner
+from .Metrics import LLMCallMetrics, metrics_recorder, set_llm_phase
 from .Qwen import QwenGenner
 from tests.mock_genner.MockGenner import MockGenner
 
-__all__ = ["get_genner", "QwenGenner", "OllamaConfig"]
+__all__ = [
+	"get_genner",
+	"get_candidate_genners",
+	"QwenGenner",
+	"OllamaConfig",
+	"CachedGenner",
+	"CompletionCache",
+	"CompletionCacheConfig",
+	"with_completion_cache",
+	"FailoverConfig",
+	"FailoverGenner",
+	"LLMCallMetrics",
+	"metrics_recorder",
+	"set_llm_phase",
+]
 
 
 class BackendException(Exception):
@@ -61,17 +80,20 @@ def get_genner(
 	gemini_config: OpenRouterConfig = OpenRouterConfig(),
 	llama_config: OAIConfig = OAIConfig(),
 	qwq_config: OpenRouterConfig = OpenRouterConfig(),
+	failover_config: FailoverConfig = FailoverConfig(),
 ) -> Genner:
 	"""
 	Get a genner instance based on the backend.
 
 	Args:
-		backend (str): The backend to use.
+		backend (str): The backend to use. A comma separated list, e.g. "deepseek_or,gemini",
+			builds a `FailoverGenner` trying the backends in that order.
 		deepseek_deepseek_client (OpenAI): OpenAI client but endpoint are pointed towards deepseek endpoint for deepseek-r1.
 		deepseek_or_client (OpenAI): OpenAI client but endpoint are pointed towards openrouter endpoint for deepseek-r1.
 		deepseek_local_client (OpenAI): OpenAI client but endpoint are pointed towards local endpoint for deepseek-r1.
 		deepseek_config (DeepseekConfig, optional): The configuration for the Deepseek backend. Defaults to DeepseekConfig().
 		qwen_config (QwenConfig, optional): The configuration for the Qwen backend. Defaults to QwenConfig().
+		failover_config (FailoverConfig, optional): Hedging and circuit breaker settings of a failover genner.
 
 	Raises:
 		BackendException: If the backend is not supported.
@@ -81,6 +103,47 @@ def get_genner(
 	Returns:
 		Genner: The genner instance.
 	"""
+	if "," in backend:
+		backends = [x.strip() for x in backend.split(",") if x.strip()]
+		clients = dict(
+			deepseek_deepseek_client=deepseek_deepseek_client,
+			deepseek_local_client=deepseek_local_client,
+			anthropic_client=anthropic_client,
+			or_client=or_client,
+			llama_client=llama_client,
+		)
+
+		genners = [
+			get_genner(
+				backend=backends[0],
+				stream_fn=stream_fn,
+				deepseek_config=deepseek_config,
+				claude_config=claude_config,
+				openai_config=openai_config,
+				gemini_config=gemini_config,
+				llama_config=llama_config,
+				qwq_config=qwq_config,
+				**clients,
+			)
+		]
+		# Fallbacks get fresh configs, as get_genner mutates the ones it is
+		# given, and never stream so their output cannot interleave
+		for fallback in backends[1:]:
+			genners.append(
+				get_genner(
+					backend=fallback,
+					stream_fn=None,
+					deepseek_config=DeepseekConfig(),
+					claude_config=ClaudeConfig(),
+					openai_config=OpenRouterConfig(),
+					gemini_config=OpenRouterConfig(),
+					llama_config=OAIConfig(),
+					qwq_config=OpenRouterConfig(),
+					**clients,
+				)
+			)
+
+		return FailoverGenner(genners, failover_config)
 
 	if backend == "deepseek":
 		deepseek_config.model = "deepseek-reasoner"
@@ -180,3 +243,51 @@ def get_genner(
 	raise BackendException(
 		f"Unsupported backend: {backend}, available backends: {', '.join(available_backends)}"
 	)
+
+
+def get_candidate_genners(
+	candidates: List[str],
+	or_client: OpenRouter | None = None,
+	anthropic_client: Anthropic | None = None,
+) -> List[Genner]:
+	"""
+	Build the extra genners raced against the main one for speculative code generation.
+
+	Each candidate is written as `backend` or `backend:temperature`, for example
+	`["deepseek_v3_or:0.7", "gemini"]`. Candidates never stream, as their
+	output would interleave with the main genner's.
+
+	Args:
+		candidates (List[str]): Candidate specs
+		or_client (OpenRouter | None): OpenRouter client for OpenRouter backends
+		anthropic_client (Anthropic | None): Anthropic client for the Claude backend
+
+	Raises:
+		BackendException: If a backend is not supported.
+
+	Returns:
+		List[Genner]: The candidate genners, in the given order.
+	"""
+	genners = []
+
+	for candidate in candidates:
+		backend, _, temperature = candidate.strip().partition(":")
+
+		# Fresh configs, as get_genner mutates the ones it is given
+		genner = get_genner(
+			backend=backend,
+			stream_fn=None,
+			or_client=or_client,
+			anthropic_client=anthropic_client,
+			deepseek_config=DeepseekConfig(),
+			claude_config=ClaudeConfig(),
+			openai_config=OpenRouterConfig(),
+			gemini_config=OpenRouterConfig(),
+			qwq_config=OpenRouterConfig(),
+		)
+		if temperature and hasattr(genner, "config"):
+			genner.config.temperature = float(temperature)
+
+		genners.append(genner)
+
+	return genners
@@ -0,0 +1,325 @@
+"""
+Batched and cached market data for Overtime Protocol v2 on Arbitrum
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from loguru import logger
+from web3 import Web3
+
+OVERTIME_MARKETS_URL = "https://overtimemarketsv2.xyz/arbitrum/markets"
+
+# Multicall3 is deployed at the same address on every EVM chain
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+	{
+		"inputs": [
+			{
+				"components": [
+					{"name": "target", "type": "address"},
+					{"name": "allowFailure", "type": "bool"},
+					{"name": "callData", "type": "bytes"},
+				],
+				"name": "calls",
+				"type": "tuple[]",
+			}
+		],
+		"name": "aggregate3",
+		"outputs": [
+			{
+				"components": [
+					{"name": "success", "type": "bool"},
+					{"name": "returnData", "type": "bytes"},
+				],
+				"name": "returnData",
+				"type": "tuple[]",
+			}
+		],
+		"stateMutability": "payable",
+		"type": "function",
+	},
+	{
+		"inputs": [],
+		"name": "getBlockNumber",
+		"outputs": [{"name": "blockNumber", "type": "uint256"}],
+		"stateMutability": "view",
+		"type": "function",
+	},
+]
+
+# Markets whose odds are read by one eth_call, bounded by the RPC gas cap
+DEFAULT_MULTICALL_BATCH = 200
+
+# Blocks cached odds stay valid, Arbitrum producing about 4 blocks per second
+DEFAULT_ODDS_MAX_BLOCK_AGE = 20
+
+# Seconds the latest block number is reused before asking the RPC again
+BLOCK_NUMBER_TTL_S = 1.0
+
+DEFAULT_INDEX_REFRESH_S = 60.0
+
+
+def odds_from_result(result) -> Dict[str, Optional[float]]:
+	"""Convert the getMarketDefaultOdds outputs to decimal odds."""
+	return {
+		"home": float(result[0]) / 1e18,
+		"away": float(result[1]) / 1e18,
+		"draw": float(result[2]) / 1e18 if result[2] > 0 else None,
+	}
+
+
+def market_maturity(market: Dict) -> Optional[float]:
+	"""Get the start of a market as epoch seconds, from its `maturityDate` or `maturity`."""
+	value = market.get("maturityDate", market.get("maturity"))
+	if value is None:
+		return None
+	try:
+		timestamp = float(value)
+		# Milliseconds are used by some API versions
+		return timestamp / 1000 if timestamp > 1e12 else timestamp
+	except (TypeError, ValueError):
+		pass
+	try:
+		return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+	except ValueError:
+		return None
+
+
+class MarketOddsReader:
+	"""
+	Reads the odds of many markets with Multicall3, caching them by block.
+
+	The odds of up to `batch_size` markets and the block they were read at
+	come back from a single eth_call. Cached odds are reused until the chain
+	moved `max_block_age` blocks past that block.
+	"""
+
+	def __init__(
+		self,
+		w3: Web3,
+		sports_amm,
+		batch_size: int = DEFAULT_MULTICALL_BATCH,
+		max_block_age: int = DEFAULT_ODDS_MAX_BLOCK_AGE,
+	):
+		"""Initialize the reader
+
+		Args:
+			w3: Web3 instance connected to Arbitrum
+			sports_amm: SportsAMM contract the odds are read from
+			batch_size: Markets read per eth_call
+			max_block_age: Blocks after which cached odds are read again
+		"""
+		self.w3 = w3
+		self.sports_amm = sports_amm
+		self.batch_size = batch_size
+		self.max_block_age = max_block_age
+		self.multicall = w3.eth.contract(
+			address=Web3.to_checksum_address(MULTICALL3_ADDRESS), abi=MULTICALL3_ABI
+		)
+		self._cache: Dict[str, Tuple[int, Dict[str, Optional[float]]]] = {}
+		self._block_number = 0
+		self._block_checked_at = 0.0
+		self._lock = threading.Lock()
+
+	def current_block(self) -> int:
+		"""Get the latest block number, asking the RPC at most once per BLOCK_NUMBER_TTL_S"""
+		now = time.monotonic()
+		if now - self._block_checked_at > BLOCK_NUMBER_TTL_S:
+			self._block_number = self.w3.eth.block_number
+			self._block_checked_at = now
+		return self._block_number
+
+	def _fetch(self, markets: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+		calls = [
+			(self.multicall.address, False, self.multicall.encode_abi("getBlockNumber"))
+		]
+		calls += [
+			(
+				self.sports_amm.address,
+				True,
+				self.sports_amm.encode_abi("getMarketDefaultOdds", args=[market]),
+			)
+			for market in markets
+		]
+		results = self.multicall.functions.aggregate3(calls).call()
+
+		block_number = self.w3.codec.decode(["uint256"], results[0][1])[0]
+		odds = {}
+		for market, (success, data) in zip(markets, results[1:]):
+			if not success or not data:
+				logger.warning(f"Could not read the odds of market {market}")
+				continue
+			odds[market] = odds_from_result(
+				self.w3.codec.decode(["uint256", "uint256", "uint256"], data)
+			)
+
+		with self._lock:
+			for market, market_odds in odds.items():
+				self._cache[market] = (block_number, market_odds)
+			self._block_number = max(self._block_number, block_number)
+		return odds
+
+	def get_odds(
+		self, market_addresses: List[str]
+	) -> Dict[str, Dict[str, Optional[float]]]:
+		"""Get the odds of markets, reading those not cached in batches
+
+		Args:
+			market_addresses: Addresses of the sports markets
+
+		Returns:
+			Dictionary of odds by checksum market address, without the markets that could not be read
+		"""
+		markets = list(
+			dict.fromkeys(
+				Web3.to_checksum_address(address) for address in market_addresses
+			)
+		)
+		oldest_valid_block = self.current_block() - self.max_block_age
+
+		odds = {}
+		missing = []
+		with self._lock:
+			for market in markets:
+				cached = self._cache.get(market)
+				if cached is not None and cached[0] >= oldest_valid_block:
+					odds[market] = cached[1]
+				else:
+					missing.append(market)
+
+		for start in range(0, len(missing), self.batch_size):
+			odds.update(self._fetch(missing[start : start + self.batch_size]))
+		return odds
+
+
+class MarketIndex:
+	"""
+	Index of the open Overtime markets, refreshed in the background.
+
+	The market list is downloaded once, then refreshed every
+	`refresh_interval_s` by a daemon thread, so queries filter and page
+	through memory instead of downloading the list again.
+	"""
+
+	def __init__(
+		self,
+		url: str = OVERTIME_MARKETS_URL,
+		refresh_interval_s: float = DEFAULT_INDEX_REFRESH_S,
+	):
+		"""Initialize the index, loaded on the first query
+
+		Args:
+			url: Overtime API endpoint listing the markets
+			refresh_interval_s: Seconds between refreshes of the market list
+		"""
+		self.url = url
+		self.refresh_interval_s = refresh_interval_s
+		self.session = requests.Session()
+		self._etag: Optional[str] = None
+		self._markets: List[Dict] = []
+		self._loaded = False
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def _fetch_markets(self) -> Optional[List[Dict]]:
+		headers = {"If-None-Match": self._etag} if self._etag else {}
+		response = self.session.get(self.url, headers=headers, timeout=10)
+		if response.status_code == 304:
+			return None
+		response.raise_for_status()
+		self._etag = response.headers.get("ETag")
+		return response.json()
+
+	def refresh(self) -> bool:
+		"""Download the market list, keeping the previous one on failure
+
+		Returns:
+			True if the index holds a market list
+		"""
+		try:
+			markets = self._fetch_markets()
+		except Exception as e:
+			logger.error(f"Error fetching markets: {e}")
+			return self._loaded
+
+		if markets is not None:
+			active_markets = [m for m in markets if m.get("isOpen", False)]
+			# Soonest first, markets without maturity last
+			active_markets.sort(key=lambda m: market_maturity(m) or float("inf"))
+			with self._lock:
+				self._markets = active_markets
+			logger.info(f"Found {len(active_markets)} active markets")
+		self._loaded = True
+		return True
+
+	def _refresh_forever(self):
+		while not self._stop.wait(self.refresh_interval_s):
+			self.refresh()
+
+	def _ensure_started(self):
+		if not self._loaded:
+			self.refresh()
+		if self._thread is None:
+			self._thread = threading.Thread(target=self._refresh_forever, daemon=True)
+			self._thread.start()
+
+	def query(
+		self,
+		sport: Optional[str] = None,
+		maturity_after: Optional[float] = None,
+		maturity_before: Optional[float] = None,
+		min_liquidity: Optional[float] = None,
+		offset: int = 0,
+		limit: int = 50,
+	) -> List[Dict]:
+		"""Get a page of the open markets matching the filters, soonest first
+
+		Args:
+			sport: Only markets of this sport, case-insensitive
+			maturity_after: Only markets starting after this epoch time
+			maturity_before: Only markets starting before this epoch time
+			min_liquidity: Only markets with at least this `liquidity`
+			offset: Matching markets skipped
+			limit: Maximum number of markets returned
+
+		Returns:
+			List of market dictionaries
+		"""
+		self._ensure_started()
+		with self._lock:
+			markets = self._markets
+
+		def matches(market: Dict) -> bool:
+			if (
+				sport is not None
+				and str(market.get("sport", "")).lower() != sport.lower()
+			):
+				return False
+			if maturity_after is not None or maturity_before is not None:
+				maturity = market_maturity(market)
+				if maturity is None:
+					return False
+				if maturity_after is not None and maturity < maturity_after:
+					return False
+				if maturity_before is not None and maturity > maturity_before:
+					return False
+			if (
+				min_liquidity is not None
+				and float(market.get("liquidity") or 0) < min_liquidity
+			):
+				return False
+			return True
+
+		matching = [market for market in markets if matches(market)]
+		return matching[offset : offset + limit]
+
+	def close(self):
+		"""Stop the background refresh and close the HTTP session"""
+		self._stop.set()
+		self.session.close()
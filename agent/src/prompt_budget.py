@@ -0,0 +1,256 @@
+import hashlib
+import os
+import re
+import tempfile
+from functools import lru_cache
+from typing import Callable, Dict
+
+from loguru import logger
+
+from src.genner.Base import Genner
+
+# Context window of each model in tokens, prompt and completion together
+MODEL_CONTEXT_TOKENS: Dict[str, int] = {
+	"deepseek/deepseek-r1": 64_000,
+	"deepseek-reasoner": 64_000,
+	"deepseek/deepseek-chat": 64_000,
+	"openai/o3-mini": 200_000,
+	"o3-mini": 200_000,
+	"google/gemini-2.0-flash-lite-001": 1_000_000,
+	"qwen/qwq-32b": 131_072,
+	"claude-3-5-sonnet-latest": 200_000,
+	"claude-3-opus-20240229": 200_000,
+}
+DEFAULT_CONTEXT_TOKENS = 32_000
+
+# Upper bound on prompt tokens regardless of the context window, to bound cost and latency
+DEFAULT_MAX_PROMPT_TOKENS = 24_000
+
+TRUNCATION_MARKER = "\n...[{} tokens truncated]...\n"
+
+_ENCODING_NAME = "cl100k_base"
+_ENCODING_URL = (
+	"https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+)
+
+_TRACEBACK_RE = re.compile(r"Traceback \(most recent call last\):\n(?:[ \t].*\n?)*\S.*")
+_VOLATILE_RE = [
+	(re.compile(r"temp_script_\w+\.py"), "temp_script.py"),
+	(re.compile(r"0x[0-9a-fA-F]+"), "0x?"),
+]
+
+
+def _encoding_is_cached() -> bool:
+	"""Whether tiktoken can load the encoding from its local cache, without a download."""
+	cache_dir = os.environ.get(
+		"TIKTOKEN_CACHE_DIR",
+		os.environ.get(
+			"DATA_GYM_CACHE_DIR", os.path.join(tempfile.gettempdir(), "data-gym-cache")
+		),
+	)
+	cache_key = hashlib.sha1(_ENCODING_URL.encode()).hexdigest()
+	return bool(cache_dir) and os.path.exists(os.path.join(cache_dir, cache_key))
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+	"""
+	Load the local tokenizer once, or None when it is unavailable.
+
+	The encoding is only loaded from the tiktoken cache, so that counting
+	tokens never blocks a cycle on a download.
+	"""
+	try:
+		import tiktoken
+
+		if not _encoding_is_cached():
+			logger.warning(
+				f"tiktoken encoding {_ENCODING_NAME} not cached, estimating tokens from length"
+			)
+			return None
+		return tiktoken.get_encoding(_ENCODING_NAME)
+	except Exception as e:
+		logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+		return None
+
+
+def count_tokens(text: str) -> int:
+	"""
+	Count the tokens of a text with the local tokenizer.
+
+	Falls back to one token per four characters when tiktoken cannot be loaded.
+
+	Args:
+		text (str): The text to measure
+
+	Returns:
+		int: Number of tokens
+	"""
+	encoding = _get_encoding()
+	if encoding is None:
+		return len(text) // 4
+	return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_middle(text: str, max_tokens: int) -> str:
+	"""
+	Cut the middle out of a text so that it fits in `max_tokens`.
+
+	The head and the tail are kept, as both usually carry the most context
+	(headers and the latest entries), with a marker where text was removed.
+
+	Args:
+		text (str): The text to truncate
+		max_tokens (int): Maximum number of tokens of the kept text
+
+	Returns:
+		str: The truncated text, or the original text if it already fits
+	"""
+	encoding = _get_encoding()
+	tokens = encoding.encode(text, disallowed_special=()) if encoding else text
+	size = len(tokens) if encoding else len(text) // 4
+
+	if size <= max_tokens:
+		return text
+
+	marker = TRUNCATION_MARKER.format(size)
+	keep = max(max_tokens - count_tokens(marker), 0)
+	if encoding is None:
+		keep_chars = keep * 4
+		head, tail = text[: keep_chars // 2], text[len(text) - keep_chars // 2 :]
+	else:
+		head = encoding.decode(tokens[: keep // 2])
+		tail = encoding.decode(tokens[len(tokens) - keep // 2 :])
+
+	return head + TRUNCATION_MARKER.format(size - keep) + tail
+
+
+def dedupe_tracebacks(errors: str) -> str:
+	"""
+	Replace tracebacks that already appeared earlier in the text by a one-line reference.
+
+	Tracebacks are compared after masking volatile parts such as the temporary
+	script name and memory addresses, so the same failure on another retry is
+	recognised as a repeat.
+
+	Args:
+		errors (str): Accumulated error messages
+
+	Returns:
+		str: The errors with repeated tracebacks collapsed
+	"""
+	seen = set()
+
+	def replace(match: re.Match) -> str:
+		block = match.group(0)
+		key = block
+		for pattern, replacement in _VOLATILE_RE:
+			key = pattern.sub(replacement, key)
+
+		if key in seen:
+			return f"[Same traceback as above: {block.splitlines()[-1].strip()}]"
+		seen.add(key)
+		return block
+
+	return _TRACEBACK_RE.sub(replace, errors)
+
+
+def context_budget(
+	genner: Genner, max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS
+) -> int:
+	"""
+	Get the number of prompt tokens a genner may be sent.
+
+	This is the model's context window minus the tokens reserved for the
+	completion, capped at `max_prompt_tokens`.
+
+	Args:
+		genner (Genner): The genner the prompt is sent to, wrappers are unwrapped
+		max_prompt_tokens (int): Upper bound regardless of the context window
+
+	Returns:
+		int: The prompt token budget
+	"""
+	while hasattr(genner, "genner"):
+		genner = genner.genner
+
+	config = getattr(genner, "config", None)
+	model = getattr(config, "model", None) or ""
+	completion_tokens = getattr(config, "max_tokens", 0) or 0
+
+	context_tokens = MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+	return max(min(context_tokens - completion_tokens, max_prompt_tokens), 0)
+
+
+class PromptBudget:
+	"""
+	Keeps the variable sections of a prompt within a token budget.
+
+	The largest section is trimmed first, down to at least
+	`min_section_tokens`, until the whole prompt fits.
+	"""
+
+	def __init__(self, min_section_tokens: int = 256):
+		"""
+		Initialize the budget manager.
+
+		Args:
+			min_section_tokens (int): Sections are never trimmed below this size
+		"""
+		self.min_section_tokens = min_section_tokens
+
+	def fit_sections(self, sections: Dict[str, str], budget: int) -> Dict[str, str]:
+		"""
+		Trim the largest sections until their total fits in `budget` tokens.
+
+		Args:
+			sections (Dict[str, str]): Section name to text
+			budget (int): Token budget of all sections together
+
+		Returns:
+			Dict[str, str]: The sections, trimmed where needed
+		"""
+		sections = dict(sections)
+		sizes = {name: count_tokens(text) for name, text in sections.items()}
+
+		while sum(sizes.values()) > budget:
+			name = max(sizes, key=lambda k: sizes[k])
+			size = sizes[name]
+			if size <= self.min_section_tokens:
+				logger.warning(
+					f"Prompt sections still {sum(sizes.values()) - budget} tokens over budget after trimming"
+				)
+				break
+
+			target = max(self.min_section_tokens, size - (sum(sizes.values()) - budget))
+			trimmed = truncate_middle(sections[name], target)
+			trimmed_size = count_tokens(trimmed)
+			if trimmed_size >= size:
+				break
+
+			sections[name], sizes[name] = trimmed, trimmed_size
+			logger.info(
+				f"Trimmed prompt section `{name}` from {size} to {sizes[name]} tokens"
+			)
+
+		return sections
+
+	def fit(
+		self,
+		render: Callable[[Dict[str, str]], str],
+		sections: Dict[str, str],
+		budget: int,
+	) -> str:
+		"""
+		Render a prompt whose variable sections are trimmed to fit in `budget` tokens.
+
+		Args:
+			render (Callable[[Dict[str, str]], str]): Renders the prompt from the sections
+			sections (Dict[str, str]): Section name to text
+			budget (int): Token budget of the whole rendered prompt
+
+		Returns:
+			str: The rendered prompt
+		"""
+		overhead = count_tokens(render({name: "" for name in sections}))
+		return render(self.fit_sections(sections, budget - overhead))
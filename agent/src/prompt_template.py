@@ -0,0 +1,152 @@
+import ast
+import json
+import threading
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# Rendered stable prefixes kept per template
+MAX_CACHED_PREFIXES = 32
+
+# A literal followed by the field rendered after it, (name, format spec, conversion)
+Segment = Tuple[str, Optional[Tuple[str, str, Optional[str]]]]
+
+
+class PromptTemplate:
+	"""
+	A `str.format` template parsed once into literal and field segments.
+
+	Rendering joins the segments instead of parsing the template again, a
+	template without fields is rendered once, and the stable prefixes
+	rendered by `prefix` are cached. Templates are immutable, so a compiled
+	template is shared by every agent using the same prompt text.
+	"""
+
+	__slots__ = ("text", "segments", "fields", "_static", "_prefixes", "_lock")
+
+	def __init__(self, text: str):
+		"""
+		Parse a template.
+
+		Args:
+			text (str): The template, in the `str.format` syntax with named fields
+
+		Raises:
+			ValueError: If the template is malformed or has positional, indexed or attribute fields
+		"""
+		segments: List[Segment] = []
+		fields: List[str] = []
+
+		for literal, field, format_spec, conversion in Formatter().parse(text):
+			if field is None:
+				segments.append((literal, None))
+				continue
+			if not field.isidentifier():
+				raise ValueError(
+					f"Unsupported placeholder {{{field}}} in prompt template"
+				)
+			if format_spec and "{" in format_spec:
+				raise ValueError(
+					f"Nested placeholder in the format spec of {{{field}}}"
+				)
+
+			segments.append((literal, (field, format_spec or "", conversion)))
+			if field not in fields:
+				fields.append(field)
+
+		self.text = text
+		self.segments: Tuple[Segment, ...] = tuple(segments)
+		self.fields: FrozenSet[str] = frozenset(fields)
+		self._static: Optional[str] = None if fields else self._join(segments, {})
+		self._prefixes: Dict[Tuple[Tuple[str, str], ...], str] = {}
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _join(segments, values: Dict[str, Any], stop_at_missing: bool = False) -> str:
+		parts = []
+		for literal, field in segments:
+			parts.append(literal)
+			if field is None:
+				continue
+
+			name, format_spec, conversion = field
+			if name not in values:
+				if stop_at_missing:
+					break
+				raise KeyError(name)
+
+			value = values[name]
+			if conversion == "r":
+				value = repr(value)
+			elif conversion == "s":
+				value = str(value)
+			elif conversion == "a":
+				value = ascii(value)
+			if type(value) is not str or format_spec:
+				value = format(value, format_spec)
+			parts.append(value)
+
+		return "".join(parts)
+
+	def render(self, **values: Any) -> str:
+		"""
+		Render the template, as `text.format(**values)` would.
+
+		Raises:
+			KeyError: If a field of the template has no value
+		"""
+		if self._static is not None:
+			return self._static
+		return self._join(self.segments, values)
+
+	def prefix(self, **stable_values: str) -> str:
+		"""
+		Render the template up to its first field without a value.
+
+		Args:
+			**stable_values (str): Values of the fields that do not change between cycles
+
+		Returns:
+			str: The rendered leading part of the template
+		"""
+		key = tuple(
+			sorted((k, v) for k, v in stable_values.items() if k in self.fields)
+		)
+		with self._lock:
+			prefix = self._prefixes.get(key)
+			if prefix is None:
+				if len(self._prefixes) >= MAX_CACHED_PREFIXES:
+					self._prefixes.pop(next(iter(self._prefixes)))
+				prefix = self._prefixes[key] = self._join(
+					self.segments, dict(key), stop_at_missing=True
+				)
+		return prefix
+
+
+@lru_cache(maxsize=256)
+def compile_template(text: str) -> PromptTemplate:
+	"""Get the compiled template of a prompt text, shared by every caller with the same text."""
+	return PromptTemplate(text)
+
+
+def parse_metric_state(metric_state: str) -> Any:
+	"""
+	Parse a metric state rendered with `str` or `json.dumps` back into a value.
+
+	Only literals are accepted, so the state is never executed.
+
+	Args:
+		metric_state (str): The rendered state, usually a dictionary
+
+	Returns:
+		Any: The parsed value, None if it is not a literal
+	"""
+	try:
+		return ast.literal_eval(metric_state.strip())
+	except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+		pass
+
+	try:
+		return json.loads(metric_state)
+	except (ValueError, TypeError, RecursionError):
+		return None
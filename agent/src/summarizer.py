@@ -1,10 +1,25 @@
-from functools import partial
-from typing import Callable, List, Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
 
 from src.genner.Base import Genner
+from src.genner.Extract import parse_response
+from src.genner.Metrics import set_llm_phase
 from src.custom_types import ChatHistory, Message
 
 
+def _format_talking_points(talking_points: List[str]) -> str:
+	"""Format talking points with bullet points for better readability."""
+	return "\n• " + "\n• ".join(
+		point.strip() for point in talking_points if point.strip()
+	)
+
+
 def summarize(
 	genner: "Genner",
 	talking_points: List[str],
@@ -33,10 +48,7 @@ def summarize(
 	if not all(isinstance(point, str) for point in talking_points):
 		raise ValueError("All talking points must be strings")
 
-	# Format talking points with bullet points for better readability
-	talking_points_formatted = "\n• " + "\n• ".join(
-		point.strip() for point in talking_points if point.strip()
-	)
+	talking_points_formatted = _format_talking_points(talking_points)
 
 	# Create the chat history with the formatted prompt
 	chat_history = ChatHistory(
@@ -68,11 +80,309 @@ def summarize(
 	raise Exception("Failed to generate valid summary")
 
 
+DEFAULT_SUMMARIZER_TEMPLATE = "Please summarize the following points:"
+
+BATCH_INSTRUCTION = (
+	"Summarize each of the {count} items below on its own, in 1 single sentence or more. "
+	"Answer with one block per item, in order, from <summary_1></summary_1> "
+	"to <summary_{count}></summary_{count}>, and nothing else."
+)
+
+
+def _summary_key(template: str, talking_points: List[str]) -> str:
+	"""Hash the template and talking points into the key of their summary."""
+	digest = hashlib.sha256(template.encode())
+	for point in talking_points:
+		digest.update(b"\x00" + point.encode())
+	return digest.hexdigest()
+
+
+class SummarizerService:
+	"""
+	Summarizer that batches requests into single completions and caches the results.
+
+	Requests submitted with `submit` are queued and summarized by a background
+	thread, which groups the requests pending at that time, up to `max_batch`,
+	into one completion asking for one tagged summary per item. Summaries are
+	cached by the hash of their talking points, and identical requests pending
+	at the same time share one summary.
+
+	Calling the service directly summarizes synchronously, so it can be used
+	wherever a `Callable[[List[str]], str]` summarizer is expected.
+	"""
+
+	def __init__(
+		self,
+		genner: Genner,
+		template: str = DEFAULT_SUMMARIZER_TEMPLATE,
+		max_retries: int = 3,
+		max_batch: int = 8,
+		batch_window_s: float = 0.2,
+		cache_size: int = 512,
+	):
+		"""
+		Initialize the summarizer service.
+
+		Args:
+			genner (Genner): The genner used for summaries, a cheaper model than the agent's will do
+			template (str): System prompt of the summary requests
+			max_retries (int): Maximum number of attempts of every item
+			max_batch (int): Maximum number of items summarized in one completion
+			batch_window_s (float): How long the worker waits for more items before a completion
+			cache_size (int): Maximum number of cached summaries
+		"""
+		self.genner = genner
+		self.template = template
+		self.max_retries = max_retries
+		self.max_batch = max_batch
+		self.batch_window_s = batch_window_s
+		self.cache_size = cache_size
+
+		self._cache: OrderedDict[str, str] = OrderedDict()
+		# Key, talking points and future of every queued or running item
+		self._pending: OrderedDict[str, Tuple[List[str], Future]] = OrderedDict()
+		self._cond = threading.Condition()
+		self._worker: Optional[threading.Thread] = None
+
+	def __call__(self, talking_points: List[str]) -> str:
+		"""
+		Summarize talking points, waiting for the result.
+
+		Raises:
+			Exception: If the summarization fails after max_retries attempts
+		"""
+		return self.submit(talking_points).result()
+
+	def submit(self, talking_points: List[str]) -> "Future[str]":
+		"""
+		Queue talking points to be summarized in the background.
+
+		Args:
+			talking_points (List[str]): The points to summarize together
+
+		Returns:
+			Future[str]: The summary, or the exception of the failed summarization
+
+		Raises:
+			ValueError: If talking_points is empty or contains invalid data
+		"""
+		if not talking_points:
+			raise ValueError("talking_points cannot be empty")
+
+		if not all(isinstance(point, str) for point in talking_points):
+			raise ValueError("All talking points must be strings")
+
+		key = _summary_key(self.template, talking_points)
+
+		with self._cond:
+			if key in self._cache:
+				self._cache.move_to_end(key)
+				future: Future = Future()
+				future.set_result(self._cache[key])
+				return future
+
+			if key in self._pending:
+				return self._pending[key][1]
+
+			future = Future()
+			self._pending[key] = (list(talking_points), future)
+
+			if self._worker is None or not self._worker.is_alive():
+				self._worker = threading.Thread(
+					target=self._run, name="summarizer", daemon=True
+				)
+				self._worker.start()
+			self._cond.notify()
+
+		return future
+
+	def flush(self, timeout: Optional[float] = None) -> bool:
+		"""
+		Wait for the queued summaries to finish.
+
+		Args:
+			timeout (float | None): Maximum seconds to wait, None to wait as long as needed
+
+		Returns:
+			bool: Whether the queue is empty
+		"""
+		deadline = None if timeout is None else time.monotonic() + timeout
+
+		with self._cond:
+			while self._pending:
+				remaining = None if deadline is None else deadline - time.monotonic()
+				if remaining is not None and remaining <= 0:
+					return False
+				self._cond.wait(remaining)
+			return True
+
+	def backfill_strategy(
+		self,
+		db: Any,
+		strategy_id: Optional[str],
+		full_desc: str,
+		parameters: Dict[str, Any],
+		parameter_points: Dict[str, List[str]] = {},
+	) -> Optional[Future]:
+		"""
+		Summarize a saved strategy in the background and write the summaries back.
+
+		Args:
+			db (DBInterface): Database holding the strategy
+			strategy_id (str | None): ID of the strategy, nothing is done if None
+			full_desc (str): The full strategy, summarized into `summarized_desc`
+			parameters (Dict[str, Any]): The strategy's parameters, saved again with the summaries
+			parameter_points (Dict[str, List[str]]): Talking points to summarize into each parameter
+
+		Returns:
+			Future | None: Future of the update, None if the summaries could not be written back
+		"""
+		if strategy_id is None:
+			logger.error("The strategy has no ID, its summaries will not be backfilled")
+			return None
+
+		if not db.supports_strategy_summary_updates():
+			logger.warning(
+				f"The database cannot update strategy {strategy_id}, its summaries will not be backfilled"
+			)
+			return None
+
+		futures = {
+			name: self.submit(points) for name, points in parameter_points.items()
+		}
+		desc_future = self.submit([full_desc])
+		done: Future = Future()
+		remaining = [len(futures) + 1]
+		lock = threading.Lock()
+
+		def write_back(_: Future):
+			with lock:
+				remaining[0] -= 1
+				if remaining[0]:
+					return
+
+			try:
+				summaries = {name: future.result() for name, future in futures.items()}
+				summarized_desc = desc_future.result()
+				done.set_result(
+					db.update_strategy_summary(
+						strategy_id, summarized_desc, {**parameters, **summaries}
+					)
+				)
+				logger.info(f"Backfilled the summaries of strategy {strategy_id}")
+			except Exception as e:
+				logger.error(
+					f"Failed to backfill the summaries of strategy {strategy_id}: {e}"
+				)
+				done.set_exception(e)
+
+		for future in [*futures.values(), desc_future]:
+			future.add_done_callback(write_back)
+
+		return done
+
+	def _run(self):
+		"""Summarize queued items batch by batch, until the queue stays empty."""
+		set_llm_phase("summarize")
+
+		while True:
+			with self._cond:
+				if not self._pending:
+					self._cond.wait(self.batch_window_s)
+					if not self._pending:
+						self._worker = None
+						return
+
+				# Give the other items of the same cycle a chance to join the batch
+				deadline = time.monotonic() + self.batch_window_s
+				while len(self._pending) < self.max_batch:
+					remaining = deadline - time.monotonic()
+					if remaining <= 0:
+						break
+					self._cond.wait(remaining)
+
+				batch = list(self._pending.items())[: self.max_batch]
+
+			for key, summary in self._summarize_batch(batch).items():
+				with self._cond:
+					_, future = self._pending.pop(key)
+					if isinstance(summary, Exception):
+						future.set_exception(summary)
+					else:
+						self._cache[key] = summary
+						if len(self._cache) > self.cache_size:
+							self._cache.popitem(last=False)
+						future.set_result(summary)
+					self._cond.notify_all()
+
+	def _summarize_batch(
+		self, batch: List[Tuple[str, Tuple[List[str], Future]]]
+	) -> Dict[str, str | Exception]:
+		"""Summarize a batch, retrying the items missing from the response on their own."""
+		results: Dict[str, str | Exception] = {}
+		todo = batch
+
+		for attempt in range(self.max_retries):
+			if len(todo) == 1:
+				key, (talking_points, _) = todo[0]
+				try:
+					results[key] = summarize(
+						self.genner,
+						talking_points,
+						self.template,
+						self.max_retries - attempt,
+					)
+				except Exception as e:
+					results[key] = e
+				return results
+
+			items = "\n".join(
+				f"<item_{i}>{_format_talking_points(points)}\n</item_{i}>"
+				for i, (_, (points, _)) in enumerate(todo, start=1)
+			)
+			chat_history = ChatHistory(
+				[
+					Message(role="system", content=self.template),
+					Message(
+						role="user",
+						content=BATCH_INSTRUCTION.format(count=len(todo))
+						+ "\n\n"
+						+ items,
+					),
+				]
+			)
+
+			missing = []
+			try:
+				response = self.genner.ch_completion(chat_history).unwrap()
+				parsed = parse_response(response)
+			except Exception as e:
+				logger.warning(f"Batch summarization of {len(todo)} items failed: {e}")
+				parsed = None
+
+			for i, item in enumerate(todo, start=1):
+				summary = parsed.block(f"summary_{i}") if parsed else ""
+				if summary:
+					results[item[0]] = summary
+				else:
+					missing.append(item)
+
+			if not missing:
+				return results
+			todo = missing
+
+		for key, _ in todo:
+			results[key] = Exception(
+				f"Failed to generate summary after {self.max_retries} attempts"
+			)
+		return results
+
+
 def get_summarizer(
 	genner: "Genner", custom_template: Optional[str] = None, max_retries: int = 3
-) -> Callable[[List[str]], str]:
+) -> SummarizerService:
 	"""
-	Create a partial function for summarization with predefined parameters.
+	Create a summarizer service with predefined parameters.
 
 	Args:
 	    genner: An instance of the Genner class
@@ -80,18 +390,15 @@ def get_summarizer(
 	    max_retries: Maximum number of retry attempts for failed generations
 
 	Returns:
-	    Callable: A function that takes a list of strings and returns a summary
+	    SummarizerService: A callable that takes a list of strings and returns a summary
 
 	Example:
 	    >>> summarizer = get_summarizer(genner)
 	    >>> summary = summarizer(["Point 1", "Point 2", "Point 3"])
 	"""
 
-	return partial(
-		summarize,
+	return SummarizerService(
 		genner,
-		template=custom_template
-		if custom_template
-		else "Please summarize the following points:\n{to_summarize}",
+		template=custom_template if custom_template else DEFAULT_SUMMARIZER_TEMPLATE,
 		max_retries=max_retries,
 	)
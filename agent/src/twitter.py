@@ -1,11 +1,34 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 import random
-from typing import Any, List, TypeGuard
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, TypeGuard
 
 from loguru import logger
 import tweepy
 from result import Err, Ok, Result
 
+from src.twitter_rate_limit import (
+	PRIORITY_LOW,
+	EndpointBudget,
+	RateLimitExceeded,
+	call_priority,
+	endpoint_key,
+)
+
+# Follower timelines fetched at the same time
+DEFAULT_FANOUT_CONCURRENCY = 8
+
+# Longest wait for the timeline of one follower once its request started
+DEFAULT_FOLLOWER_TIMEOUT_S = 10.0
+
+# Seconds the recent tweets of a user are reused before being fetched again
+DEFAULT_USER_TWEETS_TTL_S = 300.0
+
+# How often the fan-out checks its running requests for timeouts
+FANOUT_POLL_S = 0.1
+
 
 @dataclass
 class TweetData:
@@ -84,18 +107,58 @@ class TweepyTwitterClient:
 	This class provides a comprehensive interface to Twitter's functionality,
 	including posting tweets, replying, liking, retweeting, and retrieving
 	information about tweets and accounts.
+
+	Built with a `RateLimitedClient`, its calls share the rate limit budget
+	of the process and fail fast with an Err instead of sleeping on a 429.
 	"""
 
-	def __init__(self, client: tweepy.Client, api_client: tweepy.API):
+	def __init__(
+		self,
+		client: tweepy.Client,
+		api_client: tweepy.API,
+		fanout_concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+		follower_timeout_s: float = DEFAULT_FOLLOWER_TIMEOUT_S,
+		user_tweets_ttl_s: float = DEFAULT_USER_TWEETS_TTL_S,
+	):
 		"""
 		Initialize the Twitter client with Tweepy clients.
 
 		Args:
 		    client (tweepy.Client): The Tweepy Client instance for v2 API access
 		    api_client (tweepy.API): The Tweepy API instance for v1.1 API access
+		    fanout_concurrency (int): Follower timelines fetched at the same time
+		    follower_timeout_s (float): Longest wait for the timeline of one follower
+		    user_tweets_ttl_s (float): Seconds the recent tweets of a user are reused, 0 disables reuse
 		"""
 		self.client = client
 		self.api_client = api_client
+		self.fanout_concurrency = fanout_concurrency
+		self.follower_timeout_s = follower_timeout_s
+		self.user_tweets_ttl_s = user_tweets_ttl_s
+		self._me_id: Optional[str] = None
+		# (user id, since id, max results) -> (expiry, tweets)
+		self._user_tweets: Dict[
+			Tuple[str, Optional[str], int], Tuple[float, List[TweetData]]
+		] = {}
+		self._user_tweets_lock = threading.Lock()
+
+	def get_rate_limit_budget(
+		self, method: str, route: str
+	) -> Optional[EndpointBudget]:
+		"""
+		Get the remaining rate limit budget of an endpoint.
+
+		Args:
+		    method (str): HTTP method of the endpoint, e.g. "GET"
+		    route (str): Route of the endpoint, e.g. "/2/users/:id/tweets"
+
+		Returns:
+		    Optional[EndpointBudget]: The budget, None if the client is not rate limited
+		"""
+		rate_limiter = getattr(self.client, "rate_limiter", None)
+		if rate_limiter is None:
+			return None
+		return rate_limiter.budget(endpoint_key(method, route))
 
 	def get_count_of_me_likes(self) -> Result[int, str]:
 		"""
@@ -376,6 +439,10 @@ class TweepyTwitterClient:
 		        - Ok with the user's ID as a string on success
 		        - Err with error message on failure
 		"""
+		# The ID of an account never changes, it is looked up once
+		if self._me_id is not None:
+			return Ok(self._me_id)
+
 		try:
 			get_me_data = self.client.get_me()
 
@@ -392,7 +459,8 @@ class TweepyTwitterClient:
 		except Exception as e:
 			return Err(f"TweepyTwitterClient.get_me_id: {e}")
 
-		return Ok(str(get_me_data.data.id))
+		self._me_id = str(get_me_data.data.id)
+		return Ok(self._me_id)
 
 	def get_tweet(self, tweet_id: str) -> Result[TweetData, str]:
 		"""
@@ -510,9 +578,10 @@ class TweepyTwitterClient:
 			try:
 				response = self.client.get_users_followers(
 					id=me_id,
-					max_results=100,  # Max per request (100 for standard tier)
+					# Max per request (100 for standard tier), no more than needed
+					max_results=max(1, min(100, max_results - len(followers))),
 					pagination_token=pagination_token,
-					user_fields=["username", "name", "created_at"],
+					user_fields=["username", "name", "created_at", "public_metrics"],
 				)
 
 				assert isinstance(response, tweepy.Response), (
@@ -536,13 +605,13 @@ class TweepyTwitterClient:
 
 		data = [
 			AccountData(
-				id=str(f.id()),
+				id=str(f.id),
 				username=str(f.username),
-				followers_count=int(f.public_metrics.followers_count),
+				followers_count=int(f.public_metrics["followers_count"]),
 			)
-			for f in followers
+			for f in followers[:max_results]
 		]
-		data = random.sample(data, sample) if sample else data
+		data = random.sample(data, min(sample, len(data))) if sample else data
 
 		return Ok(data)
 
@@ -592,9 +661,87 @@ class TweepyTwitterClient:
 		logger.info(f"Followers count: {followers_count}")
 		return Ok(followers_count)
 
+	def get_recent_tweets_of_user(
+		self, user_id: str, max_results: int = 5, since_id: Optional[str] = None
+	) -> Result[List[TweetData], str]:
+		"""
+		Get the recent tweets of a user, reusing a fetch younger than the TTL.
+
+		Args:
+		    user_id (str): ID of the user
+		    max_results (int): Maximum number of tweets, from 5 to 100
+		    since_id (Optional[str]): Only get tweets newer than this tweet ID
+
+		Returns:
+		    Result[List[TweetData], str]:
+		        - Ok with the tweets, newest first, on success
+		        - Err with error message on failure
+
+		Raises:
+		    RateLimitExceeded: If the timeline endpoint has no budget left
+		"""
+		key = (user_id, since_id, max_results)
+		with self._user_tweets_lock:
+			cached = self._user_tweets.get(key)
+		if cached is not None and cached[0] > time.monotonic():
+			return Ok(cached[1])
+
+		try:
+			response = self.client.get_users_tweets(
+				id=user_id,
+				max_results=max_results,
+				since_id=since_id,
+				tweet_fields=["created_at"],
+			)
+			assert isinstance(response, tweepy.Response), (
+				"Response is not a tweepy.Response"
+			)
+		except RateLimitExceeded:
+			raise
+		except AssertionError as e:
+			return Err(f"TweepyTwitterClient.get_recent_tweets_of_user: {e}")
+		except Exception as e:
+			return Err(f"TweepyTwitterClient.get_recent_tweets_of_user: {e}")
+
+		# A user without recent tweets has no data, which is cached too
+		tweets = [
+			TweetData(id=str(tweet.id), text=tweet.text, created_at=tweet.created_at)
+			for tweet in response.data or []
+		]
+
+		if self.user_tweets_ttl_s > 0:
+			now = time.monotonic()
+			with self._user_tweets_lock:
+				# Expired entries are dropped as new ones come in
+				for stale in [
+					k for k, (expiry, _) in self._user_tweets.items() if expiry <= now
+				]:
+					del self._user_tweets[stale]
+				self._user_tweets[key] = (now + self.user_tweets_ttl_s, tweets)
+
+		return Ok(tweets)
+
 	def get_recent_tweets_of_followers(
-		self, max_per_user: int = 5
+		self, max_per_user: int = 5, since_id: Optional[str] = None
 	) -> Result[List[TweetData], str]:
+		"""
+		Get the recent tweets of a sample of followers.
+
+		Timelines are fetched concurrently, up to `fanout_concurrency` at a
+		time. A follower whose request fails or takes longer than
+		`follower_timeout_s` is skipped, and once the rate limit budget is
+		exhausted the remaining followers are skipped, keeping the tweets
+		fetched so far.
+
+		Args:
+		    max_per_user (int): Maximum number of tweets per follower
+		    since_id (Optional[str]): Only get tweets newer than this tweet ID
+
+		Returns:
+		    Result[List[TweetData], str]:
+		        - Ok with the tweets, grouped by follower in sample order
+		        - Err with the errors if no tweet could be fetched
+		"""
 		followers_result = self.sample_my_followers()
 
 		if err := followers_result.err():
@@ -603,36 +750,87 @@ class TweepyTwitterClient:
 			)
 
 		followers = followers_result.unwrap()
-		all_tweets = []
+		tweets_by_follower: Dict[int, List[TweetData]] = {}
 		errors = []
 
-		for follower in followers:
-			try:
-				response = self.client.get_users_tweets(
-					id=follower.id,
-					max_results=max_per_user,
-					tweet_fields=["created_at"],
-				)
-				assert isinstance(response, tweepy.Response), (
-					"Response is not a tweepy.Response"
+		executor = ThreadPoolExecutor(
+			max_workers=max(1, self.fanout_concurrency),
+			thread_name_prefix="twitter-fanout",
+		)
+		started_at: Dict[int, float] = {}
+
+		def fetch(index: int) -> Result[List[TweetData], str]:
+			started_at[index] = time.monotonic()
+			# Background sampling, other calls of the timeline endpoint go first
+			with call_priority(PRIORITY_LOW):
+				return self.get_recent_tweets_of_user(
+					followers[index].id, max_per_user, since_id
 				)
-				assert response.data is not None
-			except AssertionError as e:
-				logger.error(f"Error fetching tweets for follower {follower.id}: {e}")
-				errors.append(f"Error fetching tweets for follower {follower.id}: {e}")
-				continue
-			except Exception as e:
-				errors.append(f"Error fetching tweets for follower {follower.id}: {e}")
-				logger.error(f"Error fetching tweets for follower {follower.id}: {e}")
-				continue
 
-			follower_tweets = [
-				TweetData(
-					id=str(tweet.id), text=tweet.text, created_at=tweet.created_at
+		pending: Dict[Future, int] = {
+			executor.submit(fetch, index): index for index in range(len(followers))
+		}
+		# Bounds the whole fan-out, should abandoned requests hold every worker
+		rounds = -(-len(followers) // max(1, self.fanout_concurrency))
+		deadline = time.monotonic() + self.follower_timeout_s * (rounds + 1)
+		rate_limited = False
+		try:
+			while pending:
+				done, _ = wait(
+					pending, timeout=FANOUT_POLL_S, return_when=FIRST_COMPLETED
 				)
-				for tweet in response.data
-			]
-			all_tweets.extend(follower_tweets)
+
+				for future in done:
+					index = pending.pop(future)
+					try:
+						result = future.result()
+					except RateLimitExceeded as e:
+						if not rate_limited:
+							logger.warning(f"Stopping follower tweets fetch: {e}")
+							errors.append(f"Stopped fetching tweets of followers: {e}")
+						rate_limited = True
+						continue
+					except Exception as e:
+						result = Err(str(e))
+
+					if err := result.err():
+						logger.error(
+							f"Error fetching tweets for follower {followers[index].id}: {err}"
+						)
+						errors.append(
+							f"Error fetching tweets for follower {followers[index].id}: {err}"
+						)
+						continue
+					tweets_by_follower[index] = result.unwrap()
+
+				if rate_limited:
+					# Followers not started yet would fail the same way, those in flight are still collected
+					for future in list(pending):
+						if future.cancel():
+							del pending[future]
+
+				# Requests cannot be cancelled, a slow one is abandoned to its thread
+				now = time.monotonic()
+				for future, index in list(pending.items()):
+					if now > deadline or (
+						index in started_at
+						and now - started_at[index] > self.follower_timeout_s
+					):
+						del pending[future]
+						logger.warning(
+							f"Timed out fetching tweets for follower {followers[index].id}"
+						)
+						errors.append(
+							f"Timed out after {self.follower_timeout_s}s fetching tweets for follower {followers[index].id}"
+						)
+		finally:
+			executor.shutdown(wait=False, cancel_futures=True)
+
+		all_tweets = [
+			tweet
+			for index in sorted(tweets_by_follower)
+			for tweet in tweets_by_follower[index]
+		]
 
 		if len(all_tweets) == 0 and len(errors) > 0:
 			formatted_err = "\n".join(errors)
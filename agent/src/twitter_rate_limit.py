@@ -0,0 +1,246 @@
+import contextvars
+import heapq
+import itertools
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, Mapping, Optional
+
+import tweepy
+from loguru import logger
+
+# Lower values are served first when calls wait for the budget of the same endpoint
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Priority of the calls made in the current context, see `call_priority`
+_call_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+	"twitter_call_priority", default=PRIORITY_NORMAL
+)
+
+# Longest a call waits for budget before failing, instead of stalling the flow
+DEFAULT_MAX_WAIT_S = 30.0
+
+# Window assumed when a 429 response carries no reset header
+DEFAULT_RETRY_AFTER_S = 60.0
+
+# Numeric path segments after the API version, e.g. the user ID of /2/users/123/mentions
+_ID_SEGMENT = re.compile(r"(?<=.)/\d+(?=/|$)")
+
+
+def endpoint_key(method: str, route: str) -> str:
+	"""Get the rate limit key of a request, with the IDs in its route replaced by `:id`."""
+	return f"{method.upper()} {_ID_SEGMENT.sub('/:id', route)}"
+
+
+@contextmanager
+def call_priority(priority: int) -> Iterator[None]:
+	"""
+	Give a priority to the Twitter calls made within the block.
+
+	Calls of an endpoint waiting for its budget are served by priority, so
+	e.g. a background fan-out marked PRIORITY_LOW does not delay other calls.
+
+	Args:
+		priority (int): Priority of the calls, PRIORITY_HIGH to PRIORITY_LOW
+	"""
+	token = _call_priority.set(priority)
+	try:
+		yield
+	finally:
+		_call_priority.reset(token)
+
+
+class RateLimitExceeded(Exception):
+	"""Raised when an endpoint has no budget left within the allowed wait."""
+
+	def __init__(self, endpoint: str, reset_at: float):
+		self.endpoint = endpoint
+		self.reset_at = reset_at
+		super().__init__(
+			f"Rate limit of {endpoint} exhausted, budget resets in "
+			f"{max(0.0, reset_at - time.time()):.0f}s"
+		)
+
+
+@dataclass
+class EndpointBudget:
+	"""
+	Rate limit budget of an endpoint, as last reported by the API.
+
+	Attributes:
+		limit (int | None): Calls allowed per window, None until a response reported it
+		remaining (int | None): Calls left in the current window, None if unknown
+		reset_at (float): Epoch time the window resets
+	"""
+
+	limit: Optional[int] = None
+	remaining: Optional[int] = None
+	reset_at: float = 0.0
+
+	def is_available(self, now: float) -> bool:
+		"""Whether a call can be made now."""
+		return self.remaining is None or self.remaining > 0 or now >= self.reset_at
+
+
+class TwitterRateLimiter:
+	"""
+	Token bucket per Twitter endpoint, filled from the rate limit headers.
+
+	Each call takes a token from the bucket of its endpoint. Once a bucket
+	is empty, calls wait for the window to reset, highest priority first,
+	and fail with RateLimitExceeded if that takes longer than `max_wait_s`.
+	"""
+
+	def __init__(self, max_wait_s: float = DEFAULT_MAX_WAIT_S):
+		"""
+		Initialize the limiter.
+
+		Args:
+			max_wait_s (float): Longest a call waits for budget
+		"""
+		self.max_wait_s = max_wait_s
+		self._budgets: Dict[str, EndpointBudget] = {}
+		self._waiting: Dict[str, list] = {}
+		self._tickets = itertools.count()
+		self._condition = threading.Condition()
+
+	def budget(self, endpoint: str) -> EndpointBudget:
+		"""Get a copy of the budget of an endpoint, unknown if it was never called."""
+		with self._condition:
+			return replace(self._budgets.get(endpoint, EndpointBudget()))
+
+	def acquire(
+		self,
+		endpoint: str,
+		priority: Optional[int] = None,
+		max_wait_s: Optional[float] = None,
+	):
+		"""
+		Take a token for a call, waiting for the window to reset if needed.
+
+		Args:
+			endpoint (str): Key of the endpoint, see `endpoint_key`
+			priority (int | None): Priority of the call, that of `call_priority` if None
+			max_wait_s (float | None): Longest wait for this call, the limiter default if None
+
+		Raises:
+			RateLimitExceeded: If no token is available within the wait
+		"""
+		if priority is None:
+			priority = _call_priority.get()
+		deadline = time.time() + (self.max_wait_s if max_wait_s is None else max_wait_s)
+		ticket = (priority, next(self._tickets))
+
+		with self._condition:
+			budget = self._budgets.setdefault(endpoint, EndpointBudget())
+			queue = self._waiting.setdefault(endpoint, [])
+			heapq.heappush(queue, ticket)
+			try:
+				while True:
+					now = time.time()
+					available = budget.is_available(now)
+					if available and queue[0] == ticket:
+						break
+
+					wake_at = deadline if available else min(budget.reset_at, deadline)
+					if (
+						not available and budget.reset_at > deadline
+					) or now >= deadline:
+						raise RateLimitExceeded(endpoint, budget.reset_at)
+					self._condition.wait(timeout=max(0.0, wake_at - now))
+
+				if budget.remaining is not None:
+					if budget.remaining <= 0:
+						# The window reset, the next response reports the exact budget
+						budget.remaining = budget.limit
+					if budget.remaining is not None:
+						budget.remaining -= 1
+						if budget.remaining == 0:
+							logger.warning(
+								f"TwitterRateLimiter: last call of {endpoint} until the window resets"
+							)
+			finally:
+				queue.remove(ticket)
+				heapq.heapify(queue)
+				self._condition.notify_all()
+
+	def update(
+		self, endpoint: str, headers: Mapping[str, str], exhausted: bool = False
+	):
+		"""
+		Record the budget reported by a response.
+
+		Args:
+			endpoint (str): Key of the endpoint the response came from
+			headers (Mapping[str, str]): Response headers, with the x-rate-limit-* values
+			exhausted (bool): Whether the response was a 429
+		"""
+		with self._condition:
+			budget = self._budgets.setdefault(endpoint, EndpointBudget())
+			try:
+				if "x-rate-limit-limit" in headers:
+					budget.limit = int(headers["x-rate-limit-limit"])
+				if "x-rate-limit-remaining" in headers:
+					budget.remaining = int(headers["x-rate-limit-remaining"])
+				if "x-rate-limit-reset" in headers:
+					budget.reset_at = float(headers["x-rate-limit-reset"])
+			except ValueError as e:
+				logger.warning(
+					f"TwitterRateLimiter: invalid rate limit headers for {endpoint}: {e}"
+				)
+
+			if exhausted:
+				budget.remaining = 0
+				budget.reset_at = max(
+					budget.reset_at, time.time() + DEFAULT_RETRY_AFTER_S
+				)
+			self._condition.notify_all()
+
+
+_rate_limiter: Optional[TwitterRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TwitterRateLimiter:
+	"""Get the limiter shared by every client of the process, Twitter limits being per account."""
+	global _rate_limiter
+	with _rate_limiter_lock:
+		if _rate_limiter is None:
+			_rate_limiter = TwitterRateLimiter()
+		return _rate_limiter
+
+
+class RateLimitedClient(tweepy.Client):
+	"""
+	Tweepy v2 client sending every request through a TwitterRateLimiter.
+
+	Never sleeps on a 429 like `wait_on_rate_limit` does: a call either gets
+	budget within the limiter wait or fails with RateLimitExceeded.
+	"""
+
+	def __init__(
+		self, *args, rate_limiter: Optional[TwitterRateLimiter] = None, **kwargs
+	):
+		kwargs["wait_on_rate_limit"] = False
+		super().__init__(*args, **kwargs)
+		self.rate_limiter = rate_limiter or get_rate_limiter()
+
+	def request(self, method, route, params=None, json=None, user_auth=False):
+		endpoint = endpoint_key(method, route)
+		self.rate_limiter.acquire(endpoint)
+
+		try:
+			response = super().request(method, route, params, json, user_auth)
+		except tweepy.TooManyRequests as e:
+			self.rate_limiter.update(endpoint, e.response.headers, exhausted=True)
+			raise
+		except tweepy.HTTPException as e:
+			self.rate_limiter.update(endpoint, e.response.headers)
+			raise
+
+		self.rate_limiter.update(endpoint, response.headers)
+		return response
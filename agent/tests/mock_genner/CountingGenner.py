@@ -0,0 +1,37 @@
+from typing import List
+
+from result import Err, Ok, Result
+
+from src.custom_types import ChatHistory, Message
+from src.genner.Base import Genner
+
+
+class CountingGenner(Genner):
+	def __init__(self):
+		super().__init__("counting", False)
+		self.calls = 0
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		self.calls += 1
+		return Ok(f"response {self.calls}")
+
+	def generate_code(self, messages: ChatHistory, blocks: List[str] = [""]):
+		return Err("CountingGenner.generate_code: not used in tests")
+
+	def generate_list(self, messages: ChatHistory, blocks: List[str] = [""]):
+		return Err("CountingGenner.generate_list: not used in tests")
+
+	def extract_code(self, response: str, blocks: List[str] = [""]):
+		return Ok([response])
+
+	def extract_list(self, response: str, blocks: List[str] = [""]):
+		return Ok([[response]])
+
+
+def make_history(content: str) -> ChatHistory:
+	return ChatHistory(
+		[
+			Message(role="system", content="You are a helpful assistant."),
+			Message(role="user", content=content),
+		]
+	)
@@ -27,9 +27,7 @@ class MockGenner(Genner):
 		mock_response = "- item1\n- item2\n\n- item3\n- item4"
 		return mock_lists, mock_response
 
-	def extract_code(
-		self, response: str, blocks: List[str] = []
-	) -> List[str]:
+	def extract_code(self, response: str, blocks: List[str] = []) -> List[str]:
 		mock_extracted = response.split("\n")
 		return mock_extracted
 
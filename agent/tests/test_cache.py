@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from src.genner.Cache import CachedGenner, CompletionCache
+from tests.mock_genner.CountingGenner import CountingGenner, make_history
+
+
+class TestCompletionCache(unittest.TestCase):
+	def setUp(self):
+		self.tmp_dir = tempfile.TemporaryDirectory()
+		self.db_path = os.path.join(self.tmp_dir.name, "cache.db")
+
+	def tearDown(self):
+		self.tmp_dir.cleanup()
+
+	def test_read_write_serves_hits(self):
+		backend = CountingGenner()
+		genner = CachedGenner(backend, CompletionCache(self.db_path))
+
+		first = genner.ch_completion(make_history("hello")).unwrap()
+		second = genner.ch_completion(make_history("hello")).unwrap()
+		third = genner.ch_completion(make_history("bye")).unwrap()
+
+		self.assertEqual(first, second)
+		self.assertNotEqual(first, third)
+		self.assertEqual(backend.calls, 2)
+
+	def test_expired_entries_are_refetched(self):
+		backend = CountingGenner()
+		cache = CompletionCache(self.db_path, ttl_seconds=60)
+		genner = CachedGenner(backend, cache)
+
+		genner.ch_completion(make_history("hello"))
+		with sqlite3.connect(self.db_path) as conn:
+			conn.execute(
+				"UPDATE llm_completion_cache SET created_at = created_at - 120"
+			)
+		genner.ch_completion(make_history("hello"))
+
+		self.assertEqual(backend.calls, 2)
+
+	def test_max_entries_evicts_least_recently_used(self):
+		cache = CompletionCache(self.db_path, max_entries=2)
+
+		cache.put("a", "counting", None, "A")
+		cache.put("b", "counting", None, "B")
+		cache.get("a")
+		cache.put("c", "counting", None, "C")
+
+		self.assertEqual(cache.get("a"), "A")
+		self.assertIsNone(cache.get("b"))
+		self.assertEqual(cache.get("c"), "C")
+
+	def test_replay_follows_recorded_order(self):
+		recorder = CachedGenner(
+			CountingGenner(),
+			CompletionCache(self.db_path),
+			mode="record",
+			run_id="cycle",
+		)
+		recorded = [
+			recorder.ch_completion(make_history("today is monday")).unwrap(),
+			recorder.ch_completion(make_history("research")).unwrap(),
+		]
+
+		backend = CountingGenner()
+		replayer = CachedGenner(
+			backend, CompletionCache(self.db_path), mode="replay", run_id="cycle"
+		)
+		replayed = [
+			replayer.ch_completion(make_history("today is tuesday")).unwrap(),
+			replayer.ch_completion(make_history("research")).unwrap(),
+		]
+
+		self.assertEqual(recorded, replayed)
+		self.assertEqual(backend.calls, 0)
+		self.assertTrue(replayer.ch_completion(make_history("extra")).is_err())
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from src.custom_types import Message
+from src.genner.CacheControl import (
+	cached_prompt_tokens,
+	to_cached_native,
+	with_cache_prefix,
+)
+
+
+class TestCacheControl(unittest.TestCase):
+	def test_stable_prefix_is_marked_as_separate_block(self):
+		messages = [
+			with_cache_prefix(
+				Message(role="system", content="APIS\nportfolio: 1 ETH"), "APIS\n"
+			),
+			Message(role="user", content="research"),
+		]
+
+		natives = to_cached_native(messages)
+
+		self.assertEqual(
+			natives[0]["content"],
+			[
+				{
+					"type": "text",
+					"text": "APIS\n",
+					"cache_control": {"type": "ephemeral"},
+				},
+				{"type": "text", "text": "portfolio: 1 ETH"},
+			],
+		)
+		self.assertEqual(
+			natives[1]["content"][0]["cache_control"], {"type": "ephemeral"}
+		)
+
+	def test_breakpoints_keep_system_prefix_and_latest(self):
+		messages = [
+			with_cache_prefix(
+				Message(role=role, content=f"{i} stable {i}"), f"{i} stable"
+			)
+			for i, role in enumerate(
+				["system", "user", "assistant", "user", "assistant"]
+			)
+		]
+
+		natives = to_cached_native(messages, max_breakpoints=3)
+
+		marked = [
+			i
+			for i, native in enumerate(natives)
+			if isinstance(native["content"], list)
+			and any("cache_control" in block for block in native["content"])
+		]
+		self.assertEqual(marked, [0, 4])
+		self.assertEqual(natives[1]["content"], "1 stable 1")
+
+	def test_mismatching_prefix_is_ignored(self):
+		message = with_cache_prefix(Message(role="user", content="changed"), "stale")
+
+		self.assertEqual(
+			to_cached_native([message])[0]["content"][0]["text"], "changed"
+		)
+
+	def test_cached_tokens_are_read_from_usage(self):
+		self.assertEqual(
+			cached_prompt_tokens({"prompt_tokens_details": {"cached_tokens": 7}}), 7
+		)
+		self.assertIsNone(cached_prompt_tokens({"prompt_tokens": 10}))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from src.custom_types import ChatHistory, Message
+
+
+class TestChatHistory(unittest.TestCase):
+	def test_append_shares_log_and_branches_old_histories(self):
+		base = ChatHistory(Message(role="system", content="sys"))
+		first = base.append(Message(role="user", content="a"))
+		second = first.append(Message(role="assistant", content="b"))
+		# base no longer ends at the end of the log, appending to it branches
+		branch = base.append(Message(role="user", content="c"))
+
+		self.assertIs(first._log, second._log)
+		self.assertIsNot(branch._log, first._log)
+		self.assertEqual([m.content for m in base.messages], ["sys"])
+		self.assertEqual([m.content for m in second.messages], ["sys", "a", "b"])
+		self.assertEqual([m.content for m in branch.messages], ["sys", "c"])
+
+	def test_latest_response_and_instruction_follow_the_view(self):
+		history = ChatHistory()
+		self.assertEqual(history.get_latest_response(), "")
+
+		history += ChatHistory(
+			[
+				Message(role="user", content="q1"),
+				Message(role="assistant", content="r1"),
+				Message(role="user", content="q2"),
+			]
+		)
+		longer = history.append(Message(role="assistant", content="r2"))
+
+		self.assertEqual(history.get_latest_response(), "r1")
+		self.assertEqual(history.get_latest_instruction(), "q2")
+		self.assertEqual(longer.get_latest_response(), "r2")
+
+	def test_modify_message_does_not_leak_into_shared_histories(self):
+		first = ChatHistory([Message(role="user", content="a")])
+		second = first.append(Message(role="assistant", content="b"))
+
+		first.modify_message_at_index(0, Message(role="assistant", content="x"))
+
+		self.assertEqual(first.get_latest_response(), "x")
+		self.assertEqual(second.messages[0].content, "a")
+		self.assertEqual(second.as_native()[-1], {"role": "assistant", "content": "b"})
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from src.genner.Extract import extract_code_blocks, extract_yaml_lists
+
+# Shortened responses recorded from the research and strategy phases
+REASONING_RESPONSE = """<think>
+The user wants market data, I could use ```python fences later.
+</think>
+Here is the research code:
+```python
+from dotenv import load_dotenv
+import requests
+
+load_dotenv()
+
+def main():
+	print(requests.get("https://api.coingecko.com/api/v3/ping").json())
+
+main()
+```
+It prints the API status."""
+
+TAGGED_RESPONSE = """<Research>
+```python
+print("research")
+```
+</Research>
+<Trading>
+```python
+print("trade")
+```
+</Trading>
+<Tokens>
+```yaml
+- WETH
+- USDC
+```
+</Tokens>"""
+
+
+class TestExtract(unittest.TestCase):
+	def test_single_block_takes_first_python_fence(self):
+		code = extract_code_blocks(REASONING_RESPONSE).unwrap()
+
+		self.assertEqual(len(code), 1)
+		self.assertTrue(code[0].startswith("from dotenv import load_dotenv"))
+		self.assertTrue(code[0].rstrip().endswith("main()"))
+
+	def test_tagged_blocks_are_extracted_independently(self):
+		self.assertEqual(
+			extract_code_blocks(TAGGED_RESPONSE, ["Trading", "Research"]).unwrap(),
+			['print("trade")\n', 'print("research")\n'],
+		)
+		self.assertEqual(
+			extract_yaml_lists(TAGGED_RESPONSE, ["Tokens"]).unwrap(), [["WETH", "USDC"]]
+		)
+
+	def test_missing_fence_error_is_short(self):
+		response = "I will not write code. " * 500
+
+		err = extract_code_blocks(response).unwrap_err()
+
+		self.assertIn("No ```python fence found in the response", err)
+		self.assertLess(len(err), 400)
+
+
+if __name__ == "__main__":
+	unittest.main()
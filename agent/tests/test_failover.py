@@ -0,0 +1,70 @@
+import time
+import unittest
+
+from result import Err, Ok, Result
+
+from src.config import FailoverConfig
+from src.custom_types import ChatHistory
+from src.genner.Failover import FailoverGenner
+from tests.mock_genner.CountingGenner import CountingGenner, make_history
+
+
+class ScriptedGenner(CountingGenner):
+	def __init__(
+		self,
+		identifier: str,
+		delay: float = 0.0,
+		fail: bool = False,
+		do_stream: bool = False,
+	):
+		super().__init__()
+		self.identifier = identifier
+		self.do_stream = do_stream
+		self.delay = delay
+		self.fail = fail
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		self.calls += 1
+		time.sleep(self.delay)
+		if self.fail:
+			return Err(f"{self.identifier} is down")
+		return Ok(self.identifier)
+
+
+class TestFailoverGenner(unittest.TestCase):
+	def test_slow_backend_is_hedged(self):
+		slow = ScriptedGenner("slow", delay=1.0, do_stream=True)
+		fast = ScriptedGenner("fast")
+		genner = FailoverGenner([slow, fast], FailoverConfig(hedge_after_s=0.1))
+
+		started = time.monotonic()
+		result = genner.ch_completion(make_history("hello"))
+
+		self.assertEqual(result, Ok("fast"))
+		self.assertLess(time.monotonic() - started, 0.8)
+
+	def test_slow_non_streaming_backend_is_not_hedged(self):
+		slow = ScriptedGenner("slow", delay=0.3)
+		fast = ScriptedGenner("fast")
+		genner = FailoverGenner([slow, fast], FailoverConfig(hedge_after_s=0.1))
+
+		self.assertEqual(genner.ch_completion(make_history("hello")), Ok("slow"))
+		self.assertEqual(fast.calls, 0)
+
+	def test_failing_backend_opens_circuit(self):
+		down = ScriptedGenner("down", fail=True)
+		backup = ScriptedGenner("backup")
+		genner = FailoverGenner(
+			[down, backup],
+			FailoverConfig(hedge_after_s=0, failure_threshold=2, cooldown_s=60),
+		)
+
+		for _ in range(3):
+			self.assertEqual(genner.ch_completion(make_history("hello")), Ok("backup"))
+
+		self.assertEqual(down.calls, 2)
+		self.assertIsNotNone(genner.health[0].opened_at)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -43,38 +43,56 @@ completion = genner.ch_completion(
 
 print(completion)
 
+
 class TestCoinGeckoAPI(unittest.TestCase):
-    def setUp(self):
-        # Setup the necessary components for testing
-        ollama_config = OllamaConfig(model='example_model')  # Replace 'example_model' with the actual model name
-        self.prompt_generator = TradingPromptGenerator(prompts={
-            'address_research_code_prompt': 'Address research code prompt',
-            'research_code_prompt': 'Research code prompt',
-            'trading_code_prompt': 'Trading code prompt',
-            'system_prompt': 'System prompt',
-            'regen_code_prompt': 'Regen code prompt',
-            'strategy_prompt': 'Strategy prompt',
-            'research_code_prompt_first': 'Research code prompt first'
-        }, genner=None)
-        self.genner = OllamaGenner(config=ollama_config, identifier="test", stream_fn=None)
-
-    def test_generate_address_research_code_prompt(self):
-        # Create a chat history with the address research prompt
-        chat_history = ChatHistory([
-            Message(role="user", content=self.prompt_generator.generate_address_research_code_prompt())
-        ])
-
-        # Generate code using the genner
-        result = self.genner.generate_code(chat_history)
-
-        # Check if the result is successful
-        self.assertTrue(result.is_ok(), "The code generation should be successful.")
-
-        # Extract the generated code
-        generated_code, raw_response = result.unwrap()
-
-        # Verify the generated code contains the expected API call format
-        self.assertIn("https://api.coingecko.com/api/v3/", generated_code[0], "The API call should be correctly formatted.")
+	def setUp(self):
+		# Setup the necessary components for testing
+		ollama_config = OllamaConfig(
+			model="example_model"
+		)  # Replace 'example_model' with the actual model name
+		self.prompt_generator = TradingPromptGenerator(
+			prompts={
+				"address_research_code_prompt": "Address research code prompt",
+				"research_code_prompt": "Research code prompt",
+				"trading_code_prompt": "Trading code prompt",
+				"system_prompt": "System prompt",
+				"regen_code_prompt": "Regen code prompt",
+				"strategy_prompt": "Strategy prompt",
+				"research_code_prompt_first": "Research code prompt first",
+			},
+			genner=None,
+		)
+		self.genner = OllamaGenner(
+			config=ollama_config, identifier="test", stream_fn=None
+		)
+
+	def test_generate_address_research_code_prompt(self):
+		# Create a chat history with the address research prompt
+		chat_history = ChatHistory(
+			[
+				Message(
+					role="user",
+					content=self.prompt_generator.generate_address_research_code_prompt(),
+				)
+			]
+		)
+
+		# Generate code using the genner
+		result = self.genner.generate_code(chat_history)
+
+		# Check if the result is successful
+		self.assertTrue(result.is_ok(), "The code generation should be successful.")
+
+		# Extract the generated code
+		generated_code, raw_response = result.unwrap()
+
+		# Verify the generated code contains the expected API call format
+		self.assertIn(
+			"https://api.coingecko.com/api/v3/",
+			generated_code[0],
+			"The API call should be correctly formatted.",
+		)
+
 
 if __name__ == "__main__":
-    unittest.main()
+	unittest.main()
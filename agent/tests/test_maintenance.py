@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.config import MaintenanceConfig
+from src.db.maintenance import (
+	INCREMENTAL_AUTO_VACUUM,
+	ZSTD_AVAILABLE,
+	ZSTD_ENCODING,
+	DBMaintenance,
+)
+from src.db.sqlite import SQLiteDB
+
+INIT_SQL = os.path.join(os.path.dirname(__file__), "..", "src", "db", "00001_init.sql")
+
+
+class TestDBMaintenance(unittest.TestCase):
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.db_path = os.path.join(self.tmp.name, "agent.db")
+		with open(INIT_SQL) as f, sqlite3.connect(self.db_path) as conn:
+			conn.executescript(f.read())
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def execute(self, query: str, params=()):
+		with sqlite3.connect(self.db_path) as conn:
+			return conn.execute(query, params).fetchall()
+
+	def test_notifications_are_pruned_per_source(self):
+		for source, age in [
+			("rss", 10),
+			("rss", 1),
+			("coingecko", 3),
+			("coingecko", 1),
+		]:
+			self.execute(
+				"INSERT INTO sup_notifications (source, short_desc, long_desc, created) "
+				"VALUES (?, 'x', 'y', datetime('now', ?))",
+				(source, f"-{age} days"),
+			)
+		config = MaintenanceConfig(
+			notification_retention_days=5,
+			notification_retention_by_source={"coingecko": 2},
+		)
+
+		report = DBMaintenance(self.db_path, config).run()
+
+		self.assertEqual(report.notifications_deleted, 2)
+		self.assertEqual(
+			self.execute("SELECT COUNT(*) FROM sup_notifications")[0][0], 2
+		)
+
+	@unittest.skipUnless(ZSTD_AVAILABLE, "zstandard is not installed")
+	def test_cold_chat_history_is_compressed(self):
+		content = "the same strategy text " * 50
+		for age in (30, 1):
+			self.execute(
+				"INSERT INTO sup_chat_history (session_id, message_type, content, timestamp) "
+				"VALUES ('s', 'message', ?, datetime('now', ?))",
+				(content, f"-{age} days"),
+			)
+
+		report = DBMaintenance(self.db_path).run()
+
+		self.assertEqual(report.chat_history_compressed, 1)
+		rows = self.execute(
+			"SELECT content, content_encoding FROM sup_chat_history ORDER BY id"
+		)
+		self.assertEqual(rows[0][1], ZSTD_ENCODING)
+		self.assertIsNone(rows[1][1])
+
+		with patch.object(SQLiteDB, "_init_db"):
+			db = SQLiteDB(self.db_path)
+		self.assertEqual(
+			[message["content"] for message in db.fetch_chat_history("s")],
+			[content, content],
+		)
+
+	def test_old_snapshots_are_rolled_up(self):
+		for minutes, value in [(0, 10.0), (10, 30.0), (20, 20.0)]:
+			self.execute(
+				"INSERT INTO sup_wallet_snapshots (snapshot_id, agent_id, total_value_usd, assets, snapshot_time) "
+				"VALUES ('id', 'agent', ?, ?, datetime('now', '-10 days', 'start of day', ?))",
+				(value, f"assets {value}", f"+{minutes} minutes"),
+			)
+		self.execute(
+			"INSERT INTO sup_wallet_snapshots (snapshot_id, agent_id, total_value_usd, assets) "
+			"VALUES ('id', 'agent', 50.0, 'fresh')"
+		)
+
+		report = DBMaintenance(self.db_path).run()
+
+		self.assertEqual(report.snapshots_rolled_up, 3)
+		self.assertEqual(
+			self.execute("SELECT COUNT(*) FROM sup_wallet_snapshots")[0][0], 1
+		)
+		rollup = self.execute(
+			"SELECT granularity, samples, min_value_usd, max_value_usd, sum_value_usd, last_value_usd, last_assets "
+			"FROM sup_wallet_snapshot_rollups"
+		)
+		self.assertEqual(rollup, [("hour", 3, 10.0, 30.0, 60.0, 20.0, "assets 20.0")])
+
+	def test_runs_do_not_rebuild_the_database(self):
+		maintenance = DBMaintenance(self.db_path)
+
+		self.assertEqual(maintenance.run().pages_freed, 0)
+		self.assertEqual(self.execute("PRAGMA auto_vacuum")[0][0], 0)
+
+		maintenance.enable_incremental_vacuum()
+		self.assertEqual(
+			self.execute("PRAGMA auto_vacuum")[0][0], INCREMENTAL_AUTO_VACUUM
+		)
+
+
+if __name__ == "__main__":
+	unittest.main()
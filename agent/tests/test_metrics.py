@@ -0,0 +1,64 @@
+import unittest
+
+from result import Ok, Result
+
+from src.custom_types import ChatHistory, Message
+from src.genner.Metrics import (
+	instrument_completion,
+	metrics_recorder,
+	report_usage,
+	set_llm_phase,
+)
+from src.genner.Stream import TokenStream
+from tests.mock_genner.CountingGenner import CountingGenner
+
+
+class StreamingGenner(CountingGenner):
+	@instrument_completion
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		token_stream = TokenStream(None)
+		for token in ["hello", " ", "world"]:
+			token_stream.feed(token)
+		report_usage(12, 3, 0.5)
+		return Ok(token_stream.close())
+
+
+class EstimatingGenner(CountingGenner):
+	@instrument_completion
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		return Ok("x" * 40)
+
+
+class TestMetrics(unittest.TestCase):
+	def setUp(self):
+		metrics_recorder.drain()
+		self.messages = ChatHistory(Message(role="user", content="y" * 80))
+
+	def test_reported_usage_and_ttft_are_recorded(self):
+		set_llm_phase("research_code", 2)
+		StreamingGenner().ch_completion(self.messages)
+		set_llm_phase("")
+
+		[call] = metrics_recorder.drain()
+		self.assertEqual(call.phase, "research_code")
+		self.assertEqual(call.attempt, 2)
+		self.assertEqual((call.input_tokens, call.output_tokens), (12, 3))
+		self.assertEqual(call.cost_usd, 0.5)
+		self.assertIsNotNone(call.ttft_s)
+		self.assertTrue(call.usage_reported)
+
+	def test_missing_usage_is_estimated(self):
+		EstimatingGenner().ch_completion(self.messages)
+
+		[call] = metrics_recorder.drain()
+		self.assertEqual((call.input_tokens, call.output_tokens), (20, 10))
+		self.assertIsNone(call.ttft_s)
+		self.assertFalse(call.usage_reported)
+		self.assertIn(
+			'llm_calls_total{backend="counting",model="",phase=""}',
+			metrics_recorder.to_prometheus(),
+		)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from src.client.notification_events import NotificationSubscriber
+
+
+class FakeWorker:
+	"""Unix socket server standing in for the notification worker."""
+
+	def __init__(self, socket_path: str):
+		self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.server.bind(socket_path)
+		self.server.listen()
+		self.connected = threading.Event()
+		self.conn = None
+		threading.Thread(target=self._accept, daemon=True).start()
+
+	def _accept(self):
+		self.conn, _ = self.server.accept()
+		self.connected.set()
+
+	def publish(self, source: str, high_signal: bool):
+		event = {
+			"source": source,
+			"notification_ids": ["id"],
+			"high_signal": high_signal,
+		}
+		self.conn.sendall(json.dumps(event).encode("utf-8") + b"\n")
+
+	def close(self):
+		if self.conn is not None:
+			self.conn.close()
+		self.server.close()
+
+
+class TestNotificationSubscriber(unittest.TestCase):
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		socket_path = os.path.join(self.tmp.name, "events.sock")
+		self.worker = FakeWorker(socket_path)
+		self.subscriber = NotificationSubscriber(socket_path)
+		self.assertTrue(self.worker.connected.wait(5))
+
+	def tearDown(self):
+		self.subscriber.close()
+		self.worker.close()
+		self.tmp.cleanup()
+
+	def test_high_signal_event_ends_the_wait(self):
+		threading.Timer(0.1, self.worker.publish, args=("rss", True)).start()
+
+		started = time.monotonic()
+		self.assertTrue(self.subscriber.wait(5, ["rss"]))
+		self.assertLess(time.monotonic() - started, 2)
+
+	def test_other_events_do_not_end_the_wait(self):
+		self.worker.publish("rss", False)
+		self.worker.publish("twitter_feed", True)
+
+		self.assertFalse(self.subscriber.wait(0.3, ["rss"]))
+		self.assertEqual(self.subscriber.new_sources(), ["rss", "twitter_feed"])
+
+		self.subscriber.clear()
+		self.assertEqual(self.subscriber.new_sources(), [])
+
+
+if __name__ == "__main__":
+	unittest.main()
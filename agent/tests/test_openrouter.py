@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+import httpx
+
+from src.client.openrouter import OpenRouter, SSEDecoder
+
+
+class TestOpenRouterStream(unittest.TestCase):
+	def test_decoder_joins_multi_line_events(self):
+		decoder = SSEDecoder()
+		lines = [
+			": OPENROUTER PROCESSING",
+			"",
+			"event: message",
+			"data: {",
+			"data: }",
+			"",
+		]
+
+		events = [data for data in map(decoder.feed, lines) if data is not None]
+
+		self.assertEqual(events, ["{\n}"])
+
+	def test_tokens_are_parsed_until_done(self):
+		client = OpenRouter(api_key="test", http2=False)
+		lines = [
+			'data: {"choices": [{"delta": {"reasoning": "think</s>"}}]}',
+			"",
+			'data: {"choices": [{"delta": {"content": "answer"}}]}',
+			"",
+			'data: {"choices": [], "usage": {"prompt_tokens": 5}}',
+			"",
+			"data: [DONE]",
+			"",
+			'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+			"",
+		]
+
+		tokens = list(client._iter_tokens(iter(lines)))
+
+		self.assertEqual(tokens, [("think", "reasoning"), ("answer", "main")])
+		self.assertEqual(client.get_last_usage(), {"prompt_tokens": 5})
+		client.close()
+
+	def test_async_stream_decodes_line_by_line(self):
+		client = OpenRouter(api_key="test", http2=False)
+		body = (
+			'data: {"choices": [{"delta": {"content": "a"}}]}\n\n'
+			'data: {"choices": [{"delta": {"content": "b"}}]}\n\n'
+			"data: [DONE]\n\n"
+			'data: {"choices": [{"delta": {"content": "ignored"}}]}\n\n'
+		)
+		transport = httpx.MockTransport(lambda request: httpx.Response(200, text=body))
+
+		async def stream():
+			client._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+				transport=transport
+			)
+			tokens = [
+				result.unwrap()
+				async for result in client.async_create_chat_completion_stream(
+					[{"role": "user", "content": "hi"}]
+				)
+			]
+			await client.aclose()
+			return tokens
+
+		self.assertEqual(asyncio.run(stream()), [("a", "main"), ("b", "main")])
+		client.close()
+
+	def test_async_clients_of_finished_loops_are_dropped(self):
+		client = OpenRouter(api_key="test", http2=False)
+
+		async def get_client():
+			return client._get_async_client()
+
+		first = asyncio.run(get_client())
+		second = asyncio.run(get_client())
+
+		self.assertIsNot(first, second)
+		self.assertEqual(list(client._async_clients.values()), [second])
+		client.close()
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+
+from web3 import Web3
+
+from src.overtime_market_data import MarketIndex, MarketOddsReader
+from src.overtime_protocol import OVERTIME_CONTRACTS, SPORTS_AMM_ABI
+
+
+class FakeAggregate3:
+	def __init__(self, multicall, calls):
+		self.multicall = multicall
+		self.calls = calls
+
+	def call(self):
+		self.multicall.batches.append(len(self.calls) - 1)
+		codec = self.multicall.codec
+		results = [(True, codec.encode(["uint256"], [self.multicall.block_number]))]
+		for _, _, call_data in self.calls[1:]:
+			# The market address is the last argument word of the call data
+			market = int(call_data[-40:], 16)
+			if market % 7 == 0:
+				results.append((False, b""))
+			else:
+				results.append(
+					(True, codec.encode(["uint256"] * 3, [2 * 10**18, 3 * 10**18, 0]))
+				)
+		return results
+
+
+class FakeMulticall:
+	"""Multicall3 answering every getMarketDefaultOdds call, failing for some markets."""
+
+	def __init__(self, codec, block_number: int):
+		self.address = Web3.to_checksum_address(
+			"0xcA11bde05977b3631167028862bE2a173976CA11"
+		)
+		self.codec = codec
+		self.block_number = block_number
+		self.batches = []
+		self.functions = self
+
+	def encode_abi(self, fn_name, args=None):
+		return "0x42cbb15c"
+
+	def aggregate3(self, calls):
+		return FakeAggregate3(self, calls)
+
+
+class TestMarketOddsReader(unittest.TestCase):
+	def setUp(self):
+		w3 = Web3()
+		sports_amm = w3.eth.contract(
+			address=Web3.to_checksum_address(OVERTIME_CONTRACTS["SportsAMM"]),
+			abi=SPORTS_AMM_ABI,
+		)
+		self.reader = MarketOddsReader(w3, sports_amm, batch_size=200, max_block_age=5)
+		self.multicall = FakeMulticall(w3.codec, block_number=100)
+		self.reader.multicall = self.multicall
+		self.reader.current_block = lambda: self.multicall.block_number
+		self.markets = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, 301)]
+
+	def test_odds_are_read_in_batches(self):
+		odds = self.reader.get_odds(self.markets)
+
+		self.assertEqual(self.multicall.batches, [200, 100])
+		self.assertEqual(
+			odds[self.markets[0]], {"home": 2.0, "away": 3.0, "draw": None}
+		)
+		# Markets whose call reverted are left out
+		self.assertNotIn(self.markets[6], odds)
+		self.assertEqual(len(odds), 300 - 300 // 7)
+
+	def test_cached_odds_expire_with_the_block(self):
+		self.reader.get_odds(self.markets[:10])
+		self.multicall.block_number = 105
+		self.reader.get_odds(self.markets[:10])
+		# Only the market whose call failed is read again
+		self.assertEqual(self.multicall.batches, [10, 1])
+
+		self.multicall.block_number = 106
+		self.reader.get_odds(self.markets[:10])
+		self.assertEqual(self.multicall.batches, [10, 1, 10])
+
+
+class TestMarketIndex(unittest.TestCase):
+	def setUp(self):
+		self.index = MarketIndex(refresh_interval_s=3600)
+		self.index._fetch_markets = lambda: [
+			{
+				"address": "a",
+				"sport": "Soccer",
+				"isOpen": True,
+				"maturityDate": 3000,
+				"liquidity": 50,
+			},
+			{
+				"address": "b",
+				"sport": "Tennis",
+				"isOpen": True,
+				"maturityDate": "1970-01-01T00:16:40Z",
+			},
+			{
+				"address": "c",
+				"sport": "soccer",
+				"isOpen": True,
+				"maturityDate": 2000000,
+				"liquidity": 500,
+			},
+			{"address": "d", "sport": "Soccer", "isOpen": False, "maturityDate": 1500},
+		]
+
+	def tearDown(self):
+		self.index.close()
+
+	def test_query_filters_and_pages_open_markets(self):
+		def addresses(markets):
+			return [m["address"] for m in markets]
+
+		self.assertEqual(addresses(self.index.query()), ["b", "a", "c"])
+		self.assertEqual(addresses(self.index.query(sport="SOCCER")), ["a", "c"])
+		self.assertEqual(
+			addresses(self.index.query(maturity_after=2000, maturity_before=5000)),
+			["a"],
+		)
+		self.assertEqual(addresses(self.index.query(min_liquidity=100)), ["c"])
+		self.assertEqual(addresses(self.index.query(offset=1, limit=1)), ["a"])
+
+
+if __name__ == "__main__":
+	unittest.main()
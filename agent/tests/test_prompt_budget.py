@@ -0,0 +1,55 @@
+import unittest
+
+from src.prompt_budget import (
+	PromptBudget,
+	count_tokens,
+	dedupe_tracebacks,
+	truncate_middle,
+)
+
+TRACEBACK = """Traceback (most recent call last):
+  File "//temp_script_20250101_120000_{}.py", line 3, in <module>
+    main()
+KeyError: 'price'"""
+
+
+class TestPromptBudget(unittest.TestCase):
+	def test_truncate_middle_keeps_head_and_tail(self):
+		text = "HEAD " + "filler " * 2000 + "TAIL"
+
+		truncated = truncate_middle(text, 100)
+
+		self.assertTrue(truncated.startswith("HEAD"))
+		self.assertTrue(truncated.endswith("TAIL"))
+		self.assertIn("tokens truncated", truncated)
+		self.assertLess(count_tokens(truncated), 120)
+
+	def test_fit_trims_largest_section_first(self):
+		budget = PromptBudget(min_section_tokens=10)
+		sections = {"small": "short note", "large": "word " * 3000}
+
+		prompt = budget.fit(
+			lambda s: f"Notes: {s['small']}\nData: {s['large']}", sections, 500
+		)
+
+		self.assertIn("Notes: short note", prompt)
+		self.assertLessEqual(count_tokens(prompt), 520)
+
+	def test_repeated_tracebacks_are_collapsed(self):
+		errors = "\n".join(
+			[
+				"Attempt 1 failed:",
+				TRACEBACK.format("abc123"),
+				"Attempt 2 failed:",
+				TRACEBACK.format("def456"),
+			]
+		)
+
+		deduped = dedupe_tracebacks(errors)
+
+		self.assertEqual(deduped.count("Traceback (most recent call last)"), 1)
+		self.assertIn("[Same traceback as above: KeyError: 'price']", deduped)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from src.prompt_template import PromptTemplate, compile_template, parse_metric_state
+
+
+class TestPromptTemplate(unittest.TestCase):
+	def test_render_matches_str_format(self):
+		text = 'Goal: {goal}\n{{"json": {{}}}}\nState: {state!r} {count:>3}'
+		values = {"goal": "profit", "state": {"eth": 1}, "count": 7}
+
+		self.assertEqual(compile_template(text).render(**values), text.format(**values))
+		self.assertIs(compile_template(text), compile_template(text))
+
+	def test_prefix_stops_at_first_volatile_field(self):
+		template = PromptTemplate(
+			"APIs: {apis}\nNetwork: {network}\nNews: {news}\nEnd {apis}"
+		)
+
+		self.assertEqual(
+			template.prefix(apis="a", network="eth"), "APIs: a\nNetwork: eth\nNews: "
+		)
+		self.assertEqual(template.prefix(network="eth"), "APIs: ")
+
+	def test_unsupported_placeholders_are_rejected(self):
+		for text in ["{0}", "{}", "{state.attr}", "{state[0]}", "{unclosed"]:
+			with self.assertRaises(ValueError):
+				PromptTemplate(text)
+
+	def test_metric_state_is_parsed_without_evaluation(self):
+		self.assertEqual(parse_metric_state(str({"eth": 1.5})), {"eth": 1.5})
+		self.assertEqual(parse_metric_state('{"ok": true}'), {"ok": True})
+		self.assertIsNone(parse_metric_state("__import__('os').getcwd()"))
+
+
+if __name__ == "__main__":
+	unittest.main()
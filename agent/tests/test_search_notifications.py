@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.db.sqlite import SQLiteDB
+
+INIT_SQL = os.path.join(os.path.dirname(__file__), "..", "src", "db", "00001_init.sql")
+
+
+class TestSearchNotifications(unittest.TestCase):
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		db_path = os.path.join(self.tmp.name, "agent.db")
+		with open(INIT_SQL) as f, sqlite3.connect(db_path) as conn:
+			conn.executescript(f.read())
+			conn.executemany(
+				"""INSERT INTO sup_notifications
+                   (notification_id, source, short_desc, long_desc, unique_hash, cluster_id, created)
+                   VALUES (?, ?, ?, ?, ?, ?, datetime('now', ?))""",
+				[
+					(
+						"a",
+						"coindesk",
+						"Bitcoin ETF",
+						"Bitcoin ETF inflows hit a record",
+						"a",
+						"a",
+						"-1 hours",
+					),
+					(
+						"b",
+						"decrypt",
+						"Bitcoin ETF",
+						"Bitcoin ETF inflows hit a new record",
+						"b",
+						"a",
+						"-1 hours",
+					),
+					(
+						"c",
+						"coingecko",
+						"Solana",
+						"Solana network upgrade ships",
+						"c",
+						None,
+						"-1 hours",
+					),
+					(
+						"d",
+						"coindesk",
+						"Bitcoin miners",
+						"Bitcoin miners hold their coins",
+						"d",
+						None,
+						"-48 hours",
+					),
+				],
+			)
+		with patch.object(SQLiteDB, "_init_db"):
+			self.db = SQLiteDB(db_path)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def search(self, keywords, **kwargs):
+		return [
+			row["notification_id"]
+			for row in self.db.search_notifications(keywords, **kwargs)
+		]
+
+	def test_near_duplicates_are_returned_once(self):
+		results = self.search(["bitcoin"])
+
+		self.assertEqual(len(results), 2)
+		self.assertIn("d", results)
+		self.assertEqual(len({"a", "b"} & set(results)), 1)
+
+	def test_keywords_are_matched_as_phrases(self):
+		self.assertEqual(self.search(["upgrade network"]), [])
+		# Quotes are escaped instead of breaking the query syntax
+		self.assertEqual(self.search(['network "upgrade']), ["c"])
+		self.assertCountEqual(self.search(["network upgrade", "miners"]), ["c", "d"])
+
+	def test_filters_by_age_and_source(self):
+		self.assertNotIn("d", self.search(["bitcoin"], within_hours=24))
+		self.assertEqual(self.search(["bitcoin"], sources=["decrypt"]), ["b"])
+		self.assertEqual(
+			self.search(["bitcoin"], within_hours=24, sources=["coindesk"]), ["a"]
+		)
+
+	def test_blank_keywords_return_nothing(self):
+		self.assertEqual(self.search(["", "  "]), [])
+
+
+if __name__ == "__main__":
+	unittest.main()
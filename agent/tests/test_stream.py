@@ -0,0 +1,53 @@
+import unittest
+
+from src.genner.Stream import TokenStream
+
+
+class TestTokenStream(unittest.TestCase):
+	def test_typed_phases_are_marked_once(self):
+		sink = []
+		stream = TokenStream(sink.append, flush_size=1)
+
+		for token, token_type in [
+			("let me ", "reasoning"),
+			("think", "reasoning"),
+			("answer", "main"),
+			(" here", "main"),
+		]:
+			stream.feed(token, token_type)
+
+		self.assertEqual(stream.close(), "answer here")
+		self.assertEqual("".join(sink), "<think>\nlet me think</think>\nanswer here\n")
+
+	def test_delimited_tokens_split_on_delimiter(self):
+		sink = []
+		stream = TokenStream(sink.append, thinking_delimiter="</think>")
+
+		for token in ["<think>hmm", "...</think>the ", "answer"]:
+			stream.feed_delimited(token)
+
+		self.assertEqual(stream.close(), "the answer")
+		self.assertEqual("".join(sink), "<think>hmm...</think>the answer\n")
+
+	def test_sink_writes_are_batched(self):
+		sink = []
+		stream = TokenStream(sink.append, flush_size=64, flush_interval=60)
+
+		for _ in range(1000):
+			stream.feed("tok ")
+		stream.close()
+
+		self.assertLess(len(sink), 100)
+		self.assertEqual("".join(sink), "tok " * 1000 + "\n")
+
+	def test_max_tokens_stops_the_stream(self):
+		stream = TokenStream(None, max_tokens=3)
+
+		accepted = [stream.feed("x") for _ in range(3)]
+
+		self.assertEqual(accepted, [True, True, False])
+		self.assertEqual(stream.close(), "xxx")
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,83 @@
+import re
+import unittest
+
+from result import Ok, Result
+
+from src.custom_types import ChatHistory
+from src.summarizer import SummarizerService
+from tests.mock_genner.CountingGenner import CountingGenner
+
+
+class BatchGenner(CountingGenner):
+	"""Answers batch requests with one summary per item, and others with a single summary."""
+
+	def ch_completion(self, messages: ChatHistory) -> Result[str, str]:
+		self.calls += 1
+		items = re.findall(r"<item_(\d+)>", messages.get_latest_instruction())
+		if not items:
+			return Ok("single summary")
+		return Ok("".join(f"<summary_{i}>summary {i}</summary_{i}>" for i in items))
+
+
+class RecordingDB:
+	def __init__(self, supports_updates: bool = True):
+		self.updates = []
+		self.supports_updates = supports_updates
+
+	def supports_strategy_summary_updates(self):
+		return self.supports_updates
+
+	def update_strategy_summary(self, strategy_id, summarized_desc, parameters):
+		self.updates.append((strategy_id, summarized_desc, parameters))
+		return True
+
+
+class TestSummarizerService(unittest.TestCase):
+	def test_backfill_batches_items_into_one_call(self):
+		genner = BatchGenner()
+		db = RecordingDB()
+		summarizer = SummarizerService(genner, batch_window_s=0.1)
+
+		done = summarizer.backfill_strategy(
+			db, "strategy-1", "buy low", {"apis": []}, {"summarized_code": ["print(1)"]}
+		)
+
+		self.assertTrue(done.result(timeout=5))
+		self.assertEqual(genner.calls, 1)
+		self.assertEqual(
+			db.updates,
+			[
+				(
+					"strategy-1",
+					"summary 2",
+					{"apis": [], "summarized_code": "summary 1"},
+				)
+			],
+		)
+
+	def test_backfill_is_skipped_when_summaries_cannot_be_written_back(self):
+		genner = BatchGenner()
+		summarizer = SummarizerService(genner, batch_window_s=0)
+
+		self.assertIsNone(
+			summarizer.backfill_strategy(RecordingDB(), None, "buy low", {})
+		)
+		self.assertIsNone(
+			summarizer.backfill_strategy(
+				RecordingDB(False), "strategy-1", "buy low", {}
+			)
+		)
+		self.assertEqual(genner.calls, 0)
+
+	def test_summaries_are_cached_by_content(self):
+		genner = BatchGenner()
+		summarizer = SummarizerService(genner, batch_window_s=0)
+
+		self.assertEqual(summarizer(["same strategy"]), "single summary")
+		self.assertEqual(summarizer(["same strategy"]), "single summary")
+		self.assertEqual(genner.calls, 1)
+		self.assertTrue(summarizer.flush(timeout=1))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+import tweepy
+
+from src.twitter import TweepyTwitterClient
+from src.twitter_rate_limit import RateLimitExceeded
+
+
+class FakeClient:
+	"""tweepy.Client stand-in with a slow timeline endpoint."""
+
+	def __init__(
+		self,
+		followers: int,
+		delay_s: float = 0.1,
+		slow_user: str | None = None,
+		limited_user: str | None = None,
+	):
+		self.followers = followers
+		self.delay_s = delay_s
+		self.slow_user = slow_user
+		self.limited_user = limited_user
+		self.timeline_calls = 0
+		self.lock = threading.Lock()
+
+	def get_me(self, **kwargs):
+		return tweepy.Response(
+			tweepy.User({"id": "1", "name": "me", "username": "me"}), {}, [], {}
+		)
+
+	def get_users_followers(self, id, max_results, pagination_token, user_fields):
+		users = [
+			SimpleNamespace(
+				id=str(i), username=f"user{i}", public_metrics={"followers_count": i}
+			)
+			for i in range(self.followers)
+		]
+		return tweepy.Response(users, {}, [], {})
+
+	def get_users_tweets(self, id, max_results, since_id, tweet_fields):
+		with self.lock:
+			self.timeline_calls += 1
+		time.sleep(1.5 if id == self.slow_user else self.delay_s)
+		if id == self.limited_user:
+			raise RateLimitExceeded("GET /2/users/:id/tweets", time.time() + 900)
+		tweet = SimpleNamespace(id=f"{id}-1", text=f"tweet of {id}", created_at="now")
+		return tweepy.Response([tweet], {}, [], {})
+
+
+class TestFollowerFanout(unittest.TestCase):
+	def test_timelines_are_fetched_concurrently(self):
+		client = FakeClient(followers=16, delay_s=0.1)
+		twitter = TweepyTwitterClient(client, None, fanout_concurrency=8)
+
+		started = time.monotonic()
+		tweets = twitter.get_recent_tweets_of_followers().unwrap()
+
+		self.assertEqual(len(tweets), 16)
+		self.assertLess(time.monotonic() - started, 1.0)
+
+	def test_slow_follower_is_skipped(self):
+		client = FakeClient(followers=4, delay_s=0.01, slow_user="2")
+		twitter = TweepyTwitterClient(client, None, follower_timeout_s=0.3)
+
+		started = time.monotonic()
+		tweets = twitter.get_recent_tweets_of_followers().unwrap()
+
+		self.assertEqual(len(tweets), 3)
+		self.assertNotIn("2-1", [tweet.id for tweet in tweets])
+		self.assertLess(time.monotonic() - started, 2.0)
+
+	def test_rate_limit_keeps_the_timelines_fetched_alongside(self):
+		client = FakeClient(followers=4, delay_s=0.1, limited_user="1")
+		twitter = TweepyTwitterClient(client, None, fanout_concurrency=4)
+
+		tweets = twitter.get_recent_tweets_of_followers().unwrap()
+
+		self.assertCountEqual([tweet.id for tweet in tweets], ["0-1", "2-1", "3-1"])
+
+	def test_recent_tweets_are_reused_within_ttl(self):
+		client = FakeClient(followers=3, delay_s=0)
+		twitter = TweepyTwitterClient(client, None)
+
+		twitter.get_recent_tweets_of_followers()
+		twitter.get_recent_tweets_of_followers()
+		self.assertEqual(client.timeline_calls, 3)
+
+		twitter.get_recent_tweets_of_followers(since_id="5")
+		self.assertEqual(client.timeline_calls, 6)
+
+
+if __name__ == "__main__":
+	unittest.main()
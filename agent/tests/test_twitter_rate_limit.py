@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+
+from src.twitter_rate_limit import (
+	PRIORITY_HIGH,
+	PRIORITY_LOW,
+	RateLimitExceeded,
+	TwitterRateLimiter,
+	call_priority,
+	endpoint_key,
+)
+
+MENTIONS = "GET /2/users/:id/mentions"
+
+
+def exhaust(limiter: TwitterRateLimiter, endpoint: str, reset_in_s: float):
+	limiter.update(
+		endpoint,
+		{
+			"x-rate-limit-limit": "2",
+			"x-rate-limit-remaining": "0",
+			"x-rate-limit-reset": str(time.time() + reset_in_s),
+		},
+	)
+
+
+class TestTwitterRateLimiter(unittest.TestCase):
+	def test_endpoint_key_hides_ids(self):
+		self.assertEqual(endpoint_key("get", "/2/users/12345/mentions"), MENTIONS)
+		self.assertEqual(
+			endpoint_key("GET", "/2/tweets/search/recent"),
+			"GET /2/tweets/search/recent",
+		)
+
+	def test_budget_is_read_from_headers_and_consumed(self):
+		limiter = TwitterRateLimiter()
+		limiter.update(
+			MENTIONS,
+			{
+				"x-rate-limit-limit": "180",
+				"x-rate-limit-remaining": "3",
+				"x-rate-limit-reset": "0",
+			},
+		)
+
+		limiter.acquire(MENTIONS)
+
+		budget = limiter.budget(MENTIONS)
+		self.assertEqual((budget.limit, budget.remaining), (180, 2))
+
+	def test_fails_fast_when_reset_is_beyond_the_wait(self):
+		limiter = TwitterRateLimiter(max_wait_s=0.5)
+		exhaust(limiter, MENTIONS, reset_in_s=900)
+
+		started = time.monotonic()
+		with self.assertRaises(RateLimitExceeded):
+			limiter.acquire(MENTIONS)
+		self.assertLess(time.monotonic() - started, 0.5)
+
+	def test_high_priority_waiter_gets_through_before_low_priority_one(self):
+		limiter = TwitterRateLimiter(max_wait_s=5)
+		exhaust(limiter, MENTIONS, reset_in_s=3)
+		served = []
+
+		def call(name, priority):
+			with call_priority(priority):
+				limiter.acquire(MENTIONS)
+			served.append(name)
+
+		low = threading.Thread(target=call, args=("low", PRIORITY_LOW))
+		low.start()
+		time.sleep(0.05)
+		high = threading.Thread(target=call, args=("high", PRIORITY_HIGH))
+		high.start()
+		time.sleep(0.05)
+
+		# A single call's budget goes to the later, high priority waiter
+		limiter.update(MENTIONS, {"x-rate-limit-remaining": "1"})
+		high.join(timeout=2)
+		self.assertEqual(served, ["high"])
+		self.assertTrue(low.is_alive())
+
+		limiter.update(MENTIONS, {"x-rate-limit-remaining": "1"})
+		low.join(timeout=2)
+		self.assertEqual(served, ["high", "low"])
+
+
+if __name__ == "__main__":
+	unittest.main()
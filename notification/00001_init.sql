@@ -8,7 +8,42 @@ create table if not exists sup_notifications (
     long_desc TEXT,
     notification_date DATETIME,
     unique_hash TEXT UNIQUE,
+    sentiment TEXT,
+    price_signals TEXT,
+    market_events TEXT,
+    simhash TEXT,
+    cluster_id TEXT,
     created DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
-create index if not exists sup_notifications_source_IDX on sup_notifications (source);
\ No newline at end of file
+create index if not exists sup_notifications_source_IDX on sup_notifications (source);
+
+-- Full-text index of the notifications, kept in sync by the triggers
+create virtual table if not exists sup_notifications_fts using fts5(
+    short_desc,
+    long_desc,
+    content='sup_notifications',
+    content_rowid='id'
+);
+
+create trigger if not exists sup_notifications_fts_ai after insert on sup_notifications begin
+    insert into sup_notifications_fts (rowid, short_desc, long_desc) values (new.id, new.short_desc, new.long_desc);
+end;
+
+create trigger if not exists sup_notifications_fts_ad after delete on sup_notifications begin
+    insert into sup_notifications_fts (sup_notifications_fts, rowid, short_desc, long_desc) values ('delete', old.id, old.short_desc, old.long_desc);
+end;
+
+create trigger if not exists sup_notifications_fts_au after update of short_desc, long_desc on sup_notifications begin
+    insert into sup_notifications_fts (sup_notifications_fts, rowid, short_desc, long_desc) values ('delete', old.id, old.short_desc, old.long_desc);
+    insert into sup_notifications_fts (rowid, short_desc, long_desc) values (new.id, new.short_desc, new.long_desc);
+end;
+
+create table if not exists sup_scraper_cursors (
+    source TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    last_seen_id TEXT,
+    seen_ids TEXT,
+    updated DATETIME DEFAULT CURRENT_TIMESTAMP
+);
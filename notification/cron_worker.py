@@ -5,12 +5,13 @@ import sys
 from datetime import datetime
 from pathlib import Path
 import os
-from typing import Optional
+from typing import Optional, Tuple
 from crontab import CronTab
 import signal
 import time
 import subprocess
 
+from events import NotificationEventPublisher
 from scrapers import (
     ScraperManager,
     TwitterMentionsScraper,
@@ -21,8 +22,9 @@ from scrapers import (
     RSSFeedScraper,
 )
 from notification_database_manager import NotificationDatabaseManager
+from twitter_service import TwitterService
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
 # Load environment variables
 load_dotenv()
 
@@ -40,6 +42,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Environment variables the scrapers are built from, a change rebuilds them
+SCRAPER_CONFIG_ENV_VARS = (
+    "SCRAPER",
+    "TOPIC",
+    "TWITTER_BOT_USERNAME",
+    "TWITTER_API_KEY",
+    "TWITTER_API_SECRET",
+    "TWITTER_ACCESS_TOKEN",
+    "TWITTER_ACCESS_TOKEN_SECRET",
+    "REDDIT_CLIENT_ID",
+    "REDDIT_CLIENT_SECRET",
+    "COINGECKO_API_KEY",
+    "PRICE_CHANGE_THRESHOLD",
+)
+
 def handle_shutdown(signum, frame):
     """
     Handle shutdown signals (SIGTERM, SIGINT).
@@ -184,9 +201,23 @@ class CronNotificationWorker:
             env_path (str): Path to environment file (default: ".env")
         """
         # Initialize components
+        self.env_path = env_path
         load_dotenv(dotenv_path=env_path)
+        self.env_file_values = dotenv_values(env_path)
+        # Scrapers and the Twitter service are built once and kept across cycles
+        self.scraper_config: Optional[Tuple[Optional[str], ...]] = None
+        self.twitter_service: Optional[TwitterService] = None
         self.notification_manager = NotificationDatabaseManager("./db/superior-agents.db")
-        self.scraper_manager = ScraperManager(self.notification_manager)
+        # Agents subscribe to the stored notifications when a socket is configured
+        events_socket = os.getenv("NOTIFICATION_EVENTS_SOCKET")
+        self.event_publisher = NotificationEventPublisher(events_socket) if events_socket else None
+        self.scraper_manager = ScraperManager(
+            self.notification_manager,
+            max_concurrency=int(os.getenv("SCRAPER_MAX_CONCURRENCY", "16")),
+            per_host_limit=int(os.getenv("SCRAPER_PER_HOST_LIMIT", "2")),
+            scraper_timeout_seconds=float(os.getenv("SCRAPER_TIMEOUT_SECONDS", "120")),
+            event_publisher=self.event_publisher,
+        )
         
     @staticmethod
     def setup_cron_jobs(notification_dir: str) -> None:
@@ -248,8 +279,14 @@ class CronNotificationWorker:
                 }
 
                 if all(twitter_creds.values()):
-                    mentions_scraper = TwitterMentionsScraper(bot_username=twitter_creds["bot_username"])
-                    feed_scraper = TwitterFeedScraper(bot_username=twitter_creds["bot_username"])
+                    # One service for both scrapers, so the bot user ID is looked up once
+                    self.twitter_service = TwitterService(bot_username=twitter_creds["bot_username"])
+                    mentions_scraper = TwitterMentionsScraper(
+                        bot_username=twitter_creds["bot_username"], twitter_service=self.twitter_service
+                    )
+                    feed_scraper = TwitterFeedScraper(
+                        bot_username=twitter_creds["bot_username"], twitter_service=self.twitter_service
+                    )
                     self.scraper_manager.add_scraper(mentions_scraper)
                     self.scraper_manager.add_scraper(feed_scraper)
                     logger.info("Twitter scrapers initialized")
@@ -393,16 +430,58 @@ class CronNotificationWorker:
             logger.error(f"Error initializing scrapers: {str(e)}")
             raise
             
+    def reload_env(self):
+        """
+        Apply the changes of the environment file to the process environment.
+
+        Variables set by the process itself, e.g. SCRAPER in the cron jobs,
+        keep precedence over the file, as with the initial load.
+        """
+        env_file_values = dotenv_values(self.env_path)
+        for name, value in env_file_values.items():
+            if value is None:
+                continue
+            if name not in os.environ or os.environ[name] == self.env_file_values.get(name):
+                os.environ[name] = value
+        self.env_file_values = env_file_values
+
+    async def ensure_scrapers(self):
+        """
+        Build the scrapers on the first cycle, and rebuild them when their configuration changed.
+
+        The environment file is read again before every cycle, so editing it
+        reconfigures a running daemon without restarting it.
+        """
+        self.reload_env()
+        scraper_config = tuple(os.getenv(name) for name in SCRAPER_CONFIG_ENV_VARS)
+        if scraper_config == self.scraper_config:
+            return
+
+        if self.scraper_config is not None:
+            logger.info("Scraper configuration changed, reloading scrapers...")
+            await self.scraper_manager.clear_scrapers()
+            self.twitter_service = None
+
+        logger.info("Initializing scrapers...")
+        try:
+            await self.initialize_scrapers()
+        except Exception:
+            # Start from scratch next cycle rather than keeping half the scrapers
+            await self.scraper_manager.clear_scrapers()
+            self.scraper_config = None
+            raise
+        self.scraper_config = scraper_config
+            
     async def run_single_cycle(self):
         """
         Run a single scraping cycle.
         
-        Initializes scrapers, runs the scraping cycle, and performs cleanup.
-        Handles any errors that occur during the cycle.
+        Builds the scrapers if needed and runs the scraping cycle. Scrapers,
+        HTTP connections and the Twitter service are kept for the next cycle,
+        `close` releases them.
         """
         try:
-            logger.info("Initializing scrapers...")
-            await self.initialize_scrapers()
+            await self.ensure_scrapers()
             
             logger.info("Starting scraping cycle...")
             await self.scraper_manager.run_scraping_cycle()
@@ -411,33 +490,39 @@ class CronNotificationWorker:
         except Exception as e:
             logger.error(f"Error in scraping cycle: {str(e)}")
             raise
+
+    async def start_events(self):
+        """Start publishing the stored notifications to the agents, if a socket is configured."""
+        if self.event_publisher is None:
+            return
+        try:
+            await self.event_publisher.start()
+        except OSError as e:
+            # Agents fall back to their own schedule
+            logger.error(f"Error starting notification events: {str(e)}")
+            self.event_publisher = None
+            self.scraper_manager.event_publisher = None
+
+    async def close(self):
+        """Close the scrapers, the HTTP client they share and the event subscribers."""
+        await self.scraper_manager.clear_scrapers()
+        self.scraper_config = None
+        self.twitter_service = None
+
+        try:
+            await self.scraper_manager.aclose()
+        except Exception as e:
+            logger.error(f"Error closing scraper HTTP client: {str(e)}")
+
+        if self.event_publisher is not None:
+            await self.event_publisher.close()
+
+    async def run_once(self):
+        """Run a single scraping cycle and release everything it used."""
+        try:
+            await self.run_single_cycle()
         finally:
-            # Cleanup any remaining tasks
-            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
-            for task in tasks:
-                task.cancel()
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Close notification manager
-            # try:
-            #     await self.notification_manager.close()
-            # except Exception as e:
-            #     logger.error(f"Error closing notification manager: {str(e)}")
-            
-            # Close scraper clients
-            for scraper in self.scraper_manager.scrapers:
-                if hasattr(scraper, 'client') and hasattr(scraper.client, 'aclose'):
-                    try:
-                        await scraper.client.aclose()
-                    except Exception as e:
-                        logger.error(f"Error closing client for {scraper.__class__.__name__}: {str(e)}")
-                        
-                if hasattr(scraper, 'close'):
-                    try:
-                        await scraper.close()
-                    except Exception as e:
-                        logger.error(f"Error closing {scraper.__class__.__name__}: {str(e)}")
+            await self.close()
 
 async def run_forever():
     """
@@ -454,8 +539,10 @@ async def run_forever():
     signal.signal(signal.SIGTERM, handle_shutdown)
     signal.signal(signal.SIGINT, handle_shutdown)
     
+    worker = None
     try:
         worker = CronNotificationWorker()
+        await worker.start_events()
         while True:  # Single persistent worker
             start_time = datetime.now()
             logger.info(f"Starting scraping cycle at {start_time}")
@@ -474,7 +561,8 @@ async def run_forever():
             await asyncio.sleep(interval * 60)
     finally:
         print('finally')
-        # await worker.notification_manager.close()
+        if worker is not None:
+            await worker.close()
 
 def main():
     """
@@ -495,7 +583,7 @@ def main():
             # Single run mode for testing
             logger.info("Running in single-run mode")
             worker = CronNotificationWorker()
-            asyncio.run(worker.run_single_cycle())
+            asyncio.run(worker.run_once())
         else:
             # Default to daemon mode
             logger.info("Starting in daemon mode")
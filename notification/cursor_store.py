@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Item IDs remembered per source, the oldest are forgotten first
+MAX_SEEN_IDS = 1000
+
+
+class ScraperCursor:
+    """
+    Scraping position of one source, kept across cycles and restarts.
+
+    Holds the validators of the last fetched response, for conditional
+    requests, the latest item ID, used as the `since_id` of APIs, and the
+    IDs of the items already seen, ordered from oldest to most recent.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        last_seen_id: Optional[str] = None,
+        seen_ids: Iterable[str] = (),
+    ):
+        """
+        Initialize a cursor.
+
+        Args:
+            source (str): Key of the source, e.g. 'crypto_news:coindesk'
+            etag (Optional[str]): ETag of the last fetched response
+            last_modified (Optional[str]): Last-Modified of the last fetched response
+            last_seen_id (Optional[str]): ID of the latest item seen
+            seen_ids (Iterable[str]): IDs of the items seen, oldest first
+        """
+        self.source = source
+        self.etag = etag
+        self.last_modified = last_modified
+        self.last_seen_id = last_seen_id
+        self.seen_ids: "OrderedDict[str, None]" = OrderedDict.fromkeys(seen_ids)
+
+    def has_seen(self, item_id: str) -> bool:
+        """Whether an item was seen in a previous cycle."""
+        return item_id in self.seen_ids
+
+    def mark_seen(self, item_ids: Iterable[str]):
+        """
+        Remember items as the most recent ones, forgetting the oldest beyond MAX_SEEN_IDS.
+
+        Args:
+            item_ids (Iterable[str]): IDs of the items, oldest first
+        """
+        for item_id in item_ids:
+            self.seen_ids[item_id] = None
+            self.seen_ids.move_to_end(item_id)
+        while len(self.seen_ids) > MAX_SEEN_IDS:
+            self.seen_ids.popitem(last=False)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Get the headers making a request return 304 if the resource did not change."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update_validators(self, headers):
+        """Keep the ETag and Last-Modified of a response for the next request."""
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+
+
+@dataclass
+class CursorUpdate:
+    """
+    Progress of a scrape on a cursor, applied once its items are stored.
+
+    Scrapers do not move their cursors themselves: if the items were lost
+    before reaching the database, a moved cursor would skip them for good.
+
+    Attributes:
+        cursor (ScraperCursor): The cursor to update
+        seen_ids (List[str]): IDs of the items handled by the scrape, oldest first
+        last_seen_id (Optional[str]): ID of the latest item, kept if None
+        validators (Optional[Mapping[str, str]]): Headers of the fetched response, kept if None
+    """
+
+    cursor: ScraperCursor
+    seen_ids: List[str] = field(default_factory=list)
+    last_seen_id: Optional[str] = None
+    validators: Optional[Mapping[str, str]] = None
+
+    def apply(self):
+        """Move the cursor past the scraped items."""
+        self.cursor.mark_seen(self.seen_ids)
+        if self.last_seen_id is not None:
+            self.cursor.last_seen_id = self.last_seen_id
+        if self.validators is not None:
+            self.cursor.update_validators(self.validators)
+
+
+class CursorStore:
+    """
+    Cursors of the scraped sources, persisted in the notification database.
+
+    Cursors are loaded once and kept in memory; saving writes them back
+    off the event loop. Without a database path the cursors only live as
+    long as the store.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            db_path (Optional[str]): Path to the SQLite database with the sup_scraper_cursors table
+        """
+        self.db_path = db_path
+        self._cursors: Dict[str, ScraperCursor] = {}
+
+    def _load(self, source: str) -> ScraperCursor:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, last_seen_id, seen_ids FROM sup_scraper_cursors WHERE source = ?",
+                [source],
+            ).fetchone()
+
+        if row is None:
+            return ScraperCursor(source)
+
+        etag, last_modified, last_seen_id, seen_ids = row
+        return ScraperCursor(
+            source,
+            etag=etag,
+            last_modified=last_modified,
+            last_seen_id=last_seen_id,
+            seen_ids=json.loads(seen_ids) if seen_ids else (),
+        )
+
+    def _write(self, values: list):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO sup_scraper_cursors (source, etag, last_modified, last_seen_id, seen_ids, updated)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(source) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    last_seen_id = excluded.last_seen_id,
+                    seen_ids = excluded.seen_ids,
+                    updated = excluded.updated
+                """,
+                values,
+            )
+
+    async def get(self, source: str) -> ScraperCursor:
+        """
+        Get the cursor of a source, a new one if it was never saved.
+
+        Args:
+            source (str): Key of the source
+
+        Returns:
+            ScraperCursor: The cursor, shared by every caller of the store
+        """
+        if source not in self._cursors:
+            cursor = ScraperCursor(source)
+            if self.db_path:
+                try:
+                    cursor = await asyncio.to_thread(self._load, source)
+                except Exception as e:
+                    logger.error(f"Error loading cursor of {source}, starting from scratch: {str(e)}")
+            self._cursors.setdefault(source, cursor)
+        return self._cursors[source]
+
+    async def save(self, cursor: ScraperCursor):
+        """
+        Persist a cursor, failures are logged as the cursor stays valid in memory.
+
+        Args:
+            cursor (ScraperCursor): The cursor to persist
+        """
+        if not self.db_path:
+            return
+        # Serialized on the loop, so the thread does not race further updates
+        values = [
+            cursor.source,
+            cursor.etag,
+            cursor.last_modified,
+            cursor.last_seen_id,
+            json.dumps(list(cursor.seen_ids)),
+        ]
+        try:
+            await asyncio.to_thread(self._write, values)
+        except Exception as e:
+            logger.error(f"Error saving cursor of {cursor.source}: {str(e)}")
+
+    async def commit(self, updates: Iterable[CursorUpdate]):
+        """
+        Apply the updates of a scrape whose items were stored, and persist the cursors.
+
+        Args:
+            updates (Iterable[CursorUpdate]): Updates returned with the stored items
+        """
+        for update in updates:
+            update.apply()
+            await self.save(update.cursor)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import logging
+import os
+from typing import List, Set
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationEventPublisher:
+    """
+    Publishes the notifications stored by the worker to subscribed agents.
+
+    Agents connect to a Unix socket and receive one JSON line per source and
+    scraping batch, with the IDs of the notifications just inserted and
+    whether the batch holds a high-signal one, so they can start a cycle
+    early instead of polling the database on a fixed interval. Publishing
+    never blocks the worker: a subscriber that cannot keep up is dropped
+    and reconnects.
+    """
+
+    def __init__(self, socket_path: str, max_buffer_bytes: int = 1024 * 1024):
+        """
+        Initialize the publisher.
+
+        Args:
+            socket_path (str): Path of the Unix socket, in a directory shared with the agents
+            max_buffer_bytes (int): Unsent bytes after which a subscriber is dropped
+        """
+        self.socket_path = socket_path
+        self.max_buffer_bytes = max_buffer_bytes
+        self._server = None
+        self._subscribers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self):
+        """Listen for subscribers, replacing the socket left by a previous worker."""
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._on_subscriber, path=self.socket_path)
+        logger.info(f"Publishing notification events on {self.socket_path}")
+
+    async def _on_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._subscribers.add(writer)
+        logger.info(f"Agent subscribed to notification events, {len(self._subscribers)} subscribed")
+        try:
+            # Subscribers never send anything, reading only detects the disconnection
+            await reader.read()
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    def publish(self, source: str, notification_ids: List[str], high_signal: bool = False):
+        """
+        Send the notifications inserted for a source to every subscriber.
+
+        Args:
+            source (str): Source of the notifications, e.g. 'twitter_mentions'
+            notification_ids (List[str]): IDs of the inserted notifications
+            high_signal (bool): Whether one of the notifications carries a market event
+        """
+        if not notification_ids or not self._subscribers:
+            return
+
+        line = json.dumps({
+            "source": source,
+            "notification_ids": notification_ids,
+            "high_signal": high_signal,
+        }).encode("utf-8") + b"\n"
+        for writer in list(self._subscribers):
+            if writer.transport.get_write_buffer_size() > self.max_buffer_bytes:
+                logger.warning("Dropping a notification event subscriber that stopped reading")
+                self._subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+    async def close(self):
+        """Disconnect the subscribers and stop listening."""
+        for writer in list(self._subscribers):
+            writer.close()
+        self._subscribers.clear()
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
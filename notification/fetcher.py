@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight across every scraper
+DEFAULT_MAX_CONCURRENCY = 16
+# Requests in flight to a single host
+DEFAULT_PER_HOST_LIMIT = 2
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+
+class HttpFetcher:
+    """
+    HTTP client shared by the scrapers.
+
+    Every request goes through one pooled httpx.AsyncClient, so connections
+    to a source are reused across feeds and cycles. A global limit bounds
+    the requests in flight, and a per-host limit keeps concurrent scrapers
+    from hammering the same source.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+    ):
+        """
+        Initialize the fetcher, the client is created on first use.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight
+            per_host_limit (int): Maximum number of requests in flight to the same host
+            timeout (httpx.Timeout): Timeout of every request
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the pooled client, creating it if needed."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_slots[host]
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request once a global and a per-host slot are free.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute URL of the request
+            **kwargs: Passed to httpx.AsyncClient.request, e.g. headers or params
+
+        Returns:
+            httpx.Response: The response, whatever its status
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._slots, self._host_semaphore(urlsplit(url).netloc):
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Send a GET request, see `request`."""
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self):
+        """
+        Close the pooled client.
+
+        The limits are reset too, as they belong to the event loop that used
+        them, the next request creates a new client.
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._slots = None
+        self._host_slots = {}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing   import Optional, List
+from typing   import Dict, Optional, List, Union
 from pydantic import BaseModel
 
 
@@ -31,6 +31,43 @@ class NotificationBatchCreate(BaseModel):
     """
     notifications: List[NotificationCreate]
 
+class NotificationSignals(BaseModel):
+    """
+    Model for the signals extracted from a notification.
+
+    Attributes:
+        sentiment (Optional[str]): 'bullish' or 'bearish', None if the text has no sentiment keyword
+        prices (Dict[str, float]): Prices mentioned, by upper-case symbol
+        events (Dict[str, List[Union[str, bool]]]): Subjects of each market event type, True for events without subject
+    """
+    sentiment: Optional[str] = None
+    prices: Dict[str, float] = {}
+    events: Dict[str, List[Union[str, bool]]] = {}
+
+    def is_high_signal(self) -> bool:
+        """Whether the notification reports a market event, worth an early agent cycle."""
+        return bool(self.events)
+
+    def to_trading_signals(self) -> Optional[Dict]:
+        """Get the signals as the dictionary of prices and sentiment used in formatted tweets."""
+        signals: Dict = dict(self.prices)
+        if self.sentiment:
+            signals['sentiment'] = self.sentiment
+        return signals or None
+
+class NotificationBatchResult(BaseModel):
+    """
+    Model for the outcome of a batch insert.
+
+    Attributes:
+        inserted (int): Number of notifications stored
+        skipped (int): Number of notifications already stored, or duplicated within the batch
+        notification_ids (List[str]): IDs of the notifications stored
+    """
+    inserted: int
+    skipped: int
+    notification_ids: List[str] = []
+
 class NotificationUpdate(BaseModel):
     """
     Model for updating an existing notification.
@@ -0,0 +1,160 @@
+import re
+import threading
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+
+# Bits of a fingerprint, and bands of the index: two fingerprints within
+# NEAR_DUPLICATE_DISTANCE bits share at least one band as long as there
+# are more bands than allowed differing bits
+FINGERPRINT_BITS = 64
+INDEX_BANDS = 8
+# A credit line appended to a 50 to 100 word story moves its fingerprint by
+# about 3 bits and a one-word edit by 5 to 10, while stories sharing 80% of
+# their words stay 8 or more bits apart
+NEAR_DUPLICATE_DISTANCE = 6
+
+# Texts with fewer tokens, like price alerts, only cluster with identical texts
+MIN_NEAR_DUPLICATE_TOKENS = 24
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Lines differing between the copies of a syndicated story, dropped before fingerprinting
+_VOLATILE_LINE = re.compile(r'^\s*(?:link|source|published):.*$', re.IGNORECASE | re.MULTILINE)
+_LABEL = re.compile(r'^\s*(?:title|summary|tweet):\s*', re.IGNORECASE | re.MULTILINE)
+_URL = re.compile(r'https?://\S+|www\.\S+')
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Normalize a notification text into its words.
+
+    Links, source and publication lines and field labels are dropped, so the
+    copies of a story from different feeds normalize to the same words.
+
+    Args:
+        text (str): Text of the notification, e.g. its long description
+
+    Returns:
+        List[str]: Lower-case words of the text
+    """
+    text = _VOLATILE_LINE.sub(' ', text)
+    text = _LABEL.sub(' ', text)
+    text = _URL.sub(' ', text)
+    return _TOKEN.findall(text.lower())
+
+
+def simhash(tokens: List[str]) -> int:
+    """
+    Compute the SimHash fingerprint of a text from its word shingles.
+
+    Args:
+        tokens (List[str]): Words of the text, see `tokenize`
+
+    Returns:
+        int: Unsigned fingerprint of FINGERPRINT_BITS bits
+    """
+    if len(tokens) >= SHINGLE_SIZE:
+        shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    else:
+        shingles = {' '.join(tokens)}
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        value = int.from_bytes(blake2b(shingle.encode('utf-8'), digest_size=FINGERPRINT_BITS // 8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDuplicateIndex:
+    """
+    SimHash index assigning near-duplicate notifications to a shared cluster.
+
+    Fingerprints are split into INDEX_BANDS bands, and a fingerprint is only
+    compared with those sharing one of its bands, so a lookup does not scan
+    the whole index. A notification joins the cluster of the first indexed
+    fingerprint within NEAR_DUPLICATE_DISTANCE bits, or starts its own.
+    Only the most recent `capacity` fingerprints are kept.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize an empty index.
+
+        Args:
+            capacity (int): Number of fingerprints kept, the oldest are forgotten first
+        """
+        self.capacity = capacity
+        self._band_bits = FINGERPRINT_BITS // INDEX_BANDS
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(INDEX_BANDS)]
+        # Cluster of each fingerprint, in insertion order
+        self._clusters: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        return [fingerprint >> (band * self._band_bits) & mask for band in range(INDEX_BANDS)]
+
+    def _find(self, fingerprint: int) -> Optional[str]:
+        if fingerprint in self._clusters:
+            return self._clusters[fingerprint]
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for candidate in band.get(key, ()):
+                if bin(candidate ^ fingerprint).count('1') <= NEAR_DUPLICATE_DISTANCE:
+                    return self._clusters[candidate]
+        return None
+
+    def _add(self, fingerprint: int, cluster_id: str):
+        if fingerprint in self._clusters:
+            return
+        self._clusters[fingerprint] = cluster_id
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            band.setdefault(key, []).append(fingerprint)
+
+        while len(self._clusters) > self.capacity:
+            oldest = next(iter(self._clusters))
+            del self._clusters[oldest]
+            for band, key in zip(self._bands, self._band_keys(oldest)):
+                band[key].remove(oldest)
+                if not band[key]:
+                    del band[key]
+
+    def load(self, entries: List[Tuple[str, str]]):
+        """
+        Index stored notifications, e.g. on startup.
+
+        Args:
+            entries (List[Tuple[str, str]]): Hex fingerprint and cluster ID of each notification, oldest first
+        """
+        with self._lock:
+            for fingerprint, cluster_id in entries:
+                self._add(int(fingerprint, 16), cluster_id)
+
+    def cluster(self, notification_id: str, text: str) -> Tuple[str, str]:
+        """
+        Fingerprint a notification and assign it to a cluster.
+
+        Args:
+            notification_id (str): ID of the notification, the cluster ID if it starts a cluster
+            text (str): Text of the notification
+
+        Returns:
+            Tuple[str, str]: Hex fingerprint and cluster ID of the notification
+        """
+        tokens = tokenize(text)
+        fingerprint = simhash(tokens)
+        with self._lock:
+            if len(tokens) >= MIN_NEAR_DUPLICATE_TOKENS:
+                cluster_id = self._find(fingerprint)
+            else:
+                cluster_id = self._clusters.get(fingerprint)
+            cluster_id = cluster_id or notification_id
+            self._add(fingerprint, cluster_id)
+        return f"{fingerprint:016x}", cluster_id
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from datetime import datetime
@@ -5,7 +6,8 @@ import os
 from typing import List, Optional, Dict, Any, Union
 import sqlite3
 import httpx
-from models import NotificationCreate, NotificationUpdate, NotificationResponse
+from near_duplicates import NearDuplicateIndex
+from models import NotificationBatchResult, NotificationCreate, NotificationUpdate, NotificationResponse, NotificationSignals
 from dotenv import load_dotenv
 import requests
 from hashlib import sha256
@@ -16,6 +18,75 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns written for every notification, in the order of the insert parameters
+NOTIFICATION_COLUMNS = (
+    "notification_id",
+    "source",
+    "short_desc",
+    "long_desc",
+    "notification_date",
+    "relative_to_scraper_id",
+    "bot_username",
+    "unique_hash",
+    "sentiment",
+    "price_signals",
+    "market_events",
+    "simhash",
+    "cluster_id",
+)
+
+# Columns added after the first release, added to older databases on startup
+ADDED_COLUMNS = {
+    "sentiment": "TEXT",
+    "price_signals": "TEXT",
+    "market_events": "TEXT",
+    "simhash": "TEXT",
+    "cluster_id": "TEXT",
+}
+
+# Most recent notifications indexed for near-duplicate detection
+NEAR_DUPLICATE_WINDOW = 10000
+
+INSERT_NOTIFICATION_QUERY = (
+    f"INSERT INTO sup_notifications ({', '.join(NOTIFICATION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in NOTIFICATION_COLUMNS)}) "
+    "ON CONFLICT(unique_hash) DO NOTHING "
+    "RETURNING notification_id"
+)
+
+
+def notification_hash(short_desc: str, relative_to_scraper_id: Optional[str]) -> str:
+    """
+    Compute the hash identifying a notification across scraping cycles.
+
+    Args:
+        short_desc (str): Brief description of the notification
+        relative_to_scraper_id (Optional[str]): ID relating to the scraper source
+
+    Returns:
+        str: Hex sha256 of the description followed by the scraper ID
+    """
+    return sha256((short_desc + (relative_to_scraper_id or "")).encode('utf-8')).hexdigest()
+
+
+def signal_values(signals: Optional[NotificationSignals]) -> tuple:
+    """
+    Get the values of the signal columns of a notification.
+
+    Args:
+        signals (Optional[NotificationSignals]): Signals extracted from the notification
+
+    Returns:
+        tuple: Sentiment, prices as JSON and market events as JSON, all None without signals
+    """
+    if signals is None:
+        return (None, None, None)
+    return (
+        signals.sentiment,
+        json.dumps(signals.prices) if signals.prices else None,
+        json.dumps(signals.events) if signals.events else None,
+    )
+
 
 class NotificationDatabaseManager:
     def __init__(self, db_path: str):
@@ -25,6 +96,7 @@ class NotificationDatabaseManager:
             db_path (str): Path to the SQLite database file
         """
         self.db_path = db_path
+        self.near_duplicates = NearDuplicateIndex(capacity=NEAR_DUPLICATE_WINDOW)
         self._init_db()
 
     def _init_db(self):
@@ -35,14 +107,67 @@ class NotificationDatabaseManager:
 
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
+            fts_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sup_notifications_fts'"
+            ).fetchone()
             cursor.executescript(init_script)
+            # The triggers only index new notifications, the stored ones are indexed once
+            if not fts_exists:
+                cursor.execute("INSERT INTO sup_notifications_fts (sup_notifications_fts) VALUES ('rebuild')")
+
+            # Databases created before the added columns lack them
+            existing = {row[1] for row in cursor.execute("PRAGMA table_info(sup_notifications)")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE sup_notifications ADD COLUMN {column} {column_type}")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS sup_notifications_cluster_IDX ON sup_notifications (cluster_id)"
+            )
             conn.commit()
+
+            recent = cursor.execute(
+                "SELECT simhash, cluster_id FROM sup_notifications WHERE simhash IS NOT NULL ORDER BY id DESC LIMIT ?",
+                [NEAR_DUPLICATE_WINDOW],
+            ).fetchall()
+        self.near_duplicates.load(list(reversed(recent)))
     
+    def _insert_rows(self, rows: List[tuple]) -> List[str]:
+        """
+        Insert notification rows in one transaction, skipping those already stored.
+
+        Blocking, callers run it in a thread.
+
+        Args:
+            rows (List[tuple]): Values of NOTIFICATION_COLUMNS, one tuple per notification
+
+        Returns:
+            List[str]: IDs of the rows inserted
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                # Rows skipped by the unique hash return no ID. Counting changes instead
+                # would be wrong, as the full-text index triggers write too
+                inserted = []
+                for row in rows:
+                    returned = conn.execute(INSERT_NOTIFICATION_QUERY, row).fetchone()
+                    if returned is not None:
+                        inserted.append(returned[0])
+                return inserted
+        finally:
+            conn.close()
+
     async def create_notification(self, source: str, short_desc: str, long_desc: str, notification_date: str, 
-                                 relative_to_scraper_id: Optional[str] = None, bot_username: str = "") -> str:
+                                 relative_to_scraper_id: Optional[str] = None, bot_username: str = "",
+                                 signals: Optional[NotificationSignals] = None,
+                                 notification_id: Optional[str] = None) -> Optional[str]:
         """
         Create a new notification in the database.
 
+        A notification with the same description and scraper ID as a stored one is not inserted again.
+        A near-duplicate of a recent notification, e.g. the same story from another feed, is stored
+        in the cluster of that notification.
+
         Args:
             source (str): The source of the notification (e.g., 'twitter', 'rss')
             short_desc (str): A brief description of the notification
@@ -50,56 +175,38 @@ class NotificationDatabaseManager:
             notification_date (str): The date of the notification in ISO format
             relative_to_scraper_id (Optional[str]): ID relating to the scraper source (e.g., tweet ID)
             bot_username (str): Username of the bot that created the notification
+            signals (Optional[NotificationSignals]): Signals extracted from the notification, stored in their columns
+            notification_id (Optional[str]): ID of the notification, generated if missing
 
         Returns:
-            str: The ID of the created notification
+            Optional[str]: The ID of the created notification, None if it was already stored
 
         Raises:
             Exception: If the notification creation fails
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            notification_id = str(uuid.uuid4())
-            payload = {
-                "notification_id": notification_id,
-                "source": source,
-                "short_desc": short_desc,
-                "long_desc": long_desc,
-                "notification_date": notification_date,
-                "relative_to_scraper_id": relative_to_scraper_id,
-                "bot_username": bot_username
-            }
-            for_hashing : str = payload["short_desc"]
-            for_hashing += payload["relative_to_scraper_id"]
-
-            payload["unique_hash"] = sha256(for_hashing.encode('utf-8')).hexdigest()
-            columns = ', '.join(payload.keys())
-            values  = ', '.join(['?' for _ in payload.values()])
-
-            try:
-                # Check if the record exists with the same relative_to_scraper_id or long_desc
-                if payload.get('unique_hash'):
-                    check_query = "SELECT id FROM sup_notifications WHERE unique_hash = ?"
-                    cursor.execute(check_query, [payload.get('unique_hash')])
-                else:
-                    check_query = "SELECT id FROM sup_notifications WHERE relative_to_scraper_id = ? OR long_desc = ?"
-                    cursor.execute(check_query, [payload.get('relative_to_scraper_id'), payload.get('long_desc')])
-                
-                existing = cursor.fetchone()
-
-                if not existing:
-                    # Insert new record
-                    query = f"INSERT INTO sup_notifications ({columns}) VALUES ({values})"
-                    cursor.execute(query, list(payload.values()))
-                
-                return notification_id
-            except Exception as e:
-                raise
+        notification_id = notification_id or str(uuid.uuid4())
+        row = (
+            notification_id,
+            source,
+            short_desc,
+            long_desc,
+            notification_date,
+            relative_to_scraper_id,
+            bot_username,
+            notification_hash(short_desc, relative_to_scraper_id),
+            *signal_values(signals),
+            *self.near_duplicates.cluster(notification_id, long_desc),
+        )
+        inserted_ids = await asyncio.to_thread(self._insert_rows, [row])
+        return inserted_ids[0] if inserted_ids else None
 
-    
-    async def create_notifications_batch(self, notifications: List[Dict[str, Any]]) -> List[str]:
+    async def create_notifications_batch(self, notifications: List[Dict[str, Any]]) -> NotificationBatchResult:
         """
-        Create multiple notifications in a single batch request.
+        Create multiple notifications with a single bulk insert.
+
+        Hashes are computed in one pass, duplicates within the batch are dropped, and the
+        rows are inserted in one transaction off the event loop. Notifications already
+        stored are skipped by the unique hash, near-duplicates are stored in a shared cluster.
         
         Args:
             notifications (List[Dict[str, Any]]): List of notification dictionaries with the following keys:
@@ -109,26 +216,43 @@ class NotificationDatabaseManager:
                 - notification_date: Date in ISO format
                 - relative_to_scraper_id (optional): ID relating to scraper
                 - bot_username (optional): Bot username
+                - signals (optional): NotificationSignals extracted from the notification
+                - notification_id (optional): ID of the notification, generated if missing
                 
         Returns:
-            List[str]: List of created notification IDs
+            NotificationBatchResult: Numbers of inserted and skipped notifications
 
         Raises:
-            Exception: If the batch creation fails
+            Exception: If the batch creation fails, in which case nothing is inserted
         """
-        notification_ids = []
+        rows = []
+        seen_hashes = set()
         for notification in notifications:
-            # Call the single insert function for each notification
-            notification_id = await self.create_notification(
-                notification['source'],
+            relative_to_scraper_id = notification.get("relative_to_scraper_id")
+            unique_hash = notification_hash(notification["short_desc"], relative_to_scraper_id)
+            if unique_hash in seen_hashes:
+                continue
+            seen_hashes.add(unique_hash)
+            notification_id = notification.get("notification_id") or str(uuid.uuid4())
+            rows.append((
+                notification_id,
+                notification["source"],
                 notification["short_desc"],
                 notification["long_desc"],
                 notification["notification_date"],
-                notification["relative_to_scraper_id"],
-                notification["bot_username"]
-            )
-            notification_ids.append(notification_id)
-        return notification_ids
+                relative_to_scraper_id,
+                notification.get("bot_username", ""),
+                unique_hash,
+                *signal_values(notification.get("signals")),
+                *self.near_duplicates.cluster(notification_id, notification["long_desc"]),
+            ))
+
+        inserted_ids = await asyncio.to_thread(self._insert_rows, rows) if rows else []
+        return NotificationBatchResult(
+            inserted=len(inserted_ids),
+            skipped=len(notifications) - len(inserted_ids),
+            notification_ids=inserted_ids,
+        )
           
     async def close(self):
         """
@@ -166,8 +290,8 @@ if __name__ == "__main__":
                 }
                 for i in range(3)
             ]
-            batch_ids = await manager.create_notifications_batch(batch_notifications)
-            print(f"Created batch notifications with IDs: {batch_ids}")
+            batch_result = await manager.create_notifications_batch(batch_notifications)
+            print(f"Created batch notifications: {batch_result.inserted} inserted, {batch_result.skipped} skipped")
             
             # Get all notifications
             all_notifications = await manager.get_all_notifications()
@@ -3,10 +3,10 @@ import logging
 from abc import ABC, abstractmethod
 from datetime import datetime
 import json
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Tuple
 import os
 import re
-import requests
+import uuid
 import tweepy
 import praw
 import httpx
@@ -17,7 +17,12 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 from dateutil import parser
 
-from models import NotificationCreate
+from cursor_store import CursorStore, CursorUpdate, ScraperCursor
+from events import NotificationEventPublisher
+from fetcher import DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST_LIMIT, HttpFetcher
+from models import NotificationCreate, NotificationSignals
+from signals import get_signal_extractor
+from twitter_rate_limit import RateLimitExceeded
 from twitter_service import TwitterService, Tweet
 from notification_database_manager import NotificationDatabaseManager
 
@@ -25,6 +30,9 @@ from notification_database_manager import NotificationDatabaseManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds a scraper may take before the cycle stops waiting for it
+DEFAULT_SCRAPER_TIMEOUT_SECONDS = 120
+
 class ScrapedNotification(BaseModel):
     """
     Model representing a notification scraped from a source.
@@ -35,12 +43,14 @@ class ScrapedNotification(BaseModel):
         long_desc (str): Detailed description of the notification
         notification_date (str): Date of the notification in ISO format
         relative_to_scraper_id (Optional[str]): ID relating to the source (e.g., tweet ID)
+        signals (Optional[NotificationSignals]): Signals already extracted by the scraper, extracted on storage if None
     """
     source: str
     short_desc: str
     long_desc: str
     notification_date: str
     relative_to_scraper_id: Optional[str] = None
+    signals: Optional[NotificationSignals] = None
 
 class BaseScraper(ABC):
     def __init__(self, bot_username: str = ""):
@@ -52,7 +62,48 @@ class BaseScraper(ABC):
         """
         self.last_check_time: Optional[datetime] = None
         self.notification_manager = None  # Will be set by ScraperManager
+        self.http: Optional[HttpFetcher] = None  # Shared fetcher, set by ScraperManager
+        self.cursor_store: Optional[CursorStore] = None  # Persisted cursors, set by ScraperManager
+        self.cursor_updates: List[CursorUpdate] = []  # Progress of the last scrape, until stored
         self.bot_username = bot_username
+
+    def get_http(self) -> HttpFetcher:
+        """
+        Get the fetcher for HTTP requests.
+
+        Returns:
+            HttpFetcher: The fetcher shared by the ScraperManager, or an own one outside of it
+        """
+        if self.http is None:
+            self.http = HttpFetcher()
+        return self.http
+
+    async def get_cursor(self, key: str = "") -> ScraperCursor:
+        """
+        Get the persisted cursor of this scraper, or of one of its sources.
+
+        Args:
+            key (str): Name of the source within the scraper, e.g. a feed name
+
+        Returns:
+            ScraperCursor: The cursor, kept in memory only outside of a ScraperManager
+        """
+        if self.cursor_store is None:
+            self.cursor_store = CursorStore()
+        source = f"{self.get_source_prefix()}:{self.bot_username}"
+        if key:
+            source += f":{key}"
+        return await self.cursor_store.get(source)
+
+    def take_cursor_updates(self) -> List[CursorUpdate]:
+        """
+        Take the cursor updates of the last scrape, to apply once its items are stored.
+
+        Returns:
+            List[CursorUpdate]: The updates, cleared from the scraper
+        """
+        updates, self.cursor_updates = self.cursor_updates, []
+        return updates
     
     @abstractmethod
     def get_source_prefix(self) -> str:
@@ -65,16 +116,16 @@ class BaseScraper(ABC):
         pass
 
 class TwitterMentionsScraper(BaseScraper):
-    def __init__(self, bot_username: str):
+    def __init__(self, bot_username: str, twitter_service: Optional[TwitterService] = None):
         """
         Initialize Twitter mentions scraper.
 
         Args:
             bot_username (str): The username of the Twitter bot to monitor mentions for
+            twitter_service (Optional[TwitterService]): Service shared with other scrapers, built if not given
         """
         super().__init__(bot_username=bot_username)
-        self.twitter_service = TwitterService(bot_username=bot_username)
-        self.last_mention_id: Optional[str] = None
+        self.twitter_service = twitter_service or TwitterService(bot_username=bot_username)
     
     def get_source_prefix(self) -> str:
         """
@@ -85,12 +136,13 @@ class TwitterMentionsScraper(BaseScraper):
         """
         return "twitter_mentions"
         
-    def _format_tweet_content(self, tweet: Tweet) -> str:
+    def _format_tweet_content(self, tweet: Tweet, signals: NotificationSignals) -> str:
         """
         Format tweet content with additional context.
 
         Args:
             tweet (Tweet): Tweet object to format
+            signals (NotificationSignals): Signals extracted from the tweet text
 
         Returns:
             str: Formatted tweet content including text, mentions, hashtags, and URLs
@@ -101,7 +153,7 @@ class TwitterMentionsScraper(BaseScraper):
         content_parts.append(f"Tweet: {tweet.text}")
         
         # Add trading signals if present
-        trading_signals = self.twitter_service.extract_trading_signals(tweet)
+        trading_signals = signals.to_trading_signals()
         if trading_signals:
             content_parts.append("\nTrading Signals:")
             if 'sentiment' in trading_signals:
@@ -111,7 +163,7 @@ class TwitterMentionsScraper(BaseScraper):
                     content_parts.append(f"- {symbol}: ${price:,.2f}")
         
         # Add market events if present
-        market_events = self.twitter_service.extract_market_events(tweet)
+        market_events = signals.events
         if market_events:
             content_parts.append("\nMarket Events:")
             for event_type, details in market_events.items():
@@ -148,29 +200,40 @@ class TwitterMentionsScraper(BaseScraper):
         """
         scraped_data = []
         try:
+            cursor = await self.get_cursor()
             try:
-                mentions = self.twitter_service.get_mentions(since_id=self.last_mention_id)
-            except tweepy.errors.TooManyRequests:
-                logger.warning("Twitter rate limit reached, skipping mentions scraping")
+                # Tweepy blocks, running it in a thread lets the other scrapers proceed
+                mentions = await asyncio.to_thread(
+                    self.twitter_service.get_mentions, since_id=cursor.last_seen_id
+                )
+            except (tweepy.errors.TooManyRequests, RateLimitExceeded) as e:
+                # The cursor is kept, the skipped mentions are fetched next cycle
+                logger.warning(f"Twitter rate limit reached, skipping mentions scraping: {e}")
                 return []  # Return empty list to skip this scraper
             except Exception as e:
                 logger.error(f"Error getting Twitter mentions: {str(e)}")
                 return []
 
-            # Process mentions if successful
-            if mentions:
-                self.last_mention_id = mentions[0].id
-                
             for tweet in mentions:
-                if await self.check_notification_exists(tweet.id):
+                if cursor.has_seen(tweet.id):
                     continue
                     
+                signals = get_signal_extractor().extract(tweet.text)
                 scraped_data.append(ScrapedNotification(
                     source="twitter_mentions",
                     short_desc=f"New mention from @{tweet.user_screen_name}",
-                    long_desc=self._format_tweet_content(tweet),
+                    long_desc=self._format_tweet_content(tweet, signals),
                     notification_date=tweet.created_at.isoformat(),
-                    relative_to_scraper_id=tweet.id
+                    relative_to_scraper_id=tweet.id,
+                    signals=signals
+                ))
+
+            # Process mentions if successful, the newest comes first
+            if mentions:
+                self.cursor_updates.append(CursorUpdate(
+                    cursor,
+                    seen_ids=[tweet.id for tweet in reversed(mentions)],
+                    last_seen_id=mentions[0].id
                 ))
                 
         except Exception as e:
@@ -179,16 +242,16 @@ class TwitterMentionsScraper(BaseScraper):
         return scraped_data
 
 class TwitterFeedScraper(BaseScraper):
-    def __init__(self, bot_username: str):
+    def __init__(self, bot_username: str, twitter_service: Optional[TwitterService] = None):
         """
         Initialize Twitter feed scraper.
 
         Args:
             bot_username (str): The username of the Twitter bot whose feed to monitor
+            twitter_service (Optional[TwitterService]): Service shared with other scrapers, built if not given
         """
         super().__init__(bot_username=bot_username)
-        self.twitter_service = TwitterService(bot_username=bot_username)
-        self.last_tweet_id: Optional[str] = None
+        self.twitter_service = twitter_service or TwitterService(bot_username=bot_username)
     
     def get_source_prefix(self) -> str:
         """
@@ -199,12 +262,13 @@ class TwitterFeedScraper(BaseScraper):
         """
         return "twitter_feed"
         
-    def _format_tweet_content(self, tweet: Tweet) -> str:
+    def _format_tweet_content(self, tweet: Tweet, signals: NotificationSignals) -> str:
         """
         Format tweet content with additional context.
 
         Args:
             tweet (Tweet): Tweet object to format
+            signals (NotificationSignals): Signals extracted from the tweet text
 
         Returns:
             str: Formatted tweet content including text, mentions, hashtags, and URLs
@@ -217,7 +281,7 @@ class TwitterFeedScraper(BaseScraper):
         if tweet.hashtags:
             content_parts.append(f"\nHashtags: {', '.join(['#' + tag for tag in tweet.hashtags])}")
         # Add trading signals if present
-        trading_signals = self.twitter_service.extract_trading_signals(tweet)
+        trading_signals = signals.to_trading_signals()
         if trading_signals:
             content_parts.append("\nTrading Signals:")
             if 'sentiment' in trading_signals:
@@ -227,7 +291,7 @@ class TwitterFeedScraper(BaseScraper):
                     content_parts.append(f"- {symbol}: ${price:,.2f}")
 
         # Add market events if present
-        market_events = self.twitter_service.extract_market_events(tweet)
+        market_events = signals.events
         if market_events:
             content_parts.append("\nMarket Events:")
             for event_type, details in market_events.items():
@@ -259,32 +323,41 @@ class TwitterFeedScraper(BaseScraper):
         """
         scraped_data = []
         try:
+            cursor = await self.get_cursor()
             try:
-                tweets = self.twitter_service.get_own_timeline(count=10, since_id=self.last_tweet_id)
-            except tweepy.errors.TooManyRequests:
-                logger.warning("Twitter rate limit reached, skipping feed scraping") 
+                tweets = await asyncio.to_thread(
+                    self.twitter_service.get_own_timeline, count=10, since_id=cursor.last_seen_id
+                )
+            except (tweepy.errors.TooManyRequests, RateLimitExceeded) as e:
+                logger.warning(f"Twitter rate limit reached, skipping feed scraping: {e}")
                 return []  # Return empty list to skip this scraper
             except Exception as e:
                 logger.error(f"Error getting Twitter timeline: {str(e)}")
                 return []
 
-            if tweets:
-                self.last_tweet_id = tweets[0].id
-                
             # Process tweets only if successful
             for tweet in tweets:
-                if await self.check_notification_exists(tweet.id):
+                if cursor.has_seen(tweet.id):
                     continue
                     
                 mentioned = [f"@{user}" for user in tweet.mentioned_users]
                 mentioned_str = f" replying to {', '.join(mentioned)}" if mentioned else ""
                 
+                signals = get_signal_extractor().extract(tweet.text)
                 scraped_data.append(ScrapedNotification(
                     source="twitter_feed",
                     short_desc=f"New tweet{mentioned_str}",
-                    long_desc=self._format_tweet_content(tweet),
+                    long_desc=self._format_tweet_content(tweet, signals),
                     notification_date=tweet.created_at.isoformat(),
-                    relative_to_scraper_id=tweet.id
+                    relative_to_scraper_id=tweet.id,
+                    signals=signals
+                ))
+
+            if tweets:
+                self.cursor_updates.append(CursorUpdate(
+                    cursor,
+                    seen_ids=[tweet.id for tweet in reversed(tweets)],
+                    last_seen_id=tweets[0].id
                 ))
                 
         except Exception as e:
@@ -296,7 +369,6 @@ class CoinMarketCapScraper(BaseScraper):
     def __init__(self, bot_username: str = ""):
         super().__init__(bot_username=bot_username)
         self.rss_url = "https://blog.coinmarketcap.com/feed/"
-        self.client = httpx.AsyncClient(follow_redirects=True)
     
     def get_source_prefix(self) -> str:
         """
@@ -310,7 +382,7 @@ class CoinMarketCapScraper(BaseScraper):
     async def scrape(self) -> List[ScrapedNotification]:
         scraped_data = []
         try:
-            response = requests.get(self.rss_url)
+            response = await self.get_http().get(self.rss_url)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, "xml")
@@ -358,7 +430,6 @@ class CoinMarketCapScraper(BaseScraper):
             logger.error(f"Error scraping CoinMarketCap RSS: {str(e)}")
             
         self.last_check_time = datetime.now()
-        await self.client.aclose()
         return scraped_data
 
 class CoinGeckoScraper(BaseScraper):
@@ -367,11 +438,9 @@ class CoinGeckoScraper(BaseScraper):
         # Get API key from environment
         self.api_key = os.getenv("COINGECKO_API_KEY", "")
         
-        # Initialize HTTP client for direct API calls
-        self.client = httpx.AsyncClient(
-            base_url="https://pro-api.coingecko.com/api/v3" if self.api_key else "https://api.coingecko.com/api/v3",
-            headers={'x-cg-pro-api-key': self.api_key} if self.api_key else {}
-        )
+        # Endpoint and headers of the direct API calls, sent through the shared fetcher
+        self.base_url = "https://pro-api.coingecko.com/api/v3" if self.api_key else "https://api.coingecko.com/api/v3"
+        self.headers = {'x-cg-pro-api-key': self.api_key} if self.api_key else {}
         if self.api_key:
             logger.info("Initialized CoinGecko client with Pro API endpoint")
         else:
@@ -393,26 +462,30 @@ class CoinGeckoScraper(BaseScraper):
     async def scrape(self) -> List[ScrapedNotification]:
         scraped_data = []
         try:
+            if not self.tracked_currencies:
+                return scraped_data
+            
+            # One request for the prices of every tracked currency
+            response = await self.get_http().get(
+                self.base_url + "/simple/price",
+                headers=self.headers,
+                params={
+                    'ids': ",".join(self.tracked_currencies),
+                    'vs_currencies': 'usd',
+                    'include_24hr_change': 'true'
+                }
+            )
+            response.raise_for_status()
+            data = response.json() or {}
+            
             for currency in self.tracked_currencies:
-                base_url = "https://pro-api.coingecko.com/api/v3" if self.api_key else "https://api.coingecko.com/api/v3"
-                headers = {'x-cg-pro-api-key': self.api_key} if self.api_key else {}
-                response = requests.get(
-                    base_url + "/simple/price",
-                    headers=headers,
-                    params={
-                        'ids': currency,
-                        'vs_currencies': 'usd',
-                        'include_24hr_change': 'true'
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data or currency not in data:
+                if currency not in data:
                     continue
                 
-                current_price = data[currency]['usd']
-                price_change = data[currency]['usd_24h_change']
+                current_price = data[currency].get('usd')
+                price_change = data[currency].get('usd_24h_change')
+                if current_price is None or price_change is None:
+                    continue
                 
                 # Create unique ID for this price update
                 price_update_id = f"{currency}_{current_price}_{price_change}"
@@ -464,12 +537,26 @@ class RedditScraper(BaseScraper):
         """
         return "reddit"
     
+    def _fetch_hot_posts(self) -> Dict[str, list]:
+        """
+        Fetch the hot posts of every subreddit.
+
+        PRAW blocks on its requests, so this runs in a thread.
+
+        Returns:
+            Dict[str, list]: Hot posts by subreddit name
+        """
+        return {
+            subreddit_name: list(self.reddit.subreddit(subreddit_name).hot(limit=10))
+            for subreddit_name in self.subreddits
+        }
+
     async def scrape(self) -> List[ScrapedNotification]:
         scraped_data = []
         try:
-            for subreddit_name in self.subreddits:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                for post in subreddit.hot(limit=10):
+            hot_posts = await asyncio.to_thread(self._fetch_hot_posts)
+            for subreddit_name, posts in hot_posts.items():
+                for post in posts:
                     created_time = datetime.fromtimestamp(post.created_utc)
                     
                     if self.last_check_time and created_time <= self.last_check_time:
@@ -510,8 +597,6 @@ class RSSFeedScraper(BaseScraper):
         super().__init__(bot_username)
         self.feed_urls = feed_urls
         self.news_type = news_type
-        # Initialize a dictionary to store the last seen entry IDs for each feed
-        self.last_entry_ids: Dict[str, Set[str]] = {feed: set() for feed in feed_urls}
         # Common user agent to mimic a regular browser
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -653,180 +738,328 @@ class RSSFeedScraper(BaseScraper):
     async def scrape(self) -> List[ScrapedNotification]:
         scraped_data = []
         try:
-            for feed_name, feed_url in self.feed_urls.items():
+            # Feeds are fetched concurrently, the fetcher limits the requests per host
+            feed_results = await asyncio.gather(
+                *(self._scrape_feed(feed_name, feed_url) for feed_name, feed_url in self.feed_urls.items())
+            )
+            for feed_data in feed_results:
+                scraped_data.extend(feed_data)
+            
+        except Exception as e:
+            logger.error(f"Error in RSS scraping: {str(e)}")
+        
+        return scraped_data
+
+    async def _scrape_feed(self, feed_name: str, feed_url: str) -> List[ScrapedNotification]:
+        """
+        Scrape a single feed.
+
+        Args:
+            feed_name (str): Name of the feed source
+            feed_url (str): URL of the feed
+
+        Returns:
+            List[ScrapedNotification]: Notifications of the entries not seen before
+        """
+        scraped_data = []
+        try:
+            logger.info(f"Scraping RSS feed: {feed_name} from {feed_url}")
+            # Seen entries and validators of the feed, persisted across cycles
+            cursor = await self.get_cursor(feed_name)
+            
+            # Try different approaches if the site blocks direct requests
+            try:
+                # First attempt: Use httpx with headers, conditional on the last fetched version
+                response = await self.get_http().get(
+                    feed_url, headers={**self.headers, **cursor.conditional_headers()}
+                )
+                if response.status_code == 304:
+                    logger.info(f"RSS feed {feed_name} not modified since the last cycle")
+                    return []
+                response.raise_for_status()  # Will raise an exception for 4XX/5XX responses
+                feed_content = response.text
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 403:
+                    logger.warning(f"Access forbidden (403) for {feed_name}.")
+                    # For Bitcoin Magazine specifically, we can try an alternative feed URL or use feedparser directly
+                    # If we get here, we couldn't access the feed
+                    logger.error(f"Could not access feed {feed_name}: Access Forbidden (403)")
+                    return []
+                else:
+                    # For other HTTP errors, log and skip
+                    logger.error(f"HTTP error {e.response.status_code} for {feed_name}: {str(e)}")
+                    return []
+            except Exception as request_error:
+                logger.error(f"Error fetching feed {feed_name}: {str(request_error)}")
+                return []
+            
+            # Preprocess the feed content to fix any XML issues
+            feed_content = self._preprocess_feed(feed_content, feed_name)
+            
+            # Parse the preprocessed feed
+            feed = feedparser.parse(feed_content, sanitize_html=True)
+            
+            # Check for bozo_exception but continue if there are entries
+            if hasattr(feed, 'bozo_exception'):
+                logger.warning(f"Warning parsing feed {feed_name}: {feed.bozo_exception}")
+                if not feed.entries:
+                    logger.error(f"No entries found in feed {feed_name}, skipping")
+                    return []
+            
+            # IDs of the entries handled in this cycle, in feed order
+            handled_ids = []
+            
+            # Process entries
+            for entry in feed.entries:
                 try:
-                    logger.info(f"Scraping RSS feed: {feed_name} from {feed_url}")
+                    # Use entry id or link as unique identifier
+                    entry_id = entry.get("id", entry.get("link", ""))
                     
-                    # Try different approaches if the site blocks direct requests
-                    try:
-                        # First attempt: Use httpx with headers
-                        async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-                            response = await client.get(feed_url, headers=self.headers)
-                            response.raise_for_status()  # Will raise an exception for 4XX/5XX responses
-                            feed_content = response.text
-                    except httpx.HTTPStatusError as e:
-                        if e.response.status_code == 403:
-                            logger.warning(f"Access forbidden (403) for {feed_name}.")
-                            # For Bitcoin Magazine specifically, we can try an alternative feed URL or use feedparser directly
-                            # If we get here, we couldn't access the feed
-                            logger.error(f"Could not access feed {feed_name}: Access Forbidden (403)")
-                            continue
-                        else:
-                            # For other HTTP errors, log and skip
-                            logger.error(f"HTTP error {e.response.status_code} for {feed_name}: {str(e)}")
-                            continue
-                    except Exception as request_error:
-                        logger.error(f"Error fetching feed {feed_name}: {str(request_error)}")
+                    # Skip if no valid ID
+                    if not entry_id:
+                        continue
+                    
+                    # Skip if we've seen this entry before
+                    if cursor.has_seen(entry_id):
+                        handled_ids.append(entry_id)
                         continue
                     
-                    # Preprocess the feed content to fix any XML issues
-                    feed_content = self._preprocess_feed(feed_content, feed_name)
+                    # Format the content
+                    content = self._format_entry_content(entry, feed_name)
                     
-                    # Parse the preprocessed feed
-                    feed = feedparser.parse(feed_content, sanitize_html=True)
+                    # Parse and standardize the publication date
+                    try:
+                        if isinstance(content["pub_date"], str):
+                            dt = parser.parse(content["pub_date"])
+                            content["pub_date"] = dt.isoformat()
+                    except Exception as date_error:
+                        logger.warning(f"Error parsing date for {feed_name}: {date_error}")
+                        content["pub_date"] = datetime.now().isoformat()
                     
-                    # Check for bozo_exception but continue if there are entries
-                    if hasattr(feed, 'bozo_exception'):
-                        logger.warning(f"Warning parsing feed {feed_name}: {feed.bozo_exception}")
-                        if not feed.entries:
-                            logger.error(f"No entries found in feed {feed_name}, skipping")
-                            continue
+                    # Create notification
+                    notification = ScrapedNotification(
+                        source=self.get_source_prefix(),
+                        short_desc=content["short_desc"],
+                        long_desc=content["long_desc"],
+                        notification_date=content["pub_date"],
+                        relative_to_scraper_id=entry_id
+                    )
                     
-                    # Process entries
-                    for entry in feed.entries:
-                        try:
-                            # Use entry id or link as unique identifier
-                            entry_id = entry.get("id", entry.get("link", ""))
-                            
-                            # Skip if no valid ID
-                            if not entry_id:
-                                continue
-                            
-                            # Skip if we've seen this entry before
-                            if entry_id in self.last_entry_ids[feed_name]:
-                                continue
-                            
-                            # Format the content
-                            content = self._format_entry_content(entry, feed_name)
-                            
-                            # Parse and standardize the publication date
-                            try:
-                                if isinstance(content["pub_date"], str):
-                                    dt = parser.parse(content["pub_date"])
-                                    content["pub_date"] = dt.isoformat()
-                            except Exception as date_error:
-                                logger.warning(f"Error parsing date for {feed_name}: {date_error}")
-                                content["pub_date"] = datetime.now().isoformat()
-                            
-                            # Create notification
-                            notification = ScrapedNotification(
-                                source=self.get_source_prefix(),
-                                short_desc=content["short_desc"],
-                                long_desc=content["long_desc"],
-                                notification_date=content["pub_date"],
-                                relative_to_scraper_id=entry_id
-                            )
-                            
-                            # Add to scraped data
-                            scraped_data.append(notification)
-                            
-                            # Add to seen entries
-                            self.last_entry_ids[feed_name].add(entry_id)
-                            
-                        except Exception as entry_error:
-                            logger.error(f"Error processing entry in feed {feed_name}: {str(entry_error)}")
-                            continue
+                    # Add to scraped data
+                    scraped_data.append(notification)
                     
-                    # Limit the size of the seen entries set
-                    self.last_entry_ids[feed_name] = set(list(self.last_entry_ids[feed_name])[-1000:])
+                    # Add to seen entries
+                    handled_ids.append(entry_id)
                     
-                except Exception as feed_error:
-                    logger.error(f"Error scraping RSS feed {feed_name}: {str(feed_error)}")
+                except Exception as entry_error:
+                    logger.error(f"Error processing entry in feed {feed_name}: {str(entry_error)}")
                     continue
             
-        except Exception as e:
-            logger.error(f"Error in RSS scraping: {str(e)}")
+            # Feeds list the newest entry first, the cursor keeps the most recent ones.
+            # Only a processed version of the feed may be skipped as unchanged.
+            self.cursor_updates.append(CursorUpdate(
+                cursor,
+                seen_ids=list(reversed(handled_ids)),
+                last_seen_id=handled_ids[0] if handled_ids else None,
+                validators=response.headers
+            ))
+            
+        except Exception as feed_error:
+            logger.error(f"Error scraping RSS feed {feed_name}: {str(feed_error)}")
         
         return scraped_data
 
 class ScraperManager:
-    def __init__(self, notification_manager: NotificationDatabaseManager):
+    def __init__(
+        self,
+        notification_manager: NotificationDatabaseManager,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        scraper_timeout_seconds: float = DEFAULT_SCRAPER_TIMEOUT_SECONDS,
+        event_publisher: Optional[NotificationEventPublisher] = None,
+    ):
         """
         Initialize scraper manager.
 
         Args:
             notification_manager (NotificationDatabaseManager): Manager for storing notifications
+            max_concurrency (int): Maximum number of HTTP requests in flight across all scrapers
+            per_host_limit (int): Maximum number of HTTP requests in flight to the same host
+            scraper_timeout_seconds (float): Time budget of one scraper in a cycle
+            event_publisher (Optional[NotificationEventPublisher]): Notifies the agents of stored notifications
         """
         self.notification_manager = notification_manager
+        self.event_publisher = event_publisher
         self.scrapers: List[BaseScraper] = []
+        self.http = HttpFetcher(max_concurrency=max_concurrency, per_host_limit=per_host_limit)
+        self.cursor_store = CursorStore(notification_manager.db_path)
+        self.scraper_timeout_seconds = scraper_timeout_seconds
         
     def add_scraper(self, scraper: BaseScraper):
         """Add a scraper to the manager."""
         scraper.notification_manager = self.notification_manager  # Set the notification manager
+        scraper.http = self.http  # Share the pooled HTTP client
+        scraper.cursor_store = self.cursor_store  # Share the persisted cursors
         self.scrapers.append(scraper)
+
+    async def clear_scrapers(self):
+        """Remove all scrapers, closing those holding resources of their own."""
+        for scraper in self.scrapers:
+            if hasattr(scraper, 'close'):
+                try:
+                    await scraper.close()
+                except Exception as e:
+                    logger.error(f"Error closing {scraper.__class__.__name__}: {str(e)}")
+        self.scrapers = []
     
+    async def _run_scraper(
+        self, scraper: BaseScraper
+    ) -> Tuple[List[ScrapedNotification], List[CursorUpdate]]:
+        """
+        Run a scraper within its time budget.
+
+        Returns:
+            Tuple[List[ScrapedNotification], List[CursorUpdate]]: The scraped items and the
+                cursor updates to apply once they are stored, neither if the scraper failed
+                or ran out of time
+        """
+        scraper.take_cursor_updates()
+        try:
+            items = await asyncio.wait_for(scraper.scrape(), timeout=self.scraper_timeout_seconds)
+            return items, scraper.take_cursor_updates()
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"{scraper.__class__.__name__} did not finish within {self.scraper_timeout_seconds}s, skipping it this cycle"
+            )
+        except Exception as e:
+            logger.error(f"Error in scraping cycle for {scraper.__class__.__name__}: {str(e)}")
+        # The items are dropped, so the cursors must not move past them
+        scraper.take_cursor_updates()
+        return [], []
+
+    def _publish(self, notification_ids: List[str], items_by_id: Dict[str, ScrapedNotification]):
+        """Tell the subscribed agents which notifications were stored, per source."""
+        if self.event_publisher is None:
+            return
+
+        ids_by_source: Dict[str, List[str]] = {}
+        high_signal_sources = set()
+        for notification_id in notification_ids:
+            item = items_by_id[notification_id]
+            ids_by_source.setdefault(item.source, []).append(notification_id)
+            if item.signals is not None and item.signals.is_high_signal():
+                high_signal_sources.add(item.source)
+
+        for source, ids in ids_by_source.items():
+            self.event_publisher.publish(source, ids, high_signal=source in high_signal_sources)
+
+    async def _store(self, scraper: BaseScraper, scraped_items: List[ScrapedNotification]) -> bool:
+        """
+        Store the items of a scraper in batch, falling back to one by one if the batch fails.
+
+        Returns:
+            bool: Whether every item is in the database
+        """
+        # Extract the signals of the items the scraper did not analyze, in one batch
+        pending = [item for item in scraped_items if item.signals is None]
+        extracted = get_signal_extractor().extract_many(
+            f"{item.short_desc}\n{item.long_desc}" for item in pending
+        )
+        for item, signals in zip(pending, extracted):
+            item.signals = signals
+
+        # Prepare batch notifications, with their IDs to publish those inserted
+        batch_notifications = []
+        items_by_id = {}
+        
+        for item in scraped_items:
+            notification_id = str(uuid.uuid4())
+            items_by_id[notification_id] = item
+            # Add to batch
+            batch_notifications.append({
+                "notification_id": notification_id,
+                "source": item.source,
+                "short_desc": item.short_desc,
+                "long_desc": item.long_desc,
+                "notification_date": item.notification_date,
+                "relative_to_scraper_id": item.relative_to_scraper_id,
+                "bot_username": scraper.bot_username,
+                "signals": item.signals
+            })
+        
+        # Create notifications in batch if there are any
+        if batch_notifications:
+            logger.info(f"Creating batch of {len(batch_notifications)} notifications from {scraper.__class__.__name__}")
+            try:
+                batch_result = await self.notification_manager.create_notifications_batch(batch_notifications)
+                logger.info(
+                    f"Successfully created {batch_result.inserted} notifications in batch, "
+                    f"skipped {batch_result.skipped} already stored"
+                )
+                self._publish(batch_result.notification_ids, items_by_id)
+                return True
+            except Exception as e:
+                logger.error(f"Error creating batch notifications: {str(e)}")
+                # Fallback to individual creation if batch fails
+                logger.info("Falling back to individual notification creation")
+                stored_all = True
+                stored_ids = []
+                for notification in batch_notifications:
+                    try:
+                        notification_id = await self.notification_manager.create_notification(
+                            source=notification["source"],
+                            short_desc=notification["short_desc"],
+                            long_desc=notification["long_desc"],
+                            notification_date=notification["notification_date"],
+                            relative_to_scraper_id=notification["relative_to_scraper_id"],
+                            bot_username=notification["bot_username"],
+                            signals=notification["signals"],
+                            notification_id=notification["notification_id"]
+                        )
+                        if notification_id:
+                            stored_ids.append(notification_id)
+                        
+                    except Exception as individual_error:
+                        import traceback
+                        logger.error(traceback.format_exc())
+                        logger.error(f"Error creating individual notification: {str(individual_error)}")
+                        stored_all = False
+                self._publish(stored_ids, items_by_id)
+                return stored_all
+        return True
+
     async def run_scraping_cycle(self):
         """
         Run one cycle of scraping from all sources.
         
         This method:
-        1. Iterates through all registered scrapers
-        2. Runs each scraper to collect notifications
-        3. Batches notifications for efficient storage
-        4. Falls back to individual notification creation if batch fails
+        1. Runs all registered scrapers concurrently, each within its time budget
+        2. Batches the notifications of each scraper for efficient storage
+        3. Falls back to individual notification creation if batch fails
         
-        Raises:
-            Exception: If there's an error during the scraping cycle
+        A slow or failing scraper only loses its own items for the cycle. The
+        cursors of a scraper only move once its items are stored, so items
+        that could not be stored are scraped again next cycle.
         """
-        for scraper in self.scrapers:
+        results = await asyncio.gather(*(self._run_scraper(scraper) for scraper in self.scrapers))
+        
+        for scraper, (scraped_items, cursor_updates) in zip(self.scrapers, results):
             try:
-                scraped_items = await scraper.scrape()
-                
-                if not scraped_items:
-                    continue
-                
-                # Prepare batch notifications
-                batch_notifications = []
-                
-                for item in scraped_items:
-                    # Add to batch
-                    batch_notifications.append({
-                        "source": item.source,
-                        "short_desc": item.short_desc,
-                        "long_desc": item.long_desc,
-                        "notification_date": item.notification_date,
-                        "relative_to_scraper_id": item.relative_to_scraper_id,
-                        "bot_username": scraper.bot_username
-                    })
-                
-                # Create notifications in batch if there are any
-                if batch_notifications:
-                    logger.info(f"Creating batch of {len(batch_notifications)} notifications from {scraper.__class__.__name__}")
-                    try:
-                        notification_ids = await self.notification_manager.create_notifications_batch(batch_notifications)
-                        logger.info(f"Successfully created {len(notification_ids)} notifications in batch")
-                    except Exception as e:
-                        logger.error(f"Error creating batch notifications: {str(e)}")
-                        # Fallback to individual creation if batch fails
-                        logger.info("Falling back to individual notification creation")
-                        for notification in batch_notifications:
-                            try:
-                                await self.notification_manager.create_notification(
-                                    source=notification["source"],
-                                    short_desc=notification["short_desc"],
-                                    long_desc=notification["long_desc"],
-                                    notification_date=notification["notification_date"],
-                                    relative_to_scraper_id=notification["relative_to_scraper_id"],
-                                    bot_username=notification["bot_username"]
-                                )
-                                
-                            except Exception as individual_error:
-                                import traceback
-                                logger.error(traceback.format_exc())
-                                logger.error(f"Error creating individual notification: {str(individual_error)}")
-                
+                stored = await self._store(scraper, scraped_items) if scraped_items else True
             except Exception as e:
-                logger.error(f"Error in scraping cycle for {scraper.__class__.__name__}: {str(e)}")
+                logger.error(f"Error storing notifications of {scraper.__class__.__name__}: {str(e)}")
+                stored = False
+
+            if stored:
+                await self.cursor_store.commit(cursor_updates)
+            elif cursor_updates:
+                logger.warning(
+                    f"Keeping the cursors of {scraper.__class__.__name__}, its items will be scraped again"
+                )
+
+    async def aclose(self):
+        """Close the HTTP client shared by the scrapers."""
+        await self.http.aclose()
                 
     async def start_periodic_scraping(self, interval_seconds: int = 3600):  # Default 1 hour
         """Start periodic scraping with the specified interval."""
@@ -855,7 +1088,7 @@ if __name__ == "__main__":
         #             print(f"- {item.short_desc}")
         #             print(f"  {item.long_desc[:200]}...")  # Show first 200 chars of description
         #     finally:
-        #         await cmc_scraper.client.aclose()
+        #         await cmc_scraper.get_http().aclose()
         
         # asyncio.run(test_cmc())
         
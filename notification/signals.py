@@ -0,0 +1,127 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+from models import NotificationSignals
+
+# Price mentions, e.g. "$BTC 50000" or "BTC/USD 50000"
+PRICE_PATTERN = r'\$?([a-z]{2,5})[/-]?(?:usd)?\s*[\$]?\s*([\d,.]+)k?'
+
+BULLISH_KEYWORDS = ('buy', 'long', 'bullish', 'support', 'breakout', 'accumulate')
+BEARISH_KEYWORDS = ('sell', 'short', 'bearish', 'resistance', 'breakdown', 'dump')
+
+# Market events, the first group of a pattern is the subject of the event.
+# Patterns are anchored on word boundaries, so e.g. "second" is not the SEC
+EVENT_PATTERNS = {
+    'listing': r'\b(?:listed|listing|lists) on (\w+)',
+    'partnership': r'\bpartners? with (\w+)',
+    'launch': r'\b(?:launch|releases?|announces?) (\w+)',
+    'hack': r'\b(?:hack|exploit|breach|attack)',
+    'regulation': r'\b(?:sec|regulations?|regulatory|laws?|compliance)\b',
+}
+
+
+class SignalExtractor:
+    """
+    Extracts trading signals and market events from notification text.
+
+    Every pattern is compiled once, and the sentiment keywords of both
+    polarities are matched in a single scan of the text by one alternation,
+    so an extractor is built once and shared by all scrapers.
+    """
+
+    def __init__(
+        self,
+        bullish_keywords: Iterable[str] = BULLISH_KEYWORDS,
+        bearish_keywords: Iterable[str] = BEARISH_KEYWORDS,
+        event_patterns: Dict[str, str] = EVENT_PATTERNS,
+    ):
+        """
+        Compile the patterns of the extractor.
+
+        Args:
+            bullish_keywords (Iterable[str]): Keywords marking a bullish text
+            bearish_keywords (Iterable[str]): Keywords marking a bearish text
+            event_patterns (Dict[str, str]): Regex of each market event type
+        """
+        self.price_re = re.compile(PRICE_PATTERN)
+        # Longest keywords first, so a keyword is not shadowed by one of its prefixes
+        bullish = sorted(bullish_keywords, key=len, reverse=True)
+        bearish = sorted(bearish_keywords, key=len, reverse=True)
+        self.sentiment_re = re.compile(
+            f"(?P<bullish>{'|'.join(map(re.escape, bullish))})"
+            f"|(?P<bearish>{'|'.join(map(re.escape, bearish))})"
+        )
+        self.event_res = {
+            event_type: re.compile(pattern) for event_type, pattern in event_patterns.items()
+        }
+
+    def _prices(self, text: str) -> Dict[str, float]:
+        prices = {}
+        for match in self.price_re.finditer(text):
+            symbol, price = match.groups()
+            # check if price is real number
+            if not price.replace(',', '').replace('.', '').isdigit():
+                continue
+            try:
+                prices[symbol.upper()] = float(price.replace(',', ''))
+            except ValueError:
+                continue
+        return prices
+
+    def _sentiment(self, text: str) -> Optional[str]:
+        # Bullish wins when both polarities are present
+        sentiment = None
+        for match in self.sentiment_re.finditer(text):
+            if match.lastgroup == 'bullish':
+                return 'bullish'
+            sentiment = 'bearish'
+        return sentiment
+
+    def _events(self, text: str) -> Dict[str, List]:
+        events = {}
+        for event_type, event_re in self.event_res.items():
+            for match in event_re.finditer(text):
+                events.setdefault(event_type, []).append(
+                    match.group(1) if event_re.groups else True
+                )
+        return events
+
+    def extract(self, text: str) -> NotificationSignals:
+        """
+        Extract the signals of a text.
+
+        Args:
+            text (str): Text to analyze, matched case-insensitively
+
+        Returns:
+            NotificationSignals: Sentiment, prices by symbol and market events found in the text
+        """
+        text = text.lower()
+        return NotificationSignals(
+            sentiment=self._sentiment(text),
+            prices=self._prices(text),
+            events=self._events(text),
+        )
+
+    def extract_many(self, texts: Iterable[str]) -> List[NotificationSignals]:
+        """
+        Extract the signals of many texts, e.g. a batch of notifications.
+
+        Args:
+            texts (Iterable[str]): Texts to analyze
+
+        Returns:
+            List[NotificationSignals]: Signals of each text, in order
+        """
+        return [self.extract(text) for text in texts]
+
+
+_extractor: Optional[SignalExtractor] = None
+
+
+def get_signal_extractor() -> SignalExtractor:
+    """Get the extractor shared by the scrapers, compiled on first use."""
+    global _extractor
+    if _extractor is None:
+        _extractor = SignalExtractor()
+    return _extractor
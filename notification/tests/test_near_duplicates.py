@@ -0,0 +1,104 @@
+import unittest
+
+from near_duplicates import (
+    MIN_NEAR_DUPLICATE_TOKENS,
+    NEAR_DUPLICATE_DISTANCE,
+    NearDuplicateIndex,
+    simhash,
+    tokenize,
+)
+
+STORY = (
+    "Bitcoin climbed above seventy thousand dollars on Tuesday as spot ETF inflows "
+    "reached a record for the third week in a row while traders priced in rate cuts "
+    "from the Federal Reserve and miners held on to their coins ahead of the halving. "
+    "Analysts said the rally could extend into the end of the quarter if demand from "
+    "institutional buyers keeps outpacing the supply of newly mined coins, although funding "
+    "rates on perpetual futures suggest that leverage is building up again across exchanges"
+)
+
+
+def syndicated(story: str, feed: str) -> str:
+    return (
+        f"Title: Bitcoin tops 70k\n"
+        f"Summary: {story}\n"
+        f"Link: https://{feed}.example.com/bitcoin-70k?utm_source=rss\n"
+        f"Source: {feed}\n"
+        f"Published: 2024-03-12T09:00:00Z"
+    )
+
+
+def distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class TestSimHash(unittest.TestCase):
+    def test_tokenize_drops_links_labels_and_volatile_lines(self):
+        self.assertEqual(
+            tokenize("Title: ETH up\nLink: https://a.example.com/x\nSource: feed\nsee www.b.example.com NOW"),
+            ["eth", "up", "see", "now"],
+        )
+
+    def test_syndicated_copies_share_a_fingerprint(self):
+        coindesk = simhash(tokenize(syndicated(STORY, "coindesk")))
+        decrypt = simhash(tokenize(syndicated(STORY, "decrypt")))
+
+        self.assertEqual(coindesk, decrypt)
+
+    def test_small_edits_stay_within_the_distance(self):
+        original = simhash(tokenize(STORY))
+        credited = simhash(tokenize(STORY + " Read more on CoinDesk"))
+        edited = simhash(tokenize(STORY.replace("record", "new")))
+        unrelated = simhash(tokenize(STORY.replace("Bitcoin", "Solana").replace("record", "low")[::-1]))
+
+        self.assertLessEqual(distance(original, credited), NEAR_DUPLICATE_DISTANCE)
+        self.assertLessEqual(distance(original, edited), NEAR_DUPLICATE_DISTANCE)
+        self.assertGreater(distance(original, unrelated), NEAR_DUPLICATE_DISTANCE)
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def test_near_duplicates_join_the_first_cluster(self):
+        index = NearDuplicateIndex()
+
+        _, first = index.cluster("a", syndicated(STORY, "coindesk"))
+        _, copy = index.cluster("b", syndicated(STORY.replace("record", "new"), "decrypt"))
+        _, other = index.cluster("c", "Ethereum developers scheduled the next network upgrade " * 4)
+
+        self.assertEqual((first, copy, other), ("a", "a", "c"))
+
+    def test_short_texts_only_cluster_when_identical(self):
+        index = NearDuplicateIndex()
+        alert = "BTC price alert: up 5.2% in the last hour"
+        self.assertLess(len(tokenize(alert)), MIN_NEAR_DUPLICATE_TOKENS)
+
+        _, first = index.cluster("a", alert)
+        _, same = index.cluster("b", alert)
+        _, changed = index.cluster("c", alert.replace("5.2", "5.3"))
+
+        self.assertEqual((first, same, changed), ("a", "a", "c"))
+
+    def test_band_lookup_finds_fingerprints_within_the_distance(self):
+        index = NearDuplicateIndex()
+        fingerprint = 0x0123456789ABCDEF
+        index.load([(f"{fingerprint:016x}", "cluster")])
+
+        # Differing bits spread over the bands still leave a band in common
+        near = fingerprint ^ sum(1 << bit for bit in range(0, 60, 10))
+        far = near ^ (1 << 60)
+
+        self.assertEqual(index._find(near), "cluster")
+        self.assertIsNone(index._find(far))
+
+    def test_oldest_fingerprints_are_evicted(self):
+        index = NearDuplicateIndex(capacity=2)
+        index.load([("0000000000000001", "a"), ("0000000000000002", "b"), ("0000000000000100", "c")])
+
+        self.assertEqual(list(index._clusters.values()), ["b", "c"])
+        buckets = [bucket for band in index._bands for bucket in band.values()]
+        self.assertNotIn(0x1, [fingerprint for bucket in buckets for fingerprint in bucket])
+        # Evicted fingerprints leave no empty band buckets behind
+        self.assertTrue(all(buckets))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from notification_database_manager import NotificationDatabaseManager
+
+
+def notification(i: int) -> dict:
+    return {
+        "source": "rss",
+        "short_desc": f"Headline {i}",
+        "long_desc": f"Story number {i}",
+        "notification_date": "2024-03-12T09:00:00",
+        "relative_to_scraper_id": f"item-{i}",
+    }
+
+
+class TestNotificationDatabaseManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = NotificationDatabaseManager(os.path.join(self.tmp.name, "notifications.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batch_reports_only_the_new_notifications(self):
+        first = asyncio.run(self.manager.create_notifications_batch([notification(i) for i in range(6)]))
+        second_batch = [notification(i) for i in range(7)]
+        second_batch[6]["notification_id"] = "new-id"
+        second = asyncio.run(self.manager.create_notifications_batch(second_batch))
+
+        self.assertEqual((first.inserted, first.skipped), (6, 0))
+        self.assertEqual((second.inserted, second.skipped), (1, 6))
+        self.assertEqual(second.notification_ids, ["new-id"])
+
+    def test_duplicates_within_a_batch_are_stored_once(self):
+        result = asyncio.run(self.manager.create_notifications_batch([notification(1), notification(1)]))
+
+        self.assertEqual((result.inserted, result.skipped), (1, 1))
+
+    def test_stored_notification_is_not_created_again(self):
+        stored = asyncio.run(self.manager.create_notification(**notification(1)))
+        again = asyncio.run(self.manager.create_notification(**notification(1)))
+
+        self.assertIsNotNone(stored)
+        self.assertIsNone(again)
+
+
+if __name__ == "__main__":
+    unittest.main()
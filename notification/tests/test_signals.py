@@ -0,0 +1,31 @@
+import unittest
+
+from signals import SignalExtractor
+
+
+class TestSignalExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = SignalExtractor()
+
+    def test_events_match_whole_words(self):
+        signals = self.extractor.extract(
+            "For a second day, security researchers found flaws in the bridge contract"
+        )
+
+        self.assertEqual(signals.events, {})
+        self.assertFalse(signals.is_high_signal())
+
+    def test_market_events_are_high_signal(self):
+        signals = self.extractor.extract("The SEC sues an exchange after a hack drained its wallets")
+
+        self.assertEqual(signals.events, {"regulation": [True], "hack": [True]})
+        self.assertTrue(signals.is_high_signal())
+
+    def test_event_subjects_are_captured(self):
+        signals = self.extractor.extract("Token listed on Binance as the team partners with Chainlink")
+
+        self.assertEqual(signals.events, {"listing": ["binance"], "partnership": ["chainlink"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,14 @@
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Set
-import re
 import os
 
 import tweepy
 from pydantic import BaseModel
 
+from signals import get_signal_extractor
+from twitter_rate_limit import RateLimitedClient, RateLimitExceeded
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -76,26 +78,41 @@ class TwitterService:
             retry_errors=False
         )
         
-        # Initialize Twitter API v2 client with minimal settings
-        self.client = tweepy.Client(
+        # Initialize Twitter API v2 client, its calls share the rate limit budget of the process
+        self.client = RateLimitedClient(
             consumer_key=os.getenv("TWITTER_API_KEY"),
             consumer_secret=os.getenv("TWITTER_API_SECRET"),
             access_token=os.getenv("TWITTER_ACCESS_TOKEN"),
             access_token_secret=os.getenv("TWITTER_ACCESS_TOKEN_SECRET"),
-            wait_on_rate_limit=False
         )
         self.bot_username = bot_username
         
         # Get user ID for the bot
+        self.user_id = None
+        self._resolve_user_id()
+            
+        logger.info(f"Initialized Twitter service for bot: {bot_username}")
+
+    def _resolve_user_id(self) -> Optional[str]:
+        """
+        Look up the user ID of the bot, once per service.
+
+        A failed lookup is retried on the next call, so a service shared across
+        cycles recovers without being rebuilt.
+
+        Returns:
+            Optional[str]: The user ID, None if the lookup failed
+        """
+        if self.user_id:
+            return self.user_id
         try:
-            user = self.client.get_user(username=bot_username)
+            user = self.client.get_user(username=self.bot_username)
             logger.info(f"User ID: {user}")
             self.user_id = user.data.id
         except Exception as e:
             logger.error(f"Error getting user ID: {str(e)}")
             self.user_id = None
-            
-        logger.info(f"Initialized Twitter service for bot: {bot_username}")
+        return self.user_id
         
     def _process_tweet(self, tweet) -> Tweet:
         """
@@ -187,7 +204,7 @@ class TwitterService:
             Rate limited to 180 requests per 15 minutes
         """
         try:
-            if not self.user_id:
+            if not self._resolve_user_id():
                 logger.error("User ID not available")
                 return []
                 
@@ -263,6 +280,9 @@ class TwitterService:
                 
             return tweets
             
+        except (tweepy.errors.TooManyRequests, RateLimitExceeded):
+            # Let the caller keep its cursor and retry once the budget is back
+            raise
         except Exception as e:
             logger.error(f"Error getting mentions: {str(e)}")
             return []
@@ -282,7 +302,7 @@ class TwitterService:
             Rate limited to 5 requests per 15 minutes
         """
         try:
-            if not self.user_id:
+            if not self._resolve_user_id():
                 logger.error("User ID not available")
                 return []
                 
@@ -349,6 +369,8 @@ class TwitterService:
                 
             return tweets
             
+        except (tweepy.errors.TooManyRequests, RateLimitExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error getting own timeline: {str(e)}")
             return []
@@ -364,32 +386,7 @@ class TwitterService:
             Optional[Dict]: Dictionary containing extracted trading signals if found,
                           None if no signals detected
         """
-        text = tweet.text.lower()
-        signals = {}
-        
-        # Price patterns (e.g., "$BTC 50000" or "BTC/USD 50000")
-        price_pattern = r'\$?([a-z]{2,5})[/-]?(?:usd)?\s*[\$]?\s*([\d,.]+)k?'
-        matches = re.finditer(price_pattern, text)
-        for match in matches:
-            symbol, price = match.groups()
-            # check if price is real number
-            if not price.replace(',', '').replace('.', '').isdigit():
-                continue
-            # Convert price to float, handling "k" notation
-            price = price.replace(',', '')
-            if 'k' in price.lower():
-                price = float(price.lower().replace('k', '')) * 1000
-            else:
-                price = float(price)
-            signals[symbol.upper()] = price
-        # Trading keywords
-        bullish_keywords = ['buy', 'long', 'bullish', 'support', 'breakout', 'accumulate']
-        bearish_keywords = ['sell', 'short', 'bearish', 'resistance', 'breakdown', 'dump']
-        if any(keyword in text for keyword in bullish_keywords):
-            signals['sentiment'] = 'bullish'
-        elif any(keyword in text for keyword in bearish_keywords):
-            signals['sentiment'] = 'bearish'
-        return signals if signals else None
+        return get_signal_extractor().extract(tweet.text).to_trading_signals()
     
     def extract_market_events(self, tweet: Tweet) -> Optional[Dict]:
         """
@@ -402,29 +399,7 @@ class TwitterService:
             Optional[Dict]: Dictionary containing extracted market events if found,
                           None if no events detected
         """
-        text = tweet.text.lower()
-        events = {}
-        
-        # Event keywords
-        event_keywords = {
-            'listing': r'(?:listed|listing|lists) on (\w+)',
-            'partnership': r'partners? with (\w+)',
-            'launch': r'(?:launch|releases?|announces?) (\w+)',
-            'hack': r'(?:hack|exploit|breach|attack)',
-            'regulation': r'(?:sec|regulation|regulatory|law|compliance)',
-        }
-        
-        for event_type, pattern in event_keywords.items():
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                if event_type not in events:
-                    events[event_type] = []
-                if len(match.groups()) > 0:
-                    events[event_type].append(match.group(1))
-                else:
-                    events[event_type].append(True)
-        
-        return events if events else None
+        return get_signal_extractor().extract(tweet.text).events or None
 
     def check_rate_limit(self):
         """